@@ -0,0 +1,4 @@
+"""
+LAM-Agent 性能基准
+离线LLM桩服务器与端到端基准测试脚本
+"""
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+API大响应序列化与压缩基准
+构造附带详情的 /ask 响应（--evidence 条证据，执行结果中含 fetch_page 结构的页面，总计约 --size-mb），报告：
+- 标准库json（Starlette JSONResponse）与orjson（ORJSONResponse）的序列化耗时与字节数；
+- 完整响应与去掉原始HTML（exclude_fields）后的大小；
+- 不压缩、gzip与zstd（需安装 zstandard）的压缩耗时与压缩后大小。
+
+用法:
+    python -m benchmarks.bench_api_payload --size-mb 5 --evidence 20
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORDS = ("商品", "价格", "评价", "发货", "店铺", "销量", "优惠", "示例", "规格", "型号", "price", "review",
+         "shipping", "2024", "¥199", "\"引号\"", "——", "，", "。", "\n")
+
+
+def make_text(chars: int, rng: random.Random) -> str:
+    """由常见词随机组成的文本（接近真实页面的可压缩性，避免重复片段被压缩到几乎为零）"""
+    words = rng.choices(WORDS, k=chars // 2 + 1)
+    return "".join(words)[:chars]
+
+
+def make_response(size_mb: float, evidence: int, seed: int = 0) -> Dict[str, Any]:
+    """附带详情的 /ask 响应：一半内容为搜索证据，一半为执行结果中 fetch_page 结构的页面（html约占2/3）"""
+    rng = random.Random(seed)
+    half = int(size_mb / 2 * 1024 * 1024)
+    per_item = half // evidence
+    items = [{"title": f"证据 {i}", "href": f"https://example.com/{i}", "body": make_text(per_item // 2, rng),
+              "html": "<p>" + make_text(per_item // 2, rng) + "</p>"} for i in range(evidence)]
+    html = "".join(f'<div class="item" data-id="{i}"><a href="https://example.com/{i}">{make_text(40, rng)}</a></div>'
+                   for i in range(half * 2 // 3 // 90))
+    page = {"url": "https://example.com", "title": "示例页面", "html": html, "text": make_text(half // 3, rng)}
+    return {
+        "plan": "browse", "evidence_count": evidence, "answer": "示例回答", "sources": [e["href"] for e in items],
+        "cached": False, "cache": None, "evidence": items,
+        "execution_result": {"success": True, "operation_type": "browse", "page": page},
+    }
+
+
+def _timed(fn: Callable[[], Any], repeat: int) -> tuple:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        value = fn()
+    return value, (time.perf_counter() - start) / repeat * 1000
+
+
+def measure(size_mb: float, evidence: int, repeat: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+    from starlette.responses import JSONResponse
+
+    from src.api.responses import HEAVY_FIELDS, ORJSONResponse, _Encoder, available_encodings, exclude_fields
+
+    response = make_response(size_mb, evidence)
+    json_response = JSONResponse.__new__(JSONResponse)
+    orjson_response = ORJSONResponse.__new__(ORJSONResponse)
+
+    serialization = []
+    for variant, build in (("full", lambda: response), ("no-html", lambda: exclude_fields(response, HEAVY_FIELDS))):
+        for name, render in (("json", json_response.render), ("orjson", orjson_response.render)):
+            body, elapsed = _timed(lambda: render(build()), repeat)
+            serialization.append({"variant": variant, "encoder": name, "bytes": len(body), "ms": elapsed})
+
+    compression = []
+    for variant in ("full", "no-html"):
+        body = orjson_response.render(response if variant == "full" else exclude_fields(response, HEAVY_FIELDS))
+        compression.append({"variant": variant, "encoding": "identity", "bytes": len(body), "ms": 0.0})
+        for encoding in available_encodings(["gzip", "zstd"]):
+            data, elapsed = _timed(lambda: _Encoder(encoding).encode(body, final=True), repeat)
+            compression.append({"variant": variant, "encoding": encoding, "bytes": len(data), "ms": elapsed})
+    return {"serialization": serialization, "compression": compression}
+
+
+def format_tables(report: Dict[str, List[Dict[str, Any]]]) -> str:
+    header = f"{'variant':<9}{'encoder':<9}{'bytes':>11}{'ms':>9}"
+    lines = [header, "-" * len(header)]
+    for r in report["serialization"]:
+        lines.append(f"{r['variant']:<9}{r['encoder']:<9}{r['bytes']:>11}{r['ms']:>9.1f}")
+    header = f"{'variant':<9}{'encoding':<10}{'bytes':>11}{'ratio':>8}{'ms':>9}"
+    lines += ["", header, "-" * len(header)]
+    identity = {}
+    for r in report["compression"]:
+        identity.setdefault(r["variant"], r["bytes"])
+        lines.append(f"{r['variant']:<9}{r['encoding']:<10}{r['bytes']:>11}"
+                     f"{r['bytes'] / identity[r['variant']]:>8.2f}{r['ms']:>9.1f}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="API大响应序列化与压缩基准")
+    parser.add_argument("--size-mb", type=float, default=5.0, help="响应中证据与页面内容的总大小（MB）")
+    parser.add_argument("--evidence", type=int, default=20, help="证据条数")
+    parser.add_argument("--repeat", type=int, default=10, help="每项测量的重复次数")
+    parser.add_argument("--json", dest="json_path", default=None, help="将结果写入JSON文件")
+    args = parser.parse_args(argv)
+
+    report = measure(args.size_mb, max(1, args.evidence), args.repeat)
+    print(format_tables(report))
+    report = {"size_mb": args.size_mb, "evidence": args.evidence, **report}
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
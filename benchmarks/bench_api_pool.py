@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+/ask 接口代理工作池负载测试
+启动离线桩LLM服务器与 FastAPI 应用，在固定并发下比较不同工作池大小（LAM_API_AGENT_WORKERS）的
+/ask 吞吐与 p50/p95 延迟，同时持续探测 /health，验证代理执行期间事件循环仍能及时响应。
+
+用法:
+    python -m benchmarks.bench_api_pool --workers 1,2,4 --requests 24 --concurrency 8 --latency-ms 200
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_e2e import _ApiServer, api_worker, configure_settings, percentile, run_load
+from benchmarks.stub_llm_server import DEFAULT_FIXTURE, StubLLMServer, StubScript
+
+
+class HealthProbe:
+    """后台线程按固定间隔请求 /health 并记录延迟"""
+
+    def __init__(self, base_url: str, interval: float = 0.05):
+        import httpx
+
+        self._client = httpx.Client(base_url=base_url, timeout=30)
+        self.interval = interval
+        self.latencies: List[float] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="bench-health", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            self._client.get("/health")
+            self.latencies.append((time.perf_counter() - start) * 1000)
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "HealthProbe":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join(timeout=30)
+        self._client.close()
+
+
+def run_pool(workers: int, queries: List[str], total: int, concurrency: int) -> Dict[str, Any]:
+    from src.config import settings
+
+    settings.lam_api_agent_workers = workers
+    settings.lam_api_queue_size = max(settings.lam_api_queue_size, concurrency)
+    with _ApiServer() as api:
+        base_url = f"http://{api.host}:{api.port}"
+        with HealthProbe(base_url) as probe:
+            result = run_load("api", api_worker(base_url), queries, total, concurrency)
+    return {
+        "workers": workers,
+        **result,
+        "health_p50_ms": round(percentile(probe.latencies, 0.50), 1),
+        "health_max_ms": round(max(probe.latencies, default=0.0), 1),
+    }
+
+
+def format_table(results: List[Dict[str, Any]]) -> str:
+    header = (f"{'workers':>8}{'conc':>6}{'req':>6}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'req/s':>9}"
+              f"{'health p50':>12}{'health max':>12}")
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r['workers']:>8}{r['concurrency']:>6}{r['requests']:>6}{r['errors']:>5}"
+            f"{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['throughput_rps']:>9.2f}"
+            f"{r['health_p50_ms']:>12.1f}{r['health_max_ms']:>12.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description="/ask 接口代理工作池负载测试")
+    parser.add_argument("--workers", default="1,2,4", help="逗号分隔的工作池大小")
+    parser.add_argument("--requests", type=int, default=24)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--fixture", default=DEFAULT_FIXTURE)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="桩服务器首token延迟")
+    parser.add_argument("--tokens-per-sec", type=float, default=None, help="桩服务器token生成速率")
+    parser.add_argument("--json", dest="json_path", default=None, help="将结果写入JSON文件")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    sizes = [int(w) for w in args.workers.split(",") if w.strip()]
+    script = StubScript.load(args.fixture, latency_ms=args.latency_ms, tokens_per_sec=args.tokens_per_sec)
+    queries = script.queries or ["什么是LAM Agent？"]
+    results: List[Dict[str, Any]] = []
+
+    with StubLLMServer(script) as stub:
+        configure_settings(stub.base_url, 0.0, max(sizes) * 4)
+        for workers in sizes:
+            results.append(run_pool(workers, queries, args.requests, args.concurrency))
+
+    print(format_table(results))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
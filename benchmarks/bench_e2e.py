@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+端到端基准测试
+启动离线桩LLM服务器，分别驱动 LamAgent.run、FastAPI /ask 接口与UI命令处理路径，
+报告各路径的 p50/p95 延迟与吞吐量。
+
+用法:
+    python -m benchmarks.bench_e2e --requests 20 --concurrency 4 --targets agent,api,ui
+    python -m benchmarks.bench_e2e --latency-ms 300 --tokens-per-sec 200 --json results.json
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_llm_server import DEFAULT_FIXTURE, StubLLMServer, StubScript
+
+logger = logging.getLogger(__name__)
+
+TARGETS = ("agent", "api", "ui")
+
+
+def percentile(values: List[float], q: float) -> float:
+    """最近秩百分位数"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def configure_settings(base_url: str, llm_rate: float, llm_concurrency: int, answer_cache: bool = False) -> None:
+    """将全局配置指向桩服务器（须在创建LLM网关之前调用）"""
+    from src.config import settings
+
+    settings.lam_answer_cache_enabled = answer_cache
+    settings.use_deepseek = True
+    settings.deepseek_api_key = "stub"
+    settings.deepseek_base_url = base_url
+    settings.lam_llm_rate_per_sec = llm_rate
+    settings.lam_llm_burst = max(1, llm_concurrency)
+    settings.lam_llm_max_concurrency = llm_concurrency
+    settings.lam_llm_max_connections = max(settings.lam_llm_max_connections, llm_concurrency)
+
+
+def run_load(name: str, make_worker: Callable[[], Callable[[str], bool]], queries: List[str],
+             total: int, concurrency: int) -> Dict[str, Any]:
+    """以固定并发执行 total 次请求；每个工作线程持有自己的 worker 实例"""
+    local = threading.local()
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def task(i: int) -> None:
+        nonlocal errors
+        if not hasattr(local, "worker"):
+            local.worker = make_worker()
+        # 追加序号避免触发代理的短时间重复指令保护
+        query = f"{queries[i % len(queries)]} #{i}"
+        start = time.perf_counter()
+        try:
+            ok = local.worker(query)
+        except Exception as e:
+            logger.warning(f"{name} 请求失败: {e}")
+            ok = False
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies.append(elapsed)
+            errors += 0 if ok else 1
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f"bench-{name}") as pool:
+        list(pool.map(task, range(total)))
+    wall = time.perf_counter() - wall_start
+
+    return {
+        "target": name,
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 0.50), 1),
+        "p95_ms": round(percentile(latencies, 0.95), 1),
+        "mean_ms": round(sum(latencies) / len(latencies), 1) if latencies else 0.0,
+        "throughput_rps": round(total / wall, 2) if wall > 0 else 0.0,
+        "wall_s": round(wall, 2),
+    }
+
+
+def agent_worker() -> Callable[[str], bool]:
+    """LamAgent.run 不可重入，每个工作线程使用独立的代理实例"""
+    from src.agent.lam_agent import LamAgent
+
+    agent = LamAgent()
+
+    def call(query: str) -> bool:
+        result = agent.run(query)
+        return result.get("plan") not in ("error", "busy", "skipped") and bool(result.get("answer"))
+
+    return call
+
+
+class _ApiServer:
+    """在后台线程中运行 FastAPI 应用"""
+
+    def __init__(self, host: str = "127.0.0.1"):
+        import uvicorn
+        from src.api.main import app
+
+        self._server = uvicorn.Server(uvicorn.Config(app, host=host, port=0, log_level="warning",
+                                                     access_log=False))
+        self._thread = threading.Thread(target=self._server.run, name="bench-api", daemon=True)
+        self.host = host
+        self.port = 0
+
+    def __enter__(self) -> "_ApiServer":
+        self._thread.start()
+        deadline = time.monotonic() + 30
+        while not self._server.started:
+            if not self._thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("API服务器启动失败")
+            time.sleep(0.01)
+        self.port = self._server.servers[0].sockets[0].getsockname()[1]
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
+
+
+def api_worker(base_url: str) -> Callable[[], Callable[[str], bool]]:
+    import httpx
+
+    def make() -> Callable[[str], bool]:
+        client = httpx.Client(base_url=base_url, timeout=120)
+
+        def call(query: str) -> bool:
+            response = client.post("/ask", json={"question": query})
+            return response.status_code == 200 and bool(response.json().get("answer"))
+
+        return call
+
+    return make
+
+
+def ui_worker() -> Callable[[str], bool]:
+    """无窗口驱动 ChatGPTUI.process_message（分类 -> 关键词 -> 搜索 -> 回答 或 拆分 -> 执行）"""
+    from src.ui.chatgpt_ui import ChatGPTUI
+
+    class _ImmediateRoot:
+        def after(self, _delay, fn=None, *args):
+            if fn is not None:
+                fn(*args)
+
+    class _NullWidget:
+        def config(self, **_options):
+            pass
+
+    class HeadlessChatUI(ChatGPTUI):
+        def __init__(self):  # 不创建Tk窗口
+            self.root = _ImmediateRoot()
+            self.stop_btn = _NullWidget()
+            self.cancel_token = None
+            self.messages: List[tuple] = []
+
+        def append_to_chat(self, sender, message, tag="info"):
+            self.messages.append((sender, tag, message))
+
+        def update_status(self, message):
+            pass
+
+        def show_progress_bar(self, total_steps):
+            pass
+
+        def update_progress(self, current_step, total_steps, detail=None):
+            pass
+
+        def hide_progress_bar(self):
+            pass
+
+    ui = HeadlessChatUI()
+
+    def call(query: str) -> bool:
+        ui.messages.clear()
+        ui.process_message(query)
+        return any(tag in ("ai", "success") for _, tag, _ in ui.messages) and \
+            not any(tag == "error" for _, tag, _ in ui.messages)
+
+    return call
+
+
+def format_table(results: List[Dict[str, Any]]) -> str:
+    header = f"{'target':<8}{'req':>6}{'conc':>6}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}{'req/s':>9}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r['target']:<8}{r['requests']:>6}{r['concurrency']:>6}{r['errors']:>5}"
+            f"{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['mean_ms']:>10.1f}{r['throughput_rps']:>9.2f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description="LAM-Agent 端到端离线基准测试")
+    parser.add_argument("--targets", default=",".join(TARGETS), help="逗号分隔: agent,api,ui")
+    parser.add_argument("--requests", type=int, default=20, help="每个目标的请求总数")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--fixture", default=DEFAULT_FIXTURE)
+    parser.add_argument("--latency-ms", type=float, default=None, help="桩服务器首token延迟")
+    parser.add_argument("--tokens-per-sec", type=float, default=None, help="桩服务器token生成速率")
+    parser.add_argument("--llm-rate", type=float, default=0.0, help="LLM网关限流（每秒请求数），0为不限")
+    parser.add_argument("--llm-concurrency", type=int, default=16, help="LLM网关并发上限")
+    parser.add_argument("--answer-cache", action="store_true", help="启用回答缓存（默认关闭以测量完整路径）")
+    parser.add_argument("--json", dest="json_path", default=None, help="将结果写入JSON文件")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    targets = [t.strip() for t in args.targets.split(",") if t.strip()]
+    unknown = set(targets) - set(TARGETS)
+    if unknown:
+        parser.error(f"未知目标: {', '.join(sorted(unknown))}")
+
+    script = StubScript.load(args.fixture, latency_ms=args.latency_ms, tokens_per_sec=args.tokens_per_sec)
+    queries = script.queries or ["什么是LAM Agent？"]
+    results: List[Dict[str, Any]] = []
+
+    with StubLLMServer(script) as stub:
+        configure_settings(stub.base_url, args.llm_rate, args.llm_concurrency, args.answer_cache)
+
+        for target in targets:
+            if target == "agent":
+                results.append(run_load("agent", agent_worker, queries, args.requests, args.concurrency))
+            elif target == "api":
+                with _ApiServer() as api:
+                    make = api_worker(f"http://{api.host}:{api.port}")
+                    results.append(run_load("api", make, queries, args.requests, args.concurrency))
+            elif target == "ui":
+                results.append(run_load("ui", ui_worker, queries, args.requests, args.concurrency))
+
+        from src.agent.llm_gateway import get_llm_gateway
+        report = {"results": results, "llm": get_llm_gateway().snapshot(), "stub_hits": dict(script.hits)}
+
+    print(format_table(results))
+    print(f"\nstub hits: {report['stub_hits']}")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
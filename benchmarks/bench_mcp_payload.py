@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+MCP大响应传输基准
+启动带有 bench_payload 工具的MCP服务器进程，该工具返回与 fetch_page 结构相同、总计约 --size-mb 的页面结果
+（html + text），分别按以下方式传输并报告单次调用耗时：
+- line:   每条消息一行，读取端逐字节查找换行
+- framed: 超过阈值的消息使用长度前缀帧
+- blob:   长度前缀帧 + 大字符串经临时文件按引用传递
+另外给出标准库json与orjson对同一结果的编解码耗时。
+
+用法:
+    python -m benchmarks.bench_mcp_payload --size-mb 5 --calls 20
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_e2e import percentile
+
+MODES = {
+    # 模式: (帧阈值, 按引用传递的最小字符串长度)
+    "line": (0, 0),
+    "framed": (64 * 1024, 0),
+    "blob": (64 * 1024, 1024 * 1024),
+}
+
+
+def make_page(size_mb: float) -> Dict[str, Any]:
+    """构造与 fetch_page 返回值结构相同的页面结果，html约占2/3"""
+    chars = int(size_mb * 1024 * 1024)
+    row = '<div class="item"><a href="https://example.com/x">示例商品 "引号" 与换行</a></div>\n'
+    html = (row * (chars * 2 // 3 // len(row) + 1))[: chars * 2 // 3]
+    text = ("示例商品 引号 与换行\n" * (chars // 3 // 12 + 1))[: chars // 3]
+    return {"url": "https://example.com", "title": "示例页面", "html": html, "text": text}
+
+
+def serve(size_mb: float, frame_threshold: int) -> None:
+    """子进程入口：注册 bench_payload 工具后提供stdio服务"""
+    from src.mcp.core.base import MCPTool
+    from src.mcp.server import LAMMCPServer
+    from src.mcp.transport import serve_stdio
+
+    page = make_page(size_mb)
+    server = LAMMCPServer()
+    server.tools["bench_payload"] = MCPTool("bench_payload", "返回固定的大页面结果", {"type": "object"}, lambda args: page)
+    protocol_out = sys.stdout.buffer
+    sys.stdout = sys.stderr
+    asyncio.run(serve_stdio(server.handle_message, stdout=protocol_out, frame_threshold=frame_threshold))
+
+
+async def run_mode(mode: str, size_mb: float, calls: int) -> Dict[str, Any]:
+    from src.mcp.client import MCPClient
+
+    frame_threshold, blob_min_bytes = MODES[mode]
+    command = [sys.executable, "-m", "benchmarks.bench_mcp_payload", "--serve",
+               "--size-mb", str(size_mb), "--frame-threshold", str(frame_threshold)]
+    client = MCPClient(server_command=command, transport="stdio")
+    client.frame_threshold = frame_threshold
+    client.blob_min_bytes = blob_min_bytes
+    await client.start_server()
+    try:
+        # 预热
+        result = await client.call_tool("bench_payload", {})
+        assert result.get("success"), result
+        latencies: List[float] = []
+        for _ in range(calls):
+            start = time.perf_counter()
+            await client.call_tool("bench_payload", {})
+            latencies.append(time.perf_counter() - start)
+    finally:
+        await client.stop_server()
+    return {
+        "mode": mode,
+        "calls": calls,
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "mb_per_s": size_mb * calls / sum(latencies),
+    }
+
+
+def measure_codecs(size_mb: float, repeat: int = 10) -> List[Dict[str, Any]]:
+    """同一结果在json与orjson下的编码/解码耗时"""
+    from src.mcp import codec
+
+    message = {"jsonrpc": "2.0", "id": 1, "result": {"success": True, "result": make_page(size_mb)}}
+    rows = []
+    for name, dumps, loads in (
+        ("json", lambda m: json.dumps(m, ensure_ascii=False).encode("utf-8"), json.loads),
+        ("orjson", codec.dumps, codec.loads),
+    ):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            data = dumps(message)
+        encode = (time.perf_counter() - start) / repeat
+        start = time.perf_counter()
+        for _ in range(repeat):
+            loads(data)
+        decode = (time.perf_counter() - start) / repeat
+        rows.append({"codec": name, "bytes": len(data), "encode_ms": encode * 1000, "decode_ms": decode * 1000})
+    return rows
+
+
+def format_tables(results: List[Dict[str, Any]], codecs: List[Dict[str, Any]]) -> str:
+    header = f"{'mode':<8}{'calls':>7}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'MB/s':>9}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(f"{r['mode']:<8}{r['calls']:>7}{r['mean_ms']:>10.1f}{r['p50_ms']:>10.1f}"
+                     f"{r['p95_ms']:>10.1f}{r['mb_per_s']:>9.1f}")
+    header = f"{'codec':<8}{'bytes':>10}{'encode ms':>11}{'decode ms':>11}"
+    lines += ["", header, "-" * len(header)]
+    for r in codecs:
+        lines.append(f"{r['codec']:<8}{r['bytes']:>10}{r['encode_ms']:>11.1f}{r['decode_ms']:>11.1f}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="MCP大响应传输基准")
+    parser.add_argument("--size-mb", type=float, default=5.0, help="页面结果大小（MB）")
+    parser.add_argument("--calls", type=int, default=20, help="每种模式的调用次数")
+    parser.add_argument("--modes", default=",".join(MODES), help="逗号分隔: line,framed,blob")
+    parser.add_argument("--json", dest="json_path", default=None, help="将结果写入JSON文件")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--frame-threshold", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve(args.size_mb, args.frame_threshold)
+        return {}
+
+    logging.basicConfig(level=logging.WARNING)
+    results = [asyncio.run(run_mode(mode.strip(), args.size_mb, args.calls))
+               for mode in args.modes.split(",") if mode.strip()]
+    codecs = measure_codecs(args.size_mb)
+    print(format_tables(results, codecs))
+    report = {"size_mb": args.size_mb, "transfer": results, "codecs": codecs}
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
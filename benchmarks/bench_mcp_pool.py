@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+MCP服务器工作池聚合吞吐基准
+启动带有 bench_work 工具的MCP服务器（单进程或工作池），工具在阻塞线程池中执行一段纯Python计算
+（持有GIL，代表解析页面、处理结果等在单个服务器进程内无法并行的工作），
+在固定并发下比较不同进程数的每秒调用数与 p50/p95 延迟。
+
+用法:
+    python -m benchmarks.bench_mcp_pool --workers 1,2,4 --calls 400 --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_mcp_stdio import run_level
+
+
+def serve() -> None:
+    """子进程入口：注册 bench_work 工具后提供stdio服务"""
+    from src.mcp.core.base import MCPTool
+    from src.mcp.core.execution import ExecutionClass
+    from src.mcp.server import LAMMCPServer
+    from src.mcp.transport import serve_stdio
+
+    def work(args: Dict[str, Any]) -> Dict[str, Any]:
+        total = 0
+        for i in range(int(args.get("n", 200_000))):
+            total += i * i
+        return {"total": total}
+
+    server = LAMMCPServer()
+    server.tools["bench_work"] = MCPTool(
+        "bench_work", "纯Python计算", {"type": "object", "properties": {"n": {"type": "integer"}}},
+        work, ExecutionClass.BLOCKING_IO,
+    )
+    protocol_out = sys.stdout.buffer
+    sys.stdout = sys.stderr
+    asyncio.run(serve_stdio(server.handle_message, stdout=protocol_out))
+
+
+async def run_workers(workers: int, calls: int, concurrency: int, n: int) -> Dict[str, Any]:
+    from src.mcp.client import MCPClient
+
+    command = [sys.executable, "-m", "benchmarks.bench_mcp_pool", "--serve"]
+    client = MCPClient(server_command=command, transport="stdio", workers=workers)
+    started = time.perf_counter()
+    await client.start_server()
+    startup_ms = (time.perf_counter() - started) * 1000
+    try:
+        # 预热每个进程
+        await asyncio.gather(*[client.call_tool("bench_work", {"n": 1}) for _ in range(workers * 2)])
+        result = await run_level(client, "bench_work", {"n": n}, calls, concurrency)
+    finally:
+        await client.stop_server()
+    return {"workers": workers, "startup_ms": startup_ms, **result}
+
+
+def format_table(results: List[Dict[str, Any]]) -> str:
+    header = f"{'workers':>8}{'conc':>6}{'calls':>7}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'calls/s':>10}{'startup ms':>12}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r['workers']:>8}{r['concurrency']:>6}{r['calls']:>7}{r['errors']:>5}"
+            f"{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['calls_per_s']:>10.1f}{r['startup_ms']:>12.0f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description="MCP服务器工作池聚合吞吐基准")
+    parser.add_argument("--workers", default="1,2,4", help="逗号分隔的服务器进程数")
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--n", type=int, default=200_000, help="每次调用的计算量（循环次数）")
+    parser.add_argument("--json", dest="json_path", default=None, help="将结果写入JSON文件")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve()
+        return []
+
+    logging.basicConfig(level=logging.WARNING)
+    results = []
+    for workers in [int(w) for w in args.workers.split(",") if w.strip()]:
+        results.append(asyncio.run(run_workers(workers, args.calls, args.concurrency, args.n)))
+    print(format_table(results))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+MCP stdio传输吞吐基准
+启动一个MCP服务器进程，在不同并发度下发起 tools/call，报告每秒调用数与 p50/p95 延迟。
+并发度为1时相当于旧的一问一答式传输。
+
+用法:
+    python -m benchmarks.bench_mcp_stdio --calls 500 --concurrency 1,8,32,64
+    python -m benchmarks.bench_mcp_stdio --tool web_search --args '{"query": "MCP", "max_results": 3}'
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_e2e import percentile
+
+
+async def run_level(client, tool: str, arguments: Dict[str, Any], calls: int, concurrency: int) -> Dict[str, Any]:
+    """以固定并发发起 calls 次工具调用"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one() -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                result = await client.call_tool(tool, arguments)
+                if not result.get("success", False):
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(calls)])
+    elapsed = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "calls": calls,
+        "errors": errors,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "calls_per_s": calls / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def format_table(results: List[Dict[str, Any]]) -> str:
+    header = f"{'conc':>6}{'calls':>8}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'calls/s':>10}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r['concurrency']:>6}{r['calls']:>8}{r['errors']:>5}"
+            f"{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['calls_per_s']:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    from src.mcp.client import MCPClient
+
+    command = args.server_command.split() if args.server_command else None
+    client = MCPClient(server_command=command)
+    arguments = json.loads(args.args)
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    await client.start_server()
+    try:
+        # 预热，排除首次调用的初始化开销
+        await client.call_tool(args.tool, arguments)
+        return [await run_level(client, args.tool, arguments, args.calls, level) for level in levels]
+    finally:
+        await client.stop_server()
+
+
+def main(argv: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description="MCP stdio传输吞吐基准")
+    parser.add_argument("--calls", type=int, default=200, help="每个并发度下的调用次数")
+    parser.add_argument("--concurrency", default="1,8,32,64", help="逗号分隔的并发度")
+    parser.add_argument("--tool", default="calculate")
+    parser.add_argument("--args", default='{"expression": "1+1"}', help="工具参数（JSON）")
+    parser.add_argument("--server-command", default=None, help="自定义服务器命令，默认 python -m src.mcp.server")
+    parser.add_argument("--json", dest="json_path", default=None, help="将结果写入JSON文件")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    results = asyncio.run(run(args))
+    print(format_table(results))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
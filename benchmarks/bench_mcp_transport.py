@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+MCP传输单次调用开销微基准
+分别通过 stdio（子进程 + JSON管道）与 inprocess（直接调用服务器）顺序发起请求，
+比较 ping 与 tools/call 的平均/中位单次耗时。
+
+用法:
+    python -m benchmarks.bench_mcp_transport --calls 2000
+    python -m benchmarks.bench_mcp_transport --transports inprocess --tool web_search --args '{"query": "MCP"}'
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_e2e import percentile
+
+
+async def measure(call, calls: int) -> Dict[str, float]:
+    """顺序调用 calls 次，返回单次耗时统计（微秒）"""
+    latencies: List[float] = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        await call()
+        latencies.append(time.perf_counter() - start)
+    return {
+        "mean_us": sum(latencies) / len(latencies) * 1e6,
+        "p50_us": percentile(latencies, 0.50) * 1e6,
+        "p95_us": percentile(latencies, 0.95) * 1e6,
+    }
+
+
+async def run_transport(kind: str, tool: str, arguments: Dict[str, Any], calls: int) -> List[Dict[str, Any]]:
+    from src.mcp.client import MCPClient
+
+    client = MCPClient(transport=kind)
+    started = time.perf_counter()
+    await client.start_server()
+    startup_ms = (time.perf_counter() - started) * 1000
+    try:
+        # 预热，排除首次调用的初始化开销
+        await client.call_tool(tool, arguments)
+        rows = []
+        for method, call in (
+            ("ping", lambda: client.transport.request("ping")),
+            ("tools/call", lambda: client.call_tool(tool, arguments)),
+        ):
+            stats = await measure(call, calls)
+            rows.append({"transport": kind, "method": method, "calls": calls, "startup_ms": startup_ms, **stats})
+        return rows
+    finally:
+        await client.stop_server()
+
+
+def format_table(results: List[Dict[str, Any]]) -> str:
+    header = f"{'transport':<11}{'method':<12}{'calls':>7}{'mean us':>10}{'p50 us':>10}{'p95 us':>10}{'startup ms':>12}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r['transport']:<11}{r['method']:<12}{r['calls']:>7}"
+            f"{r['mean_us']:>10.1f}{r['p50_us']:>10.1f}{r['p95_us']:>10.1f}{r['startup_ms']:>12.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description="MCP传输单次调用开销微基准")
+    parser.add_argument("--calls", type=int, default=1000, help="每种请求的顺序调用次数")
+    parser.add_argument("--transports", default="stdio,inprocess", help="逗号分隔: stdio,inprocess")
+    parser.add_argument("--tool", default="calculate")
+    parser.add_argument("--args", default='{"expression": "1+1"}', help="工具参数（JSON）")
+    parser.add_argument("--json", dest="json_path", default=None, help="将结果写入JSON文件")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    arguments = json.loads(args.args)
+    results: List[Dict[str, Any]] = []
+    for kind in [t.strip() for t in args.transports.split(",") if t.strip()]:
+        results.extend(asyncio.run(run_transport(kind, args.tool, arguments, args.calls)))
+    print(format_table(results))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+离线LLM桩服务器
+实现OpenAI兼容的 chat/completions 接口（含SSE流式输出），按夹具文件中的规则返回
+脚本化或模板化的响应，并模拟首token延迟与token生成速率，用于无API密钥的端到端基准测试。
+
+用法:
+    python -m benchmarks.stub_llm_server --port 8765 --latency-ms 200 --tokens-per-sec 300
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import string
+import sys
+import threading
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from src.utils.evidence import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "stub_llm.json")
+
+# 从各类提示词中提取用户原始输入，用于模板中的 ${query}
+_QUERY_RE = re.compile(r"用户(?:查询|输入|问题|指令)\s*[:：]\s*(.+)")
+
+
+class StubScript:
+    """夹具脚本：按顺序匹配规则，返回第一个命中规则的响应
+
+    规则字段：
+    - match: 对最后一条用户消息做正则搜索
+    - response: 字符串或JSON对象（对象会被序列化），其中的 ${query} 替换为用户输入
+    - latency_ms / tokens_per_sec / chars_per_token: 覆盖默认的时延参数
+    """
+
+    def __init__(self, data: Dict[str, Any], latency_ms: Optional[float] = None,
+                 tokens_per_sec: Optional[float] = None):
+        self.defaults = {"latency_ms": 0.0, "tokens_per_sec": 0.0, "chars_per_token": 4}
+        self.defaults.update(data.get("defaults", {}))
+        if latency_ms is not None:
+            self.defaults["latency_ms"] = latency_ms
+        if tokens_per_sec is not None:
+            self.defaults["tokens_per_sec"] = tokens_per_sec
+        self.rules = [dict(rule, pattern=re.compile(rule["match"])) for rule in data.get("rules", [])]
+        self.fallback = data.get("fallback", "OK")
+        self.queries: List[str] = list(data.get("queries", []))
+        self.hits: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_FIXTURE, **overrides) -> "StubScript":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), **overrides)
+
+    def respond(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """返回 {name, content, latency_ms, tokens_per_sec, chars_per_token}"""
+        prompt = _message_text(messages[-1]) if messages else ""
+        match = _QUERY_RE.search(prompt)
+        query = match.group(1).strip() if match else prompt.strip()[:200]
+
+        rule: Dict[str, Any] = {"name": "fallback", "response": self.fallback}
+        for candidate in self.rules:
+            if candidate["pattern"].search(prompt):
+                rule = candidate
+                break
+
+        # 先在各字符串中替换再序列化，查询中的引号与反斜杠不会破坏JSON响应
+        response = _substitute(rule["response"], query)
+        if not isinstance(response, str):
+            response = json.dumps(response, ensure_ascii=False, indent=2)
+        with self._lock:
+            self.hits[rule["name"]] = self.hits.get(rule["name"], 0) + 1
+        return {
+            "name": rule["name"],
+            "content": response,
+            "latency_ms": float(rule.get("latency_ms", self.defaults["latency_ms"])),
+            "tokens_per_sec": float(rule.get("tokens_per_sec", self.defaults["tokens_per_sec"])),
+            "chars_per_token": max(1, int(rule.get("chars_per_token", self.defaults["chars_per_token"]))),
+        }
+
+
+def _substitute(value: Any, query: str) -> Any:
+    """把响应（字符串或JSON对象）中所有字符串里的 ${query} 替换为用户输入"""
+    if isinstance(value, str):
+        return string.Template(value).safe_substitute(query=query)
+    if isinstance(value, list):
+        return [_substitute(item, query) for item in value]
+    if isinstance(value, dict):
+        return {key: _substitute(item, query) for key, item in value.items()}
+    return value
+
+
+def _message_text(message: Dict[str, Any]) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content)
+
+
+def _usage(messages: List[Dict[str, Any]], content: str) -> Dict[str, int]:
+    prompt_tokens = sum(estimate_tokens(_message_text(m)) for m in messages)
+    completion_tokens = estimate_tokens(content)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def create_app(script: StubScript) -> FastAPI:
+    """创建桩服务器应用；同时挂载 /v1 前缀与无前缀路由以兼容不同的 base_url"""
+    app = FastAPI(title="LAM Stub LLM", version="1.0.0")
+    app.state.script = script
+
+    async def models():
+        return {"object": "list", "data": [{"id": "stub", "object": "model", "owned_by": "lam-agent"}]}
+
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages", [])
+        model = body.get("model", "stub")
+        reply = script.respond(messages)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+
+        if body.get("stream"):
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+            return StreamingResponse(
+                _stream_chunks(reply, messages, model, completion_id, created, include_usage),
+                media_type="text/event-stream",
+            )
+
+        await asyncio.sleep(reply["latency_ms"] / 1000)
+        if reply["tokens_per_sec"] > 0:
+            await asyncio.sleep(estimate_tokens(reply["content"]) / reply["tokens_per_sec"])
+        return JSONResponse({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": reply["content"]},
+                "finish_reason": "stop",
+            }],
+            "usage": _usage(messages, reply["content"]),
+        })
+
+    async def stats():
+        return {"hits": dict(script.hits)}
+
+    for prefix in ("", "/v1"):
+        app.add_api_route(f"{prefix}/models", models, methods=["GET"])
+        app.add_api_route(f"{prefix}/chat/completions", chat_completions, methods=["POST"])
+    app.add_api_route("/stats", stats, methods=["GET"])
+    return app
+
+
+async def _stream_chunks(reply: Dict[str, Any], messages: List[Dict[str, Any]], model: str,
+                         completion_id: str, created: int, include_usage: bool) -> AsyncIterator[str]:
+    def event(choices: List[Dict[str, Any]], usage: Optional[Dict[str, int]] = None) -> str:
+        payload = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": choices,
+        }
+        if usage is not None:
+            payload["usage"] = usage
+        return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+    await asyncio.sleep(reply["latency_ms"] / 1000)
+    yield event([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+
+    content = reply["content"]
+    step = reply["chars_per_token"]
+    delay = 1.0 / reply["tokens_per_sec"] if reply["tokens_per_sec"] > 0 else 0.0
+    for i in range(0, len(content), step):
+        if delay:
+            await asyncio.sleep(delay)
+        yield event([{"index": 0, "delta": {"content": content[i:i + step]}, "finish_reason": None}])
+
+    yield event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+    if include_usage:
+        yield event([], usage=_usage(messages, content))
+    yield "data: [DONE]\n\n"
+
+
+class StubLLMServer:
+    """在后台线程中运行桩服务器，便于基准测试与测试用例内嵌使用
+
+    with StubLLMServer(StubScript.load()) as server:
+        settings.deepseek_base_url = server.base_url
+    """
+
+    def __init__(self, script: Optional[StubScript] = None, host: str = "127.0.0.1", port: int = 0):
+        self.script = script or StubScript.load()
+        self.host = host
+        self.port = port
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    def start(self, timeout: float = 10.0) -> "StubLLMServer":
+        config = uvicorn.Config(create_app(self.script), host=self.host, port=self.port,
+                                log_level="warning", access_log=False)
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, name="stub-llm", daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if not self._thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("桩LLM服务器启动失败")
+            time.sleep(0.01)
+        # port=0 时由系统分配端口
+        self.port = self._server.servers[0].sockets[0].getsockname()[1]
+        logger.info(f"桩LLM服务器已启动: {self.base_url}")
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._server = None
+        self._thread = None
+
+    def __enter__(self) -> "StubLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="离线OpenAI兼容桩LLM服务器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixture", default=DEFAULT_FIXTURE, help="规则夹具文件（JSON）")
+    parser.add_argument("--latency-ms", type=float, default=None, help="首token延迟，覆盖夹具默认值")
+    parser.add_argument("--tokens-per-sec", type=float, default=None, help="token生成速率，0表示不限速")
+    args = parser.parse_args()
+
+    script = StubScript.load(args.fixture, latency_ms=args.latency_ms, tokens_per_sec=args.tokens_per_sec)
+    print(f"Stub LLM listening on http://{args.host}:{args.port}/v1")
+    uvicorn.run(create_app(script), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
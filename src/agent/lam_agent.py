@@ -2,17 +2,22 @@ import json
 import logging
 import threading
 import time
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_openai import ChatOpenAI
 
 from ..config import settings
+from ..database.answer_cache import AnswerCache, get_answer_cache, has_side_effects
 from ..tools.browser import automate_page
 from ..tools.search import open_search_in_browser, web_search
 from ..tools.desktop_integration import DesktopIntegration
+from ..utils.evidence import compact_evidence
+from ..utils.json_stream import IncrementalPlanParser
+from ..utils.metrics import get_metrics_registry
 from ..utils.validators import sanitize_text, validate_query, validate_url
 from ..mcp import LAMAgentMCPAdapter
+from .llm_gateway import LLMGateway, get_llm_gateway
+from .speculation import SpeculativeNavigator
 
 def _setup_logging():
     """配置日志系统"""
@@ -85,14 +90,24 @@ SYSTEM_PROMPT = (
     "4. 按顺序执行所有步骤\n"
 )
 
+PLAN_OPERATION_TYPES = ("search", "automate", "browse", "answer")
+
+_metrics = get_metrics_registry()
+AGENT_RUNS = _metrics.counter(
+    "lam_agent_runs_total", "LamAgent.run 调用次数（按结果：completed/cache_hit/desktop/skipped/busy/error）", ("outcome",))
+AGENT_PHASE_SECONDS = _metrics.histogram(
+    "lam_agent_phase_seconds", "智能体各阶段耗时（plan: 计划LLM, execute: 计划执行, answer: 回答LLM与回答缓存）", ("phase",))
+
 class LamAgent:
     def __init__(self, model: Optional[str] = None):
         self._model_name = model or settings.lam_agent_model
-        self._llm: Optional[ChatOpenAI] = None
+        self._llm_gateway: LLMGateway = get_llm_gateway()
         self._is_running = False
         self._run_lock = threading.Lock()
         self._last_sig = ""
         self._last_sig_ts = 0.0
+        # 当前查询的投机导航（仅在run期间有效）
+        self._speculation: Optional[SpeculativeNavigator] = None
         
         # 初始化桌面集成功能
         self._desktop_integration = DesktopIntegration()
@@ -109,26 +124,22 @@ class LamAgent:
             if not settings.openai_api_key:
                 raise ValueError("OPENAI_API_KEY is required but not set")
 
-    def _ensure_llm(self) -> ChatOpenAI:
-        if self._llm is None:
-            if settings.use_deepseek:
-                self._llm = ChatOpenAI(
-                    model=self._model_name,
-                    api_key=settings.deepseek_api_key,
-                    base_url=settings.deepseek_base_url,
-                    temperature=0.2,
-                )
-            else:
-                self._llm = ChatOpenAI(
-                    model=self._model_name,
-                    api_key=settings.openai_api_key,
-                    base_url=settings.openai_base_url,
-                    temperature=0.2,
-                )
-        return self._llm
-    
-    def _generate_deepseek_plan(self, user_query: str, llm: ChatOpenAI) -> Dict[str, Any]:
-        """使用DeepSeek生成执行计划"""
+    def _default_plan(self, user_query: str) -> Dict[str, Any]:
+        """计划生成失败时使用的默认搜索计划"""
+        return {
+            "operation_type": "search",
+            "target_platform": "browser",
+            "steps": [],
+            "context": user_query
+        }
+
+    def _generate_deepseek_plan(self, user_query: str) -> Dict[str, Any]:
+        """使用DeepSeek生成执行计划
+
+        以流式方式接收计划并增量解析；第一个步骤是navigate时立即派发投机导航，
+        与后续步骤的生成重叠执行。计划最终无效时取消投机工作并返回默认计划。
+        """
+        speculation = self._speculation
         try:
             prompt = f"""
 用户查询: {user_query}
@@ -213,32 +224,61 @@ class LamAgent:
         }}
 """
             
-            response = llm.invoke([
+            parser = IncrementalPlanParser()
+            for chunk in self._llm_gateway.stream([
                 SystemMessage(content=SYSTEM_PROMPT),
                 HumanMessage(content=prompt)
-            ]).content.strip()
+            ], model=self._model_name, temperature=0.2, purpose="plan"):
+                for kind, index, value in parser.feed(chunk.content or ""):
+                    if kind == "step" and index == 0 and speculation is not None:
+                        self._maybe_speculate(parser, value, speculation)
+            if speculation is not None:
+                speculation.mark_plan_done()
             
             # 尝试解析JSON
             try:
-                plan = json.loads(response)
-                return plan
-            except json.JSONDecodeError:
+                plan = parser.result()
+            except ValueError:
                 # 如果JSON解析失败，返回默认计划
-                return {
-                    "operation_type": "search",
-                    "target_platform": "browser",
-                    "steps": [],
-                    "context": user_query
-                }
+                plan = None
+            
+            if not self._is_valid_plan(plan):
+                logger.warning("DeepSeek计划无效，使用默认计划")
+                if speculation is not None:
+                    speculation.cancel()
+                return self._default_plan(user_query)
+            return plan
                 
         except Exception as e:
             logger.error(f"生成DeepSeek计划失败: {e}")
-            return {
-                "operation_type": "search",
-                "target_platform": "browser", 
-                "steps": [],
-                "context": user_query
-            }
+            if speculation is not None:
+                speculation.cancel()
+            return self._default_plan(user_query)
+
+    def _maybe_speculate(self, parser: IncrementalPlanParser, step: Dict[str, Any],
+                         speculation: SpeculativeNavigator) -> None:
+        """第一个步骤为navigate且计划类型允许时，派发投机导航"""
+        if step.get("action") != "navigate" or not step.get("url"):
+            return
+        if parser.fields.get("operation_type", "automate") != "automate":
+            return
+        try:
+            url = validate_url(step["url"])
+        except Exception as e:
+            logger.debug(f"跳过投机导航: {e}")
+            return
+        # 仅在URL无需规范化时派发，保证与执行阶段的目标URL一致
+        if url == step["url"]:
+            speculation.dispatch(url)
+
+    def _is_valid_plan(self, plan: Any) -> bool:
+        """检查计划结构是否可执行"""
+        if not isinstance(plan, dict):
+            return False
+        if plan.get("operation_type", "search") not in PLAN_OPERATION_TYPES:
+            return False
+        steps = plan.get("steps", [])
+        return isinstance(steps, list) and all(isinstance(step, dict) for step in steps)
     
     def _execute_deepseek_plan(self, plan: Dict[str, Any], user_query: str) -> Dict[str, Any]:
         """执行DeepSeek生成的计划"""
@@ -250,8 +290,14 @@ class LamAgent:
             
             logger.info(f"执行计划: {operation_type} - {target_platform} - {len(steps)}步骤")
             
+            # 已有投机预加载的页面时直接在本进程内复用，不再经由MCP
+            speculation = self._speculation
+            use_local_lease = (
+                speculation is not None and speculation.active and operation_type == "automate" and bool(steps)
+            )
+            
             # 如果启用MCP，优先使用MCP工具
-            if self._use_mcp:
+            if self._use_mcp and not use_local_lease:
                 try:
                     import asyncio
                     mcp_result = asyncio.run(self._execute_with_mcp(plan, user_query))
@@ -386,8 +432,16 @@ class LamAgent:
                     target_url = step['url']
                     break
             
-            # 执行Playwright操作
-            result = automate_page(target_url, steps, headless=False)
+            # 执行Playwright操作；投机导航已加载同一URL时复用该页面
+            speculation = self._speculation
+            if speculation is not None and speculation.matches(target_url):
+                result = speculation.run(
+                    lambda lease: automate_page(target_url, steps, headless=False, lease=lease)
+                )
+            else:
+                if speculation is not None:
+                    speculation.cancel()
+                result = automate_page(target_url, steps, headless=False)
             
             return {
                 "success": result.get("success", False),
@@ -430,14 +484,26 @@ class LamAgent:
         except Exception as e:
             return {"success": False, "message": f"传统自动化失败: {str(e)}"}
     
-    def _generate_final_answer(self, user_query: str, execution_result: Dict[str, Any], llm: ChatOpenAI) -> str:
+    def _generate_final_answer(self, user_query: str, execution_result: Dict[str, Any]) -> str:
         """生成最终答案"""
         try:
-            evidence = execution_result.get("evidence", [])
-            operation_type = execution_result.get("operation_type", "unknown")
-            target_platform = execution_result.get("target_platform", "unknown")
-            
-            prompt = f"""
+            return self._invoke_final_answer(user_query, execution_result)
+        except Exception as e:
+            logger.error(f"生成最终答案失败: {e}")
+            return f"操作完成，但生成回答时出现错误: {str(e)}"
+    
+    def _invoke_final_answer(self, user_query: str, execution_result: Dict[str, Any]) -> str:
+        """调用LLM生成最终答案，失败时抛出异常"""
+        # 去重并只保留与查询最相关的段落，避免整页文本/HTML撑大提示词
+        evidence = compact_evidence(
+            user_query,
+            execution_result.get("evidence", []),
+            token_budget=settings.lam_evidence_token_budget,
+        )
+        operation_type = execution_result.get("operation_type", "unknown")
+        target_platform = execution_result.get("target_platform", "unknown")
+        
+        prompt = f"""
 用户查询: {user_query}
 
 执行结果:
@@ -450,17 +516,37 @@ class LamAgent:
 
 请生成简洁明了的回答，总结执行结果。
 """
-            
-            response = llm.invoke([
-                SystemMessage(content="你是一个智能助手，请根据执行结果生成简洁明了的回答。"),
-                HumanMessage(content=prompt)
-            ]).content.strip()
-            
-            return response
-            
+        
+        return self._llm_gateway.invoke([
+            SystemMessage(content="你是一个智能助手，请根据执行结果生成简洁明了的回答。"),
+            HumanMessage(content=prompt)
+        ], model=self._model_name, temperature=0.2, purpose="answer").content.strip()
+    
+    def _answer_with_cache(self, user_query: str, plan: Dict[str, Any], execution_result: Dict[str, Any],
+                           cache: Optional[AnswerCache]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """生成最终答案；只读计划按（查询, 证据指纹）复用缓存的回答"""
+        if cache is None:
+            return self._generate_final_answer(user_query, execution_result), None
+        if has_side_effects(plan):
+            # 有副作用的计划不缓存，并使该查询的旧回答失效
+            cache.invalidate(user_query)
+            return self._generate_final_answer(user_query, execution_result), {"hit": False, "cacheable": False}
+        if not execution_result.get("success", False) or not cache.is_cacheable(plan):
+            return self._generate_final_answer(user_query, execution_result), {"hit": False, "cacheable": False}
+        
+        evidence = execution_result.get("evidence", [])
+        cached = cache.get(user_query, evidence)
+        if cached is not None:
+            logger.info(f"回答缓存命中（证据一致）: {user_query[:50]}")
+            return cached["answer"], {"hit": True, "level": "evidence", "age_s": cached["age_s"]}
+        
+        try:
+            answer = self._invoke_final_answer(user_query, execution_result)
         except Exception as e:
             logger.error(f"生成最终答案失败: {e}")
-            return f"操作完成，但生成回答时出现错误: {str(e)}"
+            return f"操作完成，但生成回答时出现错误: {str(e)}", {"hit": False, "cacheable": False}
+        stored = cache.put(user_query, plan, evidence, answer)
+        return answer, {"hit": False, "cacheable": True, "stored": stored}
     
     async def _execute_with_mcp(self, plan: Dict[str, Any], user_query: str) -> Dict[str, Any]:
         """使用MCP执行计划"""
@@ -561,14 +647,18 @@ class LamAgent:
                 "evidence": [{"title": "MCP执行失败", "href": "", "body": f"MCP执行时发生错误: {str(e)}"}]
             }
     
-    def run(self, user_query: str) -> Dict[str, Union[str, int, List[Dict[str, str]], Dict[str, Any]]]:
-        """运行LAM代理处理用户查询 - 使用DeepSeek统一处理"""
+    def run(self, user_query: str, use_cache: bool = True) -> Dict[str, Union[str, int, List[Dict[str, str]], Dict[str, Any]]]:
+        """运行LAM代理处理用户查询 - 使用DeepSeek统一处理
+
+        use_cache 为 False 时跳过回答缓存（既不读取也不写入）。
+        """
         # 验证输入
         user_query = validate_query(user_query)
         # 防重复与防重入：同一指令短时间内只执行一次
         sig = user_query.strip().lower()
         now = time.time()
         if self._last_sig == sig and (now - self._last_sig_ts) < 4.0:
+            AGENT_RUNS.inc(outcome="skipped")
             return {
                 "plan": "skipped",
                 "evidence_count": 0,
@@ -578,6 +668,7 @@ class LamAgent:
             }
         
         if not self._run_lock.acquire(blocking=False):
+            AGENT_RUNS.inc(outcome="busy")
             return {
                 "plan": "busy",
                 "evidence_count": 0,
@@ -590,14 +681,19 @@ class LamAgent:
         try:
             logger.info(f"处理用户查询: {user_query[:100]}...")
             
+            cache = get_answer_cache() if use_cache and settings.lam_answer_cache_enabled else None
+            
             # 检查是否为桌面相关命令
             if self._is_desktop_command(user_query):
                 logger.info("检测到桌面命令，使用桌面集成处理")
+                if cache is not None:
+                    cache.invalidate(user_query)
                 execution_result = self._handle_desktop_command(user_query)
                 answer = self._format_desktop_result(execution_result)
                 
                 self._last_sig = sig
                 self._last_sig_ts = now
+                AGENT_RUNS.inc(outcome="desktop")
                 
                 return {
                     "plan": "desktop_command",
@@ -608,33 +704,66 @@ class LamAgent:
                     "evidence": [execution_result] if execution_result.get("success") else []
                 }
             
-            llm = self._ensure_llm()
-            
-            # 使用DeepSeek分析用户意图并生成执行计划
-            execution_plan = self._generate_deepseek_plan(user_query, llm)
-            logger.info(f"DeepSeek执行计划: {execution_plan}")
-            
-            # 执行DeepSeek生成的计划
-            execution_result = self._execute_deepseek_plan(execution_plan, user_query)
-            logger.info("DeepSeek计划执行完成")
+            # 只读查询在TTL内直接返回缓存的计划、证据与回答
+            cached = cache.get(user_query) if cache is not None else None
+            if cached is not None:
+                logger.info(f"回答缓存命中: {user_query[:50]}")
+                self._last_sig = sig
+                self._last_sig_ts = now
+                AGENT_RUNS.inc(outcome="cache_hit")
+                return {
+                    "plan": cached["plan"],
+                    "execution_result": {"success": True, "evidence": cached["evidence"],
+                                         "operation_type": cached["operation_type"]},
+                    "answer": cached["answer"],
+                    "evidence_count": len(cached["evidence"]),
+                    "evidence": cached["evidence"],
+                    "cache": {"hit": True, "level": "query", "age_s": cached["age_s"]},
+                }
             
-            # 生成最终答案
-            answer = self._generate_final_answer(user_query, execution_result, llm)
+            speculation = SpeculativeNavigator(headless=False) if settings.lam_speculative_navigate else None
+            self._speculation = speculation
+            try:
+                # 使用DeepSeek分析用户意图并生成执行计划
+                with AGENT_PHASE_SECONDS.time(phase="plan"):
+                    execution_plan = self._generate_deepseek_plan(user_query)
+                logger.info(f"DeepSeek执行计划: {execution_plan}")
+                
+                # 执行DeepSeek生成的计划
+                with AGENT_PHASE_SECONDS.time(phase="execute"):
+                    execution_result = self._execute_deepseek_plan(execution_plan, user_query)
+                logger.info("DeepSeek计划执行完成")
+            finally:
+                self._speculation = None
+                if speculation is not None:
+                    speculation.close()
+            
+            # 报告投机导航与计划生成的重叠收益
+            if speculation is not None and speculation.stats()["dispatched"]:
+                execution_result["speculation"] = speculation.stats()
+                logger.info(f"投机导航统计: {execution_result['speculation']}")
+            
+            # 生成最终答案（只读计划可复用缓存）
+            with AGENT_PHASE_SECONDS.time(phase="answer"):
+                answer, cache_info = self._answer_with_cache(user_query, execution_plan, execution_result, cache)
             logger.info("查询处理完成")
             
             self._last_sig = sig
             self._last_sig_ts = now
+            AGENT_RUNS.inc(outcome="completed")
             
             return {
                 "plan": execution_plan,
                 "execution_result": execution_result,
                 "answer": answer,
                 "evidence_count": len(execution_result.get("evidence", [])),
-                "evidence": execution_result.get("evidence", [])
+                "evidence": execution_result.get("evidence", []),
+                "cache": cache_info
             }
             
         except Exception as e:
             logger.error(f"代理运行失败: {e}")
+            AGENT_RUNS.inc(outcome="error")
             return {
                 "plan": "error",
                 "execution_result": {"success": False, "error": str(e)},
@@ -0,0 +1,351 @@
+"""
+共享LLM网关
+统一管理ChatOpenAI客户端：连接池复用、令牌桶限流、并发上限、带抖动的重试、
+调用指标统计，以及相同请求的合并（singleflight）
+"""
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+from langchain_core.messages import BaseMessage
+from langchain_openai import ChatOpenAI
+
+from ..config import settings
+from ..utils.metrics import MetricFamily, Sample, get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+# 视为可重试的HTTP状态码
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+LLM_REQUEST_SECONDS = get_metrics_registry().histogram(
+    "lam_llm_request_duration_seconds", "LLM调用耗时（秒，含重试）", ("purpose",))
+
+
+class TokenBucket:
+    """线程安全的令牌桶限流器"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """获取一个令牌；rate<=0 表示不限流。超时返回 False"""
+        if self.rate <= 0:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+class _Call:
+    """进行中的请求，供相同请求的后来者等待结果"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class LLMMetrics:
+    """按用途统计的LLM调用指标"""
+
+    def __init__(self, window: int = 512):
+        self._window = window
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._latencies: Dict[str, Deque[float]] = {}
+
+    def record(self, purpose: str, latency_ms: float, usage: Optional[Dict[str, Any]] = None,
+               error: bool = False, retries: int = 0) -> None:
+        usage = usage or {}
+        with self._lock:
+            stats = self._entry(purpose)
+            stats["calls"] += 1
+            stats["errors"] += int(error)
+            stats["retries"] += retries
+            stats["latency_ms_total"] += latency_ms
+            stats["latency_ms_max"] = max(stats["latency_ms_max"], latency_ms)
+            stats["input_tokens"] += int(usage.get("input_tokens") or 0)
+            stats["output_tokens"] += int(usage.get("output_tokens") or 0)
+            self._latencies[purpose].append(latency_ms)
+        LLM_REQUEST_SECONDS.observe(latency_ms / 1000, purpose=purpose)
+
+    def record_coalesced(self, purpose: str) -> None:
+        with self._lock:
+            self._entry(purpose)["coalesced"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            result = {}
+            for purpose, stats in self._stats.items():
+                latencies = sorted(self._latencies[purpose])
+                entry = dict(stats)
+                entry["latency_ms_avg"] = round(stats["latency_ms_total"] / stats["calls"], 1) if stats["calls"] else 0.0
+                entry["latency_ms_p50"] = round(_percentile(latencies, 0.50), 1)
+                entry["latency_ms_p95"] = round(_percentile(latencies, 0.95), 1)
+                result[purpose] = entry
+            return result
+
+    def collect_metrics(self) -> List[MetricFamily]:
+        """按用途（plan/answer/...）的调用、错误、重试、合并与token计数"""
+        snapshot = self.snapshot()
+
+        def family(name: str, help: str, key: str, scale: float = 1.0) -> MetricFamily:
+            return MetricFamily(name, "counter", help,
+                                [Sample({"purpose": p}, s[key] * scale) for p, s in snapshot.items()])
+
+        return [
+            family("lam_llm_calls_total", "LLM调用次数", "calls"),
+            family("lam_llm_errors_total", "LLM调用失败次数", "errors"),
+            family("lam_llm_retries_total", "LLM调用重试次数", "retries"),
+            family("lam_llm_coalesced_total", "与进行中的相同请求合并的次数", "coalesced"),
+            MetricFamily("lam_llm_tokens_total", "counter", "LLM token用量",
+                         [Sample({"purpose": p, "direction": d}, s[f"{d}_tokens"])
+                          for p, s in snapshot.items() for d in ("input", "output")]),
+            family("lam_llm_latency_seconds_total", "LLM调用累计耗时（秒）", "latency_ms_total", 1 / 1000),
+        ]
+
+    def _entry(self, purpose: str) -> Dict[str, Any]:
+        if purpose not in self._stats:
+            self._stats[purpose] = {
+                "calls": 0, "errors": 0, "retries": 0, "coalesced": 0,
+                "latency_ms_total": 0.0, "latency_ms_max": 0.0,
+                "input_tokens": 0, "output_tokens": 0,
+            }
+            self._latencies[purpose] = deque(maxlen=self._window)
+        return self._stats[purpose]
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(q * (len(values) - 1))))
+    return values[index]
+
+
+def _usage_of(message: Any) -> Dict[str, Any]:
+    usage = getattr(message, "usage_metadata", None)
+    return dict(usage) if usage else {}
+
+
+def _is_retryable(error: BaseException) -> bool:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is not None:
+        return status in _RETRYABLE_STATUS
+    if isinstance(error, (httpx.TransportError, ConnectionError, TimeoutError)):
+        return True
+    name = type(error).__name__
+    return "Connection" in name or "Timeout" in name
+
+
+class LLMGateway:
+    """所有LLM调用的统一入口
+
+    - 同一(model, temperature)只构建一次ChatOpenAI，所有客户端共享一个httpx连接池
+    - 每次调用先经过并发信号量与令牌桶，再按指数退避+全抖动重试可恢复错误
+    - 完全相同的非流式请求在进行中时合并为一次调用
+    """
+
+    def __init__(self, max_concurrency: int = 4, rate_per_sec: float = 2.0, burst: int = 4,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 timeout: float = 60.0, max_connections: int = 10):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.metrics = LLMMetrics()
+        self._bucket = TokenBucket(rate_per_sec, burst)
+        self._semaphore = threading.BoundedSemaphore(max(1, max_concurrency))
+        self._http_client = httpx.Client(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+        self._clients: Dict[Tuple[str, float], ChatOpenAI] = {}
+        self._clients_lock = threading.Lock()
+        self._inflight: Dict[str, _Call] = {}
+        self._inflight_lock = threading.Lock()
+
+    def is_configured(self) -> bool:
+        """当前提供商的API密钥是否已配置"""
+        return bool(settings.deepseek_api_key if settings.use_deepseek else settings.openai_api_key)
+
+    def get_llm(self, model: Optional[str] = None, temperature: float = 0.2) -> ChatOpenAI:
+        """获取（缓存的）ChatOpenAI客户端"""
+        model = model or settings.lam_agent_model
+        key = (model, float(temperature))
+        with self._clients_lock:
+            llm = self._clients.get(key)
+            if llm is None:
+                if settings.use_deepseek:
+                    api_key, base_url = settings.deepseek_api_key, settings.deepseek_base_url
+                else:
+                    api_key, base_url = settings.openai_api_key, settings.openai_base_url
+                llm = ChatOpenAI(
+                    model=model,
+                    api_key=api_key,
+                    base_url=base_url,
+                    temperature=temperature,
+                    timeout=self.timeout,
+                    max_retries=0,  # 重试由网关统一处理
+                    stream_usage=True,
+                    http_client=self._http_client,
+                )
+                self._clients[key] = llm
+            return llm
+
+    def invoke(self, messages: List[BaseMessage], model: Optional[str] = None,
+               temperature: float = 0.2, purpose: str = "default") -> Any:
+        """同步调用LLM，返回AIMessage"""
+        llm = self.get_llm(model, temperature)
+        key = self._request_key(llm, messages)
+
+        with self._inflight_lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._inflight[key] = call
+            else:
+                call.waiters += 1
+
+        if not leader:
+            self.metrics.record_coalesced(purpose)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._call_with_retry(lambda: llm.invoke(messages), purpose)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+            call.done.set()
+
+    def stream(self, messages: List[BaseMessage], model: Optional[str] = None,
+               temperature: float = 0.2, purpose: str = "default") -> Iterator[Any]:
+        """流式调用LLM，逐块产出AIMessageChunk
+
+        仅在收到第一个数据块之前的错误会被重试，之后的错误直接抛出。
+        """
+        llm = self.get_llm(model, temperature)
+        with self._semaphore:
+            attempt = 0
+            start = time.perf_counter()
+            while True:
+                self._acquire_token()
+                usage: Dict[str, Any] = {}
+                received = False
+                try:
+                    for chunk in llm.stream(messages):
+                        received = True
+                        usage = _usage_of(chunk) or usage
+                        yield chunk
+                    self.metrics.record(purpose, (time.perf_counter() - start) * 1000, usage, retries=attempt)
+                    return
+                except Exception as e:
+                    if received or attempt >= self.max_retries or not _is_retryable(e):
+                        self.metrics.record(purpose, (time.perf_counter() - start) * 1000, usage,
+                                            error=True, retries=attempt)
+                        raise
+                    attempt += 1
+                    self._backoff(attempt, e, purpose)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """返回按用途聚合的调用指标"""
+        return self.metrics.snapshot()
+
+    def close(self) -> None:
+        """关闭共享连接池"""
+        with self._clients_lock:
+            self._clients.clear()
+        self._http_client.close()
+
+    def _call_with_retry(self, fn, purpose: str) -> Any:
+        with self._semaphore:
+            attempt = 0
+            start = time.perf_counter()
+            while True:
+                self._acquire_token()
+                try:
+                    result = fn()
+                    self.metrics.record(purpose, (time.perf_counter() - start) * 1000, _usage_of(result),
+                                        retries=attempt)
+                    return result
+                except Exception as e:
+                    if attempt >= self.max_retries or not _is_retryable(e):
+                        self.metrics.record(purpose, (time.perf_counter() - start) * 1000,
+                                            error=True, retries=attempt)
+                        raise
+                    attempt += 1
+                    self._backoff(attempt, e, purpose)
+
+    def _acquire_token(self) -> None:
+        if not self._bucket.acquire(timeout=self.timeout):
+            raise TimeoutError("LLM请求限流等待超时")
+
+    def _backoff(self, attempt: int, error: BaseException, purpose: str) -> None:
+        # 指数退避 + 全抖动
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1))))
+        logger.warning(f"LLM调用失败（{purpose}），{delay:.2f}s后第{attempt}次重试: {error}")
+        time.sleep(delay)
+
+    @staticmethod
+    def _request_key(llm: ChatOpenAI, messages: List[BaseMessage]) -> str:
+        payload = json.dumps(
+            [llm.model_name, llm.temperature, [(m.type, m.content) for m in messages]],
+            ensure_ascii=False, sort_keys=True, default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """获取全局LLM网关（首次调用时按配置创建）"""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway(
+                    max_concurrency=settings.lam_llm_max_concurrency,
+                    rate_per_sec=settings.lam_llm_rate_per_sec,
+                    burst=settings.lam_llm_burst,
+                    max_retries=settings.lam_llm_max_retries,
+                    timeout=settings.lam_llm_timeout,
+                    max_connections=settings.lam_llm_max_connections,
+                )
+                get_metrics_registry().register_collector("llm", _gateway.metrics.collect_metrics)
+    return _gateway
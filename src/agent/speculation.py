@@ -0,0 +1,127 @@
+"""
+投机执行
+在LLM仍在生成计划时，提前为第一个navigate步骤租用浏览器并加载页面
+"""
+import contextvars
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from ..tools.browser import PageLease
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SpeculativeNavigator:
+    """投机导航器
+
+    所有Playwright操作都在同一个专用线程中执行（同步API与线程绑定），
+    因此预加载的页面只能通过 run() 在该线程上被后续自动化复用。
+    计划最终无效或与预加载URL不一致时调用 cancel()，已打开的浏览器会被立即关闭。
+    """
+
+    def __init__(self, headless: bool = False, timeout_ms: int = 20000):
+        self._headless = headless
+        self._timeout_ms = timeout_ms
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lam-speculate")
+        self._future = None
+        self._cancelled = False
+        self._consumed = False
+        self.url: Optional[str] = None
+        self.error: Optional[str] = None
+        self._dispatched_at: Optional[float] = None
+        self._ready_at: Optional[float] = None
+        self._plan_done_at: Optional[float] = None
+
+    @property
+    def active(self) -> bool:
+        """是否存在未取消的投机导航"""
+        return self._future is not None and not self._cancelled
+
+    def dispatch(self, url: str) -> bool:
+        """开始投机导航，每个实例只执行一次"""
+        if self._future is not None or self._cancelled:
+            return False
+        self.url = url
+        self._dispatched_at = time.perf_counter()
+        self._future = self._executor.submit(self._open, url)
+        logger.info(f"投机导航已派发: {url}")
+        return True
+
+    def mark_plan_done(self) -> None:
+        """记录计划生成完成的时间点，用于计算重叠收益"""
+        if self._plan_done_at is None:
+            self._plan_done_at = time.perf_counter()
+
+    def matches(self, url: str) -> bool:
+        """预加载的URL是否与实际执行的目标一致"""
+        return self.active and url == self.url
+
+    def run(self, fn: Callable[[Optional[PageLease]], T]) -> T:
+        """在租约线程上执行 fn(lease)；预加载失败时传入 None
+
+        携带调用方的上下文提交，使取消令牌与进度回调在租约线程中同样生效。
+        """
+        def _task() -> T:
+            lease = None
+            try:
+                lease = self._future.result()
+            except Exception as e:
+                self.error = str(e)
+                logger.warning(f"投机导航失败，回退到常规启动: {e}")
+            self._consumed = lease is not None
+            return fn(lease)
+
+        return self._executor.submit(contextvars.copy_context().run, _task).result()
+
+    def cancel(self) -> None:
+        """取消投机工作：未开始的任务直接撤销，已加载的页面立即关闭"""
+        if self._cancelled:
+            return
+        self._cancelled = True
+        if self._future is None or self._future.cancel():
+            return
+        logger.info(f"取消投机导航: {self.url}")
+        self._executor.submit(self._close_lease)
+
+    def close(self) -> None:
+        """释放线程池；未被消费的租约会被关闭"""
+        if not self._consumed:
+            self.cancel()
+        self._executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """投机执行统计，overlap_ms 为页面加载与计划生成重叠的时间"""
+        overlap_ms = 0.0
+        if self._dispatched_at is not None and self._plan_done_at is not None:
+            end = self._plan_done_at
+            if self._ready_at is not None:
+                end = min(end, self._ready_at)
+            overlap_ms = max(0.0, (end - self._dispatched_at) * 1000)
+        return {
+            "dispatched": self._future is not None,
+            "url": self.url,
+            "used": self._consumed,
+            "cancelled": self._cancelled,
+            "overlap_ms": round(overlap_ms, 1),
+            "error": self.error,
+        }
+
+    def _open(self, url: str) -> Optional[PageLease]:
+        lease = PageLease(url, headless=self._headless, timeout_ms=self._timeout_ms)
+        self._ready_at = time.perf_counter()
+        if self._cancelled:
+            lease.close()
+            return None
+        return lease
+
+    def _close_lease(self) -> None:
+        try:
+            lease = self._future.result()
+        except Exception:
+            return
+        if lease is not None and not self._consumed:
+            lease.close()
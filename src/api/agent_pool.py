@@ -0,0 +1,164 @@
+"""
+API代理工作池
+LamAgent.run 是同步且不可重入的（执行期间持有运行锁），直接在 async 接口中调用会阻塞uvicorn事件循环。
+工作池持有固定数量的独立 LamAgent 实例，在专用线程池中执行查询：
+空闲实例数即并发上限，超出的请求在有界队列中等待，队列已满时立即拒绝并给出建议的重试间隔；
+单个请求超时后立即返回，同时通过取消令牌让仍在运行的代理在下一个检查点停止。
+"""
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..utils.cancellation import CancelToken, cancel_scope
+from ..utils.exceptions import TimeoutError as AgentTimeoutError
+from ..utils.metrics import MetricFamily, Sample
+
+logger = logging.getLogger(__name__)
+
+
+class AgentPoolBusy(Exception):
+    """工作池的等待队列已满"""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"代理工作池繁忙，请在 {retry_after} 秒后重试")
+
+
+class AgentPool:
+    """固定大小的 LamAgent 工作池
+
+    size: 代理实例数（同时执行的查询数）
+    queue_size: 所有实例都忙时允许排队等待的请求数
+    timeout: 单个请求从提交到完成的默认超时（秒，含排队时间）
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int = 4, queue_size: int = 16, timeout: float = 300.0):
+        self.size = max(1, int(size))
+        self.queue_size = max(0, int(queue_size))
+        self.timeout = float(timeout)
+        # 启动时创建全部实例：配置错误（如缺少API密钥）在启动阶段暴露
+        self._idle: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        for _ in range(self.size):
+            self._idle.put(factory())
+        self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="lam-agent")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._stats = {"completed": 0, "failed": 0, "rejected": 0, "timeouts": 0}
+        # 单个请求执行时长的滑动平均，用于估计重试间隔
+        self._run_avg = 1.0
+        self._closed = False
+
+    async def run(self, question: str, use_cache: bool = True, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """在工作池中执行 LamAgent.run，不阻塞事件循环
+
+        队列已满时抛出 AgentPoolBusy，超时抛出 TimeoutError（src.utils.exceptions）。
+        """
+        timeout = self.timeout if timeout is None else timeout
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("代理工作池已关闭")
+            if self._pending >= self.size + self.queue_size:
+                self._stats["rejected"] += 1
+                raise AgentPoolBusy(self._retry_after_locked())
+            self._pending += 1
+        token = CancelToken()
+        future = asyncio.get_running_loop().run_in_executor(
+            self._executor, self._execute, token, question, use_cache)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._stats["timeouts"] += 1
+            token.cancel("请求超时")
+            raise AgentTimeoutError(f"查询处理超时（{timeout} 秒）", timeout, "ask") from None
+        except asyncio.CancelledError:
+            # 客户端断开：让仍在排队或运行的查询尽快结束
+            token.cancel("请求已取消")
+            raise
+
+    async def run_many(self, questions: Sequence[str], use_cache: bool = True, parallelism: Optional[int] = None,
+                       timeout: Optional[float] = None) -> AsyncIterator[Tuple[int, Optional[Dict[str, Any]],
+                                                                                Optional[Exception]]]:
+        """以有界并行度执行一批查询，按完成顺序产出 (序号, 结果, 异常)
+
+        同时提交的查询不超过 parallelism（默认并且最多为实例数），因此一批查询不会占满等待队列；
+        工作池被其他请求占满时按建议间隔重试。迭代被中止时取消尚未完成的查询。
+        """
+        limit = max(1, min(parallelism or self.size, self.size))
+        semaphore = asyncio.Semaphore(limit)
+
+        async def one(index: int, question: str) -> Tuple[int, Optional[Dict[str, Any]], Optional[Exception]]:
+            async with semaphore:
+                while True:
+                    try:
+                        return index, await self.run(question, use_cache, timeout), None
+                    except AgentPoolBusy as e:
+                        await asyncio.sleep(e.retry_after)
+                    except Exception as e:
+                        return index, None, e
+
+        tasks = [asyncio.ensure_future(one(i, q)) for i, q in enumerate(questions)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _execute(self, token: CancelToken, question: str, use_cache: bool) -> Dict[str, Any]:
+        agent = self._idle.get()
+        started = time.monotonic()
+        with self._lock:
+            self._running += 1
+        ok = False
+        try:
+            # 在排队期间已超时的请求不再执行
+            token.raise_if_cancelled()
+            with cancel_scope(token):
+                result = agent.run(question, use_cache=use_cache)
+            ok = True
+            return result
+        finally:
+            self._idle.put(agent)
+            with self._lock:
+                self._running -= 1
+                self._pending -= 1
+                self._stats["completed" if ok else "failed"] += 1
+                self._run_avg = self._run_avg * 0.8 + (time.monotonic() - started) * 0.2
+
+    def _retry_after_locked(self) -> float:
+        return round(max(1.0, self._run_avg * (self._pending - self.size + 1) / self.size), 1)
+
+    def stats(self) -> Dict[str, Any]:
+        """实例数、运行中与排队的请求数、完成/失败/拒绝/超时计数"""
+        with self._lock:
+            return {
+                "size": self.size,
+                "running": self._running,
+                "queued": max(0, self._pending - self._running),
+                "queue_size": self.queue_size,
+                **self._stats,
+                "avg_run_s": round(self._run_avg, 2),
+            }
+
+    def collect_metrics(self) -> List[MetricFamily]:
+        """工作池占用、排队与各结果计数"""
+        stats = self.stats()
+        return [
+            MetricFamily("lam_agent_pool_size", "gauge", "代理工作池实例数", [Sample({}, stats["size"])]),
+            MetricFamily("lam_agent_pool_running", "gauge", "正在执行的查询数", [Sample({}, stats["running"])]),
+            MetricFamily("lam_agent_pool_queued", "gauge", "排队等待的查询数", [Sample({}, stats["queued"])]),
+            MetricFamily("lam_agent_pool_requests_total", "counter", "工作池请求数（按结果）",
+                         [Sample({"outcome": k}, stats[k]) for k in ("completed", "failed", "rejected", "timeouts")]),
+        ]
+
+    def shutdown(self, wait: bool = False) -> None:
+        """停止接收新请求；未开始的排队请求被丢弃"""
+        with self._lock:
+            self._closed = True
+        self._executor.shutdown(wait=wait, cancel_futures=True)
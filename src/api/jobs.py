@@ -0,0 +1,168 @@
+"""
+后台任务执行
+POST /jobs 提交的智能体查询（kind=ask）与MCP工具调用（kind=tool）写入 JobStore 后由固定数量的工作线程执行，
+执行期间通过 report_progress 上报的进度事件追加到任务的事件表。每个工作线程持有自己的 LamAgent 实例
+（LamAgent.run 不可重入）；工具调用经工作池持有的MCP客户端发送（默认在独立的服务器进程中执行，
+lam_jobs_tool_transport=inprocess 时在本进程内执行），服务器推送的进度通知同样记入事件表。
+"""
+import asyncio
+import logging
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..database.job_store import QUEUED, RUNNING, JobStore
+from ..utils.metrics import MetricFamily, Sample
+from ..utils.progress import LOG, progress_scope, report_progress
+
+logger = logging.getLogger(__name__)
+
+ASK = "ask"
+TOOL = "tool"
+
+
+class JobManager:
+    """任务工作池
+
+    agent_factory: 创建 LamAgent 的工厂（每个工作线程首次执行查询时调用）
+    tool_client: 创建MCP客户端的工厂（默认按 lam_jobs_tool_transport 创建 MCPClient），首个工具任务时启动，stop 时关闭
+    retention: 已结束任务的保留时长（秒），后台线程定期清除
+    """
+
+    def __init__(self, store: JobStore, agent_factory: Callable[[], Any], workers: int = 2,
+                 tool_client: Optional[Callable[[], Any]] = None, retention: float = 7 * 86400,
+                 purge_interval: float = 3600.0):
+        self.store = store
+        self.agent_factory = agent_factory
+        self.workers = max(1, int(workers))
+        self.tool_client = tool_client
+        self.mcp_client: Any = None
+        self._client_lock = threading.Lock()
+        self.retention = retention
+        self.purge_interval = max(1.0, purge_interval)
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._local = threading.local()
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+
+    def start(self) -> "JobManager":
+        """恢复上次运行遗留的任务并启动工作线程与清理线程"""
+        if self._threads:
+            return self
+        self.store.purge(self.retention)
+        for job_id in self.store.recover():
+            self._queue.put(job_id)
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"lam-job-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        janitor = threading.Thread(target=self._purge_loop, name="lam-job-purge", daemon=True)
+        janitor.start()
+        self._threads.append(janitor)
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """停止工作线程（正在执行的任务执行完毕后退出，未开始的任务保留在库中，下次启动时继续）"""
+        self._stop.set()
+        for _ in range(self.workers):
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+        with self._client_lock:
+            client, self.mcp_client = self.mcp_client, None
+        if client is not None:
+            asyncio.run(client.stop_server())
+
+    def submit(self, kind: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        """提交任务，返回排队中的任务记录"""
+        if kind not in (ASK, TOOL):
+            raise ValueError(f"未知的任务类型: {kind}")
+        job = self.store.create(kind, request)
+        self._queue.put(job["id"])
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        return {"workers": self.workers, "queue_depth": self._queue.qsize(), "jobs": self.store.counts()}
+
+    def collect_metrics(self) -> List[MetricFamily]:
+        """各状态的任务数（排队与运行中即在途任务）及内存队列深度"""
+        counts = self.store.counts()
+        statuses = sorted(set(counts) | {QUEUED, RUNNING})
+        return [
+            MetricFamily("lam_jobs", "gauge", "各状态的后台任务数",
+                         [Sample({"status": s}, counts.get(s, 0)) for s in statuses]),
+            MetricFamily("lam_jobs_queue_depth", "gauge", "等待工作线程的任务数", [Sample({}, self._queue.qsize())]),
+            MetricFamily("lam_jobs_workers", "gauge", "后台任务工作线程数", [Sample({}, self.workers)]),
+        ]
+
+    def _work(self) -> None:
+        while True:
+            job_id = self._queue.get()
+            if job_id is None or self._stop.is_set():
+                return
+            try:
+                self._run(job_id)
+            except Exception as e:
+                logger.error(f"任务 {job_id} 执行异常: {e}")
+
+    def _run(self, job_id: str) -> None:
+        if not self.store.mark_running(job_id):
+            return
+        job = self.store.get(job_id)
+
+        def record(event: Dict[str, Any]) -> None:
+            event = dict(event)
+            self.store.add_event(job_id, event.pop("kind", "log"), **event)
+
+        try:
+            with progress_scope(record):
+                if job["kind"] == ASK:
+                    result, error = self._run_ask(job["request"])
+                else:
+                    result, error = self._run_tool(job["request"])
+        except Exception as e:
+            logger.error(f"任务 {job_id} 失败: {e}")
+            result, error = None, str(e) or type(e).__name__
+        self.store.finish(job_id, result, error)
+
+    def _run_ask(self, request: Dict[str, Any]) -> Tuple[Any, Optional[str]]:
+        agent = getattr(self._local, "agent", None)
+        if agent is None:
+            agent = self._local.agent = self.agent_factory()
+        result = agent.run(request["question"], use_cache=not request.get("no_cache", False))
+        if result.get("plan") == "error":
+            return result, (result.get("execution_result") or {}).get("error") or result.get("answer")
+        return result, None
+
+    def _run_tool(self, request: Dict[str, Any]) -> Tuple[Any, Optional[str]]:
+        client = self._client()
+
+        def forward(event: Dict[str, Any]) -> None:
+            event = {k: v for k, v in event.items() if k not in ("type", "progress")}
+            report_progress(event.pop("kind", LOG), event.pop("message", ""), **event)
+
+        result = asyncio.run(client.call_tool(request["tool"], request.get("arguments") or {}, on_progress=forward))
+        if not result.get("success"):
+            return result, result.get("error") or "工具调用失败"
+        return result, None
+
+    def _client(self) -> Any:
+        """工作池共用的MCP客户端（传输层在自己的IO线程中运行，可从各工作线程的事件循环调用）"""
+        with self._client_lock:
+            if self.mcp_client is None:
+                if self.tool_client is None:
+                    from ..config import settings
+                    from ..mcp.client import MCPClient
+                    client = MCPClient(transport=settings.lam_jobs_tool_transport or None)
+                else:
+                    client = self.tool_client()
+                asyncio.run(client.start_server())
+                self.mcp_client = client
+            return self.mcp_client
+
+    def _purge_loop(self) -> None:
+        while not self._stop.wait(self.purge_interval):
+            removed = self.store.purge(self.retention)
+            if removed:
+                logger.info(f"已清除 {removed} 个过期任务")
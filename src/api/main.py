@@ -1,9 +1,23 @@
+import asyncio
+import json
 import logging
-from fastapi import FastAPI, HTTPException
+import time
+from fastapi import FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional
+from typing import Annotated, AsyncIterator, Dict, Any, List, Optional
 from ..agent.lam_agent import LamAgent
+from ..config import settings
+from ..database.answer_cache import normalize_query
+from ..database.job_store import FINISHED_STATUSES, STATUS, JobStore
+from ..mcp.client import collect_server_metrics
+from ..mcp.codec import dumps
+from ..utils.exceptions import TimeoutError as AgentTimeoutError
+from ..utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricFamily, get_metrics_registry
+from .agent_pool import AgentPool, AgentPoolBusy
+from .jobs import ASK, TOOL, JobManager
+from .responses import HEAVY_FIELDS, CompressionMiddleware, ORJSONResponse, exclude_fields
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -23,14 +37,62 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# 按 Accept-Encoding 压缩较大的响应（证据、任务结果、批量查询流）
+app.add_middleware(
+    CompressionMiddleware,
+    encodings=settings.lam_api_compression,
+    minimum_size=settings.lam_api_compression_min_size,
+)
+
+# 全局代理工作池（LamAgent.run 为同步调用，在工作池线程中执行以免阻塞事件循环）
+agent_pool: Optional[AgentPool] = None
+# 后台任务工作池（/jobs 接口，任务持久化在SQLite中）
+job_manager: Optional[JobManager] = None
+
+HTTP_REQUESTS = get_metrics_registry().counter(
+    "lam_http_requests_total", "HTTP请求数", ("method", "path", "status"))
+HTTP_REQUEST_SECONDS = get_metrics_registry().histogram(
+    "lam_http_request_duration_seconds", "HTTP请求处理耗时（流式响应不含响应体传输时间）", ("method", "path"))
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """按路由模板（而非实际路径，避免 /jobs/{job_id} 产生无界标签）记录请求数与耗时"""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        path = getattr(route, "path", None) or "unmatched"
+        HTTP_REQUESTS.inc(method=request.method, path=path, status=status)
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, method=request.method, path=path)
+
+
+def _collect_api_metrics() -> List[MetricFamily]:
+    """代理工作池与后台任务工作池的指标（未启动时为空）"""
+    families: List[MetricFamily] = []
+    if agent_pool is not None:
+        families.extend(agent_pool.collect_metrics())
+    if job_manager is not None:
+        families.extend(job_manager.collect_metrics())
+    return families
+
+
+get_metrics_registry().register_collector("api", _collect_api_metrics)
 
-# 全局代理实例
-agent: Optional[LamAgent] = None
+# GET /jobs/{id}/events 轮询新事件的间隔（秒）
+JOB_EVENTS_POLL_INTERVAL = 0.25
 
 
 class QueryRequest(BaseModel):
     question: str = Field(..., min_length=1, max_length=1000, description="用户问题")
     model: Optional[str] = Field(None, description="指定使用的模型")
+    no_cache: bool = Field(False, description="跳过回答缓存，强制重新执行")
+    include_details: bool = Field(False, description="在响应中附带 evidence 与 execution_result")
+    exclude_fields: List[str] = Field(list(HEAVY_FIELDS), description="从附带的详情中去掉的字段（任意层级，默认去掉原始HTML）")
 
 
 class QueryResponse(BaseModel):
@@ -38,20 +100,91 @@ class QueryResponse(BaseModel):
     evidence_count: int = Field(..., description="证据数量")
     answer: str = Field(..., description="最终答案")
     sources: list[str] = Field(..., description="来源链接")
+    cached: bool = Field(False, description="是否命中回答缓存")
+    cache: Optional[Dict[str, Any]] = Field(None, description="缓存详情（命中层级、缓存时长等）")
+
+
+class BatchQueryRequest(BaseModel):
+    questions: List[Annotated[str, Field(min_length=1, max_length=1000)]] = Field(
+        ..., min_length=1, max_length=200, description="问题列表（相同的问题只执行一次）")
+    parallelism: Optional[int] = Field(None, ge=1, description="同时执行的问题数（默认并且最多为代理实例数）")
+    no_cache: bool = Field(False, description="跳过回答缓存，强制重新执行")
+
+
+class JobRequest(BaseModel):
+    question: Optional[str] = Field(None, min_length=1, max_length=1000, description="智能体查询（与 tool 二选一）")
+    tool: Optional[str] = Field(None, min_length=1, description="MCP工具名（与 question 二选一）")
+    arguments: Dict[str, Any] = Field(default_factory=dict, description="工具参数")
+    no_cache: bool = Field(False, description="跳过回答缓存，强制重新执行")
+
+
+class JobResponse(BaseModel):
+    id: str = Field(..., description="任务id")
+    kind: str = Field(..., description="任务类型：ask 或 tool")
+    status: str = Field(..., description="queued / running / succeeded / failed")
+    created_at: float = Field(..., description="提交时间")
+    started_at: Optional[float] = Field(None, description="开始执行时间")
+    finished_at: Optional[float] = Field(None, description="结束时间")
+    result: Optional[Any] = Field(None, description="执行结果（查询任务与 /ask 的响应结构相同）")
+    error: Optional[str] = Field(None, description="失败原因")
+
+
+def _to_response(result: Dict[str, Any]) -> QueryResponse:
+    """将 LamAgent.run 的结果转换为接口响应"""
+    plan = result.get("plan", "")
+    if not isinstance(plan, str):
+        plan = json.dumps(plan, ensure_ascii=False)
+    sources: List[str] = result.get("sources") or [
+        e["href"] for e in result.get("evidence", []) if isinstance(e, dict) and e.get("href")
+    ]
+    return QueryResponse(
+        plan=plan,
+        evidence_count=result.get("evidence_count", 0),
+        answer=result.get("answer", ""),
+        sources=sources,
+        cached=bool((result.get("cache") or {}).get("hit")),
+        cache=result.get("cache"),
+    )
+
+
+def _to_job_response(job: Dict[str, Any]) -> JobResponse:
+    """将任务记录转换为接口响应"""
+    fields = {k: v for k, v in job.items() if k != "request"}
+    if job["kind"] == ASK and isinstance(job["result"], dict):
+        fields["result"] = _to_response(job["result"]).model_dump()
+    return JobResponse(**fields)
 
 
 @app.on_event("startup")
 async def startup_event():
-    """应用启动时初始化代理"""
-    global agent
+    """应用启动时初始化代理工作池与后台任务工作池"""
+    global agent_pool, job_manager
     try:
-        agent = LamAgent()
-        logger.info("LAM Agent 初始化成功")
+        agent_pool = AgentPool(LamAgent, size=settings.lam_api_agent_workers,
+                               queue_size=settings.lam_api_queue_size,
+                               timeout=settings.lam_api_request_timeout)
+        logger.info(f"LAM Agent 初始化成功（{agent_pool.size} 个工作实例）")
+        job_manager = JobManager(JobStore(settings.lam_jobs_db_path), LamAgent,
+                                 workers=settings.lam_jobs_workers,
+                                 retention=settings.lam_jobs_retention).start()
     except Exception as e:
         logger.error(f"LAM Agent 初始化失败: {e}")
         raise
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """应用关闭时停止代理工作池与后台任务工作池"""
+    global agent_pool, job_manager
+    if agent_pool is not None:
+        agent_pool.shutdown()
+        agent_pool = None
+    if job_manager is not None:
+        # 关闭工具任务的MCP客户端需要自己的事件循环
+        await asyncio.to_thread(job_manager.stop)
+        job_manager = None
+
+
 @app.get("/")
 async def root():
     """根路径，返回API信息"""
@@ -65,19 +198,44 @@ async def root():
 @app.get("/health")
 async def health_check():
     """健康检查端点"""
-    return {"status": "healthy", "agent_ready": agent is not None}
+    return {
+        "status": "healthy",
+        "agent_ready": agent_pool is not None,
+        "agent_pool": agent_pool.stats() if agent_pool is not None else None,
+        "jobs": job_manager.stats() if job_manager is not None else None,
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus指标（文本格式），包括各MCP服务器子进程的指标（带 pid 标签）"""
+    mcp_families = await collect_server_metrics()
+    return Response(get_metrics_registry().render(mcp_families), media_type=METRICS_CONTENT_TYPE)
 
 
 @app.post("/ask", response_model=QueryResponse)
 async def ask(request: QueryRequest):
     """处理用户查询"""
-    if agent is None:
+    if agent_pool is None:
         raise HTTPException(status_code=500, detail="Agent not initialized")
     
     try:
         logger.info(f"收到查询请求: {request.question[:100]}...")
-        result = agent.run(request.question)
-        return QueryResponse(**result)
+        result = await agent_pool.run(request.question, use_cache=not request.no_cache)
+        if request.include_details:
+            # 详情可能包含大段页面内容：跳过模型校验，用orjson直接编码
+            payload = _to_response(result).model_dump()
+            payload["evidence"] = exclude_fields(result.get("evidence", []), request.exclude_fields)
+            payload["execution_result"] = exclude_fields(result.get("execution_result"), request.exclude_fields)
+            return ORJSONResponse(payload)
+        return _to_response(result)
+    except AgentPoolBusy as e:
+        logger.warning(f"代理工作池繁忙: {e}")
+        raise HTTPException(status_code=503, detail=str(e),
+                            headers={"Retry-After": str(int(e.retry_after + 0.999))})
+    except AgentTimeoutError as e:
+        logger.warning(f"查询处理超时: {e}")
+        raise HTTPException(status_code=504, detail=e.message)
     except ValueError as e:
         logger.warning(f"输入验证错误: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -85,3 +243,116 @@ async def ask(request: QueryRequest):
         logger.error(f"处理查询时发生错误: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+
+@app.post("/ask/batch")
+async def ask_batch(request: BatchQueryRequest):
+    """批量处理查询，按完成顺序以NDJSON流式返回
+
+    规范化后相同的问题只执行一次，结果分发给每个重复项；各问题在代理工作池上以有界并行度执行，
+    共享LLM网关的连接池与限流。每行为 {"index", "question", "result"} 或 {"index", "question", "error"}，
+    最后一行为 {"done": true, ...} 汇总。
+    """
+    if agent_pool is None:
+        raise HTTPException(status_code=500, detail="Agent not initialized")
+    pool = agent_pool
+
+    # 规范化查询 -> 输入序号列表
+    groups: Dict[str, List[int]] = {}
+    for index, question in enumerate(request.questions):
+        groups.setdefault(normalize_query(question) or question, []).append(index)
+    keys = list(groups)
+    logger.info(f"收到批量查询: {len(request.questions)} 个问题，去重后 {len(keys)} 个")
+
+    async def stream() -> AsyncIterator[bytes]:
+        started = time.perf_counter()
+        failed = 0
+        questions = [request.questions[groups[key][0]] for key in keys]
+        async for position, result, error in pool.run_many(questions, use_cache=not request.no_cache,
+                                                            parallelism=request.parallelism):
+            indexes = groups[keys[position]]
+            if error is None:
+                payload: Dict[str, Any] = {"result": _to_response(result).model_dump()}
+            else:
+                failed += len(indexes)
+                if isinstance(error, AgentTimeoutError):
+                    payload = {"error": error.message, "status": 504}
+                elif isinstance(error, ValueError):
+                    payload = {"error": str(error), "status": 400}
+                else:
+                    logger.error(f"批量查询项失败: {error}")
+                    payload = {"error": "Internal server error", "status": 500}
+            for index in indexes:
+                line = {"index": index, "question": request.questions[index], **payload}
+                if index != indexes[0]:
+                    line["duplicate_of"] = indexes[0]
+                yield dumps(line) + b"\n"
+        summary = {"done": True, "total": len(request.questions), "unique": len(keys), "failed": failed,
+                   "elapsed_s": round(time.perf_counter() - started, 3)}
+        yield dumps(summary) + b"\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+def _get_job_manager() -> JobManager:
+    if job_manager is None:
+        raise HTTPException(status_code=500, detail="Job manager not initialized")
+    return job_manager
+
+
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+async def create_job(request: JobRequest):
+    """提交后台任务（智能体查询或工具调用），立即返回任务id"""
+    manager = _get_job_manager()
+    if (request.question is None) == (request.tool is None):
+        raise HTTPException(status_code=400, detail="question 与 tool 必须且只能提供一个")
+    if request.question is not None:
+        job = await asyncio.to_thread(manager.submit, ASK,
+                                      {"question": request.question, "no_cache": request.no_cache})
+    else:
+        job = await asyncio.to_thread(manager.submit, TOOL, {"tool": request.tool, "arguments": request.arguments})
+    logger.info(f"已提交任务 {job['id']}（{job['kind']}）")
+    return _to_job_response(job)
+
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str, exclude: Optional[str] = Query(
+        None, description="逗号分隔的字段名，从结果中去掉（任意层级，如 html 去掉抓取页面的原始HTML）")):
+    """查询任务状态与结果"""
+    job = await asyncio.to_thread(_get_job_manager().store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    payload = _to_job_response(job).model_dump()
+    if exclude:
+        payload["result"] = exclude_fields(payload["result"], filter(None, map(str.strip, exclude.split(","))))
+    return ORJSONResponse(payload)
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, after: int = 0, last_event_id: Optional[int] = Header(None)):
+    """以 Server-Sent Events 推送任务的状态变化与执行进度，任务结束后关闭
+
+    事件id为序号；断线重连时通过 Last-Event-ID 请求头（或 after 参数）从上次收到的事件之后继续。
+    """
+    store = _get_job_manager().store
+    if await asyncio.to_thread(store.get, job_id) is None:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    cursor = max(after, last_event_id or 0)
+
+    async def stream() -> AsyncIterator[str]:
+        nonlocal cursor
+        while True:
+            events = await asyncio.to_thread(store.events, job_id, cursor)
+            for event in events:
+                cursor = event["seq"]
+                yield f"id: {cursor}\nevent: {event['kind']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+                if event["kind"] == STATUS and event.get("status") in FINISHED_STATUSES:
+                    return
+            if not events:
+                # 任务在等待期间被清除时结束推送
+                if await asyncio.to_thread(store.get, job_id) is None:
+                    return
+                await asyncio.sleep(JOB_EVENTS_POLL_INTERVAL)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -0,0 +1,169 @@
+"""
+API大响应的序列化与压缩
+包含证据、执行结果或页面内容的响应可达数MB：
+- ORJSONResponse 用 orjson 直接编码为UTF-8字节（与MCP消息共用 codec.dumps），比标准库 json 快一个数量级；
+- exclude_fields 按字段名递归去掉重型字段（默认去掉原始HTML），客户端只取所需部分；
+- CompressionMiddleware 按 Accept-Encoding 协商 zstd（需安装 zstandard）或 gzip，
+  小于阈值的响应与 Server-Sent Events 不压缩，流式响应（如NDJSON）逐块压缩并立即刷新。
+"""
+import logging
+import zlib
+from typing import Any, Iterable, List, Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..mcp.codec import dumps
+
+try:
+    import zstandard
+except ImportError:  # 可选依赖：未安装时只提供gzip
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# 默认去掉的重型字段（fetch_page 等返回的原始HTML）
+HEAVY_FIELDS = ("html",)
+
+
+class ORJSONResponse(JSONResponse):
+    """使用 orjson 编码的JSON响应"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def exclude_fields(value: Any, fields: Iterable[str]) -> Any:
+    """返回去掉指定字段（任意嵌套层级的字典键）后的副本；fields 为空时原样返回"""
+    fields = frozenset(fields)
+    if not fields:
+        return value
+
+    def strip(item: Any) -> Any:
+        if isinstance(item, dict):
+            return {k: strip(v) for k, v in item.items() if k not in fields}
+        if isinstance(item, list):
+            return [strip(v) for v in item]
+        return item
+
+    return strip(value)
+
+
+def available_encodings(preferred: Sequence[str]) -> List[str]:
+    """按配置顺序筛选本机可用的压缩编码"""
+    encodings = []
+    for name in preferred:
+        name = name.strip().lower()
+        if name == "zstd" and zstandard is None:
+            logger.info("未安装 zstandard，响应压缩不使用 zstd")
+        elif name in ("zstd", "gzip") and name not in encodings:
+            encodings.append(name)
+    return encodings
+
+
+def negotiate_encoding(accept_encoding: str, encodings: Sequence[str]) -> Optional[str]:
+    """按 Accept-Encoding 的q值选择编码，q值相同时按 encodings 的顺序；没有可接受的编码时返回None"""
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, raw = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(raw)
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+    best, best_q = None, 0.0
+    for name in encodings:
+        q = weights.get(name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+class _Encoder:
+    """单个响应的增量压缩器"""
+
+    def __init__(self, encoding: str, level: Optional[int] = None):
+        if encoding == "zstd":
+            self._obj = zstandard.ZstdCompressor(level=3 if level is None else level).compressobj()
+            self._flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        else:
+            self._obj = zlib.compressobj(6 if level is None else level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._flush_block = zlib.Z_SYNC_FLUSH
+
+    def encode(self, data: bytes, final: bool) -> bytes:
+        """压缩一块数据；非最后一块时刷新，使客户端能立即解压已收到的内容"""
+        out = self._obj.compress(data)
+        return out + (self._obj.flush() if final else self._obj.flush(self._flush_block))
+
+
+class CompressionMiddleware:
+    """按 Accept-Encoding 压缩响应体的ASGI中间件"""
+
+    def __init__(self, app: ASGIApp, encodings: Sequence[str] = ("zstd", "gzip"), minimum_size: int = 1024,
+                 level: Optional[int] = None):
+        self.app = app
+        self.encodings = available_encodings(encodings)
+        self.minimum_size = minimum_size
+        self.level = level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSend(send, encoding, self.minimum_size, self.level))
+
+
+class _CompressingSend:
+    """推迟发送响应头，收到第一块响应体后决定是否压缩"""
+
+    def __init__(self, send: Send, encoding: str, minimum_size: int, level: Optional[int]):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.level = level
+        self.start: Optional[Message] = None
+        self.encoder: Optional[_Encoder] = None
+        self.decided = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+        body = message.get("body", b"")
+        more = message.get("more_body", False)
+        if not self.decided:
+            self.decided = True
+            headers = MutableHeaders(raw=self.start["headers"])
+            compress = ("content-encoding" not in headers
+                        and not headers.get("content-type", "").startswith("text/event-stream")
+                        and (more or len(body) >= self.minimum_size))
+            if compress:
+                self.encoder = _Encoder(self.encoding, self.level)
+                headers["Content-Encoding"] = self.encoding
+                headers.add_vary_header("Accept-Encoding")
+                body = self.encoder.encode(body, final=not more)
+                if more:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(body))
+            await self.send(self.start)
+            await self.send({**message, "body": body})
+            return
+        if self.encoder is not None:
+            message = {**message, "body": self.encoder.encode(body, final=not more)}
+        await self.send(message)
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional, List
+from typing import Dict, Optional, List
 from .utils.exceptions import APIKeyError
 
 
@@ -22,6 +22,73 @@ class Settings(BaseSettings):
     # 如需强制指定可执行文件，设置该路径后将忽略 channel
     lam_browser_executable: Optional[str] = None
     use_deepseek: bool = True  # 是否使用DeepSeek
+    # 流式生成计划时，提前为第一个navigate步骤启动浏览器并加载页面
+    lam_speculative_navigate: bool = True
+    # 生成最终回答前证据压缩后的token预算
+    lam_evidence_token_budget: int = 2000
+
+    # LLM网关：并发上限、令牌桶限流（每秒请求数/突发容量）、重试与连接池
+    lam_llm_max_concurrency: int = 4
+    lam_llm_rate_per_sec: float = 2.0
+    lam_llm_burst: int = 4
+    lam_llm_max_retries: int = 3
+    lam_llm_timeout: float = 60.0
+    lam_llm_max_connections: int = 10
+
+    # 计划步骤按依赖关系并行执行：总并发上限与按资源类型的并发上限
+    lam_step_max_parallel: int = 4
+    lam_step_resource_limits: Dict[str, int] = {"browser": 2, "desktop": 1, "network": 4, "system": 2}
+
+    # 只读计划的回答缓存：开关、数据库路径与按操作类型的TTL（秒，未列出的类型不缓存）
+    lam_answer_cache_enabled: bool = True
+    lam_answer_cache_path: str = "answer_cache.db"
+    lam_answer_cache_ttl: Dict[str, int] = {"answer": 86400, "search": 900, "browse": 600}
+
+    # MCP工具执行池：阻塞IO线程数、CPU进程数、同时运行的浏览器工具数
+    lam_mcp_blocking_workers: int = 16
+    lam_mcp_cpu_workers: int = 2
+    lam_mcp_browser_workers: int = 2
+    # MCP客户端传输：stdio（独立服务器进程）或 inprocess（在本进程内直接调用工具）
+    lam_mcp_transport: str = "stdio"
+    # stdio传输：超过该字节数的消息使用长度前缀帧（0表示始终按行）；
+    # 不小于该长度的字符串结果经临时文件按引用传递（0表示关闭）
+    lam_mcp_frame_threshold: int = 65536
+    lam_mcp_blob_min_bytes: int = 1048576
+    # MCP工具并发类别：同时运行的上限、等待队列长度与排队超时（秒），队列满或超时时拒绝并提示重试间隔
+    lam_mcp_concurrency_classes: Dict[str, Dict[str, float]] = {
+        "browser": {"limit": 2, "queue": 8, "timeout": 120},
+        "network": {"limit": 8, "queue": 32, "timeout": 30},
+        "desktop": {"limit": 1, "queue": 4, "timeout": 30},
+    }
+    # stdio传输启动的服务器进程数（>1时为工作池）与工具名前缀到亲和组的映射：同组调用固定到同一进程以复用会话
+    lam_mcp_workers: int = 1
+    lam_mcp_worker_affinity: Dict[str, str] = {
+        "bilibili_": "bilibili", "steam_": "steam", "jd_": "jd", "taobao_": "taobao", "pdd_": "pdd",
+        "douyin_": "douyin", "kuaishou_": "kuaishou", "wechat_": "wechat", "qq_": "qq",
+    }
+    # 幂等MCP工具的结果缓存（策略在各工具的 cache 上声明）：开关与SQLite路径（留空只使用内存）
+    lam_mcp_cache_enabled: bool = True
+    lam_mcp_cache_path: str = "tool_cache.db"
+    # MCP工具运行统计的JSONL快照文件（留空关闭）与写入间隔（秒）
+    lam_mcp_stats_dump_path: str = ""
+    lam_mcp_stats_dump_interval: float = 60.0
+    # tools/list 序列化结果的磁盘缓存（按工具清单源文件的哈希失效，留空关闭）；客户端也据此跳过重复获取
+    lam_mcp_tools_list_cache: str = "tools_list.cache"
+
+    # /ask 接口的代理工作池：LamAgent 实例数（并发上限）、排队上限与单个请求超时（秒，含排队时间）
+    lam_api_agent_workers: int = 4
+    lam_api_queue_size: int = 16
+    lam_api_request_timeout: float = 300.0
+    # 响应压缩：按优先顺序可用的编码（留空关闭，zstd 需安装 zstandard）与最小压缩字节数
+    lam_api_compression: List[str] = ["zstd", "gzip"]
+    lam_api_compression_min_size: int = 1024
+    # /jobs 后台任务：SQLite路径、工作线程数与已结束任务的保留时长（秒）
+    lam_jobs_db_path: str = "jobs.db"
+    lam_jobs_workers: int = 2
+    lam_jobs_retention: int = 604800
+    # 工具任务使用的MCP传输：留空时与 lam_mcp_transport 相同（默认stdio，工具在独立的服务器进程中执行）；
+    # 显式设为 inprocess 时在API进程内执行
+    lam_jobs_tool_transport: str = ""
 
     # 对部分网站启用纯鼠标操作模式（不修改DOM、不注入脚本、不使用iframe方案）
     mouse_only_sites: List[str] = [
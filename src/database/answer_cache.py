@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+回答缓存
+缓存只读计划（search/answer/browse）的最终回答，按规范化查询与证据指纹索引，
+不同操作类型使用不同的TTL；含副作用的计划不缓存并使同一查询的旧缓存失效。
+"""
+
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from ..utils.metrics import MetricFamily, Sample, get_metrics_registry, ratio
+
+logger = logging.getLogger(__name__)
+
+# 视为有副作用的操作类型与步骤动作
+SIDE_EFFECT_OPERATIONS = {"automate", "desktop_command"}
+SIDE_EFFECT_ACTIONS = {
+    "click", "type", "press", "press_global", "select", "upload", "submit",
+    "video_play", "video_force_play", "video_click_play", "video_keyboard_play",
+    "launch", "open_app", "run_command", "create_file", "file_write", "add_to_cart", "buy",
+}
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_CJK_SPACE_RE = re.compile(r"(?<=[\u4e00-\u9fff])\s+|\s+(?=[\u4e00-\u9fff])")
+_TRAILING_PUNCT_RE = re.compile(r"[\s?？!！。.,，;；~～]+$")
+
+
+def normalize_query(query: str) -> str:
+    """规范化查询：全角转半角、小写、合并空白（中文两侧的空白去除）并去除结尾标点"""
+    text = unicodedata.normalize("NFKC", query or "").lower().strip()
+    text = _CJK_SPACE_RE.sub("", _WHITESPACE_RE.sub(" ", text))
+    return _TRAILING_PUNCT_RE.sub("", text)
+
+
+def evidence_fingerprint(evidence: List[Any]) -> str:
+    """证据指纹：与证据顺序无关的内容哈希"""
+    items = []
+    for item in evidence or []:
+        if isinstance(item, dict):
+            items.append([str(item.get("title", "")), str(item.get("href", "")), str(item.get("body", ""))])
+        else:
+            items.append(["", "", str(item)])
+    payload = json.dumps(sorted(items), ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def has_side_effects(plan: Any) -> bool:
+    """计划是否包含副作用（自动化、桌面启动、文件写入等）"""
+    if not isinstance(plan, dict):
+        return True
+    if plan.get("operation_type") in SIDE_EFFECT_OPERATIONS:
+        return True
+    for step in plan.get("steps") or []:
+        if isinstance(step, dict) and str(step.get("action", "")).lower() in SIDE_EFFECT_ACTIONS:
+            return True
+    return False
+
+
+class AnswerCache:
+    """基于SQLite的回答缓存"""
+
+    def __init__(self, db_path: str = "answer_cache.db", ttl_by_operation: Optional[Dict[str, int]] = None):
+        self.db_path = db_path
+        self.ttl_by_operation = dict(ttl_by_operation or {})
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "invalidations": 0}
+        self.init_database()
+
+    def init_database(self) -> None:
+        """初始化缓存表"""
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS answer_cache (
+                    query_key TEXT NOT NULL,
+                    evidence_fp TEXT NOT NULL,
+                    operation_type TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    plan TEXT,
+                    evidence TEXT,
+                    answer TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    hits INTEGER DEFAULT 0,
+                    PRIMARY KEY (query_key, evidence_fp)
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_answer_cache_expires ON answer_cache (expires_at)')
+
+    def ttl_for(self, operation_type: str) -> int:
+        """操作类型对应的TTL（秒），0表示不缓存"""
+        return int(self.ttl_by_operation.get(operation_type, 0))
+
+    def is_cacheable(self, plan: Any) -> bool:
+        """计划无副作用且其操作类型配置了TTL时可缓存"""
+        return not has_side_effects(plan) and self.ttl_for(plan.get("operation_type", "")) > 0
+
+    def get(self, query: str, evidence: Optional[List[Any]] = None) -> Optional[Dict[str, Any]]:
+        """查找未过期的缓存条目
+
+        evidence 为 None 时返回该查询最新的条目；否则只匹配证据指纹相同的条目。
+        """
+        query_key = normalize_query(query)
+        now = time.time()
+        sql = 'SELECT * FROM answer_cache WHERE query_key = ? AND expires_at > ?'
+        params: List[Any] = [query_key, now]
+        if evidence is not None:
+            sql += ' AND evidence_fp = ?'
+            params.append(evidence_fingerprint(evidence))
+        sql += ' ORDER BY created_at DESC LIMIT 1'
+
+        try:
+            with self._connect() as conn:
+                row = conn.execute(sql, params).fetchone()
+                if row is not None:
+                    conn.execute(
+                        'UPDATE answer_cache SET hits = hits + 1 WHERE query_key = ? AND evidence_fp = ?',
+                        (row["query_key"], row["evidence_fp"]),
+                    )
+        except sqlite3.Error as e:
+            logger.warning(f"读取回答缓存失败: {e}")
+            return None
+
+        with self._lock:
+            self._stats["hits" if row is not None else "misses"] += 1
+        if row is None:
+            return None
+        return {
+            "query": row["query"],
+            "operation_type": row["operation_type"],
+            "plan": json.loads(row["plan"]) if row["plan"] else None,
+            "evidence": json.loads(row["evidence"]) if row["evidence"] else [],
+            "answer": row["answer"],
+            "evidence_fp": row["evidence_fp"],
+            "age_s": round(now - row["created_at"], 1),
+            "expires_in_s": round(row["expires_at"] - now, 1),
+        }
+
+    def put(self, query: str, plan: Dict[str, Any], evidence: List[Any], answer: str) -> bool:
+        """写入缓存；不可缓存的计划会使该查询已有的缓存失效"""
+        if not self.is_cacheable(plan):
+            self.invalidate(query)
+            return False
+        operation_type = plan.get("operation_type", "")
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.execute('''
+                    INSERT OR REPLACE INTO answer_cache
+                    (query_key, evidence_fp, operation_type, query, plan, evidence, answer, created_at, expires_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    normalize_query(query),
+                    evidence_fingerprint(evidence),
+                    operation_type,
+                    query,
+                    json.dumps(plan, ensure_ascii=False),
+                    json.dumps(evidence, ensure_ascii=False, default=str),
+                    answer,
+                    now,
+                    now + self.ttl_for(operation_type),
+                ))
+        except sqlite3.Error as e:
+            logger.warning(f"写入回答缓存失败: {e}")
+            return False
+        with self._lock:
+            self._stats["stores"] += 1
+        return True
+
+    def invalidate(self, query: Optional[str] = None) -> int:
+        """使某个查询（或全部）的缓存失效，返回删除的条目数"""
+        try:
+            with self._connect() as conn:
+                if query is None:
+                    cursor = conn.execute('DELETE FROM answer_cache')
+                else:
+                    cursor = conn.execute('DELETE FROM answer_cache WHERE query_key = ?', (normalize_query(query),))
+                removed = cursor.rowcount
+        except sqlite3.Error as e:
+            logger.warning(f"清除回答缓存失败: {e}")
+            return 0
+        if removed:
+            with self._lock:
+                self._stats["invalidations"] += removed
+        return removed
+
+    def purge_expired(self) -> int:
+        """删除过期条目"""
+        with self._connect() as conn:
+            return conn.execute('DELETE FROM answer_cache WHERE expires_at <= ?', (time.time(),)).rowcount
+
+    def stats(self) -> Dict[str, int]:
+        """命中/未命中/写入/失效计数"""
+        with self._lock:
+            return dict(self._stats)
+
+    def collect_metrics(self) -> List[MetricFamily]:
+        """缓存查找结果、写入与失效计数及命中率"""
+        stats = self.stats()
+        return [
+            MetricFamily("lam_answer_cache_lookups_total", "counter", "回答缓存查找次数（按结果）",
+                         [Sample({"result": "hit"}, stats["hits"]), Sample({"result": "miss"}, stats["misses"])]),
+            MetricFamily("lam_answer_cache_stores_total", "counter", "回答缓存写入次数", [Sample({}, stats["stores"])]),
+            MetricFamily("lam_answer_cache_invalidations_total", "counter", "回答缓存失效条目数",
+                         [Sample({}, stats["invalidations"])]),
+            MetricFamily("lam_answer_cache_hit_ratio", "gauge", "回答缓存命中率",
+                         [Sample({}, ratio(stats["hits"], stats["hits"] + stats["misses"]))]),
+        ]
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+_answer_cache: Optional[AnswerCache] = None
+_answer_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> AnswerCache:
+    """获取全局回答缓存（首次调用时按配置创建）"""
+    global _answer_cache
+    if _answer_cache is None:
+        with _answer_cache_lock:
+            if _answer_cache is None:
+                from ..config import settings
+                _answer_cache = AnswerCache(
+                    db_path=settings.lam_answer_cache_path,
+                    ttl_by_operation=settings.lam_answer_cache_ttl,
+                )
+                get_metrics_registry().register_collector("answer_cache", _answer_cache.collect_metrics)
+    return _answer_cache
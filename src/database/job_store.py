@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+后台任务存储
+/jobs 接口提交的智能体查询与工具调用保存在SQLite中：任务表记录请求、状态与结果，
+事件表按序号追加状态变化与执行进度，供 GET /jobs/{id}/events 断点续读。
+服务重启后排队中的任务重新入队，运行中被打断的任务标记为失败；结束超过保留期的任务定期清除。
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 任务状态
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED_STATUSES = (SUCCEEDED, FAILED)
+
+# 状态变化事件的类型（进度事件沿用 report_progress 的 kind）
+STATUS = "status"
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+class JobStore:
+    """基于SQLite的任务与事件存储（线程安全，每次操作使用独立连接）"""
+
+    def __init__(self, db_path: str = "jobs.db"):
+        self.db_path = db_path
+        # 同一任务的事件序号在进程内分配，避免并发追加时冲突
+        self._seq_lock = threading.Lock()
+        self.init_database()
+
+    def init_database(self) -> None:
+        """初始化任务表与事件表"""
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    request TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS job_events (
+                    job_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    time REAL NOT NULL,
+                    kind TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (job_id, seq)
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs (finished_at)')
+
+    def create(self, kind: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        """新建排队中的任务"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT INTO jobs (id, kind, request, status, created_at) VALUES (?, ?, ?, ?, ?)',
+                (job_id, kind, _dumps(request), QUEUED, now),
+            )
+        self.add_event(job_id, STATUS, status=QUEUED)
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return self._job(row) if row is not None else None
+
+    def mark_running(self, job_id: str) -> bool:
+        """排队中的任务开始执行；任务不存在或已不在排队状态时返回 False"""
+        with self._connect() as conn:
+            updated = conn.execute(
+                'UPDATE jobs SET status = ?, started_at = ? WHERE id = ? AND status = ?',
+                (RUNNING, time.time(), job_id, QUEUED),
+            ).rowcount
+        if updated:
+            self.add_event(job_id, STATUS, status=RUNNING)
+        return bool(updated)
+
+    def finish(self, job_id: str, result: Any = None, error: Optional[str] = None) -> None:
+        """记录任务结果；error 非空时任务失败"""
+        status = FAILED if error else SUCCEEDED
+        with self._connect() as conn:
+            conn.execute(
+                'UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?',
+                (status, _dumps(result) if result is not None else None, error, time.time(), job_id),
+            )
+        self.add_event(job_id, STATUS, status=status, **({"error": error} if error else {}))
+
+    def add_event(self, job_id: str, kind: str, **data: Any) -> int:
+        """追加一个事件，返回其序号（从1开始）"""
+        with self._seq_lock, self._connect() as conn:
+            seq = conn.execute(
+                'SELECT COALESCE(MAX(seq), 0) + 1 FROM job_events WHERE job_id = ?', (job_id,)
+            ).fetchone()[0]
+            conn.execute(
+                'INSERT INTO job_events (job_id, seq, time, kind, data) VALUES (?, ?, ?, ?, ?)',
+                (job_id, seq, data.pop("time", None) or time.time(), kind, _dumps(data)),
+            )
+        return seq
+
+    def events(self, job_id: str, after: int = 0, limit: int = 500) -> List[Dict[str, Any]]:
+        """序号大于 after 的事件（按序号排列）"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT * FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq LIMIT ?',
+                (job_id, after, limit),
+            ).fetchall()
+        return [{"seq": row["seq"], "time": row["time"], "kind": row["kind"], **json.loads(row["data"])}
+                for row in rows]
+
+    def recover(self) -> List[str]:
+        """服务启动时调用：运行中被打断的任务标记为失败，返回需要重新入队的排队任务id（按提交顺序）"""
+        with self._connect() as conn:
+            interrupted = [row["id"] for row in conn.execute('SELECT id FROM jobs WHERE status = ?', (RUNNING,))]
+            queued = [row["id"] for row in conn.execute(
+                'SELECT id FROM jobs WHERE status = ? ORDER BY created_at', (QUEUED,))]
+        for job_id in interrupted:
+            self.finish(job_id, error="服务重启，任务执行被中断")
+        return queued
+
+    def purge(self, retention: float) -> int:
+        """删除结束时间早于保留期的任务及其事件，返回删除的任务数"""
+        cutoff = time.time() - retention
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    'DELETE FROM job_events WHERE job_id IN (SELECT id FROM jobs WHERE finished_at < ?)', (cutoff,)
+                )
+                return conn.execute('DELETE FROM jobs WHERE finished_at < ?', (cutoff,)).rowcount
+        except sqlite3.Error as e:
+            logger.warning(f"清除过期任务失败: {e}")
+            return 0
+
+    def counts(self) -> Dict[str, int]:
+        """各状态的任务数"""
+        with self._connect() as conn:
+            rows = conn.execute('SELECT status, COUNT(*) AS n FROM jobs GROUP BY status').fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    @staticmethod
+    def _job(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "id": row["id"],
+            "kind": row["kind"],
+            "request": json.loads(row["request"]),
+            "status": row["status"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+        }
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
@@ -1,16 +1,29 @@
 """
 LAM-Agent MCP (Model Context Protocol) 模块
 提供标准化的工具接口和协议实现
+
+导出的名称按需加载：导入本包不会加载服务器及其工具模块，也不会创建全局实例。
 """
 
-from .server import LAMMCPServer, mcp_server
-from .client import MCPClient, LAMAgentMCPAdapter, mcp_adapter
+import importlib
+from typing import Any
+
+_EXPORTS = {
+    "LAMMCPServer": ".server",
+    "mcp_server": ".server",
+    "get_mcp_server": ".server",
+    "MCPClient": ".client",
+    "LAMAgentMCPAdapter": ".client",
+    "mcp_adapter": ".client",
+    "get_mcp_adapter": ".client",
+    "collect_server_metrics": ".client",
+}
+
+__all__ = list(_EXPORTS)
 
-__all__ = [
-    "LAMMCPServer",
-    "mcp_server", 
-    "MCPClient",
-    "LAMAgentMCPAdapter",
-    "mcp_adapter"
-]
 
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module, __name__), name)
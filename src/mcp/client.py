@@ -4,35 +4,76 @@ LAM-Agent MCP客户端实现
 用于LamAgent与MCP服务器通信
 """
 import asyncio
-import json
+import itertools
 import logging
-from typing import Any, Dict, List, Optional
-import subprocess
+import shutil
+import tempfile
+import weakref
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
 import sys
-import os
+
+from .codec import resolve_blobs
+from .manifest import action_mapping, read_cached_tools
+from .transport import JSONRPCError, create_transport
+from ..utils.metrics import MetricFamily, load_families
 
 logger = logging.getLogger(__name__)
 
+# 抓取指标时等待服务器进程响应的上限（秒）
+METRICS_TIMEOUT = 5.0
+
+# 已创建的客户端（collect_server_metrics 从其中已启动的stdio客户端取回服务器进程的指标）
+_clients: "weakref.WeakSet[MCPClient]" = weakref.WeakSet()
+
 class MCPClient:
-    """MCP客户端，用于与MCP服务器通信"""
+    """MCP客户端，用于与MCP服务器通信
+
+    stdio传输下请求多路复用在同一个服务器进程上，每个请求使用唯一id，多个 call_tool 可以同时在途；
+    inprocess传输直接调用本进程中的服务器。未指定时按配置项 lam_mcp_transport 选择。
+    workers>1（默认取 lam_mcp_workers）时stdio传输启动多个服务器进程，按工具亲和性或最少在途请求分派（见 WorkerPool）。
+    call_tool_stream 以异步迭代器的形式在调用进行中产出服务器推送的进度事件，最后产出调用结果。
+    """
     
-    def __init__(self, server_command: Optional[str] = None):
+    def __init__(self, server_command: Optional[List[str]] = None, request_timeout: Optional[float] = None,
+                 transport: Optional[str] = None, workers: Optional[int] = None):
         self.server_command = server_command or [sys.executable, "-m", "src.mcp.server"]
-        self.process: Optional[subprocess.Popen] = None
+        self.request_timeout = request_timeout
+        from ..config import settings
+        if transport is None:
+            transport = settings.lam_mcp_transport
+        self.transport_kind = transport
+        self.workers = settings.lam_mcp_workers if workers is None else workers
+        self.worker_affinity = dict(settings.lam_mcp_worker_affinity)
+        self.frame_threshold = settings.lam_mcp_frame_threshold
+        # 进程内传输不经过管道，无需按引用传递大字符串
+        self.blob_min_bytes = settings.lam_mcp_blob_min_bytes if transport == "stdio" else 0
+        # 客户端创建的引用目录（随 initialize 告知服务器），以及服务器确认使用的目录：只解析其中的引用
+        self._blob_root: Optional[str] = None
+        self.blob_dir: Optional[str] = None
+        self.transport = None
         self.tools_cache: List[Dict[str, Any]] = []
+        # 工具列表的内容哈希：与服务器 initialize 返回的一致时无需再次获取 tools/list
+        self.tools_hash: Optional[str] = None
+        self.tools_list_cache = settings.lam_mcp_tools_list_cache
+        # 进度令牌 -> (接收事件的事件循环, 队列)
+        self._progress_queues: Dict[str, Any] = {}
+        self._progress_tokens = itertools.count(1)
+        _clients.add(self)
+    
+    @property
+    def process(self):
+        """服务器子进程（未启动时为None）"""
+        return self.transport.process if self.transport else None
     
     async def start_server(self):
         """启动MCP服务器进程"""
         try:
-            self.process = subprocess.Popen(
-                self.server_command,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                encoding='utf-8',
-                bufsize=0
-            )
+            self.transport = create_transport(self.transport_kind, self.server_command,
+                                              request_timeout=self.request_timeout,
+                                              on_notification=self._on_notification,
+                                              frame_threshold=self.frame_threshold,
+                                              workers=self.workers, affinity=self.worker_affinity)
+            await self.transport.start()
             logger.info("MCP服务器已启动")
             
             # 初始化连接
@@ -40,96 +81,172 @@ class MCPClient:
             
         except Exception as e:
             logger.error(f"启动MCP服务器失败: {e}")
+            await self.stop_server()
             raise
     
     async def stop_server(self):
-        """停止MCP服务器进程"""
-        if self.process:
-            self.process.terminate()
-            await asyncio.sleep(1)
-            if self.process.poll() is None:
-                self.process.kill()
-            self.process = None
+        """停止MCP服务器进程（工作池会先等待在途请求完成）"""
+        if self.transport:
+            await self.transport.close()
+            self.transport = None
             logger.info("MCP服务器已停止")
+        self.blob_dir = None
+        if self._blob_root:
+            shutil.rmtree(self._blob_root, ignore_errors=True)
+            self._blob_root = None
     
     async def _initialize(self):
         """初始化MCP连接"""
+        capabilities: Dict[str, Any] = {"tools": {}}
+        if self.blob_min_bytes:
+            if self._blob_root is None:
+                self._blob_root = tempfile.mkdtemp(prefix="lam-mcp-blobs-")
+            capabilities["experimental"] = {"lamBlobRefs": {"minBytes": self.blob_min_bytes,
+                                                            "dir": self._blob_root}}
         # 发送初始化请求
-        init_request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "initialize",
-            "params": {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {
-                    "tools": {}
-                },
-                "clientInfo": {
-                    "name": "lam-agent",
-                    "version": "1.0.0"
-                }
+        response = await self._send_request("initialize", {
+            "protocolVersion": "2024-11-05",
+            "capabilities": capabilities,
+            "clientInfo": {
+                "name": "lam-agent",
+                "version": "1.0.0"
             }
-        }
+        })
+        if "error" in response:
+            raise RuntimeError(f"MCP初始化失败: {response['error'].get('message')}")
+        await self.transport.notify("notifications/initialized")
+        experimental = response.get("result", {}).get("capabilities", {}).get("experimental", {})
+        announced = (experimental.get("lamBlobRefs") or {}).get("dir") if self.blob_min_bytes else None
+        self.blob_dir = announced if isinstance(announced, str) else None
         
-        await self._send_request(init_request)
+        # 工具列表未变化（内存或磁盘缓存的哈希与服务器一致）时跳过 tools/list
+        digest = experimental.get("lamToolsHash")
+        if digest and digest == self.tools_hash and self.tools_cache:
+            return
+        cached = read_cached_tools(self.tools_list_cache, digest) if digest and self.tools_list_cache else None
+        if cached is not None:
+            self.tools_cache, self.tools_hash = cached, digest
+            return
         
         # 获取工具列表
         await self.list_tools()
     
-    async def _send_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
-        """发送请求到MCP服务器"""
-        if not self.process:
+    async def _send_request(self, method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """发送请求到MCP服务器，返回对应id的响应消息"""
+        if not self.transport:
             raise RuntimeError("MCP服务器未启动")
-        
-        request_str = json.dumps(request) + "\n"
-        self.process.stdin.write(request_str)
-        self.process.stdin.flush()
-        
-        # 读取响应
-        response_str = self.process.stdout.readline()
-        if not response_str:
-            raise RuntimeError("MCP服务器无响应")
-        
-        try:
-            response = json.loads(response_str.strip())
-            return response
-        except json.JSONDecodeError as e:
-            logger.error(f"解析MCP响应失败: {e}")
-            raise
+        return await self.transport.request(method, params)
+    
+    async def collect_metrics(self) -> List[MetricFamily]:
+        """服务器进程的指标，每个样本带来源进程的 pid 标签
+
+        进程内传输与本进程共用指标注册表，返回空列表。
+        """
+        if self.transport is None or self.transport_kind != "stdio" or not self.transport.is_running:
+            return []
+        response = await self.transport.request("metrics/collect", timeout=METRICS_TIMEOUT)
+        if "error" in response:
+            raise RuntimeError(f"获取MCP服务器指标失败: {response['error'].get('message')}")
+        families: List[MetricFamily] = []
+        for process in response["result"].get("processes", []):
+            families.extend(load_families(process["families"], pid=process["pid"]))
+        return families
     
     async def list_tools(self) -> List[Dict[str, Any]]:
         """获取可用工具列表"""
-        request = {
-            "jsonrpc": "2.0",
-            "id": 2,
-            "method": "tools/list"
-        }
-        
-        response = await self._send_request(request)
+        response = await self._send_request("tools/list")
         
         if "result" in response and "tools" in response["result"]:
             self.tools_cache = response["result"]["tools"]
+            self.tools_hash = response["result"].get("_meta", {}).get("lamToolsHash")
             return self.tools_cache
         else:
             logger.error(f"获取工具列表失败: {response}")
             return []
     
-    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
-        """调用MCP工具"""
-        request = {
-            "jsonrpc": "2.0",
-            "id": 3,
-            "method": "tools/call",
-            "params": {
-                "name": name,
-                "arguments": arguments
-            }
-        }
+    async def call_tool(self, name: str, arguments: Dict[str, Any],
+                        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """调用MCP工具；提供 on_progress 时执行期间的进度事件会逐个回调"""
+        if on_progress is None:
+            return await self._call_tool(name, arguments)
+        result: Dict[str, Any] = {}
+        async for event in self.call_tool_stream(name, arguments):
+            if event["type"] == "progress":
+                on_progress(event)
+            else:
+                result = event["result"]
+        return result
+    
+    async def call_tool_stream(self, name: str, arguments: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """调用MCP工具并以异步迭代器返回执行过程
+
+        依次产出 {"type": "progress", "kind", "message", "progress", "total"?, ...}，
+        最后产出 {"type": "result", "result": 与 call_tool 相同的返回值}。
+        """
+        loop = asyncio.get_running_loop()
+        token = f"lam-{next(self._progress_tokens)}"
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+        self._progress_queues[token] = (loop, queue)
+        task = asyncio.ensure_future(self._call_tool(name, arguments, progress_token=token))
+        # 通知与响应按到达顺序投递到本循环，结束标记排在所有进度事件之后
+        task.add_done_callback(lambda _: queue.put_nowait(done))
+        try:
+            while True:
+                params = await queue.get()
+                if params is done:
+                    break
+                event = dict(params.get("event") or {})
+                event.update({"type": "progress", "progress": params.get("progress"),
+                              "message": params.get("message", event.get("message", ""))})
+                if "total" in params:
+                    event.setdefault("total", params["total"])
+                yield event
+            yield {"type": "result", "result": task.result()}
+        finally:
+            self._progress_queues.pop(token, None)
+            if not task.done():
+                task.cancel()
+    
+    async def call_tools(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """在一次 tools/call_batch 往返中调用多个相互独立的工具
+
+        batch 中每项为 {"name": 工具名, "arguments": 参数}，返回与 batch 顺序一致的结果列表，
+        每项结构与 call_tool 的返回值相同。服务器不支持批量方法时退化为并发的单次调用。
+        """
+        if not batch:
+            return []
+        calls = [{"name": item["name"], "arguments": item.get("arguments") or {}} for item in batch]
+        response = await self._send_request("tools/call_batch", {"calls": calls})
         
-        response = await self._send_request(request)
+        if "result" in response:
+            results = response["result"]["results"]
+            return resolve_blobs(results, self.blob_dir) if self.blob_dir else results
+        error = response.get("error", {})
+        if error.get("code") == JSONRPCError.METHOD_NOT_FOUND:
+            return list(await asyncio.gather(*[self._call_tool(c["name"], c["arguments"]) for c in calls]))
+        message = error.get("message", "未知错误")
+        return [{"success": False, "error": message} for _ in calls]
+    
+    def _on_notification(self, method: str, params: Dict[str, Any]) -> None:
+        """传输层收到服务器通知（可能在IO线程中调用）"""
+        if method != "notifications/progress":
+            return
+        target = self._progress_queues.get(params.get("progressToken"))
+        if target is None:
+            return
+        loop, queue = target
+        loop.call_soon_threadsafe(queue.put_nowait, params)
+    
+    async def _call_tool(self, name: str, arguments: Dict[str, Any],
+                         progress_token: Optional[str] = None) -> Dict[str, Any]:
+        params: Dict[str, Any] = {"name": name, "arguments": arguments}
+        if progress_token is not None:
+            params["_meta"] = {"progressToken": progress_token}
+        response = await self._send_request("tools/call", params)
         
         if "result" in response:
-            return response["result"]
+            return resolve_blobs(response["result"], self.blob_dir) if self.blob_dir else response["result"]
         else:
             error = response.get("error", {})
             return {
@@ -181,6 +298,9 @@ class MCPClient:
 class LAMAgentMCPAdapter:
     """LAM-Agent MCP适配器，将MCP工具集成到现有LamAgent中"""
     
+    # 映射现有操作到MCP工具（由工具清单生成，见 src/mcp/manifest.py）
+    ACTION_MAPPING = action_mapping()
+    
     def __init__(self):
         self.mcp_client = MCPClient()
         self.server_started = False
@@ -202,107 +322,7 @@ class LAMAgentMCPAdapter:
         if not self.server_started:
             await self.start()
         
-        # 映射现有操作到MCP工具
-        action_mapping = {
-            "open_website": "open_website",
-            "open_bilibili": "open_bilibili",
-            "play_video": "play_video",
-            "automate_page": "web_automate",
-            "bilibili_search_play": "bilibili_search_play",
-            "nl_automate": "nl_automate",
-            "search_web": "web_search",
-            "create_file": "file_write",
-            "read_file": "file_read",
-            "run_command": "run_command",
-            "get_weather": "get_weather",
-            "calculate": "calculate",
-            "translate": "translate",
-            "send_email": "send_email",
-            "schedule_task": "schedule_task",
-            "site_search": "site_search",
-            "browse_product": "browse_product",
-            "play_video_generic": "play_video_generic",
-            "add_to_cart": "add_to_cart",
-            "nl_step_execute": "nl_step_execute",
-            "fetch_page": "fetch_page",
-            "bilibili_open_up": "bilibili_open_up",
-            # Steam集成工具
-            "steam_get_library": "steam_get_library",
-            "steam_get_recent_activity": "steam_get_recent_activity",
-            "steam_get_game_details": "steam_get_game_details",
-            "steam_get_friend_comparison": "steam_get_friend_comparison",
-            "steam_open_store": "steam_open_store",
-            "steam_analyze_habits": "steam_analyze_habits",
-            "steam_get_recommendations": "steam_get_recommendations",
-            "steam_download_game": "steam_download_game",
-            "steam_uninstall_game": "steam_uninstall_game",
-            # Bilibili集成工具
-            "bilibili_get_user_profile": "bilibili_get_user_profile",
-            "bilibili_search_videos": "bilibili_search_videos",
-            "bilibili_get_video_details": "bilibili_get_video_details",
-            "bilibili_get_user_videos": "bilibili_get_user_videos",
-            "bilibili_get_following_list": "bilibili_get_following_list",
-            "bilibili_get_favorites": "bilibili_get_favorites",
-            "bilibili_get_watch_later": "bilibili_get_watch_later",
-            "bilibili_get_user_statistics": "bilibili_get_user_statistics",
-            "bilibili_open_video": "bilibili_open_video",
-            "bilibili_open_user": "bilibili_open_user",
-            # 网站集成工具
-            "website_open": "website_open",
-            "website_search": "website_search",
-            "website_summary": "website_summary",
-            # 京东专用工具
-            "jd_search_products": "jd_search_products",
-            "jd_get_product_info": "jd_get_product_info",
-            # 淘宝专用工具
-            "taobao_search_products": "taobao_search_products",
-            "taobao_get_product_info": "taobao_get_product_info",
-            # 高德地图专用工具
-            "amap_search_location": "amap_search_location",
-            "amap_get_route": "amap_get_route",
-            # 拼多多专用工具
-            "pdd_search_products": "pdd_search_products",
-            "pdd_get_product_info": "pdd_get_product_info",
-            # 抖音专用工具
-            "douyin_search_videos": "douyin_search_videos",
-            "douyin_get_video_info": "douyin_get_video_info",
-            # 快手专用工具
-            "kuaishou_search_videos": "kuaishou_search_videos",
-            "kuaishou_get_video_info": "kuaishou_get_video_info",
-            # 桌面软件集成工具
-            "software_launch": "software_launch",
-            "software_info": "software_info",
-            "software_list": "software_list",
-            # WPS Office专用工具
-            "wps_open_document": "wps_open_document",
-            "wps_create_document": "wps_create_document",
-            # 微信专用工具
-            "wechat_send_message": "wechat_send_message",
-            "wechat_open_chat": "wechat_open_chat",
-            # QQ专用工具
-            "qq_send_message": "qq_send_message",
-            "qq_open_chat": "qq_open_chat",
-            # 凭据数据库工具
-            "credential_add": "credential_add",
-            "credential_get": "credential_get",
-            "credential_list": "credential_list",
-            "credential_update": "credential_update",
-            "credential_delete": "credential_delete",
-            "credential_search": "credential_search",
-            "credential_auto_fill": "credential_auto_fill",
-            "credential_export": "credential_export",
-            "credential_import": "credential_import",
-            "credential_categories": "credential_categories",
-            # 自动填充工具
-            "auto_fill_website": "auto_fill_website",
-            "auto_fill_application": "auto_fill_application",
-            "smart_auto_fill": "smart_auto_fill",
-            "get_suggested_credentials": "get_suggested_credentials",
-            "validate_credential_format": "validate_credential_format",
-            "get_auto_fill_statistics": "get_auto_fill_statistics"
-        }
-        
-        mcp_tool_name = action_mapping.get(action)
+        mcp_tool_name = self.ACTION_MAPPING.get(action)
         
         if mcp_tool_name:
             try:
@@ -321,6 +341,47 @@ class LAMAgentMCPAdapter:
             # 使用原有实现
             return await self._fallback_execute(action, params)
     
+    async def execute_actions(self, actions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """批量执行相互独立的操作（execute_action 的批量版本）
+
+        actions 中每项为 {"action": 操作名, "params": 参数}。有对应MCP工具的操作合并为一次 tools/call_batch，
+        其余操作并发走原有实现；结果按输入顺序返回，结构与 execute_action 相同。
+        """
+        if not self.server_started:
+            await self.start()
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(actions)
+        mapped = [i for i, item in enumerate(actions) if self.ACTION_MAPPING.get(item["action"])]
+        
+        async def fallback(i: int) -> None:
+            results[i] = await self._fallback_execute(actions[i]["action"], actions[i].get("params") or {})
+        
+        async def batch() -> None:
+            try:
+                batch_results = await self.mcp_client.call_tools([
+                    {"name": self.ACTION_MAPPING[actions[i]["action"]], "arguments": actions[i].get("params") or {}}
+                    for i in mapped
+                ])
+            except Exception as e:
+                logger.error(f"MCP批量工具调用失败: {e}")
+                # 回退到原有实现
+                await asyncio.gather(*[fallback(i) for i in mapped])
+                return
+            for i, result in zip(mapped, batch_results):
+                results[i] = {
+                    "success": True,
+                    "action": actions[i]["action"],
+                    "result": result,
+                    "source": "mcp"
+                }
+        
+        mapped_set = set(mapped)
+        tasks = [fallback(i) for i in range(len(actions)) if i not in mapped_set]
+        if mapped:
+            tasks.append(batch())
+        await asyncio.gather(*tasks)
+        return results
+    
     async def _fallback_execute(self, action: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """回退到原有执行器"""
         from src.tools.executor import executor
@@ -349,8 +410,33 @@ class LAMAgentMCPAdapter:
         
         return await self.mcp_client.list_tools()
 
-# 全局MCP适配器实例
-mcp_adapter = LAMAgentMCPAdapter()
+# 全局MCP适配器实例（首次访问时创建）
+_mcp_adapter: Optional[LAMAgentMCPAdapter] = None
+
+def get_mcp_adapter() -> LAMAgentMCPAdapter:
+    """获取全局MCP适配器"""
+    global _mcp_adapter
+    if _mcp_adapter is None:
+        _mcp_adapter = LAMAgentMCPAdapter()
+    return _mcp_adapter
+
+async def collect_server_metrics() -> List[MetricFamily]:
+    """所有已启动的stdio客户端对应的服务器进程指标（GET /metrics 合并输出），取不到的进程跳过"""
+    clients = list(_clients)
+    results = await asyncio.gather(*[client.collect_metrics() for client in clients], return_exceptions=True)
+    families: List[MetricFamily] = []
+    for result in results:
+        if isinstance(result, BaseException):
+            logger.warning(f"获取MCP服务器指标失败: {result}")
+            continue
+        families.extend(result)
+    return families
+
+def __getattr__(name: str) -> Any:
+    # 兼容旧的 `from src.mcp.client import mcp_adapter` 写法
+    if name == "mcp_adapter":
+        return get_mcp_adapter()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 async def main():
     """测试MCP客户端"""
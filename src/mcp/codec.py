@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+MCP消息编解码
+使用 orjson 在 bytes 上直接编解码JSON-RPC消息，并提供两种减少大消息拷贝的手段：
+- 长度前缀帧：超过阈值的消息以 b"#<字节数>\\n" 开头后跟消息体，读取端按长度一次读出，不必逐字节查找换行；
+  JSON消息不会以 "#" 开头，因此同一条管道上按行与按帧的消息可以混用。
+- 大字符串引用：UTF-8编码后超过阈值的字符串字段写入临时文件，消息中只保留 {"$blob": {"path", "bytes"}}，
+  由接收方读取后删除（仅用于stdio传输，且需客户端在initialize中声明支持）。接收方只解析位于
+  协商好的引用目录中、以 lam-blob- 开头的文件，其余形似引用的字典原样保留。
+此外，预先编码好的结果（如 tools/list）用 RawJSON 包装后放入消息，编码时按原字节写出而不重新序列化。
+"""
+
+import json
+import logging
+import os
+import tempfile
+from typing import Any, Optional
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+FRAME_PREFIX = b"#"
+BLOB_KEY = "$blob"
+BLOB_PREFIX = "lam-blob-"
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+class RawJSON:
+    """已编码的JSON片段：经 dumps 编码时原样嵌入，进程内传递时用 value 解析"""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    @property
+    def value(self) -> Any:
+        return loads(self.data)
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, RawJSON):
+        return orjson.Fragment(obj.data)
+    return str(obj)
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, RawJSON):
+        return obj.value
+    return str(obj)
+
+
+def dumps(message: Any) -> bytes:
+    """编码为UTF-8 JSON字节串，无法直接编码的对象转为字符串"""
+    try:
+        return orjson.dumps(message, default=_default, option=_ORJSON_OPTIONS)
+    except orjson.JSONEncodeError:
+        # orjson 不支持超过64位的整数等少数情况，退回标准库
+        return json.dumps(message, ensure_ascii=False, default=_json_default).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    """解码JSON字节串（解析失败抛出 ValueError）"""
+    return orjson.loads(data)
+
+
+def encode_frame(message: Any, frame_threshold: int = 0) -> bytes:
+    """编码一条消息：默认按行（以换行结尾），超过 frame_threshold 字节时加长度前缀（0表示始终按行）"""
+    body = dumps(message)
+    if frame_threshold and len(body) > frame_threshold:
+        return FRAME_PREFIX + str(len(body)).encode("ascii") + b"\n" + body
+    return body + b"\n"
+
+
+def frame_length(line: bytes) -> Optional[int]:
+    """若该行是长度前缀帧的头部，返回消息体字节数，否则返回None"""
+    if not line.startswith(FRAME_PREFIX):
+        return None
+    try:
+        return int(line[1:].strip())
+    except ValueError:
+        return None
+
+
+def externalize_strings(value: Any, min_bytes: int, directory: Optional[str] = None) -> Any:
+    """把UTF-8编码后不小于 min_bytes 字节的字符串写入临时文件并替换为引用，返回新对象（原对象不变）"""
+    if isinstance(value, str):
+        # 每个字符编码为1~4字节：字符数已达阈值时无需编码即可判断，明显不足时跳过编码
+        if len(value) * 4 < min_bytes:
+            return value
+        data = value.encode("utf-8")
+        if len(data) < min_bytes:
+            return value
+        fd, path = tempfile.mkstemp(prefix=BLOB_PREFIX, suffix=".txt", dir=directory)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return {BLOB_KEY: {"path": path, "bytes": len(data)}}
+    if isinstance(value, dict):
+        return {key: externalize_strings(item, min_bytes, directory) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [externalize_strings(item, min_bytes, directory) for item in value]
+    return value
+
+
+def resolve_blobs(value: Any, directory: str) -> Any:
+    """把消息中的大字符串引用读回为字符串并删除临时文件
+
+    只接受 directory 中以 lam-blob- 开头的文件；指向其他位置的引用可能来自工具结果中的外部数据，
+    不读取也不删除，原样保留。
+    """
+    return _resolve(value, os.path.realpath(directory))
+
+
+def _resolve(value: Any, root: str) -> Any:
+    if isinstance(value, dict):
+        blob = value.get(BLOB_KEY)
+        if len(value) == 1 and isinstance(blob, dict) and "path" in blob:
+            path = _blob_path(blob["path"], root)
+            if path is None:
+                logger.warning(f"忽略引用目录之外的大字符串引用: {blob['path']!r}")
+                return value
+            return _read_blob(path)
+        return {key: _resolve(item, root) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_resolve(item, root) for item in value]
+    return value
+
+
+def _blob_path(path: Any, root: str) -> Optional[str]:
+    """引用路径（解析符号链接后）直接位于 root 中且文件名以 lam-blob- 开头时返回该路径"""
+    if not isinstance(path, str):
+        return None
+    real = os.path.realpath(path)
+    if os.path.dirname(real) != root or not os.path.basename(real).startswith(BLOB_PREFIX):
+        return None
+    return real
+
+
+def _read_blob(path: str) -> str:
+    try:
+        with open(path, "rb") as f:
+            return f.read().decode("utf-8")
+    finally:
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.debug(f"删除临时文件失败: {e}")
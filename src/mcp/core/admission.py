@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+MCP工具准入控制
+工具可在 MCPTool.concurrency 上声明并发类别，同一类别的调用共享一个并发上限：
+达到上限后进入有界等待队列，等待超时或队列已满时立即拒绝并给出建议的重试间隔，
+避免大量浏览器/桌面操作同时运行拖垮机器，也不让轻量工具排在它们后面。
+等待者按事件循环记录，释放时跨线程唤醒，因此同一个服务器实例可被不同事件循环复用。
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from ...utils.metrics import MetricFamily, Sample, get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+
+class ConcurrencyClass:
+    """工具并发类别（上限、队列长度与等待超时在配置项 lam_mcp_concurrency_classes 中设置）
+
+    BROWSER: 启动或操作浏览器的工具
+    NETWORK: 调用外部HTTP接口的工具
+    DESKTOP: 启动桌面软件、发送消息等占用前台的工具
+    """
+    BROWSER = "browser"
+    NETWORK = "network"
+    DESKTOP = "desktop"
+
+
+class AdmissionRejected(Exception):
+    """调用未被准入（队列已满或等待超时）"""
+
+    def __init__(self, concurrency_class: str, reason: str, retry_after: float):
+        self.concurrency_class = concurrency_class
+        self.reason = reason
+        self.retry_after = retry_after
+        text = "等待队列已满" if reason == "queue_full" else "排队等待超时"
+        super().__init__(f"并发类别 '{concurrency_class}' {text}，请在 {retry_after} 秒后重试")
+
+
+class _Gate:
+    """单个并发类别的计数信号量 + 有界FIFO等待队列"""
+
+    def __init__(self, name: str, limit: int, queue_size: int, timeout: float):
+        self.name = name
+        self.limit = max(1, int(limit))
+        self.queue_size = max(0, int(queue_size))
+        self.timeout = float(timeout)
+        self._lock = threading.Lock()
+        self._running = 0
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._stats = {"admitted": 0, "queued": 0, "rejected": 0, "timeouts": 0}
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        # 单次调用占用时长的滑动平均，用于估计重试间隔
+        self._hold_avg = 1.0
+
+    def retry_after(self) -> float:
+        """按当前排队数与平均占用时长估计的重试间隔（秒）"""
+        with self._lock:
+            return self._retry_after_locked()
+
+    def _retry_after_locked(self) -> float:
+        return round(max(1.0, self._hold_avg * (len(self._waiters) + 1) / self.limit), 1)
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._running < self.limit and not self._waiters:
+                self._running += 1
+                self._stats["admitted"] += 1
+                return
+            if len(self._waiters) >= self.queue_size:
+                self._stats["rejected"] += 1
+                raise AdmissionRejected(self.name, "queue_full", self._retry_after_locked())
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+            self._stats["queued"] += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter[1]), self.timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    granted = False
+                else:
+                    # 名额已转交给本等待者，退出前需要归还
+                    granted = True
+                if isinstance(e, asyncio.TimeoutError):
+                    self._stats["timeouts"] += 1
+                retry_after = self._retry_after_locked()
+            if granted:
+                self.release()
+            if isinstance(e, asyncio.TimeoutError):
+                raise AdmissionRejected(self.name, "timeout", retry_after) from None
+            raise
+        waited = time.monotonic() - started
+        with self._lock:
+            self._stats["admitted"] += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+    def release(self, held: Optional[float] = None) -> None:
+        with self._lock:
+            if held is not None:
+                self._hold_avg = self._hold_avg * 0.8 + held * 0.2
+            while self._waiters:
+                # 名额直接转交给队首等待者，running 计数不变
+                loop, future = self._waiters.popleft()
+                if not loop.is_closed():
+                    loop.call_soon_threadsafe(_grant, future)
+                    return
+            self._running -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            queued = self._stats["queued"]
+            return {
+                "limit": self.limit,
+                "running": self._running,
+                "queue_depth": len(self._waiters),
+                "queue_size": self.queue_size,
+                "timeout_s": self.timeout,
+                **self._stats,
+                "avg_wait_ms": round(self._wait_total / queued * 1000, 2) if queued else 0.0,
+                "max_wait_ms": round(self._wait_max * 1000, 2),
+                "retry_after_s": self._retry_after_locked(),
+            }
+
+
+def _grant(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class AdmissionController:
+    """按并发类别管理工具调用的准入"""
+
+    def __init__(self, classes: Optional[Dict[str, Dict[str, Any]]] = None):
+        self._gates: Dict[str, _Gate] = {
+            name: _Gate(name, spec.get("limit", 1), spec.get("queue", 0), spec.get("timeout", 30.0))
+            for name, spec in (classes or {}).items()
+        }
+
+    @asynccontextmanager
+    async def slot(self, concurrency_class: Optional[str]) -> AsyncIterator[None]:
+        """占用一个并发名额；未配置的类别不受限制"""
+        gate = self._gates.get(concurrency_class) if concurrency_class else None
+        if gate is None:
+            yield
+            return
+        await gate.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            gate.release(time.monotonic() - started)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """各并发类别的运行数、队列深度、准入/拒绝/超时计数与等待时间"""
+        return {name: gate.stats() for name, gate in self._gates.items()}
+
+    def collect_metrics(self) -> List[MetricFamily]:
+        """各并发类别的占用与排队情况（browser 类别即浏览器池的利用率）"""
+        stats = self.stats()
+
+        def family(name: str, kind: str, help: str, key: str) -> MetricFamily:
+            return MetricFamily(name, kind, help, [Sample({"class": c}, s[key]) for c, s in stats.items()])
+
+        return [
+            family("lam_mcp_concurrency_limit", "gauge", "并发类别的并发上限", "limit"),
+            family("lam_mcp_concurrency_running", "gauge", "并发类别中正在运行的调用数", "running"),
+            family("lam_mcp_concurrency_queue_depth", "gauge", "并发类别的排队调用数", "queue_depth"),
+            family("lam_mcp_concurrency_admitted_total", "counter", "获得并发名额的调用数", "admitted"),
+            family("lam_mcp_concurrency_rejected_total", "counter", "因队列已满被拒绝的调用数", "rejected"),
+            family("lam_mcp_concurrency_timeouts_total", "counter", "排队超时的调用数", "timeouts"),
+        ]
+
+
+_admission: Optional[AdmissionController] = None
+_admission_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """获取全局准入控制器（首次调用时按配置创建）"""
+    global _admission
+    if _admission is None:
+        with _admission_lock:
+            if _admission is None:
+                from ...config import settings
+                _admission = AdmissionController(settings.lam_mcp_concurrency_classes)
+                get_metrics_registry().register_collector("mcp_admission", _admission.collect_metrics)
+    return _admission
@@ -9,18 +9,71 @@ import asyncio
 import json
 import logging
 from typing import Any, Dict, List, Optional, Union, Callable
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from abc import ABC, abstractmethod
 
+from .cache import CachePolicy
+from .execution import ExecutionClass, ToolDispatcher, get_tool_dispatcher
+from .schema import SchemaValidationError, Validator, compile_schema
+from .stats import ToolStats, get_tool_stats
+
 logger = logging.getLogger(__name__)
 
 @dataclass
 class MCPTool:
-    """MCP工具定义"""
+    """MCP工具定义
+
+    execution: 执行类别（见 ExecutionClass），决定调用被分派到哪个执行器
+    cache: 结果缓存策略（见 CachePolicy），仅用于无副作用的幂等工具；None 表示不缓存
+    concurrency: 并发类别（见 ConcurrencyClass），同类别调用共享并发上限与等待队列；None 表示不限制
+    validate: 由 input_schema 编译得到的校验函数，返回填充默认值后的参数
+    """
     name: str
     description: str
     input_schema: Dict[str, Any]
     handler: Callable
+    execution: str = ExecutionClass.IO_ASYNC
+    cache: Optional[CachePolicy] = None
+    concurrency: Optional[str] = None
+    validate: Validator = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.validate = compile_schema(self.input_schema)
+
+class ToolTable(dict):
+    """工具名 -> MCPTool 的字典，每次增删工具时递增 version，供缓存的 tools/list 结果判断是否失效"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+
+    def __setitem__(self, name: str, tool: MCPTool) -> None:
+        super().__setitem__(name, tool)
+        self.version += 1
+
+    def __delitem__(self, name: str) -> None:
+        super().__delitem__(name)
+        self.version += 1
+
+    def pop(self, *args):
+        self.version += 1
+        return super().pop(*args)
+
+    def popitem(self):
+        self.version += 1
+        return super().popitem()
+
+    def setdefault(self, name: str, tool: Optional[MCPTool] = None):
+        self.version += 1
+        return super().setdefault(name, tool)
+
+    def update(self, *args, **kwargs) -> None:
+        super().update(*args, **kwargs)
+        self.version += 1
+
+    def clear(self) -> None:
+        super().clear()
+        self.version += 1
 
 class BaseToolHandler(ABC):
     """工具处理器基类"""
@@ -90,38 +143,37 @@ class MCPResponse:
 class ToolExecutor:
     """工具执行器"""
     
-    def __init__(self, registry: BaseToolRegistry):
+    def __init__(self, registry: BaseToolRegistry, dispatcher: Optional[ToolDispatcher] = None,
+                 stats: Optional[ToolStats] = None):
         self.registry = registry
+        self.dispatcher = dispatcher or get_tool_dispatcher()
+        self.stats = stats or get_tool_stats()
     
     async def execute_tool(self, tool_name: str, args: Dict[str, Any]) -> MCPResponse:
         """执行工具"""
-        try:
-            tool = self.registry.get_tool(tool_name)
-            if not tool:
-                return MCPResponse.error_response(f"工具 '{tool_name}' 不存在")
-            
-            # 验证参数
-            if not self._validate_args(args, tool.input_schema):
-                return MCPResponse.error_response("参数验证失败")
-            
-            # 执行工具
-            result = await tool.handler(args)
-            return MCPResponse.success_response(result)
-            
-        except Exception as e:
-            logger.error(f"执行工具 '{tool_name}' 失败: {e}")
-            return MCPResponse.error_response(f"执行工具失败: {str(e)}")
-    
-    def _validate_args(self, args: Dict[str, Any], schema: Dict[str, Any]) -> bool:
-        """验证参数"""
-        # 简化的参数验证
-        if "required" in schema:
-            required_fields = schema["required"]
-            for field in required_fields:
-                if field not in args:
-                    logger.warning(f"缺少必需参数: {field}")
-                    return False
-        return True
+        tool = self.registry.get_tool(tool_name)
+        if not tool:
+            return MCPResponse.error_response(f"工具 '{tool_name}' 不存在")
+        
+        with self.stats.track(tool_name) as record:
+            try:
+                # 验证参数并填充默认值
+                try:
+                    args = tool.validate(args)
+                except SchemaValidationError as e:
+                    logger.warning(f"工具 '{tool_name}' 参数无效: {e}")
+                    record.fail("validation")
+                    return MCPResponse.error_response(f"参数验证失败: {e}")
+                
+                # 按执行类别分派执行
+                result = await self.dispatcher.run(tool.handler, args, tool.execution)
+                record.check_result(result)
+                return MCPResponse.success_response(result)
+                
+            except Exception as e:
+                logger.error(f"执行工具 '{tool_name}' 失败: {e}")
+                record.fail(type(e).__name__)
+                return MCPResponse.error_response(f"执行工具失败: {str(e)}")
     
     def list_available_tools(self) -> List[Dict[str, Any]]:
         """列出可用工具"""
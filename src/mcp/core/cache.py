@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+工具结果缓存
+幂等工具可在 MCPTool.cache 上声明缓存策略（TTL、参与缓存键的参数、最大条目数）。
+结果先查进程内LRU，再查SQLite，均未命中时才执行工具；同一键的并发调用只执行一次（single-flight）。
+共享的执行作为独立任务运行，使用自己的取消令牌：某个调用方被取消只会停止它自己的等待，
+所有调用方都离开后才取消这次执行。
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ...utils.cancellation import CancelToken, cancel_scope
+from ...utils.metrics import MetricFamily, Sample, get_metrics_registry, ratio
+
+logger = logging.getLogger(__name__)
+
+_STAT_KEYS = ("hits", "disk_hits", "misses", "shared", "stores", "evictions")
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """工具结果缓存策略
+
+    ttl: 结果有效期（秒）
+    key_fields: 参与缓存键的参数名（None 表示全部参数），例如超时等不影响结果的参数应排除
+    max_size: 每个工具在内存与磁盘中保留的最大条目数
+    """
+    ttl: float
+    key_fields: Optional[Sequence[str]] = None
+    max_size: int = 256
+
+    def key(self, arguments: Dict[str, Any]) -> str:
+        """由参数计算缓存键（与参数顺序无关）"""
+        if self.key_fields is not None:
+            arguments = {name: arguments.get(name) for name in self.key_fields}
+        payload = json.dumps(arguments, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_cacheable_result(result: Any) -> bool:
+    """执行失败的结果（success为False或带error字段）不缓存"""
+    if isinstance(result, dict):
+        return result.get("success") is not False and not result.get("error")
+    return True
+
+
+class _Flight:
+    """一次共享的缓存填充：执行任务、其取消令牌与等待中的调用方数量"""
+
+    __slots__ = ("task", "token", "waiters")
+
+    def __init__(self, task: "asyncio.Task", token: CancelToken):
+        self.task = task
+        self.token = token
+        self.waiters = 0
+
+
+class ToolResultCache:
+    """内存LRU + SQLite 两级工具结果缓存"""
+
+    def __init__(self, db_path: Optional[str] = "tool_cache.db"):
+        self.db_path = db_path
+        self._memory: Dict[str, "OrderedDict[str, Tuple[float, Any]]"] = {}
+        self._in_flight: Dict[Tuple[str, str], _Flight] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        if self.db_path:
+            self.init_database()
+
+    def init_database(self) -> None:
+        """初始化缓存表"""
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS tool_cache (
+                    tool TEXT NOT NULL,
+                    cache_key TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (tool, cache_key)
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_tool_cache_expires ON tool_cache (expires_at)')
+
+    async def get_or_compute(self, tool: str, policy: CachePolicy, arguments: Dict[str, Any],
+                             compute: Callable[[], Awaitable[Any]]) -> Any:
+        """返回缓存结果，未命中时执行 compute 并写入缓存"""
+        key = policy.key(arguments)
+        hit, result = self._memory_get(tool, key)
+        if hit:
+            self._count(tool, "hits")
+            return copy.deepcopy(result)
+
+        loop = asyncio.get_running_loop()
+        flight = self._in_flight.get((tool, key))
+        if flight is not None and flight.task.get_loop() is loop:
+            # 相同调用正在执行，等待其结果而不是重复执行
+            self._count(tool, "shared")
+        else:
+            token = CancelToken()
+            task = loop.create_task(self._fill(tool, key, policy, compute, token))
+            flight = _Flight(task, token)
+            self._in_flight[(tool, key)] = flight
+            task.add_done_callback(lambda done: self._flight_done(tool, key, flight))
+
+        flight.waiters += 1
+        try:
+            result = await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            # 只有当前调用方停止等待；最后一个调用方离开时才取消共享的执行
+            if flight.waiters == 1 and not flight.task.done():
+                self._abandon(tool, key, flight)
+            raise
+        finally:
+            flight.waiters -= 1
+        return copy.deepcopy(result)
+
+    async def _fill(self, tool: str, key: str, policy: CachePolicy, compute: Callable[[], Awaitable[Any]],
+                    token: CancelToken) -> Any:
+        """查磁盘缓存，未命中时执行 compute 并写入两级缓存（在共享执行自己的取消令牌下运行）"""
+        with cancel_scope(token):
+            hit, result, expires_at = (await asyncio.to_thread(self._disk_get, tool, key)
+                                       if self.db_path else (False, None, 0.0))
+            if hit:
+                self._count(tool, "hits")
+                self._count(tool, "disk_hits")
+                self._memory_put(tool, key, result, policy, expires_at)
+                return result
+            self._count(tool, "misses")
+            result = await compute()
+            if is_cacheable_result(result):
+                expires_at = time.time() + policy.ttl
+                self._memory_put(tool, key, result, policy, expires_at)
+                if self.db_path:
+                    await asyncio.to_thread(self._disk_put, tool, key, result, policy, expires_at)
+                self._count(tool, "stores")
+            return result
+
+    def _abandon(self, tool: str, key: str, flight: _Flight) -> None:
+        """所有调用方都已取消：不再让新调用加入，并中止执行（包括线程中的处理器）"""
+        if self._in_flight.get((tool, key)) is flight:
+            del self._in_flight[(tool, key)]
+        flight.token.cancel("所有调用方均已取消")
+        flight.task.cancel()
+
+    def _flight_done(self, tool: str, key: str, flight: _Flight) -> None:
+        if self._in_flight.get((tool, key)) is flight:
+            del self._in_flight[(tool, key)]
+        # 被放弃的执行没有等待者，避免 "exception was never retrieved" 警告
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+    def invalidate(self, tool: Optional[str] = None) -> int:
+        """清除某个工具（或全部工具）的缓存，返回删除的磁盘条目数"""
+        with self._lock:
+            if tool is None:
+                self._memory.clear()
+            else:
+                self._memory.pop(tool, None)
+        if not self.db_path:
+            return 0
+        try:
+            with self._connect() as conn:
+                if tool is None:
+                    return conn.execute('DELETE FROM tool_cache').rowcount
+                return conn.execute('DELETE FROM tool_cache WHERE tool = ?', (tool,)).rowcount
+        except sqlite3.Error as e:
+            logger.warning(f"清除工具结果缓存失败: {e}")
+            return 0
+
+    def purge_expired(self) -> int:
+        """删除过期的磁盘条目"""
+        if not self.db_path:
+            return 0
+        with self._connect() as conn:
+            return conn.execute('DELETE FROM tool_cache WHERE expires_at <= ?', (time.time(),)).rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        """总计与按工具的命中/未命中/合并/写入/淘汰计数"""
+        with self._lock:
+            per_tool = {tool: dict(counts) for tool, counts in self._stats.items()}
+            memory_entries = {tool: len(entries) for tool, entries in self._memory.items()}
+        total = {name: sum(counts[name] for counts in per_tool.values()) for name in _STAT_KEYS}
+        lookups = total["hits"] + total["misses"]
+        total["hit_rate"] = round(total["hits"] / lookups, 4) if lookups else 0.0
+        return {"total": total, "tools": per_tool, "memory_entries": memory_entries}
+
+    def collect_metrics(self) -> List[MetricFamily]:
+        """按工具的缓存查找结果与命中率"""
+        stats = self.stats()
+        tools = stats["tools"]
+        return [
+            MetricFamily("lam_mcp_tool_cache_lookups_total", "counter", "工具结果缓存查找次数（按结果）",
+                         [Sample({"tool": t, "result": r}, c[key]) for t, c in tools.items()
+                          for r, key in (("hit", "hits"), ("miss", "misses"))]),
+            MetricFamily("lam_mcp_tool_cache_hit_ratio", "gauge", "工具结果缓存命中率",
+                         [Sample({"tool": t}, ratio(c["hits"], c["hits"] + c["misses"])) for t, c in tools.items()]),
+        ]
+
+    def _count(self, tool: str, name: str) -> None:
+        with self._lock:
+            counts = self._stats.setdefault(tool, dict.fromkeys(_STAT_KEYS, 0))
+            counts[name] += 1
+
+    def _memory_get(self, tool: str, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entries = self._memory.get(tool)
+            if not entries or key not in entries:
+                return False, None
+            expires_at, result = entries[key]
+            if expires_at <= time.time():
+                del entries[key]
+                return False, None
+            entries.move_to_end(key)
+            return True, result
+
+    def _memory_put(self, tool: str, key: str, result: Any, policy: CachePolicy, expires_at: float) -> None:
+        with self._lock:
+            entries = self._memory.setdefault(tool, OrderedDict())
+            entries[key] = (expires_at, result)
+            entries.move_to_end(key)
+            while len(entries) > policy.max_size:
+                entries.popitem(last=False)
+                counts = self._stats.setdefault(tool, dict.fromkeys(_STAT_KEYS, 0))
+                counts["evictions"] += 1
+
+    def _disk_get(self, tool: str, key: str) -> Tuple[bool, Any, float]:
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    'SELECT result, expires_at FROM tool_cache WHERE tool = ? AND cache_key = ? AND expires_at > ?',
+                    (tool, key, time.time()),
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"读取工具结果缓存失败: {e}")
+            return False, None, 0.0
+        if row is None:
+            return False, None, 0.0
+        return True, json.loads(row["result"]), row["expires_at"]
+
+    def _disk_put(self, tool: str, key: str, result: Any, policy: CachePolicy, expires_at: float) -> None:
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO tool_cache (tool, cache_key, result, created_at, expires_at) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (tool, key, json.dumps(result, ensure_ascii=False, default=str), time.time(), expires_at),
+                )
+                # 每个工具只保留最新的 max_size 条
+                conn.execute(
+                    'DELETE FROM tool_cache WHERE tool = ? AND cache_key NOT IN '
+                    '(SELECT cache_key FROM tool_cache WHERE tool = ? ORDER BY created_at DESC LIMIT ?)',
+                    (tool, tool, policy.max_size),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"写入工具结果缓存失败: {e}")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+_tool_cache: Optional[ToolResultCache] = None
+_tool_cache_lock = threading.Lock()
+
+
+def get_tool_result_cache() -> Optional[ToolResultCache]:
+    """获取全局工具结果缓存（首次调用时按配置创建，未启用时返回None）"""
+    global _tool_cache
+    if _tool_cache is None:
+        with _tool_cache_lock:
+            if _tool_cache is None:
+                from ...config import settings
+                if not settings.lam_mcp_cache_enabled:
+                    return None
+                _tool_cache = ToolResultCache(db_path=settings.lam_mcp_cache_path or None)
+                get_metrics_registry().register_collector("mcp_tool_cache", _tool_cache.collect_metrics)
+    return _tool_cache
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+MCP工具执行调度
+按工具的执行类别把调用分派到不同的执行器，避免同步阻塞的处理器卡住服务器事件循环
+"""
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import logging
+import multiprocessing
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from .lazy import LazyHandler
+
+logger = logging.getLogger(__name__)
+
+# CPU进程池的启动方式：服务器进程中已有IO循环与线程池线程，fork 可能复制到被其他线程持有的锁而使子进程卡死，
+# 因此使用 forkserver（Windows 等不支持时用 spawn）
+CPU_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+class ExecutionClass:
+    """工具执行类别
+
+    IO_ASYNC: 真正的异步处理器，直接在事件循环中await（同步函数则经 asyncio.to_thread 执行）
+    BLOCKING_IO: 同步网络/文件/子进程调用，进入有界线程池
+    CPU: 计算密集型，进入进程池（处理器无法序列化时退回线程池）
+    BROWSER: Playwright浏览器操作，进入独立的小线程池以限制同时打开的浏览器数量
+    """
+    IO_ASYNC = "io_async"
+    BLOCKING_IO = "blocking_io"
+    CPU = "cpu"
+    BROWSER = "browser"
+
+    ALL = (IO_ASYNC, BLOCKING_IO, CPU, BROWSER)
+
+
+def _run_handler(handler: Callable, args: Dict[str, Any]) -> Any:
+    """在工作线程/进程中执行处理器；异步处理器在独立的事件循环中运行到结束"""
+    result = handler(args)
+    if inspect.isawaitable(result):
+        return asyncio.run(result)
+    return result
+
+
+class ToolDispatcher:
+    """工具调用分派器"""
+
+    def __init__(self, blocking_workers: int = 16, cpu_workers: int = 2, browser_workers: int = 2):
+        self._blocking = ThreadPoolExecutor(max_workers=max(1, blocking_workers), thread_name_prefix="mcp-blocking")
+        self._browser = ThreadPoolExecutor(max_workers=max(1, browser_workers), thread_name_prefix="mcp-browser")
+        self._cpu_workers = max(1, cpu_workers)
+        self._cpu: Optional[ProcessPoolExecutor] = None
+        self._picklable: Dict[Any, bool] = {}
+        self._lock = threading.Lock()
+        self._active: Dict[str, int] = {name: 0 for name in ExecutionClass.ALL}
+
+    async def run(self, handler: Callable, args: Dict[str, Any],
+                  execution: str = ExecutionClass.IO_ASYNC) -> Any:
+        """按执行类别执行处理器并返回其结果"""
+        if execution not in self._active:
+            logger.warning(f"未知的执行类别 '{execution}'，按 {ExecutionClass.BLOCKING_IO} 处理")
+            execution = ExecutionClass.BLOCKING_IO
+        with self._lock:
+            self._active[execution] += 1
+        try:
+            if execution == ExecutionClass.IO_ASYNC:
+                if isinstance(handler, LazyHandler):
+                    handler = handler.resolve()
+                if inspect.iscoroutinefunction(handler):
+                    return await handler(args)
+                return await asyncio.to_thread(_run_handler, handler, args)
+            loop = asyncio.get_running_loop()
+            if execution == ExecutionClass.CPU and self._can_pickle(handler):
+                return await self._run_cpu(loop, handler, args)
+            executor = self._browser if execution == ExecutionClass.BROWSER else self._blocking
+            # 携带当前上下文，使进度回调等 contextvars 在线程池中可见
+            call = functools.partial(contextvars.copy_context().run, _run_handler, handler, args)
+            return await loop.run_in_executor(executor, call)
+        finally:
+            with self._lock:
+                self._active[execution] -= 1
+
+    def active(self) -> Dict[str, int]:
+        """各执行类别正在运行的调用数"""
+        with self._lock:
+            return dict(self._active)
+
+    def shutdown(self) -> None:
+        """关闭所有执行器"""
+        self._blocking.shutdown(wait=False, cancel_futures=True)
+        self._browser.shutdown(wait=False, cancel_futures=True)
+        if self._cpu is not None:
+            self._cpu.shutdown(wait=False, cancel_futures=True)
+            self._cpu = None
+
+    async def _run_cpu(self, loop: asyncio.AbstractEventLoop, handler: Callable, args: Dict[str, Any]) -> Any:
+        try:
+            return await loop.run_in_executor(self._cpu_pool(), _run_handler, handler, args)
+        except BrokenProcessPool:
+            # 子进程崩溃后进程池不可再用，重建后交由调用方决定是否重试
+            logger.error("CPU进程池已损坏，正在重建")
+            with self._lock:
+                self._cpu = None
+            raise
+
+    def _cpu_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._cpu is None:
+                self._cpu = ProcessPoolExecutor(max_workers=self._cpu_workers,
+                                                mp_context=multiprocessing.get_context(CPU_START_METHOD))
+            return self._cpu
+
+    def _can_pickle(self, handler: Callable) -> bool:
+        cached = self._picklable.get(handler)
+        if cached is not None:
+            return cached
+        try:
+            pickle.dumps(handler)
+            picklable = True
+        except Exception as e:
+            logger.warning(f"处理器 {getattr(handler, '__qualname__', handler)} 无法序列化到进程池，改用线程池: {e}")
+            picklable = False
+        self._picklable[handler] = picklable
+        return picklable
+
+
+_tool_dispatcher: Optional[ToolDispatcher] = None
+_tool_dispatcher_lock = threading.Lock()
+
+
+def get_tool_dispatcher() -> ToolDispatcher:
+    """获取全局工具分派器（首次调用时按配置创建）"""
+    global _tool_dispatcher
+    if _tool_dispatcher is None:
+        with _tool_dispatcher_lock:
+            if _tool_dispatcher is None:
+                from ...config import settings
+                _tool_dispatcher = ToolDispatcher(
+                    blocking_workers=settings.lam_mcp_blocking_workers,
+                    cpu_workers=settings.lam_mcp_cpu_workers,
+                    browser_workers=settings.lam_mcp_browser_workers,
+                )
+    return _tool_dispatcher
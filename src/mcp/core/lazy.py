@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+延迟加载的工具处理器描述符
+注册工具时只记录 "模块路径:属性路径"，处理器模块在第一次调用时才被导入
+"""
+
+import importlib
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+class LazyHandler:
+    """处理器描述符
+
+    target 形如 "src.mcp.handlers.general_handler:CalculatorHandler" 或
+    "src.tools.executor:executor.calculate"。解析结果若是类，则实例化后使用其 handle 方法。
+    描述符本身只保存字符串，可以序列化到进程池中由子进程自行解析。
+    """
+
+    def __init__(self, target: str):
+        module, _, attr = target.partition(":")
+        if not module or not attr:
+            raise ValueError(f"无效的处理器路径: {target}")
+        self.target = target
+        self._resolved: Optional[Callable] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._resolved is not None
+
+    def resolve(self) -> Callable:
+        """导入模块并返回实际的处理器函数"""
+        if self._resolved is None:
+            with self._lock:
+                if self._resolved is None:
+                    module_name, _, attr_path = self.target.partition(":")
+                    obj: Any = importlib.import_module(module_name)
+                    for part in attr_path.split("."):
+                        obj = getattr(obj, part)
+                    if isinstance(obj, type):
+                        obj = obj().handle
+                    self._resolved = obj
+        return self._resolved
+
+    def __call__(self, args: Dict[str, Any]) -> Any:
+        return self.resolve()(args)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"target": self.target}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(state["target"])
+
+    def __repr__(self) -> str:
+        return f"LazyHandler({self.target!r})"
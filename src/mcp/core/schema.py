@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+工具参数校验
+把工具的 input_schema（JSON Schema子集）预编译成校验函数：检查类型、枚举、数值范围、
+必需字段与嵌套的对象/数组，并填充默认值。编译结果在注册时缓存在工具上，调用时只执行闭包。
+"""
+
+import copy
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+Validator = Callable[[Any], Any]
+_Node = Callable[[Any, str], Any]
+
+_INTEGER_RE = re.compile(r"^[+-]?\d+$")
+_NUMBER_RE = re.compile(r"^[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?$")
+
+_TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, (list, tuple)),
+    "null": lambda v: v is None,
+}
+
+_NOT_COERCED = object()
+
+# web_automate 步骤可用的动作（与 src.tools.browser.automate_page 支持的动作保持一致，navigate 用于指定目标URL）
+WEB_STEP_ACTIONS = [
+    "navigate", "goto", "click", "click_any", "type", "keyboard_type", "press", "press_global",
+    "wait", "wait_any", "wait_url", "wait_video_ready", "sleep", "scroll", "evaluate", "debug_page",
+    "video_play", "video_force_play", "video_click_play", "video_keyboard_play",
+]
+
+
+class SchemaValidationError(ValueError):
+    """参数不符合 input_schema"""
+
+    def __init__(self, path: str, message: str):
+        self.path = path or "参数"
+        self.message = message
+        super().__init__(f"{self.path}: {message}")
+
+
+def compile_schema(schema: Optional[Dict[str, Any]]) -> Validator:
+    """编译schema，返回 validate(arguments) -> 填充默认值后的新参数（校验失败抛出 SchemaValidationError）"""
+    node = _compile(schema or {})
+
+    def validate(value: Any) -> Any:
+        return node(value, "")
+
+    return validate
+
+
+def _join(path: str, name: str) -> str:
+    return f"{path}.{name}" if path else name
+
+
+def _coerce(value: Any, types: List[str]) -> Any:
+    """宽松转换LLM常见的标量误差（数字写成字符串等），无法转换时返回 _NOT_COERCED"""
+    for expected in types:
+        if expected == "integer":
+            if isinstance(value, str) and _INTEGER_RE.match(value.strip()):
+                return int(value)
+            if isinstance(value, float) and value.is_integer():
+                return int(value)
+        elif expected == "number":
+            if isinstance(value, str) and _NUMBER_RE.match(value.strip()):
+                return int(value) if _INTEGER_RE.match(value.strip()) else float(value)
+        elif expected == "string":
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return str(value)
+        elif expected == "boolean":
+            if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+                return value.strip().lower() == "true"
+    return _NOT_COERCED
+
+
+def _compile_type(types: List[str]) -> _Node:
+    checks = [_TYPE_CHECKS[t] for t in types if t in _TYPE_CHECKS]
+    expected = "/".join(types)
+
+    def check(value: Any, path: str) -> Any:
+        for is_type in checks:
+            if is_type(value):
+                return value
+        coerced = _coerce(value, types)
+        if coerced is not _NOT_COERCED:
+            return coerced
+        raise SchemaValidationError(path, f"类型应为 {expected}，实际为 {type(value).__name__}")
+
+    return check
+
+
+def _compile_enum(allowed: List[Any]) -> _Node:
+    def check(value: Any, path: str) -> Any:
+        if value not in allowed:
+            raise SchemaValidationError(path, f"取值必须是 {allowed} 之一")
+        return value
+
+    return check
+
+
+def _compile_range(schema: Dict[str, Any]) -> Optional[_Node]:
+    minimum, maximum = schema.get("minimum"), schema.get("maximum")
+    min_length, max_length = schema.get("minLength"), schema.get("maxLength")
+    if minimum is None and maximum is None and min_length is None and max_length is None:
+        return None
+
+    def check(value: Any, path: str) -> Any:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            if minimum is not None and value < minimum:
+                raise SchemaValidationError(path, f"不能小于 {minimum}")
+            if maximum is not None and value > maximum:
+                raise SchemaValidationError(path, f"不能大于 {maximum}")
+        elif isinstance(value, (str, list, tuple)):
+            if min_length is not None and len(value) < min_length:
+                raise SchemaValidationError(path, f"长度不能小于 {min_length}")
+            if max_length is not None and len(value) > max_length:
+                raise SchemaValidationError(path, f"长度不能大于 {max_length}")
+        return value
+
+    return check
+
+
+def _compile_object(schema: Dict[str, Any]) -> _Node:
+    properties = {name: _compile(sub) for name, sub in (schema.get("properties") or {}).items()}
+    defaults = {
+        name: sub["default"]
+        for name, sub in (schema.get("properties") or {}).items()
+        if isinstance(sub, dict) and "default" in sub
+    }
+    required = list(schema.get("required") or [])
+    closed = schema.get("additionalProperties") is False
+
+    def check(value: Any, path: str) -> Any:
+        if not isinstance(value, dict):
+            return value
+        for name in required:
+            if name not in value:
+                raise SchemaValidationError(_join(path, name), "缺少必需参数")
+        if closed:
+            extra = [name for name in value if name not in properties]
+            if extra:
+                raise SchemaValidationError(path, f"不允许的参数: {', '.join(extra)}")
+        result = dict(value)
+        for name, node in properties.items():
+            if name in result:
+                result[name] = node(result[name], _join(path, name))
+            elif name in defaults:
+                result[name] = copy.deepcopy(defaults[name])
+        return result
+
+    return check
+
+
+def _compile_array(items: Dict[str, Any]) -> _Node:
+    item_node = _compile(items)
+
+    def check(value: Any, path: str) -> Any:
+        if not isinstance(value, (list, tuple)):
+            return value
+        return [item_node(item, f"{path}[{index}]") for index, item in enumerate(value)]
+
+    return check
+
+
+def _compile(schema: Dict[str, Any]) -> _Node:
+    nodes: List[_Node] = []
+    types = schema.get("type")
+    if isinstance(types, str):
+        types = [types]
+    if types and "default" in schema and schema["default"] is None and "null" not in types:
+        # 默认值为None的字段允许显式传入None
+        types = types + ["null"]
+    if types:
+        nodes.append(_compile_type(types))
+    if "enum" in schema:
+        nodes.append(_compile_enum(list(schema["enum"])))
+    range_check = _compile_range(schema)
+    if range_check is not None:
+        nodes.append(range_check)
+    if "properties" in schema or "required" in schema:
+        nodes.append(_compile_object(schema))
+    if isinstance(schema.get("items"), dict):
+        nodes.append(_compile_array(schema["items"]))
+
+    if not nodes:
+        return lambda value, path: value
+    if len(nodes) == 1:
+        return nodes[0]
+
+    def node(value: Any, path: str) -> Any:
+        for step in nodes:
+            value = step(value, path)
+        return value
+
+    return node
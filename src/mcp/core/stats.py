@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+MCP工具运行统计
+按工具记录调用数、按类型的错误数、在途调用数与延迟直方图，供 server_stats 工具查询，
+并可定期把快照追加到JSONL文件，用于跨版本比较各工具的 p95 延迟。
+直方图采用HDR风格的对数-线性分桶：记录为O(1)、内存与调用次数无关，分位数的相对误差有上界。
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ...utils.metrics import MetricFamily, Sample, get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (0.50, 0.90, 0.95, 0.99)
+
+
+class LatencyHistogram:
+    """对数-线性分桶的延迟直方图（微秒精度）
+
+    小于 2 * 2**sub_bits 微秒的值按1微秒分桶；更大的值在每个2的幂区间内再均分为 2**sub_bits 个子桶，
+    分位数的相对误差不超过 1 / 2**sub_bits（默认 sub_bits=5，约3%）。
+    """
+
+    def __init__(self, sub_bits: int = 5):
+        self.sub_bits = sub_bits
+        self._sub_count = 1 << sub_bits
+        self._counts: Dict[int, int] = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us = 0
+
+    def record(self, seconds: float) -> None:
+        value = max(0, int(seconds * 1_000_000))
+        index = self._index(value)
+        self._counts[index] = self._counts.get(index, 0) + 1
+        self.count += 1
+        self.total_us += value
+        self.min_us = value if self.min_us is None else min(self.min_us, value)
+        self.max_us = max(self.max_us, value)
+
+    def percentile(self, q: float) -> float:
+        """第 q 分位的延迟（毫秒），取所在桶的中点"""
+        if not self.count:
+            return 0.0
+        rank = max(1, int(q * self.count + 0.999999))
+        seen = 0
+        for index in sorted(self._counts):
+            seen += self._counts[index]
+            if seen >= rank:
+                low, width = self._bounds(index)
+                value = min(low + (width - 1) / 2, self.max_us)
+                return max(value, self.min_us or 0) / 1000
+        return self.max_us / 1000
+
+    def summary(self, percentiles: Sequence[float] = PERCENTILES) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "count": self.count,
+            "min_ms": round((self.min_us or 0) / 1000, 3),
+            "mean_ms": round(self.total_us / self.count / 1000, 3) if self.count else 0.0,
+            "max_ms": round(self.max_us / 1000, 3),
+        }
+        for q in percentiles:
+            result[f"p{int(q * 100)}_ms"] = round(self.percentile(q), 3)
+        return result
+
+    def _index(self, value: int) -> int:
+        magnitude = value.bit_length() - (self.sub_bits + 1)
+        if magnitude <= 0:
+            return value
+        return magnitude * self._sub_count + (value >> magnitude)
+
+    def _bounds(self, index: int) -> Tuple[int, int]:
+        """桶的下界与宽度（微秒）"""
+        if index < 2 * self._sub_count:
+            return index, 1
+        magnitude = index // self._sub_count - 1
+        sub = index % self._sub_count + self._sub_count
+        return sub << magnitude, 1 << magnitude
+
+
+class _ToolEntry:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.errors_by_type: Dict[str, int] = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.latency = LatencyHistogram()
+
+
+class CallRecord:
+    """一次调用的统计记录；调用方在结束前设置 error 为错误类型（None 表示成功）"""
+
+    __slots__ = ("tool", "error")
+
+    def __init__(self, tool: str):
+        self.tool = tool
+        self.error: Optional[str] = None
+
+    def fail(self, error_type: str) -> None:
+        self.error = error_type
+
+    def check_result(self, result: Any) -> None:
+        """工具正常返回但结果表示失败（success为False或带error字段）时记为 tool_error"""
+        if isinstance(result, dict) and (result.get("success") is False or result.get("error")):
+            self.error = "tool_error"
+
+
+class ToolStats:
+    """线程安全的按工具运行统计"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tools: Dict[str, _ToolEntry] = {}
+        self.started_at = time.time()
+
+    @contextmanager
+    def track(self, tool: str) -> Iterator[CallRecord]:
+        """统计一次调用：计入在途数与延迟；代码块抛出的异常按异常类名计为错误"""
+        record = CallRecord(tool)
+        with self._lock:
+            entry = self._entry(tool)
+            entry.in_flight += 1
+            entry.max_in_flight = max(entry.max_in_flight, entry.in_flight)
+        started = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record.error = type(e).__name__
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                entry.in_flight -= 1
+                entry.calls += 1
+                entry.latency.record(elapsed)
+                if record.error is not None:
+                    entry.errors += 1
+                    entry.errors_by_type[record.error] = entry.errors_by_type.get(record.error, 0) + 1
+
+    def snapshot(self, tools: Optional[Sequence[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """各工具的调用数、错误数（总计与按类型）、在途数与延迟分位数"""
+        with self._lock:
+            names = sorted(self._tools) if tools is None else [t for t in tools if t in self._tools]
+            return {
+                name: {
+                    "calls": entry.calls,
+                    "errors": entry.errors,
+                    "errors_by_type": dict(entry.errors_by_type),
+                    "in_flight": entry.in_flight,
+                    "max_in_flight": entry.max_in_flight,
+                    "latency": entry.latency.summary(),
+                }
+                for name, entry in ((name, self._tools[name]) for name in names)
+            }
+
+    def dump_jsonl(self, path: str, labels: Optional[Dict[str, Any]] = None) -> None:
+        """把当前快照作为一行追加到JSONL文件"""
+        line = {
+            "time": time.time(),
+            "pid": os.getpid(),
+            "uptime_s": round(time.time() - self.started_at, 1),
+            **(labels or {}),
+            "tools": self.snapshot(),
+        }
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+    def collect_metrics(self) -> List[MetricFamily]:
+        """转换为Prometheus指标（供 /metrics 抓取）"""
+        snapshot = self.snapshot()
+        latency = []
+        for tool, entry in snapshot.items():
+            summary = entry["latency"]
+            for q in PERCENTILES:
+                latency.append(Sample({"tool": tool, "quantile": str(q)}, summary[f"p{int(q * 100)}_ms"] / 1000))
+            latency.append(Sample({"tool": tool}, summary["mean_ms"] * summary["count"] / 1000, "_sum"))
+            latency.append(Sample({"tool": tool}, summary["count"], "_count"))
+        return [
+            MetricFamily("lam_mcp_tool_calls_total", "counter", "MCP工具调用次数",
+                         [Sample({"tool": t}, e["calls"]) for t, e in snapshot.items()]),
+            MetricFamily("lam_mcp_tool_errors_total", "counter", "MCP工具调用错误数（按错误类型）",
+                         [Sample({"tool": t, "type": k}, n) for t, e in snapshot.items()
+                          for k, n in e["errors_by_type"].items()]),
+            MetricFamily("lam_mcp_tool_in_flight", "gauge", "MCP工具在途调用数",
+                         [Sample({"tool": t}, e["in_flight"]) for t, e in snapshot.items()]),
+            MetricFamily("lam_mcp_tool_latency_seconds", "summary", "MCP工具调用延迟", latency),
+        ]
+
+    def _entry(self, tool: str) -> _ToolEntry:
+        entry = self._tools.get(tool)
+        if entry is None:
+            entry = self._tools[tool] = _ToolEntry()
+        return entry
+
+
+class StatsDumper:
+    """后台线程按固定间隔把统计快照追加到JSONL文件，停止时再写一次"""
+
+    def __init__(self, stats: ToolStats, path: str, interval: float = 60.0,
+                 labels: Optional[Dict[str, Any]] = None):
+        self.stats = stats
+        self.path = path
+        self.interval = max(0.1, interval)
+        self.labels = dict(labels or {})
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "StatsDumper":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="mcp-stats-dump", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self._thread = None
+        self._dump()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._dump()
+
+    def _dump(self) -> None:
+        try:
+            self.stats.dump_jsonl(self.path, self.labels)
+        except OSError as e:
+            logger.warning(f"写入MCP统计快照失败: {e}")
+
+
+_tool_stats: Optional[ToolStats] = None
+_tool_stats_lock = threading.Lock()
+
+
+def get_tool_stats() -> ToolStats:
+    """获取全局工具运行统计"""
+    global _tool_stats
+    if _tool_stats is None:
+        with _tool_stats_lock:
+            if _tool_stats is None:
+                _tool_stats = ToolStats()
+                get_metrics_registry().register_collector("mcp_tools", _tool_stats.collect_metrics)
+    return _tool_stats
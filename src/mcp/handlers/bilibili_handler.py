@@ -58,26 +58,30 @@ class BilibiliIntegrationHandler(BaseToolHandler):
             elif action == "search_videos":
                 keyword = args["keyword"]
                 page = args.get("page", 1)
-                result = bilibili_integration.search_videos(keyword, page)
+                pagesize = args.get("pagesize", 20)
+                result = bilibili_integration.search_videos(keyword, page, pagesize)
             elif action == "get_video_details":
                 bvid = args["bvid"]
                 result = bilibili_integration.get_video_details(bvid)
             elif action == "get_user_videos":
                 uid = args["uid"]
                 page = args.get("page", 1)
-                result = bilibili_integration.get_user_videos(uid, page)
+                pagesize = args.get("pagesize", 20)
+                result = bilibili_integration.get_user_videos(uid, page, pagesize)
             elif action == "get_following_list":
                 uid = args["uid"]
                 page = args.get("page", 1)
-                result = bilibili_integration.get_following_list(uid, page)
+                pagesize = args.get("pagesize", 20)
+                result = bilibili_integration.get_following_list(uid, page, pagesize)
             elif action == "get_user_favorites":
                 uid = args["uid"]
                 page = args.get("page", 1)
-                result = bilibili_integration.get_user_favorites(uid, page)
+                pagesize = args.get("pagesize", 20)
+                result = bilibili_integration.get_user_favorites(uid, page, pagesize)
             elif action == "get_watch_later_list":
-                uid = args["uid"]
                 page = args.get("page", 1)
-                result = bilibili_integration.get_watch_later_list(uid, page)
+                pagesize = args.get("pagesize", 20)
+                result = bilibili_integration.get_watch_later_list(page, pagesize)
             elif action == "get_user_statistics":
                 uid = args["uid"]
                 result = bilibili_integration.get_user_statistics(uid)
@@ -34,18 +34,16 @@ class CredentialDatabaseHandler(BaseToolHandler):
                 credential_id = args["credential_id"]
                 result = credential_db.get_credential(credential_id)
             elif action == "list_credentials":
-                category = args.get("category", None)
-                result = credential_db.get_all_credentials(category)
+                application = args.get("application")
+                category = args.get("category")
+                if application:
+                    result = credential_db.get_credentials_by_application(application)
+                else:
+                    result = credential_db.get_all_credentials(category)
             elif action == "update_credential":
                 credential_id = args["credential_id"]
-                username = args.get("username")
-                account = args.get("account")
-                password = args.get("password")
-                application = args.get("application")
-                contact = args.get("contact")
-                website_url = args.get("website_url")
-                notes = args.get("notes")
-                result = credential_db.update_credential(credential_id, username, account, password, application, contact, website_url, notes)
+                update_data = {k: v for k, v in args.items() if k not in ("action", "credential_id")}
+                result = credential_db.update_credential(credential_id, **update_data)
             elif action == "delete_credential":
                 credential_id = args["credential_id"]
                 result = credential_db.delete_credential(credential_id)
@@ -57,11 +55,12 @@ class CredentialDatabaseHandler(BaseToolHandler):
                 website_url = args.get("website_url", "")
                 result = credential_db.auto_fill_credential(application, website_url)
             elif action == "export_credentials":
-                file_path = args.get("file_path", "credentials_export.json")
-                result = credential_db.export_credentials(file_path)
+                format_type = args.get("format", "json")
+                result = credential_db.export_credentials(format_type)
             elif action == "import_credentials":
-                file_path = args["file_path"]
-                result = credential_db.import_credentials(file_path)
+                data = args["data"]
+                format_type = args.get("format", "json")
+                result = credential_db.import_credentials(data, format_type)
             elif action == "get_categories":
                 result = credential_db.get_application_categories()
             else:
@@ -84,10 +83,14 @@ class AutoFillHandler(BaseToolHandler):
             
             if action == "auto_fill_website":
                 url = args["url"]
-                result = auto_fill_integration.auto_fill_for_website(url)
+                username_field = args.get("username_field", "")
+                password_field = args.get("password_field", "")
+                result = auto_fill_integration.auto_fill_for_website(url, username_field, password_field)
             elif action == "auto_fill_application":
-                application = args["application"]
-                result = auto_fill_integration.auto_fill_for_application(application)
+                app_name = args["app_name"]
+                username_field = args.get("username_field", "")
+                password_field = args.get("password_field", "")
+                result = auto_fill_integration.auto_fill_for_application(app_name, username_field, password_field)
             elif action == "smart_auto_fill":
                 identifier = args["identifier"]
                 identifier_type = args.get("identifier_type", "auto")
@@ -32,12 +32,13 @@ class DesktopLaunchHandler(BaseToolHandler):
     
     async def handle(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理桌面启动"""
-        file_name = args["file_name"]
+        filename = args["filename"]
+        exact_match = args.get("exact_match", False)
         
         try:
             from src.tools.desktop_launcher import DesktopLauncher
             launcher = DesktopLauncher()
-            result = launcher.launch_file(file_name)
+            result = launcher.launch_file(filename, exact_match=exact_match)
             return result
         except Exception as e:
             logger.error(f"桌面启动失败: {e}")
@@ -63,24 +64,24 @@ class DesktopSoftwareHandler(BaseToolHandler):
             elif action == "list_available_software":
                 result = software_integration.list_available_software()
             elif action == "wps_open_document":
-                document_path = args["document_path"]
-                result = software_integration.wps_open_document(document_path)
+                file_path = args.get("file_path", "")
+                result = software_integration.wps_open_document(file_path)
             elif action == "wps_create_document":
-                document_name = args["document_name"]
-                result = software_integration.wps_create_document(document_name)
+                doc_type = args.get("doc_type", "writer")
+                result = software_integration.wps_create_document(doc_type)
             elif action == "wechat_send_message":
-                contact = args["contact"]
-                message = args["message"]
+                contact = args.get("contact", "")
+                message = args.get("message", "")
                 result = software_integration.wechat_send_message(contact, message)
             elif action == "wechat_open_chat":
-                contact = args["contact"]
+                contact = args.get("contact", "")
                 result = software_integration.wechat_open_chat(contact)
             elif action == "qq_send_message":
-                contact = args["contact"]
-                message = args["message"]
+                contact = args.get("contact", "")
+                message = args.get("message", "")
                 result = software_integration.qq_send_message(contact, message)
             elif action == "qq_open_chat":
-                contact = args["contact"]
+                contact = args.get("contact", "")
                 result = software_integration.qq_open_chat(contact)
             else:
                 return {"error": f"不支持的操作: {action}"}
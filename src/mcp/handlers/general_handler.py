@@ -16,11 +16,11 @@ class NLStepExecuteHandler(BaseToolHandler):
     
     async def handle(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理自然语言步骤执行"""
-        steps = args["steps"]
+        query = args["query"]
         
         try:
-            from src.tools.step_executor import step_executor
-            result = step_executor.execute_steps(steps)
+            from src.tools.executor import executor
+            result = executor.nl_step_execute({"query": query})
             return result
         except Exception as e:
             logger.error(f"自然语言步骤执行失败: {e}")
@@ -31,11 +31,16 @@ class NLAutomateHandler(BaseToolHandler):
     
     async def handle(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理自然语言自动化"""
-        instruction = args["instruction"]
+        query = args["query"]
         
         try:
-            from src.tools.nl_parser import nl_parser
-            result = nl_parser.parse_and_execute(instruction)
+            from src.tools.executor import executor
+            result = executor.action_nl_automate({
+                "query": query,
+                "url": args.get("url", ""),
+                "auth": args.get("auth", {}),
+                "steps": args.get("steps", [])
+            })
             return result
         except Exception as e:
             logger.error(f"自然语言自动化失败: {e}")
@@ -61,7 +66,7 @@ class WeatherHandler(BaseToolHandler):
     
     async def handle(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理天气查询"""
-        city = args["city"]
+        city = args.get("city", "北京")
         
         try:
             # 模拟天气查询
@@ -107,7 +112,7 @@ class EmailHandler(BaseToolHandler):
         """处理邮件发送"""
         to = args["to"]
         subject = args["subject"]
-        body = args["body"]
+        content = args["content"]
         
         try:
             # 模拟邮件发送
@@ -125,16 +130,15 @@ class TaskScheduleHandler(BaseToolHandler):
     
     async def handle(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理任务调度"""
-        task_name = args["task_name"]
-        schedule_time = args["schedule_time"]
-        task_data = args.get("task_data", {})
+        task = args["task"]
+        time_str = args.get("time", "")
         
         try:
             # 模拟任务调度
             return {
                 "success": True,
-                "message": f"任务 '{task_name}' 已安排在 {schedule_time}",
-                "task_id": f"task_{hash(task_name)}"
+                "message": f"任务 '{task}' 已安排在 {time_str}",
+                "task_id": f"task_{hash(task)}"
             }
         except Exception as e:
             logger.error(f"任务调度失败: {e}")
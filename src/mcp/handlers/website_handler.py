@@ -22,13 +22,15 @@ class WebsiteIntegrationHandler(BaseToolHandler):
             from src.tools.website_integration import WebsiteIntegration
             website_integration = WebsiteIntegration()
             
-            if action == "open_website":
+            if action in ("site_search", "browse_product", "play_video_generic", "add_to_cart"):
+                return self._run_executor_action(action, args)
+            elif action == "open_website":
                 url = args["url"]
                 result = website_integration.open_website(url)
             elif action == "search_website":
-                url = args["url"]
                 keyword = args["keyword"]
-                result = website_integration.search_website(url, keyword)
+                website = args.get("website", "")
+                result = website_integration.search_website(keyword, website)
             elif action == "get_website_summary":
                 url = args["url"]
                 result = website_integration.get_website_summary(url)
@@ -76,5 +78,20 @@ class WebsiteIntegrationHandler(BaseToolHandler):
         except Exception as e:
             logger.error(f"网站集成操作失败: {e}")
             return {"error": f"网站集成操作失败: {str(e)}"}
+    
+    def _run_executor_action(self, action: str, args: Dict[str, Any]) -> Dict[str, Any]:
+        """站内搜索、商品浏览、视频播放与加购由执行器的浏览器操作完成"""
+        from src.tools.executor import executor
+        
+        params = {"url": args["url"], "keyword": args["keyword"]}
+        if action == "site_search":
+            params["click_first_result"] = args.get("click_first_result", True)
+            return executor.site_search(params)
+        params["match_text"] = args.get("match_text", "")
+        if action == "browse_product":
+            return executor.browse_product(params)
+        if action == "play_video_generic":
+            return executor.play_video_generic(params)
+        return executor.add_to_cart_action(params)
 
 
@@ -0,0 +1,1734 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+MCP工具清单
+每个工具的名称、描述、输入schema、执行类别、缓存策略、并发类别与处理器只在这里声明一次，由此生成：
+- LAMMCPServer 的工具表（处理器为服务器上的同名方法）及 tools/list 响应；
+- LAMToolRegistry 的工具表（处理器为 handlers 包中延迟加载的处理器类）与分类；
+- LAMAgentMCPAdapter 中智能体操作名到工具名的映射。
+tools/list 的序列化结果按清单源文件的哈希缓存在磁盘上，冷启动时直接读取；结果内容的哈希随 initialize 返回，
+客户端据此判断无需重新获取工具列表。
+"""
+
+import hashlib
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .codec import dumps, loads
+from .core.admission import ConcurrencyClass
+from .core.base import MCPTool
+from .core.cache import CachePolicy
+from .core.execution import ExecutionClass
+from .core.schema import WEB_STEP_ACTIONS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """工具声明
+
+    handler: LAMMCPServer 上的处理方法名（None 表示服务器不提供该工具）
+    registry_handler: LAMToolRegistry 使用的处理器键（见 REGISTRY_HANDLERS，None 表示注册表不提供）
+    registry_action: 集成类处理器按 action 参数分派操作，注册表调用时以此值作为 action
+    category: 注册表中的分类
+    actions: 映射到该工具的智能体操作名（None 表示与工具同名，空元组表示不映射）
+    其余字段与 MCPTool 相同。
+    """
+    name: str
+    description: str
+    input_schema: Dict[str, Any]
+    handler: Optional[str] = None
+    execution: str = ExecutionClass.IO_ASYNC
+    cache: Optional[CachePolicy] = None
+    concurrency: Optional[str] = None
+    registry_handler: Optional[str] = None
+    registry_action: Optional[str] = None
+    category: Optional[str] = None
+    actions: Optional[Tuple[str, ...]] = None
+
+    def to_tool(self, handler: Callable) -> MCPTool:
+        return MCPTool(
+            name=self.name,
+            description=self.description,
+            input_schema=self.input_schema,
+            handler=handler,
+            execution=self.execution,
+            cache=self.cache,
+            concurrency=self.concurrency,
+        )
+
+
+# 注册表处理器键 -> "模块路径:类名"（处理器模块在首次调用时才导入）
+REGISTRY_HANDLERS: Dict[str, str] = {
+    # 网页处理器
+    "web_automation": "src.mcp.handlers.web_handler:WebAutomationHandler",
+    "web_search": "src.mcp.handlers.web_handler:WebSearchHandler",
+    "page_fetch": "src.mcp.handlers.web_handler:PageFetchHandler",
+
+    # B站处理器
+    "bilibili_search_play": "src.mcp.handlers.bilibili_handler:BilibiliSearchPlayHandler",
+    "bilibili_open_up": "src.mcp.handlers.bilibili_handler:BilibiliOpenUpHandler",
+    "bilibili_integration": "src.mcp.handlers.bilibili_handler:BilibiliIntegrationHandler",
+
+    # Steam处理器
+    "steam_integration": "src.mcp.handlers.steam_handler:SteamIntegrationHandler",
+
+    # 桌面处理器
+    "desktop_scan": "src.mcp.handlers.desktop_handler:DesktopScanHandler",
+    "desktop_launch": "src.mcp.handlers.desktop_handler:DesktopLaunchHandler",
+    "desktop_software": "src.mcp.handlers.desktop_handler:DesktopSoftwareHandler",
+
+    # 网站处理器
+    "website_integration": "src.mcp.handlers.website_handler:WebsiteIntegrationHandler",
+
+    # 凭据处理器
+    "credential_database": "src.mcp.handlers.credential_handler:CredentialDatabaseHandler",
+    "auto_fill": "src.mcp.handlers.credential_handler:AutoFillHandler",
+
+    # 通用处理器
+    "nl_step_execute": "src.mcp.handlers.general_handler:NLStepExecuteHandler",
+    "nl_automate": "src.mcp.handlers.general_handler:NLAutomateHandler",
+    "calculator": "src.mcp.handlers.general_handler:CalculatorHandler",
+    "weather": "src.mcp.handlers.general_handler:WeatherHandler",
+    "translate": "src.mcp.handlers.general_handler:TranslateHandler",
+    "email": "src.mcp.handlers.general_handler:EmailHandler",
+    "task_schedule": "src.mcp.handlers.general_handler:TaskScheduleHandler",
+}
+
+
+# 工具声明（服务器注册顺序即 tools/list 的顺序）
+TOOLS: Tuple[ToolSpec, ...] = (
+    # 网站自动登录工具
+    ToolSpec(
+        name="website_auto_login",
+        description="为指定网站执行自动登录操作",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "url": {"type": "string", "description": "目标网站URL"}
+            },
+            "required": ["url"]
+        },
+        handler="_handle_website_auto_login",
+        execution=ExecutionClass.BROWSER,
+        concurrency=ConcurrencyClass.BROWSER,
+        actions=(),
+    ),
+
+    # 网站登录状态检查工具
+    ToolSpec(
+        name="check_login_status",
+        description="检查网站是否需要登录以及是否有对应凭据",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "url": {"type": "string", "description": "目标网站URL"}
+            },
+            "required": ["url"]
+        },
+        handler="_handle_check_login_status",
+        execution=ExecutionClass.BLOCKING_IO,
+        actions=(),
+    ),
+
+    # 网页自动化工具
+    ToolSpec(
+        name="web_automate",
+        description="在指定网页上执行自动化操作",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "url": {"type": "string", "description": "目标网页URL"},
+                "steps": {
+                    "type": "array",
+                    "description": "操作步骤列表",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "action": {"type": "string", "enum": WEB_STEP_ACTIONS},
+                            "selector": {"type": "string", "description": "CSS选择器"},
+                            "text": {"type": "string", "description": "要输入的文本"},
+                            "key": {"type": "string", "description": "要按下的键盘按键"},
+                            "ms": {"type": "integer", "description": "等待时间（毫秒）"}
+                        },
+                        "required": ["action"]
+                    }
+                }
+            },
+            "required": ["url"]
+        },
+        handler="_handle_web_automate",
+        execution=ExecutionClass.BROWSER,
+        concurrency=ConcurrencyClass.BROWSER,
+        registry_handler="web_automation",
+        category="网页自动化",
+        actions=("automate_page",),
+    ),
+
+    # B站搜索播放工具
+    ToolSpec(
+        name="bilibili_search_play",
+        description="在B站搜索UP主并播放其第一个视频",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "up_name": {"type": "string", "description": "UP主名称"},
+                "keep_open_seconds": {"type": "number", "description": "保持页面打开的时间（秒）", "default": 60}
+            },
+            "required": ["up_name"]
+        },
+        handler="_handle_bilibili_search_play",
+        execution=ExecutionClass.BROWSER,
+        concurrency=ConcurrencyClass.BROWSER,
+        registry_handler="bilibili_search_play",
+        category="B站操作",
+    ),
+
+    # 桌面文件管理工具
+    ToolSpec(
+        name="desktop_scan",
+        description="扫描桌面文件和快捷方式",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "file_type": {"type": "string", "description": "文件类型过滤", "default": "all"}
+            }
+        },
+        handler="_handle_desktop_scan",
+        execution=ExecutionClass.BLOCKING_IO,
+        registry_handler="desktop_scan",
+        category="桌面管理",
+        actions=(),
+    ),
+    ToolSpec(
+        name="desktop_launch",
+        description="启动桌面上的文件或应用程序",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "filename": {"type": "string", "description": "要启动的文件名"},
+                "exact_match": {"type": "boolean", "description": "是否精确匹配文件名", "default": False}
+            },
+            "required": ["filename"]
+        },
+        handler="_handle_desktop_launch",
+        execution=ExecutionClass.BLOCKING_IO,
+        concurrency=ConcurrencyClass.DESKTOP,
+        registry_handler="desktop_launch",
+        category="桌面管理",
+        actions=(),
+    ),
+
+    # 网络搜索工具
+    ToolSpec(
+        name="web_search",
+        description="使用DuckDuckGo进行网络搜索",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "搜索查询"},
+                "max_results": {"type": "integer", "description": "最大结果数量", "default": 5}
+            },
+            "required": ["query"]
+        },
+        handler="_handle_web_search",
+        execution=ExecutionClass.BLOCKING_IO,
+        cache=CachePolicy(ttl=900, key_fields=("query", "max_results")),
+        concurrency=ConcurrencyClass.NETWORK,
+        registry_handler="web_search",
+        category="网页自动化",
+        actions=("search_web",),
+    ),
+
+    # 文件操作工具
+    ToolSpec(
+        name="file_read",
+        description="读取文件内容",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "filename": {"type": "string", "description": "文件路径"}
+            },
+            "required": ["filename"]
+        },
+        handler="_handle_file_read",
+        execution=ExecutionClass.BLOCKING_IO,
+        actions=("read_file",),
+    ),
+    ToolSpec(
+        name="file_write",
+        description="写入文件内容",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "filename": {"type": "string", "description": "文件路径"},
+                "content": {"type": "string", "description": "文件内容"}
+            },
+            "required": ["filename", "content"]
+        },
+        handler="_handle_file_write",
+        execution=ExecutionClass.BLOCKING_IO,
+        actions=("create_file",),
+    ),
+
+    # 系统命令工具
+    ToolSpec(
+        name="run_command",
+        description="执行系统命令",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "command": {"type": "string", "description": "要执行的命令"},
+                "timeout": {"type": "integer", "description": "超时时间（秒）", "default": 30}
+            },
+            "required": ["command"]
+        },
+        handler="_handle_run_command",
+        execution=ExecutionClass.BLOCKING_IO,
+    ),
+
+    # 网页内容抓取工具
+    ToolSpec(
+        name="fetch_page",
+        description="抓取网页内容",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "url": {"type": "string", "description": "网页URL"},
+                "wait_selector": {"type": "string", "description": "等待的选择器"},
+                "timeout_ms": {"type": "integer", "description": "超时时间（毫秒）", "default": 15000}
+            },
+            "required": ["url"]
+        },
+        handler="_handle_fetch_page",
+        execution=ExecutionClass.BROWSER,
+        cache=CachePolicy(ttl=600, key_fields=("url", "wait_selector")),
+        concurrency=ConcurrencyClass.BROWSER,
+    ),
+    # 仅注册表提供（服务器上对应 fetch_page）
+    ToolSpec(
+        name="page_fetch",
+        description="获取网页内容",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "url": {"type": "string", "description": "目标网页URL"}
+            },
+            "required": ["url"]
+        },
+        execution=ExecutionClass.BROWSER,
+        registry_handler="page_fetch",
+        category="网页自动化",
+    ),
+
+    # 网站打开工具
+    ToolSpec(
+        name="open_website",
+        description="在浏览器中打开网站",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "url": {"type": "string", "description": "要打开的网站URL"}
+            },
+            "required": ["url"]
+        },
+        handler="_handle_open_website",
+        execution=ExecutionClass.BLOCKING_IO,
+    ),
+
+    # B站打开工具
+    ToolSpec(
+        name="open_bilibili",
+        description="打开B站并跳转到热门视频页面",
+        input_schema={
+            "type": "object",
+            "properties": {}
+        },
+        handler="_handle_open_bilibili",
+        execution=ExecutionClass.BLOCKING_IO,
+    ),
+
+    # 视频播放工具
+    ToolSpec(
+        name="play_video",
+        description="播放视频",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "video_url": {"type": "string", "description": "视频URL"},
+                "platform": {"type": "string", "description": "平台名称", "default": "bilibili"},
+                "query": {"type": "string", "description": "搜索查询"}
+            }
+        },
+        handler="_handle_play_video",
+        execution=ExecutionClass.BLOCKING_IO,
+    ),
+
+    # 自然语言自动化工具
+    ToolSpec(
+        name="nl_automate",
+        description="将自然语言解析为自动化操作并执行",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "自然语言指令"},
+                "url": {"type": "string", "description": "目标站点初始URL"},
+                "auth": {
+                    "type": "object",
+                    "description": "认证信息",
+                    "properties": {
+                        "username": {"type": "string"},
+                        "password": {"type": "string"},
+                        "username_selector": {"type": "string"},
+                        "password_selector": {"type": "string"},
+                        "submit_selector": {"type": "string"}
+                    }
+                },
+                "steps": {"type": "array", "description": "额外步骤", "items": {"type": "object"}}
+            },
+            "required": ["query"]
+        },
+        handler="_handle_nl_automate",
+        execution=ExecutionClass.BROWSER,
+        concurrency=ConcurrencyClass.BROWSER,
+        registry_handler="nl_automate",
+        category="通用工具",
+    ),
+
+    # 站点搜索工具
+    ToolSpec(
+        name="site_search",
+        description="在指定网站内搜索",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "url": {"type": "string", "description": "目标网站URL"},
+                "keyword": {"type": "string", "description": "搜索关键词"},
+                "click_first_result": {"type": "boolean", "description": "是否点击第一个结果", "default": True}
+            },
+            "required": ["url", "keyword"]
+        },
+        handler="_handle_site_search",
+        execution=ExecutionClass.BROWSER,
+        concurrency=ConcurrencyClass.BROWSER,
+        registry_handler="website_integration",
+        registry_action="site_search",
+        category="网页自动化",
+    ),
+
+    # 商品浏览工具
+    ToolSpec(
+        name="browse_product",
+        description="浏览商品详情",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "url": {"type": "string", "description": "商品页面URL"},
+                "keyword": {"type": "string", "description": "商品关键词"},
+                "match_text": {"type": "string", "description": "匹配文本"}
+            },
+            "required": ["url", "keyword"]
+        },
+        handler="_handle_browse_product",
+        execution=ExecutionClass.BROWSER,
+        concurrency=ConcurrencyClass.BROWSER,
+        registry_handler="website_integration",
+        registry_action="browse_product",
+        category="网页自动化",
+    ),
+
+    # 通用视频播放工具
+    ToolSpec(
+        name="play_video_generic",
+        description="通用视频播放",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "url": {"type": "string", "description": "视频页面URL"},
+                "keyword": {"type": "string", "description": "视频关键词"},
+                "match_text": {"type": "string", "description": "匹配文本"}
+            },
+            "required": ["url", "keyword"]
+        },
+        handler="_handle_play_video_generic",
+        execution=ExecutionClass.BROWSER,
+        concurrency=ConcurrencyClass.BROWSER,
+        registry_handler="website_integration",
+        registry_action="play_video_generic",
+        category="网页自动化",
+    ),
+
+    # 加入购物车工具
+    ToolSpec(
+        name="add_to_cart",
+        description="将商品加入购物车",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "url": {"type": "string", "description": "商品页面URL"},
+                "keyword": {"type": "string", "description": "商品关键词"},
+                "match_text": {"type": "string", "description": "匹配文本"}
+            },
+            "required": ["url", "keyword"]
+        },
+        handler="_handle_add_to_cart",
+        execution=ExecutionClass.BROWSER,
+        concurrency=ConcurrencyClass.BROWSER,
+        registry_handler="website_integration",
+        registry_action="add_to_cart",
+        category="网页自动化",
+    ),
+
+    # B站UP主页工具
+    ToolSpec(
+        name="bilibili_open_up",
+        description="打开B站UP主主页",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "up_name": {"type": "string", "description": "UP主名称"},
+                "keep_open_seconds": {"type": "number", "description": "保持页面打开的时间（秒）", "default": 60}
+            },
+            "required": ["up_name"]
+        },
+        handler="_handle_bilibili_open_up",
+        execution=ExecutionClass.BROWSER,
+        concurrency=ConcurrencyClass.BROWSER,
+        registry_handler="bilibili_open_up",
+        category="B站操作",
+    ),
+
+    # 自然语言步骤执行工具
+    ToolSpec(
+        name="nl_step_execute",
+        description="执行自然语言指令的步骤化操作",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "自然语言指令"}
+            },
+            "required": ["query"]
+        },
+        handler="_handle_nl_step_execute",
+        execution=ExecutionClass.BROWSER,
+        concurrency=ConcurrencyClass.BROWSER,
+        registry_handler="nl_step_execute",
+        category="通用工具",
+    ),
+
+    # 天气查询工具
+    ToolSpec(
+        name="get_weather",
+        description="获取天气信息",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "city": {"type": "string", "description": "城市名称", "default": "北京"}
+            }
+        },
+        handler="_handle_get_weather",
+        execution=ExecutionClass.BLOCKING_IO,
+        concurrency=ConcurrencyClass.NETWORK,
+        registry_handler="weather",
+        category="通用工具",
+    ),
+
+    # 数学计算工具
+    ToolSpec(
+        name="calculate",
+        description="计算数学表达式",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "expression": {"type": "string", "description": "数学表达式"}
+            },
+            "required": ["expression"]
+        },
+        handler="_handle_calculate",
+        execution=ExecutionClass.CPU,
+        registry_handler="calculator",
+        category="通用工具",
+    ),
+
+    # 翻译工具
+    ToolSpec(
+        name="translate",
+        description="翻译文本",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "text": {"type": "string", "description": "要翻译的文本"},
+                "target_lang": {"type": "string", "description": "目标语言", "default": "en"}
+            },
+            "required": ["text"]
+        },
+        handler="_handle_translate",
+        execution=ExecutionClass.BLOCKING_IO,
+        concurrency=ConcurrencyClass.NETWORK,
+        registry_handler="translate",
+        category="通用工具",
+    ),
+
+    # 邮件发送工具
+    ToolSpec(
+        name="send_email",
+        description="发送邮件",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "to": {"type": "string", "description": "收件人"},
+                "subject": {"type": "string", "description": "邮件主题"},
+                "content": {"type": "string", "description": "邮件内容"}
+            },
+            "required": ["to", "subject", "content"]
+        },
+        handler="_handle_send_email",
+        execution=ExecutionClass.BLOCKING_IO,
+        concurrency=ConcurrencyClass.NETWORK,
+        registry_handler="email",
+        category="通用工具",
+    ),
+
+    # 任务调度工具
+    ToolSpec(
+        name="schedule_task",
+        description="安排任务",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "task": {"type": "string", "description": "任务描述"},
+                "time": {"type": "string", "description": "执行时间"}
+            },
+            "required": ["task"]
+        },
+        handler="_handle_schedule_task",
+        execution=ExecutionClass.BLOCKING_IO,
+        registry_handler="task_schedule",
+        category="通用工具",
+    ),
+
+    # Steam集成工具
+    ToolSpec(
+        name="steam_get_library",
+        description="获取Steam游戏库和详细统计信息",
+        input_schema={
+            "type": "object",
+            "properties": {}
+        },
+        handler="_handle_steam_get_library",
+        execution=ExecutionClass.BLOCKING_IO,
+        concurrency=ConcurrencyClass.NETWORK,
+        registry_handler="steam_integration",
+        registry_action="get_game_library",
+        category="Steam集成",
+    ),
+    ToolSpec(
+        name="steam_get_recent_activity",
+        description="查看最近的游戏活动和当前正在玩的游戏",
+        input_schema={
+            "type": "object",
+            "properties": {}
+        },
+        handler="_handle_steam_get_recent_activity",
+        execution=ExecutionClass.BLOCKING_IO,
+        concurrency=ConcurrencyClass.NETWORK,
+        registry_handler="steam_integration",
+        registry_action="get_recent_activity",
+        category="Steam集成",
+    ),
+    ToolSpec(
+        name="steam_get_game_details",
+        description="获取详细的游戏信息和成就",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "appid": {"type": "string", "description": "游戏应用ID"}
+            },
+            "required": ["appid"]
+        },
+        handler="_handle_steam_get_game_details",
+        execution=ExecutionClass.BLOCKING_IO,
+        cache=CachePolicy(ttl=86400),
+        concurrency=ConcurrencyClass.NETWORK,
+        registry_handler="steam_integration",
+        registry_action="get_game_details",
+        category="Steam集成",
+    ),
+    ToolSpec(
+        name="steam_get_friend_comparison",
+        description="与朋友比较游戏库并获得推荐",
+        input_schema={
+            "type": "object",
+            "properties": {}
+        },
+        handler="_handle_steam_get_friend_comparison",
+        execution=ExecutionClass.BLOCKING_IO,
+        concurrency=ConcurrencyClass.NETWORK,
+        registry_handler="steam_integration",
+        registry_action="get_friend_comparison",
+        category="Steam集成",
+    ),
+    ToolSpec(
+        name="steam_open_store",
+        description="打开Steam商店，优先尝试桌面快捷方式，如果不存在则在浏览器中打开",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "game_name": {"type": "string", "description": "游戏名称（可选）"}
+            }
+        },
+        handler="_handle_steam_open_store",
+        execution=ExecutionClass.BLOCKING_IO,
+        concurrency=ConcurrencyClass.DESKTOP,
+        registry_handler="steam_integration",
+        registry_action="open_steam_store",
+        category="Steam集成",
+    ),
+    ToolSpec(
+        name="steam_analyze_habits",
+        description="分析游戏习惯和偏好",
+        input_schema={
+            "type": "object",
+            "properties": {}
+        },
+        handler="_handle_steam_analyze_habits",
+        execution=ExecutionClass.BLOCKING_IO,
+        concurrency=ConcurrencyClass.NETWORK,
+        registry_handler="steam_integration",
+        registry_action="analyze_gaming_habits",
+        category="Steam集成",
+    ),
+    ToolSpec(
+        name="steam_get_recommendations",
+        description="获取游戏推荐",
+        input_schema={
+            "type": "object",
+            "properties": {}
+        },
+        handler="_handle_steam_get_recommendations",
+        execution=ExecutionClass.BLOCKING_IO,
+        concurrency=ConcurrencyClass.NETWORK,
+        registry_handler="steam_integration",
+        registry_action="get_game_recommendations",
+        category="Steam集成",
+    ),
+    ToolSpec(
+        name="steam_download_game",
+        description="下载Steam游戏",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "appid": {"type": "string", "description": "游戏AppID"}
+            },
+            "required": ["appid"]
+        },
+        handler="_handle_steam_download_game",
+        execution=ExecutionClass.BLOCKING_IO,
+        concurrency=ConcurrencyClass.DESKTOP,
+        registry_handler="steam_integration",
+        registry_action="download_game",
+        category="Steam集成",
+    ),
+    ToolSpec(
+        name="steam_uninstall_game",
+        description="卸载Steam游戏",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "appid": {"type": "string", "description": "游戏AppID"}
+            },
+            "required": ["appid"]
+        },
+        handler="_handle_steam_uninstall_game",
+        execution=ExecutionClass.BLOCKING_IO,
+        concurrency=ConcurrencyClass.DESKTOP,
+        registry_handler="steam_integration",
+        registry_action="uninstall_game",
+        category="Steam集成",
+    ),
+
+    # Bilibili集成工具
+    ToolSpec(
+        name="bilibili_get_user_profile",
+        description="获取用户资料信息和统计数据",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "uid": {"type": "string", "description": "用户ID"}
+            },
+            "required": ["uid"]
+        },
+        handler="_handle_bilibili_get_user_profile",
+        execution=ExecutionClass.BLOCKING_IO,
+        cache=CachePolicy(ttl=1800),
+        concurrency=ConcurrencyClass.NETWORK,
+        registry_handler="bilibili_integration",
+        registry_action="get_user_profile",
+        category="B站操作",
+    ),
+    ToolSpec(
+        name="bilibili_search_videos",
+        description="搜索视频并获取详细视频信息",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "keyword": {"type": "string", "description": "搜索关键词"},
+                "page": {"type": "integer", "description": "页码", "default": 1},
+                "pagesize": {"type": "integer", "description": "每页数量", "default": 20}
+            },
+            "required": ["keyword"]
+        },
+        handler="_handle_bilibili_search_videos",
+        execution=ExecutionClass.BLOCKING_IO,
+        concurrency=ConcurrencyClass.NETWORK,
+        registry_handler="bilibili_integration",
+        registry_action="search_videos",
+        category="B站操作",
+    ),
+    ToolSpec(
+        name="bilibili_get_video_details",
+        description="获取视频详细信息",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "bvid": {"type": "string", "description": "视频BV号"}
+            },
+            "required": ["bvid"]
+        },
+        handler="_handle_bilibili_get_video_details",
+        execution=ExecutionClass.BLOCKING_IO,
+        cache=CachePolicy(ttl=1800),
+        concurrency=ConcurrencyClass.NETWORK,
+        registry_handler="bilibili_integration",
+        registry_action="get_video_details",
+        category="B站操作",
+    ),
+    ToolSpec(
+        name="bilibili_get_user_videos",
+        description="获取用户上传的视频",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "uid": {"type": "string", "description": "用户ID"},
+                "page": {"type": "integer", "description": "页码", "default": 1},
+                "pagesize": {"type": "integer", "description": "每页数量", "default": 20}
+            },
+            "required": ["uid"]
+        },
+        handler="_handle_bilibili_get_user_videos",
+        execution=ExecutionClass.BLOCKING_IO,
+        concurrency=ConcurrencyClass.NETWORK,
+        registry_handler="bilibili_integration",
+        registry_action="get_user_videos",
+        category="B站操作",
+    ),
+    ToolSpec(
+        name="bilibili_get_following_list",
+        description="获取关注列表",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "uid": {"type": "string", "description": "用户ID"},
+                "page": {"type": "integer", "description": "页码", "default": 1},
+                "pagesize": {"type": "integer", "description": "每页数量", "default": 20}
+            },
+            "required": ["uid"]
+        },
+        handler="_handle_bilibili_get_following_list",
+        execution=ExecutionClass.BLOCKING_IO,
+        concurrency=ConcurrencyClass.NETWORK,
+        registry_handler="bilibili_integration",
+        registry_action="get_following_list",
+        category="B站操作",
+    ),
+    ToolSpec(
+        name="bilibili_get_favorites",
+        description="获取个人收藏",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "uid": {"type": "string", "description": "用户ID"},
+                "page": {"type": "integer", "description": "页码", "default": 1},
+                "pagesize": {"type": "integer", "description": "每页数量", "default": 20}
+            },
+            "required": ["uid"]
+        },
+        handler="_handle_bilibili_get_favorites",
+        execution=ExecutionClass.BLOCKING_IO,
+        concurrency=ConcurrencyClass.NETWORK,
+        registry_handler="bilibili_integration",
+        registry_action="get_user_favorites",
+        category="B站操作",
+    ),
+    ToolSpec(
+        name="bilibili_get_watch_later",
+        description="浏览稍后再看列表",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "page": {"type": "integer", "description": "页码", "default": 1},
+                "pagesize": {"type": "integer", "description": "每页数量", "default": 20}
+            }
+        },
+        handler="_handle_bilibili_get_watch_later",
+        execution=ExecutionClass.BLOCKING_IO,
+        concurrency=ConcurrencyClass.NETWORK,
+        registry_handler="bilibili_integration",
+        registry_action="get_watch_later_list",
+        category="B站操作",
+    ),
+    ToolSpec(
+        name="bilibili_get_user_statistics",
+        description="获取用户统计数据",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "uid": {"type": "string", "description": "用户ID"}
+            },
+            "required": ["uid"]
+        },
+        handler="_handle_bilibili_get_user_statistics",
+        execution=ExecutionClass.BLOCKING_IO,
+        concurrency=ConcurrencyClass.NETWORK,
+        registry_handler="bilibili_integration",
+        registry_action="get_user_statistics",
+        category="B站操作",
+    ),
+    ToolSpec(
+        name="bilibili_open_video",
+        description="打开B站视频",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "bvid": {"type": "string", "description": "视频BV号"}
+            },
+            "required": ["bvid"]
+        },
+        handler="_handle_bilibili_open_video",
+        execution=ExecutionClass.BROWSER,
+        concurrency=ConcurrencyClass.BROWSER,
+        registry_handler="bilibili_integration",
+        registry_action="open_bilibili_video",
+        category="B站操作",
+    ),
+    ToolSpec(
+        name="bilibili_open_user",
+        description="打开B站用户主页",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "uid": {"type": "string", "description": "用户ID"}
+            },
+            "required": ["uid"]
+        },
+        handler="_handle_bilibili_open_user",
+        execution=ExecutionClass.BROWSER,
+        concurrency=ConcurrencyClass.BROWSER,
+        registry_handler="bilibili_integration",
+        registry_action="open_bilibili_user",
+        category="B站操作",
+    ),
+
+    # 网站集成工具
+    ToolSpec(
+        name="website_open",
+        description="打开网站",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "url": {"type": "string", "description": "网站URL"}
+            },
+            "required": ["url"]
+        },
+        handler="_handle_website_open",
+        execution=ExecutionClass.BROWSER,
+        concurrency=ConcurrencyClass.BROWSER,
+        registry_handler="website_integration",
+        registry_action="open_website",
+        category="网站集成",
+    ),
+    ToolSpec(
+        name="website_search",
+        description="在指定网站搜索",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "keyword": {"type": "string", "description": "搜索关键词"},
+                "website": {"type": "string", "description": "网站域名（可选）"}
+            },
+            "required": ["keyword"]
+        },
+        handler="_handle_website_search",
+        execution=ExecutionClass.BROWSER,
+        concurrency=ConcurrencyClass.BROWSER,
+        registry_handler="website_integration",
+        registry_action="search_website",
+        category="网站集成",
+    ),
+    ToolSpec(
+        name="website_summary",
+        description="获取网站信息总结",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "url": {"type": "string", "description": "网站URL"}
+            },
+            "required": ["url"]
+        },
+        handler="_handle_website_summary",
+        execution=ExecutionClass.BROWSER,
+        cache=CachePolicy(ttl=3600),
+        concurrency=ConcurrencyClass.BROWSER,
+        registry_handler="website_integration",
+        registry_action="get_website_summary",
+        category="网站集成",
+    ),
+
+    # 京东专用工具
+    ToolSpec(
+        name="jd_search_products",
+        description="搜索京东商品",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "keyword": {"type": "string", "description": "商品关键词"},
+                "page": {"type": "integer", "description": "页码（可选）"}
+            },
+            "required": ["keyword"]
+        },
+        handler="_handle_jd_search_products",
+        execution=ExecutionClass.BROWSER,
+        concurrency=ConcurrencyClass.BROWSER,
+        registry_handler="website_integration",
+        registry_action="jd_search_products",
+        category="网站集成",
+    ),
+    ToolSpec(
+        name="jd_get_product_info",
+        description="获取京东商品信息",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "product_id": {"type": "string", "description": "商品ID"}
+            },
+            "required": ["product_id"]
+        },
+        handler="_handle_jd_get_product_info",
+        execution=ExecutionClass.BROWSER,
+        concurrency=ConcurrencyClass.BROWSER,
+        registry_handler="website_integration",
+        registry_action="jd_get_product_info",
+        category="网站集成",
+    ),
+
+    # 淘宝专用工具
+    ToolSpec(
+        name="taobao_search_products",
+        description="搜索淘宝商品",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "keyword": {"type": "string", "description": "商品关键词"},
+                "page": {"type": "integer", "description": "页码（可选）"}
+            },
+            "required": ["keyword"]
+        },
+        handler="_handle_taobao_search_products",
+        execution=ExecutionClass.BROWSER,
+        concurrency=ConcurrencyClass.BROWSER,
+        registry_handler="website_integration",
+        registry_action="taobao_search_products",
+        category="网站集成",
+    ),
+    ToolSpec(
+        name="taobao_get_product_info",
+        description="获取淘宝商品信息",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "product_id": {"type": "string", "description": "商品ID"}
+            },
+            "required": ["product_id"]
+        },
+        handler="_handle_taobao_get_product_info",
+        execution=ExecutionClass.BROWSER,
+        concurrency=ConcurrencyClass.BROWSER,
+        registry_handler="website_integration",
+        registry_action="taobao_get_product_info",
+        category="网站集成",
+    ),
+
+    # 高德地图专用工具
+    ToolSpec(
+        name="amap_search_location",
+        description="搜索高德地图位置",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "keyword": {"type": "string", "description": "位置关键词"}
+            },
+            "required": ["keyword"]
+        },
+        handler="_handle_amap_search_location",
+        execution=ExecutionClass.BROWSER,
+        concurrency=ConcurrencyClass.BROWSER,
+        registry_handler="website_integration",
+        registry_action="amap_search_location",
+        category="网站集成",
+    ),
+    ToolSpec(
+        name="amap_get_route",
+        description="获取高德地图路线",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "start": {"type": "string", "description": "起点"},
+                "end": {"type": "string", "description": "终点"},
+                "mode": {"type": "string", "description": "出行方式（driving/walking/transit）"}
+            },
+            "required": ["start", "end"]
+        },
+        handler="_handle_amap_get_route",
+        execution=ExecutionClass.BROWSER,
+        concurrency=ConcurrencyClass.BROWSER,
+        registry_handler="website_integration",
+        registry_action="amap_get_route",
+        category="网站集成",
+    ),
+
+    # 拼多多专用工具
+    ToolSpec(
+        name="pdd_search_products",
+        description="搜索拼多多商品",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "keyword": {"type": "string", "description": "商品关键词"},
+                "page": {"type": "integer", "description": "页码（可选）"}
+            },
+            "required": ["keyword"]
+        },
+        handler="_handle_pdd_search_products",
+        execution=ExecutionClass.BROWSER,
+        concurrency=ConcurrencyClass.BROWSER,
+        registry_handler="website_integration",
+        registry_action="pdd_search_products",
+        category="网站集成",
+    ),
+    ToolSpec(
+        name="pdd_get_product_info",
+        description="获取拼多多商品信息",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "product_id": {"type": "string", "description": "商品ID"}
+            },
+            "required": ["product_id"]
+        },
+        handler="_handle_pdd_get_product_info",
+        execution=ExecutionClass.BROWSER,
+        concurrency=ConcurrencyClass.BROWSER,
+        registry_handler="website_integration",
+        registry_action="pdd_get_product_info",
+        category="网站集成",
+    ),
+
+    # 抖音专用工具
+    ToolSpec(
+        name="douyin_search_videos",
+        description="搜索抖音视频",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "keyword": {"type": "string", "description": "视频关键词"}
+            },
+            "required": ["keyword"]
+        },
+        handler="_handle_douyin_search_videos",
+        execution=ExecutionClass.BROWSER,
+        concurrency=ConcurrencyClass.BROWSER,
+        registry_handler="website_integration",
+        registry_action="douyin_search_videos",
+        category="网站集成",
+    ),
+    ToolSpec(
+        name="douyin_get_video_info",
+        description="获取抖音视频信息",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "video_id": {"type": "string", "description": "视频ID"}
+            },
+            "required": ["video_id"]
+        },
+        handler="_handle_douyin_get_video_info",
+        execution=ExecutionClass.BROWSER,
+        concurrency=ConcurrencyClass.BROWSER,
+        registry_handler="website_integration",
+        registry_action="douyin_get_video_info",
+        category="网站集成",
+    ),
+
+    # 快手专用工具
+    ToolSpec(
+        name="kuaishou_search_videos",
+        description="搜索快手视频",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "keyword": {"type": "string", "description": "视频关键词"}
+            },
+            "required": ["keyword"]
+        },
+        handler="_handle_kuaishou_search_videos",
+        execution=ExecutionClass.BROWSER,
+        concurrency=ConcurrencyClass.BROWSER,
+        registry_handler="website_integration",
+        registry_action="kuaishou_search_videos",
+        category="网站集成",
+    ),
+    ToolSpec(
+        name="kuaishou_get_video_info",
+        description="获取快手视频信息",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "video_id": {"type": "string", "description": "视频ID"}
+            },
+            "required": ["video_id"]
+        },
+        handler="_handle_kuaishou_get_video_info",
+        execution=ExecutionClass.BROWSER,
+        concurrency=ConcurrencyClass.BROWSER,
+        registry_handler="website_integration",
+        registry_action="kuaishou_get_video_info",
+        category="网站集成",
+    ),
+
+    # 桌面软件集成工具
+    ToolSpec(
+        name="software_launch",
+        description="启动桌面软件",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "software_name": {"type": "string", "description": "软件名称（wps/wechat/qq）"}
+            },
+            "required": ["software_name"]
+        },
+        handler="_handle_software_launch",
+        execution=ExecutionClass.BLOCKING_IO,
+        concurrency=ConcurrencyClass.DESKTOP,
+        registry_handler="desktop_software",
+        registry_action="launch_software",
+        category="桌面管理",
+    ),
+    ToolSpec(
+        name="software_info",
+        description="获取软件信息",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "software_name": {"type": "string", "description": "软件名称（wps/wechat/qq）"}
+            },
+            "required": ["software_name"]
+        },
+        handler="_handle_software_info",
+        execution=ExecutionClass.BLOCKING_IO,
+        registry_handler="desktop_software",
+        registry_action="get_software_info",
+        category="桌面管理",
+    ),
+    ToolSpec(
+        name="software_list",
+        description="列出所有可用软件",
+        input_schema={
+            "type": "object",
+            "properties": {}
+        },
+        handler="_handle_software_list",
+        execution=ExecutionClass.BLOCKING_IO,
+        cache=CachePolicy(ttl=300, max_size=1),
+        registry_handler="desktop_software",
+        registry_action="list_available_software",
+        category="桌面管理",
+    ),
+
+    # WPS Office专用工具
+    ToolSpec(
+        name="wps_open_document",
+        description="打开WPS文档",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "file_path": {"type": "string", "description": "文档路径（可选）"}
+            }
+        },
+        handler="_handle_wps_open_document",
+        execution=ExecutionClass.BLOCKING_IO,
+        concurrency=ConcurrencyClass.DESKTOP,
+        registry_handler="desktop_software",
+        registry_action="wps_open_document",
+        category="桌面管理",
+    ),
+    ToolSpec(
+        name="wps_create_document",
+        description="创建WPS文档",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "doc_type": {"type": "string", "description": "文档类型（writer/et/wpp）"}
+            }
+        },
+        handler="_handle_wps_create_document",
+        execution=ExecutionClass.BLOCKING_IO,
+        concurrency=ConcurrencyClass.DESKTOP,
+        registry_handler="desktop_software",
+        registry_action="wps_create_document",
+        category="桌面管理",
+    ),
+
+    # 微信专用工具
+    ToolSpec(
+        name="wechat_send_message",
+        description="发送微信消息",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "contact": {"type": "string", "description": "联系人"},
+                "message": {"type": "string", "description": "消息内容"}
+            }
+        },
+        handler="_handle_wechat_send_message",
+        execution=ExecutionClass.BLOCKING_IO,
+        concurrency=ConcurrencyClass.DESKTOP,
+        registry_handler="desktop_software",
+        registry_action="wechat_send_message",
+        category="桌面管理",
+    ),
+    ToolSpec(
+        name="wechat_open_chat",
+        description="打开微信聊天窗口",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "contact": {"type": "string", "description": "联系人"}
+            }
+        },
+        handler="_handle_wechat_open_chat",
+        execution=ExecutionClass.BLOCKING_IO,
+        concurrency=ConcurrencyClass.DESKTOP,
+        registry_handler="desktop_software",
+        registry_action="wechat_open_chat",
+        category="桌面管理",
+    ),
+
+    # QQ专用工具
+    ToolSpec(
+        name="qq_send_message",
+        description="发送QQ消息",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "contact": {"type": "string", "description": "联系人"},
+                "message": {"type": "string", "description": "消息内容"}
+            }
+        },
+        handler="_handle_qq_send_message",
+        execution=ExecutionClass.BLOCKING_IO,
+        concurrency=ConcurrencyClass.DESKTOP,
+        registry_handler="desktop_software",
+        registry_action="qq_send_message",
+        category="桌面管理",
+    ),
+    ToolSpec(
+        name="qq_open_chat",
+        description="打开QQ聊天窗口",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "contact": {"type": "string", "description": "联系人"}
+            }
+        },
+        handler="_handle_qq_open_chat",
+        execution=ExecutionClass.BLOCKING_IO,
+        concurrency=ConcurrencyClass.DESKTOP,
+        registry_handler="desktop_software",
+        registry_action="qq_open_chat",
+        category="桌面管理",
+    ),
+
+    # 凭据数据库工具
+    ToolSpec(
+        name="credential_add",
+        description="添加用户凭据",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "username": {"type": "string", "description": "用户名"},
+                "account": {"type": "string", "description": "账号"},
+                "password": {"type": "string", "description": "密码"},
+                "application": {"type": "string", "description": "应用名称"},
+                "contact": {"type": "string", "description": "联系方式"},
+                "website_url": {"type": "string", "description": "网站URL"},
+                "notes": {"type": "string", "description": "备注"}
+            },
+            "required": ["username", "account", "password", "application"]
+        },
+        handler="_handle_credential_add",
+        execution=ExecutionClass.BLOCKING_IO,
+        registry_handler="credential_database",
+        registry_action="add_credential",
+        category="凭据管理",
+    ),
+    ToolSpec(
+        name="credential_get",
+        description="获取用户凭据",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "credential_id": {"type": "integer", "description": "凭据ID"}
+            },
+            "required": ["credential_id"]
+        },
+        handler="_handle_credential_get",
+        execution=ExecutionClass.BLOCKING_IO,
+        registry_handler="credential_database",
+        registry_action="get_credential",
+        category="凭据管理",
+    ),
+    ToolSpec(
+        name="credential_list",
+        description="获取凭据列表",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "application": {"type": "string", "description": "应用名称（可选）"},
+                "category": {"type": "string", "description": "分类（可选）"}
+            }
+        },
+        handler="_handle_credential_list",
+        execution=ExecutionClass.BLOCKING_IO,
+        registry_handler="credential_database",
+        registry_action="list_credentials",
+        category="凭据管理",
+    ),
+    ToolSpec(
+        name="credential_update",
+        description="更新用户凭据",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "credential_id": {"type": "integer", "description": "凭据ID"},
+                "username": {"type": "string", "description": "用户名"},
+                "account": {"type": "string", "description": "账号"},
+                "password": {"type": "string", "description": "密码"},
+                "application": {"type": "string", "description": "应用名称"},
+                "contact": {"type": "string", "description": "联系方式"},
+                "website_url": {"type": "string", "description": "网站URL"},
+                "notes": {"type": "string", "description": "备注"}
+            },
+            "required": ["credential_id"]
+        },
+        handler="_handle_credential_update",
+        execution=ExecutionClass.BLOCKING_IO,
+        registry_handler="credential_database",
+        registry_action="update_credential",
+        category="凭据管理",
+    ),
+    ToolSpec(
+        name="credential_delete",
+        description="删除用户凭据",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "credential_id": {"type": "integer", "description": "凭据ID"}
+            },
+            "required": ["credential_id"]
+        },
+        handler="_handle_credential_delete",
+        execution=ExecutionClass.BLOCKING_IO,
+        registry_handler="credential_database",
+        registry_action="delete_credential",
+        category="凭据管理",
+    ),
+    ToolSpec(
+        name="credential_search",
+        description="搜索用户凭据",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "keyword": {"type": "string", "description": "搜索关键词"}
+            },
+            "required": ["keyword"]
+        },
+        handler="_handle_credential_search",
+        execution=ExecutionClass.BLOCKING_IO,
+        registry_handler="credential_database",
+        registry_action="search_credentials",
+        category="凭据管理",
+    ),
+    ToolSpec(
+        name="credential_auto_fill",
+        description="自动填充凭据",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "application": {"type": "string", "description": "应用名称"},
+                "website_url": {"type": "string", "description": "网站URL（可选）"}
+            },
+            "required": ["application"]
+        },
+        handler="_handle_credential_auto_fill",
+        execution=ExecutionClass.BLOCKING_IO,
+        registry_handler="credential_database",
+        registry_action="auto_fill_credential",
+        category="凭据管理",
+    ),
+    ToolSpec(
+        name="credential_export",
+        description="导出凭据数据",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "format": {"type": "string", "description": "导出格式（json）"}
+            }
+        },
+        handler="_handle_credential_export",
+        execution=ExecutionClass.BLOCKING_IO,
+        registry_handler="credential_database",
+        registry_action="export_credentials",
+        category="凭据管理",
+    ),
+    ToolSpec(
+        name="credential_import",
+        description="导入凭据数据",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "data": {"type": "string", "description": "导入数据"},
+                "format": {"type": "string", "description": "数据格式（json）"}
+            },
+            "required": ["data"]
+        },
+        handler="_handle_credential_import",
+        execution=ExecutionClass.BLOCKING_IO,
+        registry_handler="credential_database",
+        registry_action="import_credentials",
+        category="凭据管理",
+    ),
+    ToolSpec(
+        name="credential_categories",
+        description="获取应用分类列表",
+        input_schema={
+            "type": "object",
+            "properties": {}
+        },
+        handler="_handle_credential_categories",
+        execution=ExecutionClass.BLOCKING_IO,
+        registry_handler="credential_database",
+        registry_action="get_categories",
+        category="凭据管理",
+    ),
+
+    # 自动填充工具
+    ToolSpec(
+        name="auto_fill_website",
+        description="为网站自动填充凭据",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "url": {"type": "string", "description": "网站URL"},
+                "username_field": {"type": "string", "description": "用户名输入框标识"},
+                "password_field": {"type": "string", "description": "密码输入框标识"}
+            },
+            "required": ["url"]
+        },
+        handler="_handle_auto_fill_website",
+        execution=ExecutionClass.BLOCKING_IO,
+        registry_handler="auto_fill",
+        registry_action="auto_fill_website",
+        category="自动填充",
+    ),
+    ToolSpec(
+        name="auto_fill_application",
+        description="为应用自动填充凭据",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "app_name": {"type": "string", "description": "应用名称"},
+                "username_field": {"type": "string", "description": "用户名输入框标识"},
+                "password_field": {"type": "string", "description": "密码输入框标识"}
+            },
+            "required": ["app_name"]
+        },
+        handler="_handle_auto_fill_application",
+        execution=ExecutionClass.BLOCKING_IO,
+        registry_handler="auto_fill",
+        registry_action="auto_fill_application",
+        category="自动填充",
+    ),
+    ToolSpec(
+        name="smart_auto_fill",
+        description="智能自动填充凭据",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "identifier": {"type": "string", "description": "标识符（URL或应用名称）"},
+                "identifier_type": {"type": "string", "description": "标识符类型（url/app/auto）"}
+            },
+            "required": ["identifier"]
+        },
+        handler="_handle_smart_auto_fill",
+        execution=ExecutionClass.BLOCKING_IO,
+        registry_handler="auto_fill",
+        registry_action="smart_auto_fill",
+        category="自动填充",
+    ),
+    ToolSpec(
+        name="get_suggested_credentials",
+        description="获取建议的凭据列表",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "application": {"type": "string", "description": "应用名称"},
+                "limit": {"type": "integer", "description": "返回数量限制"}
+            },
+            "required": ["application"]
+        },
+        handler="_handle_get_suggested_credentials",
+        execution=ExecutionClass.BLOCKING_IO,
+        registry_handler="auto_fill",
+        registry_action="get_suggested_credentials",
+        category="自动填充",
+    ),
+    ToolSpec(
+        name="validate_credential_format",
+        description="验证凭据格式",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "username": {"type": "string", "description": "用户名"},
+                "password": {"type": "string", "description": "密码"},
+                "application": {"type": "string", "description": "应用名称"}
+            },
+            "required": ["username", "password", "application"]
+        },
+        handler="_handle_validate_credential_format",
+        execution=ExecutionClass.BLOCKING_IO,
+        registry_handler="auto_fill",
+        registry_action="validate_credential_format",
+        category="自动填充",
+    ),
+    ToolSpec(
+        name="get_auto_fill_statistics",
+        description="获取自动填充统计信息",
+        input_schema={
+            "type": "object",
+            "properties": {}
+        },
+        handler="_handle_get_auto_fill_statistics",
+        execution=ExecutionClass.BLOCKING_IO,
+        registry_handler="auto_fill",
+        registry_action="get_auto_fill_statistics",
+        category="自动填充",
+    ),
+
+    # 服务器统计工具
+    ToolSpec(
+        name="server_stats",
+        description="查看MCP服务器统计：各工具的调用数、错误数与延迟分位数，工具结果缓存命中情况、各执行类别在途调用数与各并发类别的排队情况",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "tools": {"type": "array", "items": {"type": "string"}, "description": "只返回这些工具的统计（默认全部）"}
+            }
+        },
+        handler="_handle_server_stats",
+        actions=(),
+    ),
+)
+
+
+def server_specs() -> List[ToolSpec]:
+    """LAMMCPServer 提供的工具（按声明顺序）"""
+    return [spec for spec in TOOLS if spec.handler is not None]
+
+
+def registry_specs() -> List[ToolSpec]:
+    """LAMToolRegistry 提供的工具（按声明顺序）"""
+    return [spec for spec in TOOLS if spec.registry_handler is not None]
+
+
+def action_mapping() -> Dict[str, str]:
+    """智能体操作名 -> MCP工具名"""
+    mapping: Dict[str, str] = {}
+    for spec in server_specs():
+        for action in (spec.name,) if spec.actions is None else spec.actions:
+            mapping[action] = spec.name
+    return mapping
+
+
+def tools_by_category() -> Dict[str, List[str]]:
+    """注册表工具按分类分组"""
+    categories: Dict[str, List[str]] = {}
+    for spec in registry_specs():
+        if spec.category:
+            categories.setdefault(spec.category, []).append(spec.name)
+    return categories
+
+
+def source_key() -> str:
+    """清单源文件（含schema常量）的哈希，用作 tools/list 磁盘缓存的键"""
+    digest = hashlib.sha256()
+    here = os.path.dirname(os.path.abspath(__file__))
+    for path in (os.path.join(here, "manifest.py"), os.path.join(here, "core", "schema.py")):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def encode_tools_list(tools: List[Dict[str, Any]]) -> Tuple[bytes, str]:
+    """编码 tools/list 结果，返回 (结果字节串, 工具列表内容哈希)"""
+    digest = hashlib.sha256(dumps(tools)).hexdigest()
+    return dumps({"tools": tools, "_meta": {"lamToolsHash": digest}}), digest
+
+
+def load_tools_list(path: str, build: Callable[[], List[Dict[str, Any]]]) -> Tuple[bytes, str]:
+    """读取磁盘上的 tools/list 缓存；清单源文件变化或缓存不可用时重新编码并写回
+
+    缓存文件第一行为 {"source", "hash"} 头部，其后是 tools/list 结果的JSON字节串。
+    """
+    key = source_key()
+    try:
+        with open(path, "rb") as f:
+            header = loads(f.readline())
+            if header.get("source") == key and header.get("hash"):
+                return f.read(), header["hash"]
+    except (OSError, ValueError, AttributeError):
+        pass
+    data, digest = encode_tools_list(build())
+    try:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(dumps({"source": key, "hash": digest}) + b"\n" + data)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning(f"写入工具列表缓存失败: {e}")
+    return data, digest
+
+
+def read_cached_tools(path: str, digest: str) -> Optional[List[Dict[str, Any]]]:
+    """客户端：磁盘缓存的内容哈希与服务器一致时返回缓存的工具列表"""
+    try:
+        with open(path, "rb") as f:
+            header = loads(f.readline())
+            if header.get("hash") != digest:
+                return None
+            return loads(f.read())["tools"]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+MCP服务器工作池
+启动多个stdio服务器进程，对外提供与 StdioTransport 相同的接口：
+- 工具名匹配亲和前缀（如 bilibili_）的调用固定到同一个进程，复用该进程中的登录会话与浏览器；
+- 其余调用分派到在途请求最少的进程；tools/call_batch 按同样规则拆分后并发发送，结果按原顺序合并；
+- metrics/collect 发给所有进程，合并各进程的指标；
+- 进程崩溃后在下次使用前（以及调用失败时）自动重启，并重放初始化握手；
+- 关闭时先拒绝新请求，等待在途请求完成后再依次关闭各进程。
+"""
+
+import asyncio
+import itertools
+import logging
+from typing import Any, Dict, List, Optional
+
+from .transport import FRAME_THRESHOLD, NotificationHandler, StdioTransport, _LoopThread
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerPool:
+    """多个MCP服务器进程组成的工作池"""
+
+    def __init__(self, command: List[str], size: int = 2, request_timeout: Optional[float] = None,
+                 on_notification: Optional[NotificationHandler] = None, frame_threshold: int = FRAME_THRESHOLD,
+                 affinity: Optional[Dict[str, str]] = None, drain_timeout: float = 30.0):
+        self.command = list(command)
+        self.size = max(1, size)
+        self.request_timeout = request_timeout
+        self.on_notification = on_notification
+        self.frame_threshold = frame_threshold
+        # 工具名前缀 -> 亲和组，同一组的调用固定到同一个进程
+        self.affinity = dict(affinity or {})
+        self.drain_timeout = drain_timeout
+        self.workers: List[StdioTransport] = []
+        self.restarts = 0
+        self._load: List[int] = []
+        self._pins: Dict[str, int] = {}
+        self._locks: List[asyncio.Lock] = []
+        self._rotation = itertools.count()
+        self._init_params: Optional[Dict[str, Any]] = None
+        self._initialized_notified = False
+        self._draining = False
+        self._io: Optional[_LoopThread] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._io is not None and not self._draining and any(w.is_running for w in self.workers)
+
+    @property
+    def in_flight(self) -> int:
+        """尚未收到响应的请求数"""
+        return sum(self._load)
+
+    @property
+    def process(self):
+        """第一个服务器进程（兼容单进程传输的接口）"""
+        return self.workers[0].process if self.workers else None
+
+    @property
+    def processes(self) -> List[Any]:
+        return [w.process for w in self.workers]
+
+    def stats(self) -> Dict[str, Any]:
+        """各进程的在途请求数、亲和组分配与重启次数"""
+        return {
+            "workers": [{"pid": w.process.pid if w.process else None, "in_flight": load}
+                        for w, load in zip(self.workers, self._load)],
+            "pins": dict(self._pins),
+            "restarts": self.restarts,
+        }
+
+    async def start(self) -> None:
+        """启动所有服务器进程"""
+        if self._io is None:
+            self._io = _LoopThread("mcp-pool")
+        await self._io.call(self._start())
+
+    async def request(self, method: str, params: Optional[Dict[str, Any]] = None,
+                      timeout: Optional[float] = None) -> Dict[str, Any]:
+        """按方法与工具名选择进程发送请求，返回完整的JSON-RPC响应消息"""
+        if self._io is None:
+            raise RuntimeError("MCP传输未启动")
+        return await self._io.call(self._request(method, params, timeout or self.request_timeout))
+
+    async def notify(self, method: str, params: Optional[Dict[str, Any]] = None) -> None:
+        """向所有进程发送通知"""
+        if self._io is None:
+            raise RuntimeError("MCP传输未启动")
+        await self._io.call(self._notify(method, params))
+
+    async def close(self, timeout: float = 3.0) -> None:
+        """停止接收新请求，等待在途请求完成后关闭所有进程"""
+        if self._io is None:
+            return
+        try:
+            await self._io.call(self._close(timeout))
+        finally:
+            self._io.stop()
+            self._io = None
+
+    def _new_worker(self) -> StdioTransport:
+        return StdioTransport(self.command, request_timeout=self.request_timeout,
+                              on_notification=self.on_notification, frame_threshold=self.frame_threshold)
+
+    async def _start(self) -> None:
+        self._draining = False
+        self.workers = [self._new_worker() for _ in range(self.size)]
+        self._load = [0] * self.size
+        self._locks = [asyncio.Lock() for _ in range(self.size)]
+        self._pins = {}
+        await asyncio.gather(*[worker.start() for worker in self.workers])
+        logger.info(f"MCP工作池已启动: {self.size} 个服务器进程")
+
+    async def _request(self, method: str, params: Optional[Dict[str, Any]],
+                       timeout: Optional[float]) -> Dict[str, Any]:
+        if self._draining:
+            raise ConnectionError("MCP工作池正在停止")
+        if method == "initialize":
+            # 每个进程都需要完成握手，崩溃重启后按相同参数重放
+            self._init_params = params
+            responses = await asyncio.gather(*[self._send(i, method, params, timeout) for i in range(self.size)])
+            return responses[0]
+        if method == "metrics/collect":
+            return await self._collect_metrics(params, timeout)
+        if method == "tools/call_batch" and isinstance((params or {}).get("calls"), list):
+            return await self._request_batch(params["calls"], timeout)
+        tool = params.get("name") if method == "tools/call" and params else None
+        return await self._send(self._select(tool), method, params, timeout)
+
+    async def _request_batch(self, calls: List[Any], timeout: Optional[float]) -> Dict[str, Any]:
+        """把批量调用按进程拆分并发发送，结果按原顺序合并；某个进程失败只影响分给它的项"""
+        groups: Dict[int, List[int]] = {}
+        for position, call in enumerate(calls):
+            tool = call.get("name") if isinstance(call, dict) else None
+            groups.setdefault(self._select(tool), []).append(position)
+        results: List[Any] = [None] * len(calls)
+
+        async def send_group(index: int, positions: List[int]) -> None:
+            try:
+                response = await self._send(index, "tools/call_batch",
+                                            {"calls": [calls[p] for p in positions]}, timeout)
+                if "result" in response:
+                    group_results = response["result"]["results"]
+                else:
+                    message = response.get("error", {}).get("message", "未知错误")
+                    group_results = [{"success": False, "error": message}] * len(positions)
+            except Exception as e:
+                group_results = [{"success": False, "error": f"MCP服务器进程调用失败: {e}"}] * len(positions)
+            for position, result in zip(positions, group_results):
+                results[position] = result
+
+        await asyncio.gather(*[send_group(index, positions) for index, positions in groups.items()])
+        return {"jsonrpc": "2.0", "id": None, "result": {"results": results}}
+
+    async def _collect_metrics(self, params: Optional[Dict[str, Any]], timeout: Optional[float]) -> Dict[str, Any]:
+        """向所有进程请求指标并合并；失败的进程跳过"""
+        responses = await asyncio.gather(*[self._send(i, "metrics/collect", params, timeout)
+                                           for i in range(self.size)], return_exceptions=True)
+        processes: List[Any] = []
+        for index, response in enumerate(responses):
+            if isinstance(response, BaseException) or "result" not in response:
+                logger.warning(f"获取MCP服务器进程 #{index} 的指标失败: {response}")
+                continue
+            processes.extend(response["result"].get("processes", []))
+        return {"jsonrpc": "2.0", "id": None, "result": {"processes": processes}}
+
+    async def _notify(self, method: str, params: Optional[Dict[str, Any]]) -> None:
+        if method == "notifications/initialized":
+            self._initialized_notified = True
+        workers = [await self._ensure_worker(i) for i in range(self.size)]
+        await asyncio.gather(*[worker.notify(method, params) for worker in workers])
+
+    async def _send(self, index: int, method: str, params: Optional[Dict[str, Any]],
+                    timeout: Optional[float]) -> Dict[str, Any]:
+        worker = await self._ensure_worker(index)
+        self._load[index] += 1
+        try:
+            return await worker.request(method, params, timeout)
+        except ConnectionError:
+            if not worker.is_running and not self._draining:
+                # 进程已退出：立即在后台重启，后续调用不必等待
+                asyncio.ensure_future(self._ensure_worker(index))
+            raise
+        finally:
+            self._load[index] -= 1
+
+    async def _ensure_worker(self, index: int) -> StdioTransport:
+        """返回可用的进程，已退出的进程先重启并重放初始化握手"""
+        worker = self.workers[index]
+        if worker.is_running or self._draining:
+            return worker
+        async with self._locks[index]:
+            worker = self.workers[index]
+            if worker.is_running or self._draining:
+                return worker
+            returncode = worker.process.returncode if worker.process else None
+            logger.warning(f"MCP服务器进程 #{index} 已退出（返回码 {returncode}），正在重启")
+            await worker.close(timeout=1.0)
+            worker = self._new_worker()
+            await worker.start()
+            if self._init_params is not None:
+                await worker.request("initialize", self._init_params)
+            if self._initialized_notified:
+                await worker.notify("notifications/initialized")
+            self.workers[index] = worker
+            self.restarts += 1
+            return worker
+
+    def _select(self, tool: Optional[str]) -> int:
+        """亲和组固定到首次分配的进程，其余调用选在途请求最少的进程（相同时轮转）"""
+        group = self._group(tool)
+        if group is None:
+            return self._least_loaded()
+        index = self._pins.get(group)
+        if index is None:
+            index = self._pins[group] = self._least_loaded()
+        return index
+
+    def _group(self, tool: Optional[str]) -> Optional[str]:
+        if not tool:
+            return None
+        for prefix, group in self.affinity.items():
+            if tool.startswith(prefix):
+                return group
+        return None
+
+    def _least_loaded(self) -> int:
+        start = next(self._rotation) % self.size
+        return min(range(self.size), key=lambda i: (self._load[i], (i - start) % self.size))
+
+    async def _close(self, timeout: float) -> None:
+        self._draining = True
+        deadline = asyncio.get_running_loop().time() + self.drain_timeout
+        while self.in_flight and asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(0.05)
+        if self.in_flight:
+            logger.warning(f"MCP工作池停止时仍有 {self.in_flight} 个请求未完成")
+        await asyncio.gather(*[worker.close(timeout) for worker in self.workers], return_exceptions=True)
+        logger.info("MCP工作池已停止")
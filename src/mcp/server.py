@@ -4,1215 +4,80 @@ LAM-Agent MCP服务器实现
 提供标准化的MCP协议接口，将现有工具转换为MCP工具
 """
 import asyncio
+import itertools
 import json
 import logging
-from typing import Any, Dict, List, Optional, Union
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 from dataclasses import dataclass
 import sys
 import os
+import shutil
+import tempfile
+import threading
 
 # 添加项目根目录到路径
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 sys.path.insert(0, project_root)
 
-from src.tools.executor import executor
-from src.tools.browser import fetch_page, automate_page
-from src.tools.bilibili_integration import BilibiliIntegration
-from src.tools.desktop_launcher_safe import SafeDesktopLauncher
-from src.tools.search import web_search
-from src.tools.steam_integration import steam_integration
-from src.tools.bilibili_integration import bilibili_integration
-from .core.base import MCPTool
+from .core.admission import AdmissionRejected, get_admission_controller
+from .core.base import MCPTool, ToolTable
+from .core.cache import get_tool_result_cache
+from .core.execution import get_tool_dispatcher
+from .core.schema import SchemaValidationError
+from .core.stats import CallRecord, StatsDumper, get_tool_stats
+from .codec import RawJSON, externalize_strings
+from .manifest import encode_tools_list, load_tools_list, server_specs
+from .transport import JSONRPCError, Notifier, serve_stdio
+from ..utils.cancellation import CancelToken, await_cancellable, cancel_scope, is_cancelled, on_cancel
+from ..utils.exceptions import OperationCancelled
+from ..utils.metrics import dump_families, get_metrics_registry
+from ..utils.progress import STEP_FINISHED, STEP_STARTED, progress_scope, report_progress
 
 logger = logging.getLogger(__name__)
 
+SERVER_INFO = {"name": "lam-agent", "version": "1.0.0"}
+
 class LAMMCPServer:
     """LAM-Agent MCP服务器"""
     
     def __init__(self):
-        self.tools: Dict[str, MCPTool] = {}
-        self.desktop_launcher = SafeDesktopLauncher()
+        self.tools: ToolTable = ToolTable()
+        self._desktop_launcher = None
+        self.dispatcher = get_tool_dispatcher()
+        self.admission = get_admission_controller()
+        self.tool_stats = get_tool_stats()
+        # 客户端在initialize中声明支持时，不小于该长度的字符串结果经临时文件传递（0表示关闭）
+        self.blob_min_bytes = 0
+        # 引用文件所在目录：优先使用客户端指定的目录（工作池中的各进程共用），否则自建并在退出时删除
+        self.blob_dir: Optional[str] = None
+        self._owns_blob_dir = False
+        # 执行中的请求id -> 取消令牌，收到 notifications/cancelled 时据此中止对应调用
+        self._cancel_tokens: Dict[Any, CancelToken] = {}
+        # 预先编码的 tools/list 结果: (工具表版本, 结果字节串, 内容哈希)
+        self._tools_list: Optional[Tuple[int, bytes, str]] = None
+        self._manifest_version = -1
         self._register_tools()
     
+    @property
+    def desktop_launcher(self):
+        """桌面启动器（依赖 win32com，首次使用时才导入）"""
+        if self._desktop_launcher is None:
+            from src.tools.desktop_launcher_safe import SafeDesktopLauncher
+            self._desktop_launcher = SafeDesktopLauncher()
+        return self._desktop_launcher
+    
     def _register_tools(self):
-        """注册所有MCP工具"""
-        
-        # 注册自动登录工具
-        self._register_auto_login_tools()
-        
-        # 网页自动化工具
-        self.tools["web_automate"] = MCPTool(
-            name="web_automate",
-            description="在指定网页上执行自动化操作",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "url": {"type": "string", "description": "目标网页URL"},
-                    "steps": {
-                        "type": "array",
-                        "description": "操作步骤列表",
-                        "items": {
-                            "type": "object",
-                            "properties": {
-                                "action": {"type": "string", "enum": ["click", "type", "wait", "sleep", "scroll", "press"]},
-                                "selector": {"type": "string", "description": "CSS选择器"},
-                                "text": {"type": "string", "description": "要输入的文本"},
-                                "key": {"type": "string", "description": "要按下的键盘按键"},
-                                "ms": {"type": "integer", "description": "等待时间（毫秒）"}
-                            },
-                            "required": ["action"]
-                        }
-                    }
-                },
-                "required": ["url"]
-            },
-            handler=self._handle_web_automate
-        )
-        
-        # B站搜索播放工具
-        self.tools["bilibili_search_play"] = MCPTool(
-            name="bilibili_search_play",
-            description="在B站搜索UP主并播放其第一个视频",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "up_name": {"type": "string", "description": "UP主名称"},
-                    "keep_open_seconds": {"type": "number", "description": "保持页面打开的时间（秒）", "default": 60}
-                },
-                "required": ["up_name"]
-            },
-            handler=self._handle_bilibili_search_play
-        )
-        
-        # 桌面文件管理工具
-        self.tools["desktop_scan"] = MCPTool(
-            name="desktop_scan",
-            description="扫描桌面文件和快捷方式",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "file_type": {"type": "string", "description": "文件类型过滤", "default": "all"}
-                }
-            },
-            handler=self._handle_desktop_scan
-        )
-        
-        self.tools["desktop_launch"] = MCPTool(
-            name="desktop_launch",
-            description="启动桌面上的文件或应用程序",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "filename": {"type": "string", "description": "要启动的文件名"},
-                    "exact_match": {"type": "boolean", "description": "是否精确匹配文件名", "default": False}
-                },
-                "required": ["filename"]
-            },
-            handler=self._handle_desktop_launch
-        )
-        
-        # 网络搜索工具
-        self.tools["web_search"] = MCPTool(
-            name="web_search",
-            description="使用DuckDuckGo进行网络搜索",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "query": {"type": "string", "description": "搜索查询"},
-                    "max_results": {"type": "integer", "description": "最大结果数量", "default": 5}
-                },
-                "required": ["query"]
-            },
-            handler=self._handle_web_search
-        )
-        
-        # 文件操作工具
-        self.tools["file_read"] = MCPTool(
-            name="file_read",
-            description="读取文件内容",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "filename": {"type": "string", "description": "文件路径"}
-                },
-                "required": ["filename"]
-            },
-            handler=self._handle_file_read
-        )
-        
-        self.tools["file_write"] = MCPTool(
-            name="file_write",
-            description="写入文件内容",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "filename": {"type": "string", "description": "文件路径"},
-                    "content": {"type": "string", "description": "文件内容"}
-                },
-                "required": ["filename", "content"]
-            },
-            handler=self._handle_file_write
-        )
-        
-        # 系统命令工具
-        self.tools["run_command"] = MCPTool(
-            name="run_command",
-            description="执行系统命令",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "command": {"type": "string", "description": "要执行的命令"},
-                    "timeout": {"type": "integer", "description": "超时时间（秒）", "default": 30}
-                },
-                "required": ["command"]
-            },
-            handler=self._handle_run_command
-        )
-        
-        # 网页内容抓取工具
-        self.tools["fetch_page"] = MCPTool(
-            name="fetch_page",
-            description="抓取网页内容",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "url": {"type": "string", "description": "网页URL"},
-                    "wait_selector": {"type": "string", "description": "等待的选择器"},
-                    "timeout_ms": {"type": "integer", "description": "超时时间（毫秒）", "default": 15000}
-                },
-                "required": ["url"]
-            },
-            handler=self._handle_fetch_page
-        )
-        
-        # 网站打开工具
-        self.tools["open_website"] = MCPTool(
-            name="open_website",
-            description="在浏览器中打开网站",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "url": {"type": "string", "description": "要打开的网站URL"}
-                },
-                "required": ["url"]
-            },
-            handler=self._handle_open_website
-        )
-        
-        # B站打开工具
-        self.tools["open_bilibili"] = MCPTool(
-            name="open_bilibili",
-            description="打开B站并跳转到热门视频页面",
-            input_schema={
-                "type": "object",
-                "properties": {}
-            },
-            handler=self._handle_open_bilibili
-        )
-        
-        # 视频播放工具
-        self.tools["play_video"] = MCPTool(
-            name="play_video",
-            description="播放视频",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "video_url": {"type": "string", "description": "视频URL"},
-                    "platform": {"type": "string", "description": "平台名称", "default": "bilibili"},
-                    "query": {"type": "string", "description": "搜索查询"}
-                }
-            },
-            handler=self._handle_play_video
-        )
-        
-        # 自然语言自动化工具
-        self.tools["nl_automate"] = MCPTool(
-            name="nl_automate",
-            description="将自然语言解析为自动化操作并执行",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "query": {"type": "string", "description": "自然语言指令"},
-                    "url": {"type": "string", "description": "目标站点初始URL"},
-                    "auth": {
-                        "type": "object",
-                        "description": "认证信息",
-                        "properties": {
-                            "username": {"type": "string"},
-                            "password": {"type": "string"},
-                            "username_selector": {"type": "string"},
-                            "password_selector": {"type": "string"},
-                            "submit_selector": {"type": "string"}
-                        }
-                    },
-                    "steps": {
-                        "type": "array",
-                        "description": "额外步骤",
-                        "items": {"type": "object"}
-                    }
-                },
-                "required": ["query"]
-            },
-            handler=self._handle_nl_automate
-        )
-        
-        # 站点搜索工具
-        self.tools["site_search"] = MCPTool(
-            name="site_search",
-            description="在指定网站内搜索",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "url": {"type": "string", "description": "目标网站URL"},
-                    "keyword": {"type": "string", "description": "搜索关键词"},
-                    "click_first_result": {"type": "boolean", "description": "是否点击第一个结果", "default": True}
-                },
-                "required": ["url", "keyword"]
-            },
-            handler=self._handle_site_search
-        )
-        
-        # 商品浏览工具
-        self.tools["browse_product"] = MCPTool(
-            name="browse_product",
-            description="浏览商品详情",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "url": {"type": "string", "description": "商品页面URL"},
-                    "keyword": {"type": "string", "description": "商品关键词"},
-                    "match_text": {"type": "string", "description": "匹配文本"}
-                },
-                "required": ["url", "keyword"]
-            },
-            handler=self._handle_browse_product
-        )
-        
-        # 通用视频播放工具
-        self.tools["play_video_generic"] = MCPTool(
-            name="play_video_generic",
-            description="通用视频播放",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "url": {"type": "string", "description": "视频页面URL"},
-                    "keyword": {"type": "string", "description": "视频关键词"},
-                    "match_text": {"type": "string", "description": "匹配文本"}
-                },
-                "required": ["url", "keyword"]
-            },
-            handler=self._handle_play_video_generic
-        )
-        
-        # 加入购物车工具
-        self.tools["add_to_cart"] = MCPTool(
-            name="add_to_cart",
-            description="将商品加入购物车",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "url": {"type": "string", "description": "商品页面URL"},
-                    "keyword": {"type": "string", "description": "商品关键词"},
-                    "match_text": {"type": "string", "description": "匹配文本"}
-                },
-                "required": ["url", "keyword"]
-            },
-            handler=self._handle_add_to_cart
-        )
-        
-        # B站UP主页工具
-        self.tools["bilibili_open_up"] = MCPTool(
-            name="bilibili_open_up",
-            description="打开B站UP主主页",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "up_name": {"type": "string", "description": "UP主名称"},
-                    "keep_open_seconds": {"type": "number", "description": "保持页面打开的时间（秒）", "default": 60}
-                },
-                "required": ["up_name"]
-            },
-            handler=self._handle_bilibili_open_up
-        )
-        
-        # 自然语言步骤执行工具
-        self.tools["nl_step_execute"] = MCPTool(
-            name="nl_step_execute",
-            description="执行自然语言指令的步骤化操作",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "query": {"type": "string", "description": "自然语言指令"}
-                },
-                "required": ["query"]
-            },
-            handler=self._handle_nl_step_execute
-        )
-        
-        # 天气查询工具
-        self.tools["get_weather"] = MCPTool(
-            name="get_weather",
-            description="获取天气信息",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "city": {"type": "string", "description": "城市名称", "default": "北京"}
-                }
-            },
-            handler=self._handle_get_weather
-        )
-        
-        # 数学计算工具
-        self.tools["calculate"] = MCPTool(
-            name="calculate",
-            description="计算数学表达式",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "expression": {"type": "string", "description": "数学表达式"}
-                },
-                "required": ["expression"]
-            },
-            handler=self._handle_calculate
-        )
-        
-        # 翻译工具
-        self.tools["translate"] = MCPTool(
-            name="translate",
-            description="翻译文本",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "text": {"type": "string", "description": "要翻译的文本"},
-                    "target_lang": {"type": "string", "description": "目标语言", "default": "en"}
-                },
-                "required": ["text"]
-            },
-            handler=self._handle_translate
-        )
-        
-        # 邮件发送工具
-        self.tools["send_email"] = MCPTool(
-            name="send_email",
-            description="发送邮件",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "to": {"type": "string", "description": "收件人"},
-                    "subject": {"type": "string", "description": "邮件主题"},
-                    "content": {"type": "string", "description": "邮件内容"}
-                },
-                "required": ["to", "subject", "content"]
-            },
-            handler=self._handle_send_email
-        )
-        
-        # 任务调度工具
-        self.tools["schedule_task"] = MCPTool(
-            name="schedule_task",
-            description="安排任务",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "task": {"type": "string", "description": "任务描述"},
-                    "time": {"type": "string", "description": "执行时间"}
-                },
-                "required": ["task"]
-            },
-            handler=self._handle_schedule_task
-        )
-        
-        # Steam集成工具
-        self.tools["steam_get_library"] = MCPTool(
-            name="steam_get_library",
-            description="获取Steam游戏库和详细统计信息",
-            input_schema={
-                "type": "object",
-                "properties": {}
-            },
-            handler=self._handle_steam_get_library
-        )
-        
-        self.tools["steam_get_recent_activity"] = MCPTool(
-            name="steam_get_recent_activity",
-            description="查看最近的游戏活动和当前正在玩的游戏",
-            input_schema={
-                "type": "object",
-                "properties": {}
-            },
-            handler=self._handle_steam_get_recent_activity
-        )
-        
-        self.tools["steam_get_game_details"] = MCPTool(
-            name="steam_get_game_details",
-            description="获取详细的游戏信息和成就",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "appid": {"type": "string", "description": "游戏应用ID"}
-                },
-                "required": ["appid"]
-            },
-            handler=self._handle_steam_get_game_details
-        )
-        
-        self.tools["steam_get_friend_comparison"] = MCPTool(
-            name="steam_get_friend_comparison",
-            description="与朋友比较游戏库并获得推荐",
-            input_schema={
-                "type": "object",
-                "properties": {}
-            },
-            handler=self._handle_steam_get_friend_comparison
-        )
-        
-        self.tools["steam_open_store"] = MCPTool(
-            name="steam_open_store",
-            description="打开Steam商店，优先尝试桌面快捷方式，如果不存在则在浏览器中打开",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "game_name": {"type": "string", "description": "游戏名称（可选）"}
-                }
-            },
-            handler=self._handle_steam_open_store
-        )
-        
-        self.tools["steam_analyze_habits"] = MCPTool(
-            name="steam_analyze_habits",
-            description="分析游戏习惯和偏好",
-            input_schema={
-                "type": "object",
-                "properties": {}
-            },
-            handler=self._handle_steam_analyze_habits
-        )
-        
-        self.tools["steam_get_recommendations"] = MCPTool(
-            name="steam_get_recommendations",
-            description="获取游戏推荐",
-            input_schema={
-                "type": "object",
-                "properties": {}
-            },
-            handler=self._handle_steam_get_recommendations
-        )
-        
-        self.tools["steam_download_game"] = MCPTool(
-            name="steam_download_game",
-            description="下载Steam游戏",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "appid": {"type": "string", "description": "游戏AppID"}
-                },
-                "required": ["appid"]
-            },
-            handler=self._handle_steam_download_game
-        )
-        
-        self.tools["steam_uninstall_game"] = MCPTool(
-            name="steam_uninstall_game",
-            description="卸载Steam游戏",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "appid": {"type": "string", "description": "游戏AppID"}
-                },
-                "required": ["appid"]
-            },
-            handler=self._handle_steam_uninstall_game
-        )
-        
-        # Bilibili集成工具
-        self.tools["bilibili_get_user_profile"] = MCPTool(
-            name="bilibili_get_user_profile",
-            description="获取用户资料信息和统计数据",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "uid": {"type": "string", "description": "用户ID"}
-                },
-                "required": ["uid"]
-            },
-            handler=self._handle_bilibili_get_user_profile
-        )
-        
-        self.tools["bilibili_search_videos"] = MCPTool(
-            name="bilibili_search_videos",
-            description="搜索视频并获取详细视频信息",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "keyword": {"type": "string", "description": "搜索关键词"},
-                    "page": {"type": "integer", "description": "页码", "default": 1},
-                    "pagesize": {"type": "integer", "description": "每页数量", "default": 20}
-                },
-                "required": ["keyword"]
-            },
-            handler=self._handle_bilibili_search_videos
-        )
-        
-        self.tools["bilibili_get_video_details"] = MCPTool(
-            name="bilibili_get_video_details",
-            description="获取视频详细信息",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "bvid": {"type": "string", "description": "视频BV号"}
-                },
-                "required": ["bvid"]
-            },
-            handler=self._handle_bilibili_get_video_details
-        )
-        
-        self.tools["bilibili_get_user_videos"] = MCPTool(
-            name="bilibili_get_user_videos",
-            description="获取用户上传的视频",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "uid": {"type": "string", "description": "用户ID"},
-                    "page": {"type": "integer", "description": "页码", "default": 1},
-                    "pagesize": {"type": "integer", "description": "每页数量", "default": 20}
-                },
-                "required": ["uid"]
-            },
-            handler=self._handle_bilibili_get_user_videos
-        )
-        
-        self.tools["bilibili_get_following_list"] = MCPTool(
-            name="bilibili_get_following_list",
-            description="获取关注列表",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "uid": {"type": "string", "description": "用户ID"},
-                    "page": {"type": "integer", "description": "页码", "default": 1},
-                    "pagesize": {"type": "integer", "description": "每页数量", "default": 20}
-                },
-                "required": ["uid"]
-            },
-            handler=self._handle_bilibili_get_following_list
-        )
-        
-        self.tools["bilibili_get_favorites"] = MCPTool(
-            name="bilibili_get_favorites",
-            description="获取个人收藏",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "uid": {"type": "string", "description": "用户ID"},
-                    "page": {"type": "integer", "description": "页码", "default": 1},
-                    "pagesize": {"type": "integer", "description": "每页数量", "default": 20}
-                },
-                "required": ["uid"]
-            },
-            handler=self._handle_bilibili_get_favorites
-        )
-        
-        self.tools["bilibili_get_watch_later"] = MCPTool(
-            name="bilibili_get_watch_later",
-            description="浏览稍后再看列表",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "page": {"type": "integer", "description": "页码", "default": 1},
-                    "pagesize": {"type": "integer", "description": "每页数量", "default": 20}
-                }
-            },
-            handler=self._handle_bilibili_get_watch_later
-        )
-        
-        self.tools["bilibili_get_user_statistics"] = MCPTool(
-            name="bilibili_get_user_statistics",
-            description="获取用户统计数据",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "uid": {"type": "string", "description": "用户ID"}
-                },
-                "required": ["uid"]
-            },
-            handler=self._handle_bilibili_get_user_statistics
-        )
-        
-        self.tools["bilibili_open_video"] = MCPTool(
-            name="bilibili_open_video",
-            description="打开B站视频",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "bvid": {"type": "string", "description": "视频BV号"}
-                },
-                "required": ["bvid"]
-            },
-            handler=self._handle_bilibili_open_video
-        )
-        
-        self.tools["bilibili_open_user"] = MCPTool(
-            name="bilibili_open_user",
-            description="打开B站用户主页",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "uid": {"type": "string", "description": "用户ID"}
-                },
-                "required": ["uid"]
-            },
-            handler=self._handle_bilibili_open_user
-        )
-        
-        # 网站集成工具
-        self.tools["website_open"] = MCPTool(
-            name="website_open",
-            description="打开网站",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "url": {"type": "string", "description": "网站URL"}
-                },
-                "required": ["url"]
-            },
-            handler=self._handle_website_open
-        )
-        
-        self.tools["website_search"] = MCPTool(
-            name="website_search",
-            description="在指定网站搜索",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "keyword": {"type": "string", "description": "搜索关键词"},
-                    "website": {"type": "string", "description": "网站域名（可选）"}
-                },
-                "required": ["keyword"]
-            },
-            handler=self._handle_website_search
-        )
-        
-        self.tools["website_summary"] = MCPTool(
-            name="website_summary",
-            description="获取网站信息总结",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "url": {"type": "string", "description": "网站URL"}
-                },
-                "required": ["url"]
-            },
-            handler=self._handle_website_summary
-        )
-        
-        # 京东专用工具
-        self.tools["jd_search_products"] = MCPTool(
-            name="jd_search_products",
-            description="搜索京东商品",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "keyword": {"type": "string", "description": "商品关键词"},
-                    "page": {"type": "integer", "description": "页码（可选）"}
-                },
-                "required": ["keyword"]
-            },
-            handler=self._handle_jd_search_products
-        )
-        
-        self.tools["jd_get_product_info"] = MCPTool(
-            name="jd_get_product_info",
-            description="获取京东商品信息",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "product_id": {"type": "string", "description": "商品ID"}
-                },
-                "required": ["product_id"]
-            },
-            handler=self._handle_jd_get_product_info
-        )
-        
-        # 淘宝专用工具
-        self.tools["taobao_search_products"] = MCPTool(
-            name="taobao_search_products",
-            description="搜索淘宝商品",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "keyword": {"type": "string", "description": "商品关键词"},
-                    "page": {"type": "integer", "description": "页码（可选）"}
-                },
-                "required": ["keyword"]
-            },
-            handler=self._handle_taobao_search_products
-        )
-        
-        self.tools["taobao_get_product_info"] = MCPTool(
-            name="taobao_get_product_info",
-            description="获取淘宝商品信息",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "product_id": {"type": "string", "description": "商品ID"}
-                },
-                "required": ["product_id"]
-            },
-            handler=self._handle_taobao_get_product_info
-        )
-        
-        # 高德地图专用工具
-        self.tools["amap_search_location"] = MCPTool(
-            name="amap_search_location",
-            description="搜索高德地图位置",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "keyword": {"type": "string", "description": "位置关键词"}
-                },
-                "required": ["keyword"]
-            },
-            handler=self._handle_amap_search_location
-        )
-        
-        self.tools["amap_get_route"] = MCPTool(
-            name="amap_get_route",
-            description="获取高德地图路线",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "start": {"type": "string", "description": "起点"},
-                    "end": {"type": "string", "description": "终点"},
-                    "mode": {"type": "string", "description": "出行方式（driving/walking/transit）"}
-                },
-                "required": ["start", "end"]
-            },
-            handler=self._handle_amap_get_route
-        )
-        
-        # 拼多多专用工具
-        self.tools["pdd_search_products"] = MCPTool(
-            name="pdd_search_products",
-            description="搜索拼多多商品",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "keyword": {"type": "string", "description": "商品关键词"},
-                    "page": {"type": "integer", "description": "页码（可选）"}
-                },
-                "required": ["keyword"]
-            },
-            handler=self._handle_pdd_search_products
-        )
-        
-        self.tools["pdd_get_product_info"] = MCPTool(
-            name="pdd_get_product_info",
-            description="获取拼多多商品信息",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "product_id": {"type": "string", "description": "商品ID"}
-                },
-                "required": ["product_id"]
-            },
-            handler=self._handle_pdd_get_product_info
-        )
-        
-        # 抖音专用工具
-        self.tools["douyin_search_videos"] = MCPTool(
-            name="douyin_search_videos",
-            description="搜索抖音视频",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "keyword": {"type": "string", "description": "视频关键词"}
-                },
-                "required": ["keyword"]
-            },
-            handler=self._handle_douyin_search_videos
-        )
-        
-        self.tools["douyin_get_video_info"] = MCPTool(
-            name="douyin_get_video_info",
-            description="获取抖音视频信息",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "video_id": {"type": "string", "description": "视频ID"}
-                },
-                "required": ["video_id"]
-            },
-            handler=self._handle_douyin_get_video_info
-        )
-        
-        # 快手专用工具
-        self.tools["kuaishou_search_videos"] = MCPTool(
-            name="kuaishou_search_videos",
-            description="搜索快手视频",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "keyword": {"type": "string", "description": "视频关键词"}
-                },
-                "required": ["keyword"]
-            },
-            handler=self._handle_kuaishou_search_videos
-        )
-        
-        self.tools["kuaishou_get_video_info"] = MCPTool(
-            name="kuaishou_get_video_info",
-            description="获取快手视频信息",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "video_id": {"type": "string", "description": "视频ID"}
-                },
-                "required": ["video_id"]
-            },
-            handler=self._handle_kuaishou_get_video_info
-        )
-        
-        # 桌面软件集成工具
-        self.tools["software_launch"] = MCPTool(
-            name="software_launch",
-            description="启动桌面软件",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "software_name": {"type": "string", "description": "软件名称（wps/wechat/qq）"}
-                },
-                "required": ["software_name"]
-            },
-            handler=self._handle_software_launch
-        )
-        
-        self.tools["software_info"] = MCPTool(
-            name="software_info",
-            description="获取软件信息",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "software_name": {"type": "string", "description": "软件名称（wps/wechat/qq）"}
-                },
-                "required": ["software_name"]
-            },
-            handler=self._handle_software_info
-        )
-        
-        self.tools["software_list"] = MCPTool(
-            name="software_list",
-            description="列出所有可用软件",
-            input_schema={
-                "type": "object",
-                "properties": {}
-            },
-            handler=self._handle_software_list
-        )
-        
-        # WPS Office专用工具
-        self.tools["wps_open_document"] = MCPTool(
-            name="wps_open_document",
-            description="打开WPS文档",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "file_path": {"type": "string", "description": "文档路径（可选）"}
-                }
-            },
-            handler=self._handle_wps_open_document
-        )
-        
-        self.tools["wps_create_document"] = MCPTool(
-            name="wps_create_document",
-            description="创建WPS文档",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "doc_type": {"type": "string", "description": "文档类型（writer/et/wpp）"}
-                }
-            },
-            handler=self._handle_wps_create_document
-        )
-        
-        # 微信专用工具
-        self.tools["wechat_send_message"] = MCPTool(
-            name="wechat_send_message",
-            description="发送微信消息",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "contact": {"type": "string", "description": "联系人"},
-                    "message": {"type": "string", "description": "消息内容"}
-                }
-            },
-            handler=self._handle_wechat_send_message
-        )
-        
-        self.tools["wechat_open_chat"] = MCPTool(
-            name="wechat_open_chat",
-            description="打开微信聊天窗口",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "contact": {"type": "string", "description": "联系人"}
-                }
-            },
-            handler=self._handle_wechat_open_chat
-        )
-        
-        # QQ专用工具
-        self.tools["qq_send_message"] = MCPTool(
-            name="qq_send_message",
-            description="发送QQ消息",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "contact": {"type": "string", "description": "联系人"},
-                    "message": {"type": "string", "description": "消息内容"}
-                }
-            },
-            handler=self._handle_qq_send_message
-        )
-        
-        self.tools["qq_open_chat"] = MCPTool(
-            name="qq_open_chat",
-            description="打开QQ聊天窗口",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "contact": {"type": "string", "description": "联系人"}
-                }
-            },
-            handler=self._handle_qq_open_chat
-        )
-        
-        # 凭据数据库工具
-        self.tools["credential_add"] = MCPTool(
-            name="credential_add",
-            description="添加用户凭据",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "username": {"type": "string", "description": "用户名"},
-                    "account": {"type": "string", "description": "账号"},
-                    "password": {"type": "string", "description": "密码"},
-                    "application": {"type": "string", "description": "应用名称"},
-                    "contact": {"type": "string", "description": "联系方式"},
-                    "website_url": {"type": "string", "description": "网站URL"},
-                    "notes": {"type": "string", "description": "备注"}
-                },
-                "required": ["username", "account", "password", "application"]
-            },
-            handler=self._handle_credential_add
-        )
-        
-        self.tools["credential_get"] = MCPTool(
-            name="credential_get",
-            description="获取用户凭据",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "credential_id": {"type": "integer", "description": "凭据ID"}
-                },
-                "required": ["credential_id"]
-            },
-            handler=self._handle_credential_get
-        )
-        
-        self.tools["credential_list"] = MCPTool(
-            name="credential_list",
-            description="获取凭据列表",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "application": {"type": "string", "description": "应用名称（可选）"},
-                    "category": {"type": "string", "description": "分类（可选）"}
-                }
-            },
-            handler=self._handle_credential_list
-        )
-        
-        self.tools["credential_update"] = MCPTool(
-            name="credential_update",
-            description="更新用户凭据",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "credential_id": {"type": "integer", "description": "凭据ID"},
-                    "username": {"type": "string", "description": "用户名"},
-                    "account": {"type": "string", "description": "账号"},
-                    "password": {"type": "string", "description": "密码"},
-                    "application": {"type": "string", "description": "应用名称"},
-                    "contact": {"type": "string", "description": "联系方式"},
-                    "website_url": {"type": "string", "description": "网站URL"},
-                    "notes": {"type": "string", "description": "备注"}
-                },
-                "required": ["credential_id"]
-            },
-            handler=self._handle_credential_update
-        )
-        
-        self.tools["credential_delete"] = MCPTool(
-            name="credential_delete",
-            description="删除用户凭据",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "credential_id": {"type": "integer", "description": "凭据ID"}
-                },
-                "required": ["credential_id"]
-            },
-            handler=self._handle_credential_delete
-        )
-        
-        self.tools["credential_search"] = MCPTool(
-            name="credential_search",
-            description="搜索用户凭据",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "keyword": {"type": "string", "description": "搜索关键词"}
-                },
-                "required": ["keyword"]
-            },
-            handler=self._handle_credential_search
-        )
-        
-        self.tools["credential_auto_fill"] = MCPTool(
-            name="credential_auto_fill",
-            description="自动填充凭据",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "application": {"type": "string", "description": "应用名称"},
-                    "website_url": {"type": "string", "description": "网站URL（可选）"}
-                },
-                "required": ["application"]
-            },
-            handler=self._handle_credential_auto_fill
-        )
-        
-        self.tools["credential_export"] = MCPTool(
-            name="credential_export",
-            description="导出凭据数据",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "format": {"type": "string", "description": "导出格式（json）"}
-                }
-            },
-            handler=self._handle_credential_export
-        )
-        
-        self.tools["credential_import"] = MCPTool(
-            name="credential_import",
-            description="导入凭据数据",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "data": {"type": "string", "description": "导入数据"},
-                    "format": {"type": "string", "description": "数据格式（json）"}
-                },
-                "required": ["data"]
-            },
-            handler=self._handle_credential_import
-        )
-        
-        self.tools["credential_categories"] = MCPTool(
-            name="credential_categories",
-            description="获取应用分类列表",
-            input_schema={
-                "type": "object",
-                "properties": {}
-            },
-            handler=self._handle_credential_categories
-        )
-        
-        # 自动填充工具
-        self.tools["auto_fill_website"] = MCPTool(
-            name="auto_fill_website",
-            description="为网站自动填充凭据",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "url": {"type": "string", "description": "网站URL"},
-                    "username_field": {"type": "string", "description": "用户名输入框标识"},
-                    "password_field": {"type": "string", "description": "密码输入框标识"}
-                },
-                "required": ["url"]
-            },
-            handler=self._handle_auto_fill_website
-        )
-        
-        self.tools["auto_fill_application"] = MCPTool(
-            name="auto_fill_application",
-            description="为应用自动填充凭据",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "app_name": {"type": "string", "description": "应用名称"},
-                    "username_field": {"type": "string", "description": "用户名输入框标识"},
-                    "password_field": {"type": "string", "description": "密码输入框标识"}
-                },
-                "required": ["app_name"]
-            },
-            handler=self._handle_auto_fill_application
-        )
-        
-        self.tools["smart_auto_fill"] = MCPTool(
-            name="smart_auto_fill",
-            description="智能自动填充凭据",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "identifier": {"type": "string", "description": "标识符（URL或应用名称）"},
-                    "identifier_type": {"type": "string", "description": "标识符类型（url/app/auto）"}
-                },
-                "required": ["identifier"]
-            },
-            handler=self._handle_smart_auto_fill
-        )
-        
-        self.tools["get_suggested_credentials"] = MCPTool(
-            name="get_suggested_credentials",
-            description="获取建议的凭据列表",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "application": {"type": "string", "description": "应用名称"},
-                    "limit": {"type": "integer", "description": "返回数量限制"}
-                },
-                "required": ["application"]
-            },
-            handler=self._handle_get_suggested_credentials
-        )
-        
-        self.tools["validate_credential_format"] = MCPTool(
-            name="validate_credential_format",
-            description="验证凭据格式",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "username": {"type": "string", "description": "用户名"},
-                    "password": {"type": "string", "description": "密码"},
-                    "application": {"type": "string", "description": "应用名称"}
-                },
-                "required": ["username", "password", "application"]
-            },
-            handler=self._handle_validate_credential_format
-        )
-        
-        self.tools["get_auto_fill_statistics"] = MCPTool(
-            name="get_auto_fill_statistics",
-            description="获取自动填充统计信息",
-            input_schema={
-                "type": "object",
-                "properties": {}
-            },
-            handler=self._handle_get_auto_fill_statistics
-        )
+        """按工具清单注册所有MCP工具，处理器为本类上的同名方法"""
+        for spec in server_specs():
+            self.tools[spec.name] = spec.to_tool(getattr(self, spec.handler))
+        self._manifest_version = self.tools.version
     
     async def list_tools(self) -> List[Dict[str, Any]]:
         """列出所有可用工具"""
+        return self._tool_descriptions()
+    
+    def _tool_descriptions(self) -> List[Dict[str, Any]]:
         return [
             {
                 "name": tool.name,
@@ -1222,6 +87,21 @@ class LAMMCPServer:
             for tool in self.tools.values()
         ]
     
+    def tools_list_result(self) -> Tuple[bytes, str]:
+        """tools/list 结果的编码字节串与内容哈希
+
+        工具表与清单一致时读取磁盘缓存（清单源文件未变时无需重新序列化）；工具表被修改后按当前内容重新编码。
+        """
+        version = self.tools.version
+        if self._tools_list is None or self._tools_list[0] != version:
+            from ..config import settings
+            if version == self._manifest_version and settings.lam_mcp_tools_list_cache:
+                data, digest = load_tools_list(settings.lam_mcp_tools_list_cache, self._tool_descriptions)
+            else:
+                data, digest = encode_tools_list(self._tool_descriptions())
+            self._tools_list = (version, data, digest)
+        return self._tools_list[1], self._tools_list[2]
+    
     async def call_tool(self, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """调用指定工具"""
         if name not in self.tools:
@@ -1232,41 +112,248 @@ class LAMMCPServer:
             }
         
         tool = self.tools[name]
-        
+        with self.tool_stats.track(name) as record:
+            result = await self._call_tool(tool, arguments, record)
+            if result.get("success"):
+                record.check_result(result["result"])
+            return result
+    
+    async def _call_tool(self, tool: MCPTool, arguments: Dict[str, Any], record: CallRecord) -> Dict[str, Any]:
+        """校验、准入并执行工具，失败时在 record 上登记错误类型"""
+        name = tool.name
         try:
-            # 验证输入参数
-            if not self._validate_arguments(arguments, tool.input_schema):
+            # 验证输入参数并填充默认值，无效调用在分派前即返回
+            try:
+                arguments = tool.validate(arguments)
+            except SchemaValidationError as e:
+                record.fail("validation")
                 return {
                     "success": False,
-                    "error": "输入参数验证失败"
+                    "error": f"输入参数验证失败: {e}"
                 }
             
-            # 执行工具
-            result = await tool.handler(arguments)
+            # 按执行类别分派，阻塞型处理器不会占用服务器事件循环；声明了缓存策略的幂等工具先查缓存，
+            # 缓存未命中时才按并发类别排队准入。调用被取消时立即返回，线程中的处理器在下一个检查点退出；
+            # 与其他请求合并的缓存填充只停止本请求的等待，由缓存在所有等待者都取消后再中止执行
+            async def run_tool() -> Any:
+                async with self.admission.slot(tool.concurrency):
+                    return await self.dispatcher.run(tool.handler, arguments, tool.execution)
+            
+            cache = get_tool_result_cache() if tool.cache is not None else None
+            try:
+                if cache is not None:
+                    result = await await_cancellable(cache.get_or_compute(name, tool.cache, arguments, run_tool))
+                else:
+                    result = await await_cancellable(run_tool())
+            except OperationCancelled as e:
+                logger.info(f"工具 '{name}' 已取消: {e.reason or e}")
+                record.fail("cancelled")
+                return {
+                    "success": False,
+                    "error": str(e),
+                    "cancelled": True
+                }
+            except AdmissionRejected as e:
+                record.fail("rejected")
+                return {
+                    "success": False,
+                    "error": str(e),
+                    "rejected": True,
+                    "retry_after": e.retry_after
+                }
             return {
                 "success": True,
                 "result": result
             }
         except Exception as e:
             logger.error(f"工具 '{name}' 执行失败: {e}")
+            record.fail(type(e).__name__)
             return {
                 "success": False,
                 "error": str(e)
             }
     
-    def _validate_arguments(self, arguments: Dict[str, Any], schema: Dict[str, Any]) -> bool:
-        """简单的参数验证"""
-        # 这里可以实现更复杂的JSON Schema验证
-        # 目前只检查必需字段
-        required_fields = schema.get("required", [])
-        for field in required_fields:
-            if field not in arguments:
-                return False
-        return True
+    async def call_tools_batch(self, calls: List[Any]) -> List[Dict[str, Any]]:
+        """并发执行一批相互独立的工具调用，结果按请求顺序返回
+
+        每项按各自工具的执行类别分派（受对应执行池的并发上限约束）；单项失败只体现在该项结果中。
+        """
+        async def run(call: Any) -> Dict[str, Any]:
+            if not isinstance(call, dict) or not isinstance(call.get("name"), str):
+                return {"success": False, "error": "批量调用项缺少工具名称"}
+            arguments = call.get("arguments") or {}
+            if not isinstance(arguments, dict):
+                return {"success": False, "error": "批量调用项的 arguments 必须是对象"}
+            return await self.call_tool(call["name"], arguments)
+
+        return list(await asyncio.gather(*[run(call) for call in calls]))
+    
+    async def call_tool_with_progress(self, name: str, arguments: Dict[str, Any],
+                                      progress_token: Any, notify: Notifier) -> Dict[str, Any]:
+        """调用工具，并把执行期间上报的进度事件作为 notifications/progress 推送给客户端"""
+        loop = asyncio.get_running_loop()
+        pending = set()
+        sequence = itertools.count(1)
+
+        def send(event: Dict[str, Any]) -> None:
+            params = {"progressToken": progress_token, "progress": next(sequence),
+                      "message": event.get("message", ""), "event": event}
+            if "total" in event:
+                params["total"] = event["total"]
+            task = asyncio.ensure_future(notify("notifications/progress", params))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        def forward(event: Dict[str, Any]) -> None:
+            # 事件可能来自执行器线程，统一切回事件循环发送
+            loop.call_soon_threadsafe(send, event)
+
+        with progress_scope(forward):
+            report_progress(STEP_STARTED, f"开始执行工具 {name}", tool=name)
+            result = await self.call_tool(name, arguments)
+            report_progress(STEP_FINISHED, f"工具 {name} 执行结束", tool=name, success=bool(result.get("success")))
+        # 进度通知先于响应写出，客户端收到结果时事件流已完整
+        await asyncio.sleep(0)
+        if pending:
+            await asyncio.gather(*list(pending), return_exceptions=True)
+        return result
+
+    def cancel_request(self, request_id: Any, reason: Optional[str] = None) -> bool:
+        """取消执行中的请求；请求不存在或已结束时返回 False"""
+        token = self._cancel_tokens.get(request_id)
+        if token is None:
+            return False
+        logger.info(f"取消MCP请求 {request_id}: {reason or '客户端取消'}")
+        return token.cancel(reason or "客户端取消")
+
+    @contextmanager
+    def _cancellable_request(self, request_id: Any) -> Iterator[CancelToken]:
+        """为一次请求创建取消令牌；处理协程本身被取消（如进程内调用超时）时同样取消工具执行"""
+        token = CancelToken()
+        if request_id is not None:
+            self._cancel_tokens[request_id] = token
+        try:
+            with cancel_scope(token):
+                yield token
+        except asyncio.CancelledError:
+            token.cancel("请求已中止")
+            raise
+        finally:
+            if request_id is not None and self._cancel_tokens.get(request_id) is token:
+                del self._cancel_tokens[request_id]
+
+    def _negotiate_blob_refs(self, blob_refs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """按客户端声明启用大字符串引用，返回在 initialize 结果中告知客户端的引用目录"""
+        self.blob_min_bytes = int(blob_refs.get("minBytes") or 0)
+        if not self.blob_min_bytes:
+            return None
+        requested = blob_refs.get("dir")
+        if isinstance(requested, str) and os.path.isdir(requested):
+            self.cleanup_blob_dir()
+            self.blob_dir, self._owns_blob_dir = requested, False
+        elif self.blob_dir is None or not self._owns_blob_dir:
+            self.blob_dir = tempfile.mkdtemp(prefix="lam-mcp-blobs-")
+            self._owns_blob_dir = True
+        return {"dir": self.blob_dir}
+    
+    def cleanup_blob_dir(self) -> None:
+        """删除服务器自建的引用目录（客户端指定的目录由客户端负责清理）"""
+        if self.blob_dir and self._owns_blob_dir:
+            shutil.rmtree(self.blob_dir, ignore_errors=True)
+    
+    async def _externalize(self, result: Any) -> Any:
+        """把结果中的大字符串写入临时文件，响应只携带引用"""
+        return await asyncio.to_thread(externalize_strings, result, self.blob_min_bytes, self.blob_dir)
+    
+    async def handle_message(self, message: Dict[str, Any],
+                             notify: Optional[Notifier] = None) -> Optional[Dict[str, Any]]:
+        """处理一条JSON-RPC消息，通知（无id）返回None
+
+        notify 用于在请求处理期间向客户端推送通知；tools/call 携带 _meta.progressToken 时据此发送进度。
+        """
+        request_id = message.get("id")
+        method = message.get("method")
+        params = message.get("params") or {}
+        try:
+            if not isinstance(method, str):
+                raise JSONRPCError(JSONRPCError.INVALID_REQUEST, "缺少method字段")
+            if method == "initialize":
+                # 工具列表的内容哈希：客户端已缓存相同内容时可跳过 tools/list
+                _, tools_hash = self.tools_list_result()
+                experimental: Dict[str, Any] = {"lamToolsHash": tools_hash}
+                blob_refs = ((params.get("capabilities") or {}).get("experimental") or {}).get("lamBlobRefs")
+                if isinstance(blob_refs, dict):
+                    announced = self._negotiate_blob_refs(blob_refs)
+                    if announced is not None:
+                        experimental["lamBlobRefs"] = announced
+                result = {
+                    "protocolVersion": params.get("protocolVersion", "2024-11-05"),
+                    "capabilities": {"tools": {}, "experimental": experimental},
+                    "serverInfo": SERVER_INFO
+                }
+            elif method == "tools/list":
+                # 预先编码的结果按原字节写出
+                result = RawJSON(self.tools_list_result()[0])
+            elif method == "tools/call":
+                if not isinstance(params.get("name"), str):
+                    raise JSONRPCError(JSONRPCError.INVALID_PARAMS, "tools/call 缺少工具名称")
+                progress_token = (params.get("_meta") or {}).get("progressToken")
+                with self._cancellable_request(request_id):
+                    if progress_token is not None and notify is not None:
+                        result = await self.call_tool_with_progress(
+                            params["name"], params.get("arguments") or {}, progress_token, notify)
+                    else:
+                        result = await self.call_tool(params["name"], params.get("arguments") or {})
+                if self.blob_min_bytes:
+                    result = await self._externalize(result)
+            elif method == "tools/call_batch":
+                if not isinstance(params.get("calls"), list):
+                    raise JSONRPCError(JSONRPCError.INVALID_PARAMS, "tools/call_batch 缺少 calls 列表")
+                with self._cancellable_request(request_id):
+                    result = {"results": await self.call_tools_batch(params["calls"])}
+                if self.blob_min_bytes:
+                    result = await self._externalize(result)
+            elif method == "metrics/collect":
+                # 本进程的指标（工具统计、准入、缓存、浏览器），由客户端合并到API的 /metrics
+                result = {"processes": [{"pid": os.getpid(),
+                                         "families": dump_families(get_metrics_registry().collect())}]}
+            elif method == "ping":
+                result = {}
+            elif method == "notifications/cancelled":
+                self.cancel_request(params.get("requestId"), params.get("reason"))
+                return None
+            elif method.startswith("notifications/"):
+                return None
+            else:
+                raise JSONRPCError(JSONRPCError.METHOD_NOT_FOUND, f"未知方法: {method}")
+        except JSONRPCError as e:
+            if request_id is None:
+                return None
+            return {"jsonrpc": "2.0", "id": request_id, "error": e.to_dict()}
+        except Exception as e:
+            logger.error(f"处理MCP请求 '{method}' 失败: {e}")
+            if request_id is None:
+                return None
+            return {"jsonrpc": "2.0", "id": request_id,
+                    "error": JSONRPCError(JSONRPCError.INTERNAL_ERROR, str(e)).to_dict()}
+        if request_id is None:
+            return None
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
     
     # 工具处理器方法
+    async def _handle_server_stats(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """处理服务器统计"""
+        cache = get_tool_result_cache()
+        return {
+            "tools": self.tool_stats.snapshot(args.get("tools")),
+            "cache": cache.stats() if cache is not None else {"enabled": False},
+            "active_calls": self.dispatcher.active(),
+            "concurrency": self.admission.stats(),
+        }
+    
     async def _handle_web_automate(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理网页自动化"""
+        from src.tools.browser import automate_page
         url = args["url"]
         steps = args.get("steps", [])
         
@@ -1275,6 +362,7 @@ class LAMMCPServer:
     
     async def _handle_bilibili_search_play(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理B站搜索播放"""
+        from src.tools.bilibili_integration import BilibiliIntegration
         up_name = args["up_name"]
         keep_open_seconds = args.get("keep_open_seconds", 60)
         keep_open_ms = int(keep_open_seconds * 1000)
@@ -1307,6 +395,7 @@ class LAMMCPServer:
     
     async def _handle_web_search(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理网络搜索"""
+        from src.tools.search import web_search
         query = args["query"]
         max_results = args.get("max_results", 5)
         
@@ -1355,26 +444,36 @@ class LAMMCPServer:
         
         try:
             import subprocess
-            result = subprocess.run(
+            # 命令在独立的进程组中运行，取消或超时时连同其子进程一起结束
+            process = subprocess.Popen(
                 command,
                 shell=True,
-                capture_output=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 text=True,
-                timeout=timeout
+                start_new_session=os.name != "nt"
             )
+            with on_cancel(lambda: _kill_process_tree(process)):
+                try:
+                    stdout, stderr = process.communicate(timeout=timeout)
+                except subprocess.TimeoutExpired:
+                    _kill_process_tree(process)
+                    process.communicate()
+                    return {"error": "命令执行超时"}
+            if is_cancelled():
+                return {"error": "命令已取消", "cancelled": True}
             return {
                 "command": command,
-                "return_code": result.returncode,
-                "stdout": result.stdout,
-                "stderr": result.stderr
+                "return_code": process.returncode,
+                "stdout": stdout,
+                "stderr": stderr
             }
-        except subprocess.TimeoutExpired:
-            return {"error": "命令执行超时"}
         except Exception as e:
             return {"error": str(e)}
     
     async def _handle_fetch_page(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理网页内容抓取"""
+        from src.tools.browser import fetch_page
         url = args["url"]
         wait_selector = args.get("wait_selector")
         timeout_ms = args.get("timeout_ms", 15000)
@@ -1535,6 +634,7 @@ class LAMMCPServer:
     
     async def _handle_bilibili_open_up(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理B站UP主页打开"""
+        from src.tools.bilibili_integration import BilibiliIntegration
         up_name = args["up_name"]
         keep_open_seconds = args.get("keep_open_seconds", 60)
         keep_open_ms = int(keep_open_seconds * 1000)
@@ -1569,8 +669,9 @@ class LAMMCPServer:
         except Exception as e:
             return {"error": f"获取天气失败: {str(e)}"}
     
-    async def _handle_calculate(self, args: Dict[str, Any]) -> Dict[str, Any]:
-        """处理数学计算"""
+    @staticmethod
+    async def _handle_calculate(args: Dict[str, Any]) -> Dict[str, Any]:
+        """处理数学计算（静态方法，可序列化到CPU进程池执行）"""
         expression = args["expression"]
         
         try:
@@ -1632,6 +733,7 @@ class LAMMCPServer:
     # Steam集成工具处理器
     async def _handle_steam_get_library(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理Steam游戏库获取"""
+        from src.tools.steam_integration import steam_integration
         try:
             result = steam_integration.get_game_library()
             return result
@@ -1640,6 +742,7 @@ class LAMMCPServer:
     
     async def _handle_steam_get_recent_activity(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理Steam最近活动获取"""
+        from src.tools.steam_integration import steam_integration
         try:
             result = steam_integration.get_recent_activity()
             return result
@@ -1648,6 +751,7 @@ class LAMMCPServer:
     
     async def _handle_steam_get_game_details(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理Steam游戏详情获取"""
+        from src.tools.steam_integration import steam_integration
         appid = args["appid"]
         try:
             result = steam_integration.get_game_details(appid)
@@ -1657,6 +761,7 @@ class LAMMCPServer:
     
     async def _handle_steam_get_friend_comparison(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理Steam朋友比较"""
+        from src.tools.steam_integration import steam_integration
         try:
             result = steam_integration.get_friend_comparison()
             return result
@@ -1665,6 +770,7 @@ class LAMMCPServer:
     
     async def _handle_steam_open_store(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理Steam商店打开"""
+        from src.tools.steam_integration import steam_integration
         game_name = args.get("game_name", "")
         try:
             result = steam_integration.open_steam_store(game_name)
@@ -1674,6 +780,7 @@ class LAMMCPServer:
     
     async def _handle_steam_analyze_habits(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理Steam游戏习惯分析"""
+        from src.tools.steam_integration import steam_integration
         try:
             result = steam_integration.analyze_gaming_habits()
             return result
@@ -1682,6 +789,7 @@ class LAMMCPServer:
     
     async def _handle_steam_get_recommendations(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理Steam游戏推荐"""
+        from src.tools.steam_integration import steam_integration
         try:
             result = steam_integration.get_game_recommendations()
             return result
@@ -1690,6 +798,7 @@ class LAMMCPServer:
     
     async def _handle_steam_download_game(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理Steam游戏下载"""
+        from src.tools.steam_integration import steam_integration
         try:
             appid = args.get("appid")
             if not appid:
@@ -1701,6 +810,7 @@ class LAMMCPServer:
     
     async def _handle_steam_uninstall_game(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理Steam游戏卸载"""
+        from src.tools.steam_integration import steam_integration
         try:
             appid = args.get("appid")
             if not appid:
@@ -1713,6 +823,7 @@ class LAMMCPServer:
     # Bilibili集成工具处理器
     async def _handle_bilibili_get_user_profile(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理Bilibili用户资料获取"""
+        from src.tools.bilibili_integration import bilibili_integration
         uid = args["uid"]
         try:
             result = bilibili_integration.get_user_profile(uid)
@@ -1722,6 +833,7 @@ class LAMMCPServer:
     
     async def _handle_bilibili_search_videos(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理Bilibili视频搜索"""
+        from src.tools.bilibili_integration import bilibili_integration
         keyword = args["keyword"]
         page = args.get("page", 1)
         pagesize = args.get("pagesize", 20)
@@ -1733,6 +845,7 @@ class LAMMCPServer:
     
     async def _handle_bilibili_get_video_details(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理Bilibili视频详情获取"""
+        from src.tools.bilibili_integration import bilibili_integration
         bvid = args["bvid"]
         try:
             result = bilibili_integration.get_video_details(bvid)
@@ -1742,6 +855,7 @@ class LAMMCPServer:
     
     async def _handle_bilibili_get_user_videos(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理Bilibili用户视频获取"""
+        from src.tools.bilibili_integration import bilibili_integration
         uid = args["uid"]
         page = args.get("page", 1)
         pagesize = args.get("pagesize", 20)
@@ -1753,6 +867,7 @@ class LAMMCPServer:
     
     async def _handle_bilibili_get_following_list(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理Bilibili关注列表获取"""
+        from src.tools.bilibili_integration import bilibili_integration
         uid = args["uid"]
         page = args.get("page", 1)
         pagesize = args.get("pagesize", 20)
@@ -1764,6 +879,7 @@ class LAMMCPServer:
     
     async def _handle_bilibili_get_favorites(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理Bilibili收藏获取"""
+        from src.tools.bilibili_integration import bilibili_integration
         uid = args["uid"]
         page = args.get("page", 1)
         pagesize = args.get("pagesize", 20)
@@ -1775,6 +891,7 @@ class LAMMCPServer:
     
     async def _handle_bilibili_get_watch_later(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理Bilibili稍后再看获取"""
+        from src.tools.bilibili_integration import bilibili_integration
         page = args.get("page", 1)
         pagesize = args.get("pagesize", 20)
         try:
@@ -1785,6 +902,7 @@ class LAMMCPServer:
     
     async def _handle_bilibili_get_user_statistics(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理Bilibili用户统计获取"""
+        from src.tools.bilibili_integration import bilibili_integration
         uid = args["uid"]
         try:
             result = bilibili_integration.get_user_statistics(uid)
@@ -1794,6 +912,7 @@ class LAMMCPServer:
     
     async def _handle_bilibili_open_video(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理Bilibili视频打开"""
+        from src.tools.bilibili_integration import bilibili_integration
         bvid = args["bvid"]
         try:
             result = bilibili_integration.open_bilibili_video(bvid)
@@ -1803,6 +922,7 @@ class LAMMCPServer:
     
     async def _handle_bilibili_open_user(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理Bilibili用户主页打开"""
+        from src.tools.bilibili_integration import bilibili_integration
         uid = args["uid"]
         try:
             result = bilibili_integration.open_bilibili_user(uid)
@@ -2242,37 +1362,6 @@ class LAMMCPServer:
         except Exception as e:
             return {"error": f"获取自动填充统计失败: {str(e)}"}
     
-    def _register_auto_login_tools(self):
-        """注册自动登录工具"""
-        
-        # 网站自动登录工具
-        self.tools["website_auto_login"] = MCPTool(
-            name="website_auto_login",
-            description="为指定网站执行自动登录操作",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "url": {"type": "string", "description": "目标网站URL"}
-                },
-                "required": ["url"]
-            },
-            handler=self._handle_website_auto_login
-        )
-        
-        # 网站登录状态检查工具
-        self.tools["check_login_status"] = MCPTool(
-            name="check_login_status",
-            description="检查网站是否需要登录以及是否有对应凭据",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "url": {"type": "string", "description": "目标网站URL"}
-                },
-                "required": ["url"]
-            },
-            handler=self._handle_check_login_status
-        )
-    
     async def _handle_website_auto_login(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """处理网站自动登录"""
         try:
@@ -2291,21 +1380,68 @@ class LAMMCPServer:
         except Exception as e:
             return {"error": f"登录状态检查失败: {str(e)}"}
 
-# 全局MCP服务器实例
-mcp_server = LAMMCPServer()
+def _kill_process_tree(process) -> None:
+    """结束子进程及其所在进程组"""
+    if process.poll() is not None:
+        return
+    try:
+        if os.name != "nt":
+            import signal
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+# 全局MCP服务器实例（首次访问时创建）
+_mcp_server: Optional[LAMMCPServer] = None
+_mcp_server_lock = threading.Lock()
+
+def get_mcp_server() -> LAMMCPServer:
+    """获取全局MCP服务器实例"""
+    global _mcp_server
+    if _mcp_server is None:
+        with _mcp_server_lock:
+            if _mcp_server is None:
+                _mcp_server = LAMMCPServer()
+    return _mcp_server
+
+def __getattr__(name: str) -> Any:
+    # 兼容旧的 `from src.mcp.server import mcp_server` 写法
+    if name == "mcp_server":
+        return get_mcp_server()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 async def main():
-    """MCP服务器主函数"""
-    print("LAM-Agent MCP服务器启动中...")
-    
-    # 列出所有工具
-    tools = await mcp_server.list_tools()
-    print(f"已注册 {len(tools)} 个工具:")
-    for tool in tools:
-        print(f"  - {tool['name']}: {tool['description']}")
-    
-    # 这里可以添加MCP协议的stdin/stdout通信逻辑
-    # 目前只是演示工具注册和调用
+    """MCP服务器主函数：在stdin/stdout上提供按行分隔的JSON-RPC服务"""
+    mcp_server = get_mcp_server()
+    if "--list-tools" in sys.argv:
+        tools = await mcp_server.list_tools()
+        print(f"已注册 {len(tools)} 个工具:")
+        for tool in tools:
+            print(f"  - {tool['name']}: {tool['description']}")
+        return
+    
+    # stdout专用于协议消息，工具内部的print输出转到stderr
+    protocol_out = sys.stdout.buffer
+    sys.stdout = sys.stderr
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    logger.info(f"LAM-Agent MCP服务器已启动，已注册 {len(mcp_server.tools)} 个工具")
+    from ..config import settings
+    # 可选：定期把各工具的运行统计追加到JSONL文件，便于跨版本比较延迟
+    dumper = None
+    if settings.lam_mcp_stats_dump_path:
+        dumper = StatsDumper(mcp_server.tool_stats, settings.lam_mcp_stats_dump_path,
+                             settings.lam_mcp_stats_dump_interval,
+                             labels={"server": SERVER_INFO["name"], "version": SERVER_INFO["version"]}).start()
+    try:
+        await serve_stdio(mcp_server.handle_message, stdout=protocol_out,
+                          frame_threshold=settings.lam_mcp_frame_threshold)
+    finally:
+        if dumper is not None:
+            dumper.stop()
+        mcp_server.cleanup_blob_dir()
 
 if __name__ == "__main__":
     asyncio.run(main())
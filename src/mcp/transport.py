@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+MCP传输层
+客户端：通过 asyncio 子进程与服务器交换JSON-RPC消息（orjson编码的bytes，按行或长度前缀帧，见 codec），
+请求按唯一id路由，支持任意数量的并发请求；也可以使用进程内传输直接调用本进程的服务器。
+服务器：逐条读取stdin并发处理请求，响应写回stdout。
+"""
+
+import asyncio
+import itertools
+import logging
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .codec import RawJSON, encode_frame, frame_length, loads
+
+logger = logging.getLogger(__name__)
+
+# 单条消息的最大长度（StreamReader默认64KB，网页抓取结果可能更大）
+MAX_LINE_BYTES = 32 * 1024 * 1024
+# 超过该字节数的消息使用长度前缀帧发送（见 codec.encode_frame），0表示始终按行
+FRAME_THRESHOLD = 64 * 1024
+
+NotificationHandler = Callable[[str, Dict[str, Any]], None]
+# 服务器端推送通知: notify(method, params)
+Notifier = Callable[[str, Optional[Dict[str, Any]]], Awaitable[None]]
+
+
+class JSONRPCError(Exception):
+    """JSON-RPC错误响应"""
+
+    PARSE_ERROR = -32700
+    INVALID_REQUEST = -32600
+    METHOD_NOT_FOUND = -32601
+    INVALID_PARAMS = -32602
+    INTERNAL_ERROR = -32603
+
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+
+    def to_dict(self) -> Dict[str, Any]:
+        error = {"code": self.code, "message": self.message}
+        if self.data is not None:
+            error["data"] = self.data
+        return error
+
+
+class _LoopThread:
+    """在后台线程中运行的事件循环
+
+    子进程管道绑定在创建它的事件循环上，而调用方（如 LamAgent 中的 asyncio.run）
+    每次都可能使用新的事件循环，因此传输层的所有IO都放在这个常驻循环中执行。
+    """
+
+    def __init__(self, name: str):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    async def call(self, coro: Awaitable[Any]) -> Any:
+        """在IO循环中执行协程，并在调用方的事件循环中等待结果"""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        return await asyncio.wrap_future(future)
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+        self.loop.close()
+
+
+class StdioTransport:
+    """基于子进程stdio的多路复用JSON-RPC客户端传输"""
+
+    def __init__(self, command: List[str], request_timeout: Optional[float] = None,
+                 on_notification: Optional[NotificationHandler] = None, frame_threshold: int = FRAME_THRESHOLD):
+        self.command = list(command)
+        self.request_timeout = request_timeout
+        self.on_notification = on_notification
+        self.frame_threshold = frame_threshold
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self._io: Optional[_LoopThread] = None
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._closed_error: Optional[BaseException] = None
+
+    @property
+    def is_running(self) -> bool:
+        # 服务器关闭输出后即不可用，即使进程尚未被回收
+        return self.process is not None and self.process.returncode is None and self._closed_error is None
+
+    @property
+    def in_flight(self) -> int:
+        """尚未收到响应的请求数"""
+        return len(self._pending)
+
+    async def start(self) -> None:
+        """启动服务器子进程与读取任务"""
+        if self._io is None:
+            self._io = _LoopThread("mcp-stdio")
+        await self._io.call(self._start())
+
+    async def request(self, method: str, params: Optional[Dict[str, Any]] = None,
+                      timeout: Optional[float] = None) -> Dict[str, Any]:
+        """发送请求并等待对应id的响应，返回完整的JSON-RPC响应消息"""
+        if self._io is None:
+            raise RuntimeError("MCP传输未启动")
+        return await self._io.call(self._request(method, params, timeout or self.request_timeout))
+
+    async def notify(self, method: str, params: Optional[Dict[str, Any]] = None) -> None:
+        """发送通知（无响应）"""
+        if self._io is None:
+            raise RuntimeError("MCP传输未启动")
+        message: Dict[str, Any] = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        await self._io.call(self._write(message))
+
+    async def close(self, timeout: float = 3.0) -> None:
+        """关闭stdin让服务器自行退出，超时后终止进程"""
+        if self._io is None:
+            return
+        try:
+            await self._io.call(self._close(timeout))
+        finally:
+            self._io.stop()
+            self._io = None
+
+    async def _start(self) -> None:
+        self._closed_error = None
+        self.process = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=MAX_LINE_BYTES,
+        )
+        self._tasks = [
+            asyncio.create_task(self._read_loop()),
+            asyncio.create_task(self._drain_stderr()),
+        ]
+        logger.info(f"MCP服务器进程已启动: pid={self.process.pid}")
+
+    async def _request(self, method: str, params: Optional[Dict[str, Any]],
+                       timeout: Optional[float]) -> Dict[str, Any]:
+        if not self.is_running:
+            raise ConnectionError(f"MCP服务器连接已断开: {self._closed_error}")
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        message: Dict[str, Any] = {"jsonrpc": "2.0", "id": request_id, "method": method}
+        if params is not None:
+            message["params"] = params
+        try:
+            await self._write(message)
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self._cancel_remote(method, request_id, "请求超时")
+            raise
+        except asyncio.CancelledError:
+            self._cancel_remote(method, request_id, "请求已被调用方取消")
+            raise
+        finally:
+            self._pending.pop(request_id, None)
+
+    def _cancel_remote(self, method: str, request_id: int, reason: str) -> None:
+        """调用方放弃等待时通知服务器取消该请求（initialize 不可取消）"""
+        if method == "initialize" or not self.is_running:
+            return
+        task = asyncio.ensure_future(self._write(
+            {"jsonrpc": "2.0", "method": "notifications/cancelled",
+             "params": {"requestId": request_id, "reason": reason}}))
+        self._tasks.append(task)
+        task.add_done_callback(self._forget_task)
+
+    def _forget_task(self, task: asyncio.Task) -> None:
+        if task in self._tasks:
+            self._tasks.remove(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"发送取消通知失败: {task.exception()}")
+
+    async def _write(self, message: Dict[str, Any]) -> None:
+        if self.process is None or self.process.stdin is None:
+            raise ConnectionError("MCP服务器未启动")
+        data = encode_frame(message, self.frame_threshold)
+        # 单次write写入整条消息，多个协程并发写时不会交错
+        self.process.stdin.write(data)
+        await self.process.stdin.drain()
+
+    async def _read_loop(self) -> None:
+        reader = self.process.stdout
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                length = frame_length(line)
+                if length is not None:
+                    line = await reader.readexactly(length)
+                try:
+                    message = loads(line)
+                except ValueError:
+                    logger.warning(f"忽略无法解析的MCP消息: {line[:200]!r}")
+                    continue
+                self._dispatch(message)
+            self._fail_pending(ConnectionError("MCP服务器已关闭输出"))
+        except Exception as e:
+            logger.error(f"读取MCP响应失败: {e}")
+            self._fail_pending(e)
+
+    def _dispatch(self, message: Dict[str, Any]) -> None:
+        if "id" in message and ("result" in message or "error" in message):
+            future = self._pending.get(message["id"])
+            if future is not None and not future.done():
+                future.set_result(message)
+            return
+        if "method" in message and self.on_notification is not None:
+            try:
+                self.on_notification(message["method"], message.get("params") or {})
+            except Exception as e:
+                logger.warning(f"处理MCP通知失败: {e}")
+
+    async def _drain_stderr(self) -> None:
+        # 必须持续读取stderr，否则服务器日志写满管道后会阻塞
+        while True:
+            line = await self.process.stderr.readline()
+            if not line:
+                return
+            logger.debug(f"[mcp-server] {line.decode('utf-8', 'replace').rstrip()}")
+
+    def _fail_pending(self, error: BaseException) -> None:
+        self._closed_error = error
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError(str(error)))
+
+    async def _close(self, timeout: float) -> None:
+        process = self.process
+        if process is None:
+            return
+        if process.stdin is not None and not process.stdin.is_closing():
+            process.stdin.close()
+        try:
+            await asyncio.wait_for(process.wait(), timeout)
+        except asyncio.TimeoutError:
+            process.terminate()
+            try:
+                await asyncio.wait_for(process.wait(), timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._fail_pending(ConnectionError("MCP服务器已停止"))
+        self.process = None
+        logger.info("MCP服务器进程已停止")
+
+
+_in_process_ids = itertools.count(1)
+
+
+class InProcessTransport:
+    """进程内传输
+
+    与 StdioTransport 接口相同，但直接把JSON-RPC消息交给本进程的 LAMMCPServer.handle_message，
+    省去子进程启动、JSON序列化与管道往返；请求/响应结构与参数校验与stdio完全一致。
+    """
+
+    def __init__(self, server=None, request_timeout: Optional[float] = None,
+                 on_notification: Optional[NotificationHandler] = None):
+        self.server = server
+        self.request_timeout = request_timeout
+        self.on_notification = on_notification
+        self.process = None
+        self._in_flight = 0
+        self._running = False
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def start(self) -> None:
+        if self.server is None:
+            from .server import get_mcp_server
+            self.server = get_mcp_server()
+        self._running = True
+
+    async def request(self, method: str, params: Optional[Dict[str, Any]] = None,
+                      timeout: Optional[float] = None) -> Dict[str, Any]:
+        if not self._running:
+            raise RuntimeError("MCP传输未启动")
+        # 多个进程内传输共享同一个服务器实例，请求id需全局唯一才能按id取消
+        message: Dict[str, Any] = {"jsonrpc": "2.0", "id": next(_in_process_ids), "method": method}
+        if params is not None:
+            message["params"] = params
+        self._in_flight += 1
+        try:
+            response = await asyncio.wait_for(self.server.handle_message(message, self._deliver),
+                                              timeout or self.request_timeout)
+            # 预先编码的结果（如 tools/list）在进程内直接解析为对象
+            if response is not None and isinstance(response.get("result"), RawJSON):
+                response["result"] = response["result"].value
+            return response
+        finally:
+            self._in_flight -= 1
+
+    async def notify(self, method: str, params: Optional[Dict[str, Any]] = None) -> None:
+        if not self._running:
+            raise RuntimeError("MCP传输未启动")
+        message: Dict[str, Any] = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        await self.server.handle_message(message)
+
+    async def close(self, timeout: float = 3.0) -> None:
+        self._running = False
+
+    async def _deliver(self, method: str, params: Optional[Dict[str, Any]] = None) -> None:
+        """服务器推送的通知直接交给 on_notification，与stdio传输的分发行为一致"""
+        if self.on_notification is None:
+            return
+        try:
+            self.on_notification(method, params or {})
+        except Exception as e:
+            logger.warning(f"处理MCP通知失败: {e}")
+
+
+def create_transport(kind: str, command: List[str], request_timeout: Optional[float] = None,
+                     on_notification: Optional[NotificationHandler] = None, frame_threshold: int = FRAME_THRESHOLD,
+                     workers: int = 1, affinity: Optional[Dict[str, str]] = None):
+    """按类型创建客户端传输：stdio（子进程，workers>1时为多进程工作池）或 inprocess（进程内）"""
+    if kind == "inprocess":
+        return InProcessTransport(request_timeout=request_timeout, on_notification=on_notification)
+    if kind != "stdio":
+        raise ValueError(f"未知的MCP传输类型: {kind}")
+    if workers > 1:
+        from .pool import WorkerPool
+        return WorkerPool(command, size=workers, request_timeout=request_timeout, on_notification=on_notification,
+                          frame_threshold=frame_threshold, affinity=affinity)
+    return StdioTransport(command, request_timeout=request_timeout, on_notification=on_notification,
+                          frame_threshold=frame_threshold)
+
+
+async def serve_stdio(handle_message: Callable[[Dict[str, Any], Notifier], Awaitable[Optional[Dict[str, Any]]]],
+                      stdin=None, stdout=None, frame_threshold: int = FRAME_THRESHOLD) -> None:
+    """服务器端stdio循环
+
+    逐条读取JSON-RPC消息（按行或长度前缀帧），每条消息在独立任务中处理，因此多个请求可以同时进行；
+    handle_message 返回的响应（通知返回None）按完成顺序写回stdout，超过 frame_threshold 的响应使用长度前缀帧。
+    handle_message 的第二个参数 notify(method, params) 用于在处理期间向客户端推送通知（如进度）。
+    stdin读取与stdout写入放在线程中进行，兼容Windows下无法异步读取的匿名管道。
+    """
+    stdin = stdin or sys.stdin.buffer
+    stdout = stdout or sys.stdout.buffer
+    loop = asyncio.get_running_loop()
+    writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mcp-stdout")
+    tasks = set()
+
+    def write_message(message: Dict[str, Any]) -> None:
+        # 编码也在写线程中进行，大响应不会阻塞事件循环
+        stdout.write(encode_frame(message, frame_threshold))
+        stdout.flush()
+
+    def read_message() -> bytes:
+        line = stdin.readline()
+        length = frame_length(line)
+        return stdin.read(length) if length is not None else line
+
+    async def send(message: Dict[str, Any]) -> None:
+        await loop.run_in_executor(writer, write_message, message)
+
+    async def process(line: bytes) -> None:
+        try:
+            message = loads(line)
+        except ValueError as e:
+            await send({"jsonrpc": "2.0", "id": None,
+                        "error": JSONRPCError(JSONRPCError.PARSE_ERROR, f"解析错误: {e}").to_dict()})
+            return
+        response = await handle_message(message, notify)
+        if response is not None:
+            await send(response)
+
+    async def notify(method: str, params: Optional[Dict[str, Any]] = None) -> None:
+        message: Dict[str, Any] = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        await send(message)
+
+    try:
+        while True:
+            line = await loop.run_in_executor(None, read_message)
+            if not line:
+                break
+            if not line.strip():
+                continue
+            task = asyncio.create_task(process(line))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        # stdin关闭后等待进行中的请求完成再退出
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        writer.shutdown(wait=True)
@@ -1,4 +1,5 @@
 import logging
+from contextlib import ExitStack
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 from bs4 import BeautifulSoup
 from typing import Optional, Dict, Any, List
@@ -15,9 +16,19 @@ from .browser_config_safe import (
     get_proxy_config,
 )
 from .auto_login import auto_login_manager
+from ..utils.cancellation import cancellable_sleep, check_cancelled
+from ..utils.exceptions import OperationCancelled
+from ..utils.metrics import get_metrics_registry
+from ..utils.progress import LOG, iter_steps, report_progress
 
 logger = logging.getLogger(__name__)
 
+_metrics = get_metrics_registry()
+BROWSER_SESSIONS = _metrics.gauge(
+    "lam_browser_sessions_active", "当前打开的浏览器实例数（fetch: 抓取页面, automate: 自动化, lease: 预加载租约）", ("kind",))
+BROWSER_LAUNCH_SECONDS = _metrics.histogram(
+    "lam_browser_launch_seconds", "启动浏览器并创建页面的耗时", ("kind",))
+
 
 def fetch_page(url: str, wait_selector: Optional[str] = None, timeout_ms: int = 15000) -> Dict[str, Any]:
     """使用Playwright抓取网页内容"""
@@ -34,11 +45,12 @@ def fetch_page(url: str, wait_selector: Optional[str] = None, timeout_ms: int =
     
     try:
         logger.info(f"开始抓取页面: {url}")
-        with sync_playwright() as p:
+        with sync_playwright() as p, BROWSER_SESSIONS.track_inprogress(kind="fetch"):
             from .browser_config_safe import get_launch_kwargs
-            browser = p.chromium.launch(**get_launch_kwargs(headless=settings.lam_browser_headless))
-            context = browser.new_context(**get_safe_browser_context_config())
-            page = context.new_page()
+            with BROWSER_LAUNCH_SECONDS.time(kind="fetch"):
+                browser = p.chromium.launch(**get_launch_kwargs(headless=settings.lam_browser_headless))
+                context = browser.new_context(**get_safe_browser_context_config())
+                page = context.new_page()
             
             try:
                 page.goto(url, timeout=timeout_ms)
@@ -64,12 +76,71 @@ def fetch_page(url: str, wait_selector: Optional[str] = None, timeout_ms: int =
         raise RuntimeError(f"页面抓取失败: {str(e)}") from e
 
 
+class PageLease:
+    """预加载页面的浏览器租约
+
+    启动独立的浏览器实例并导航到指定URL，供随后的 automate_page 直接复用。
+    Playwright同步API与创建线程绑定，租约的创建、使用与关闭必须在同一线程中完成。
+    """
+
+    def __init__(self, url: str, headless: Optional[bool] = None, timeout_ms: int = 20000):
+        if not url or not url.strip():
+            raise ValueError("URL不能为空")
+        self.url = url
+        self.browser = None
+        self.context = None
+        self.page = None
+        self.closed = False
+        self._playwright = sync_playwright().start()
+        BROWSER_SESSIONS.inc(kind="lease")
+        try:
+            from .browser_config_safe import get_launch_kwargs
+            headless = headless if headless is not None else settings.lam_browser_headless
+            with BROWSER_LAUNCH_SECONDS.time(kind="lease"):
+                self.browser = self._playwright.chromium.launch(**get_launch_kwargs(headless=headless))
+                self.context = self.browser.new_context(**get_safe_browser_context_config())
+                self.page = self.context.new_page()
+            self.page.goto(url, timeout=timeout_ms)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        """关闭浏览器并停止Playwright（可重复调用）"""
+        if self.closed:
+            return
+        self.closed = True
+        BROWSER_SESSIONS.dec(kind="lease")
+        try:
+            if self.browser:
+                self.browser.close()
+        except Exception as e:
+            logger.debug(f"关闭租约浏览器失败: {e}")
+        try:
+            self._playwright.stop()
+        except Exception as e:
+            logger.debug(f"停止租约Playwright失败: {e}")
+
+
+def _wait_cancellable(page, ms: int, chunk_ms: int = 200) -> None:
+    """分段等待页面，每段之间检查是否已取消"""
+    import time
+    deadline = time.monotonic() + ms / 1000
+    while True:
+        check_cancelled()
+        remaining = int((deadline - time.monotonic()) * 1000)
+        if remaining <= 0:
+            return
+        page.wait_for_timeout(min(remaining, chunk_ms))
+
+
 def automate_page(
     url: str,
     steps: List[Dict[str, Any]],
     headless: Optional[bool] = None,
     timeout_ms: int = 20000,
     keep_open_ms: Optional[int] = None,
+    lease: Optional[PageLease] = None,
 ) -> Dict[str, Any]:
     """使用Playwright在真实浏览器中执行一系列页面操作。
 
@@ -81,6 +152,8 @@ def automate_page(
       - wait: { action: 'wait', selector, state: 'visible'|'attached'|'detached'|'hidden' }
       - sleep: { action: 'sleep', ms }
       - evaluate: { action: 'evaluate', script }  # 执行简单脚本
+    lease: 可选的预加载页面租约（PageLease），URL一致时跳过浏览器启动与首次导航，
+      执行结束后由本函数负责关闭。
     返回: { success, title, current_url, logs: [...], screenshot(optional) }
     """
     if not url or not url.strip():
@@ -90,21 +163,32 @@ def automate_page(
     headless = headless if headless is not None else settings.lam_browser_headless
 
     try:
-        with sync_playwright() as p:
-            from .browser_config_safe import get_launch_kwargs
-            browser = p.chromium.launch(**get_launch_kwargs(headless=headless))
-
-            context_kwargs = get_safe_browser_context_config()
-            context = browser.new_context(**context_kwargs)
-            page = context.new_page()
-
+        with ExitStack() as stack:
             def log(msg: str):
                 logger.info(msg)
                 logs.append(msg)
-
-            # 进入初始URL
-            log(f"打开页面: {url}")
-            page.goto(url, timeout=timeout_ms)
+                report_progress(LOG, msg)
+
+            if lease is not None and not lease.closed and lease.url == url:
+                stack.callback(lease.close)
+                browser, context, page = lease.browser, lease.context, lease.page
+                log(f"复用预加载页面: {url}")
+            else:
+                if lease is not None:
+                    lease.close()
+                p = stack.enter_context(sync_playwright())
+                stack.enter_context(BROWSER_SESSIONS.track_inprogress(kind="automate"))
+                from .browser_config_safe import get_launch_kwargs
+                with BROWSER_LAUNCH_SECONDS.time(kind="automate"):
+                    browser = p.chromium.launch(**get_launch_kwargs(headless=headless))
+
+                    context_kwargs = get_safe_browser_context_config()
+                    context = browser.new_context(**context_kwargs)
+                    page = context.new_page()
+
+                # 进入初始URL
+                log(f"打开页面: {url}")
+                page.goto(url, timeout=timeout_ms)
             
             # 检查是否需要自动登录
             try:
@@ -131,7 +215,7 @@ def automate_page(
             
             # 按用户要求：不再注入任何脚本，避免修改页面标签
 
-            for step in steps or []:
+            for step in iter_steps(steps or [], lambda st: st.get('action') or ''):
                 action = (step.get('action') or '').lower()
                 if action == 'goto':
                     u = step.get('url')
@@ -377,9 +461,8 @@ def automate_page(
                         raise RuntimeError("视频元素未就绪或尺寸过小")
                 elif action == 'sleep':
                     ms = int(step.get('ms', 500))
-                    import time
                     log(f"暂停: {ms}ms")
-                    time.sleep(ms/1000)
+                    cancellable_sleep(ms/1000)
                 elif action == 'evaluate':
                     script = step.get('script', '')
                     if not script:
@@ -643,7 +726,7 @@ def automate_page(
             try:
                 if keep_open_ms and keep_open_ms > 0:
                     log(f"保持页面打开 {keep_open_ms}ms")
-                    page.wait_for_timeout(keep_open_ms)
+                    _wait_cancellable(page, keep_open_ms)
             finally:
                 browser.close()
 
@@ -653,6 +736,15 @@ def automate_page(
             "current_url": current_url,
             "logs": logs,
         }
+    except OperationCancelled as e:
+        # 浏览器已随 ExitStack 关闭
+        logger.info(f"自动化已取消: {e}")
+        return {
+            "success": False,
+            "cancelled": True,
+            "error": str(e),
+            "logs": logs,
+        }
     except Exception as e:
         logger.error(f"自动化失败: {e}")
         return {
@@ -18,6 +18,7 @@ class OperationStep:
     query: str   # 搜索关键词
     order: int   # 执行顺序
     description: str  # 步骤描述
+    depends_on: Optional[List[int]] = None  # 依赖的步骤order；为空时按目标站点推断
 
 
 class NaturalLanguageParser:
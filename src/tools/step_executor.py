@@ -9,7 +9,9 @@ from typing import List, Dict, Any, Optional
 from .nl_parser import OperationStep
 from .browser import automate_page
 from .search import open_search_in_browser
+from .step_scheduler import DAGScheduler, StepNode, resolve_dependencies
 from ..config import settings
+from ..utils.progress import STEP_FINISHED, STEP_STARTED, report_progress
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +28,9 @@ class StepExecutor:
         """
         执行操作步骤列表
         
+        相互独立的步骤（不同目标站点、无显式依赖）并行执行；同一站点的步骤
+        按声明顺序串行执行。结果始终按声明顺序汇总。
+        
         Args:
             steps: 操作步骤列表
             
@@ -48,13 +53,32 @@ class StepExecutor:
         }
         
         try:
-            for i, step in enumerate(steps):
-                self.current_step = i + 1
-                logger.info(f"执行步骤 {self.current_step}/{self.total_steps}: {step.description}")
-                
-                step_result = self._execute_single_step(step)
+            nodes = self._build_step_nodes(steps)
+            timestamps: Dict[int, float] = {}
+            
+            def on_start(idx: int) -> None:
+                self.current_step += 1
+                logger.info(f"执行步骤 {idx + 1}/{self.total_steps}: {steps[idx].description}")
+                report_progress(STEP_STARTED, steps[idx].description, index=idx, total=self.total_steps)
+            
+            def on_finish(idx: int, step_result: Dict[str, Any]) -> None:
+                timestamps[idx] = time.time()
+                report_progress(STEP_FINISHED, steps[idx].description, index=idx, total=self.total_steps,
+                                success=bool(step_result.get("success")))
+            
+            # 步骤间等待：仅在存在依赖的步骤之前等待，独立分支之间不再等待
+            scheduler = DAGScheduler(
+                max_workers=settings.lam_step_max_parallel,
+                resource_limits=settings.lam_step_resource_limits,
+                dependent_delay=2.0,
+            )
+            step_results = scheduler.run(
+                nodes, lambda idx: self._execute_single_step(steps[idx]), on_start=on_start, on_finish=on_finish
+            )
+            
+            for i, (step, step_result) in enumerate(zip(steps, step_results)):
                 self.execution_log.append({
-                    "step": self.current_step,
+                    "step": i + 1,
                     "operation": {
                         "description": step.description,
                         "action": step.action,
@@ -62,25 +86,19 @@ class StepExecutor:
                         "query": step.query
                     },
                     "result": step_result,
-                    "timestamp": time.time()
+                    "timestamp": timestamps.get(i, time.time())
                 })
                 
                 if step_result.get("success", False):
                     results["completed_steps"] += 1
-                    logger.info(f"步骤 {self.current_step} 执行成功")
+                    logger.info(f"步骤 {i + 1} 执行成功")
                 else:
                     results["failed_steps"] += 1
-                    logger.error(f"步骤 {self.current_step} 执行失败: {step_result.get('error', '未知错误')}")
+                    logger.error(f"步骤 {i + 1} 执行失败: {step_result.get('error', '未知错误')}")
                     
-                    # 如果关键步骤失败，停止执行
-                    if self._is_critical_step(step):
-                        logger.error("关键步骤失败，停止执行")
+                    # 关键步骤失败时，依赖它的步骤已被跳过
+                    if self._is_critical_step(step) or step_result.get("skipped"):
                         results["success"] = False
-                        break
-                
-                # 步骤间等待
-                if i < len(steps) - 1:
-                    time.sleep(2)
             
             results["execution_log"] = self.execution_log
             results["final_result"] = self._generate_final_result()
@@ -93,6 +111,24 @@ class StepExecutor:
         logger.info(f"执行完成: 成功{results['completed_steps']}步，失败{results['failed_steps']}步")
         return results
     
+    def _build_step_nodes(self, steps: List[OperationStep]) -> List[StepNode]:
+        """构建调度节点：显式依赖引用步骤的order，未声明时同一目标站点的步骤串行"""
+        # target为browser的步骤只在系统浏览器中打开搜索页，彼此无共享状态
+        sessions = [None if step.target == "browser" else step.target for step in steps]
+        dependencies = resolve_dependencies(
+            [step.order for step in steps], [step.depends_on for step in steps], sessions
+        )
+        return [
+            StepNode(
+                index=i,
+                depends_on=dependencies[i],
+                resource="system" if sessions[i] is None else "browser",
+                session=sessions[i],
+                critical=self._is_critical_step(step),
+            )
+            for i, step in enumerate(steps)
+        ]
+    
     def _execute_single_step(self, step: OperationStep) -> Dict[str, Any]:
         """执行单个步骤"""
         try:
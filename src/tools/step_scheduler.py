@@ -0,0 +1,169 @@
+"""
+步骤DAG调度器
+按依赖关系并行执行相互独立的步骤分支，并按声明顺序返回结果
+"""
+import contextvars
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from ..utils.cancellation import cancellable_sleep, is_cancelled
+from ..utils.exceptions import OperationCancelled
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StepNode:
+    """调度节点
+
+    resource: 资源类型（如 browser/desktop/network），用于按类型限制并发
+    session: 共享状态的会话键，同一会话的步骤按声明顺序在同一线程上执行
+    critical: 关键步骤失败时跳过所有依赖它的步骤
+    """
+    index: int
+    depends_on: List[int] = field(default_factory=list)
+    resource: str = "default"
+    session: Optional[str] = None
+    critical: bool = False
+
+
+def resolve_dependencies(ids: Sequence[Any], declared: Sequence[Optional[Sequence[Any]]],
+                         sessions: Sequence[Optional[str]]) -> List[List[int]]:
+    """合并显式依赖与按会话推断的依赖，返回每个步骤依赖的下标列表
+
+    - declared[i] 中的元素与 ids 中的步骤编号比较（按字符串），只允许引用之前的步骤
+    - 同一会话的步骤依赖该会话中的上一个步骤
+    """
+    position = {str(step_id): idx for idx, step_id in enumerate(ids)}
+    last_in_session: Dict[str, int] = {}
+    dependencies: List[List[int]] = []
+    for idx in range(len(ids)):
+        deps = set()
+        for ref in declared[idx] or []:
+            target = position.get(str(ref))
+            if target is None or target >= idx:
+                logger.warning(f"忽略无效的步骤依赖: 步骤{ids[idx]} -> {ref}")
+                continue
+            deps.add(target)
+        session = sessions[idx]
+        if session is not None:
+            if session in last_in_session:
+                deps.add(last_in_session[session])
+            last_in_session[session] = idx
+        dependencies.append(sorted(deps))
+    return dependencies
+
+
+class DAGScheduler:
+    """DAG步骤调度器
+
+    依赖全部完成的步骤按声明顺序派发；同一时刻每种资源的运行数不超过 resource_limits，
+    总数不超过 max_workers。有会话键的步骤进入该会话专属的单线程通道，
+    保证浏览器等线程绑定的状态始终在同一线程上被访问。
+    在 cancel_scope 中运行时，取消后不再派发新步骤，执行中的步骤在各自的取消检查点退出。
+    """
+
+    def __init__(self, max_workers: int = 4, resource_limits: Optional[Dict[str, int]] = None,
+                 dependent_delay: float = 0.0):
+        self.max_workers = max(1, max_workers)
+        self.resource_limits = dict(resource_limits or {})
+        self.dependent_delay = dependent_delay
+        self.peak_parallel = 0
+
+    def run(self, nodes: List[StepNode], execute: Callable[[int], Dict[str, Any]],
+            on_start: Optional[Callable[[int], None]] = None,
+            on_finish: Optional[Callable[[int, Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """执行全部节点，返回与 nodes 顺序一致的结果列表"""
+        count = len(nodes)
+        results: List[Optional[Dict[str, Any]]] = [None] * count
+        blocking = [False] * count
+        waiting = {node.index: set(node.depends_on) for node in nodes}
+        dependents: Dict[int, List[int]] = {node.index: [] for node in nodes}
+        for node in nodes:
+            for dep in node.depends_on:
+                dependents[dep].append(node.index)
+
+        ready = [node.index for node in nodes if not node.depends_on]
+        in_flight: Dict[Future, int] = {}
+        busy: Dict[str, int] = {}
+        lanes: Dict[str, ThreadPoolExecutor] = {}
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="lam-step")
+        self.peak_parallel = 0
+
+        def complete(idx: int, result: Dict[str, Any]) -> None:
+            results[idx] = result
+            node = nodes[idx]
+            blocking[idx] = bool(result.get("skipped")) or (node.critical and not result.get("success", False))
+            if on_finish is not None:
+                on_finish(idx, result)
+            for child in dependents[idx]:
+                waiting[child].discard(idx)
+                if not waiting[child]:
+                    ready.append(child)
+
+        try:
+            while ready or in_flight:
+                ready.sort()
+                for idx in list(ready):
+                    node = nodes[idx]
+                    if is_cancelled():
+                        ready.remove(idx)
+                        complete(idx, {
+                            "success": False,
+                            "skipped": True,
+                            "cancelled": True,
+                            "error": "操作已取消，未执行",
+                        })
+                        continue
+                    failed = [dep for dep in node.depends_on if blocking[dep]]
+                    if failed:
+                        ready.remove(idx)
+                        complete(idx, {
+                            "success": False,
+                            "skipped": True,
+                            "error": f"依赖的步骤{failed[0] + 1}未成功，已跳过",
+                        })
+                        continue
+                    limit = self.resource_limits.get(node.resource, self.max_workers)
+                    if len(in_flight) >= self.max_workers or busy.get(node.resource, 0) >= max(1, limit):
+                        continue
+                    ready.remove(idx)
+                    busy[node.resource] = busy.get(node.resource, 0) + 1
+                    executor = pool
+                    if node.session is not None:
+                        executor = lanes.get(node.session)
+                        if executor is None:
+                            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lam-step-lane")
+                            lanes[node.session] = executor
+                    if on_start is not None:
+                        on_start(idx)
+                    in_flight[executor.submit(contextvars.copy_context().run, self._call, execute, node)] = idx
+                    self.peak_parallel = max(self.peak_parallel, len(in_flight))
+
+                if not in_flight:
+                    continue
+                done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                for future in done:
+                    idx = in_flight.pop(future)
+                    busy[nodes[idx].resource] -= 1
+                    complete(idx, future.result())
+        finally:
+            pool.shutdown(wait=True)
+            for lane in lanes.values():
+                lane.shutdown(wait=True)
+
+        return [result or {"success": False, "error": "步骤未执行"} for result in results]
+
+    def _call(self, execute: Callable[[int], Dict[str, Any]], node: StepNode) -> Dict[str, Any]:
+        # 依赖步骤之后稍作等待，给页面/应用留出状态稳定的时间
+        try:
+            if node.depends_on and self.dependent_delay > 0:
+                cancellable_sleep(self.dependent_delay)
+            return execute(node.index)
+        except OperationCancelled as e:
+            return {"success": False, "cancelled": True, "error": str(e)}
+        except Exception as e:
+            logger.error(f"步骤{node.index + 1}执行异常: {e}")
+            return {"success": False, "error": str(e)}
@@ -11,24 +11,42 @@ from tkinter import ttk, scrolledtext, messagebox, filedialog, simpledialog
 import threading
 import os
 import sys
-import time
 from typing import Optional, Dict, Any, List
 import json
 import webbrowser
 from datetime import datetime
+from urllib.parse import urlparse
 import logging
 
 # 添加项目根目录到路径
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 sys.path.insert(0, project_root)
 
+from src.config import settings
 from src.agent.lam_agent import LamAgent
+from src.agent.llm_gateway import get_llm_gateway
 from src.tools.executor import executor
 from src.tools.command_recognizer import CommandRecognizer, CommandType
+from src.tools.step_scheduler import DAGScheduler, StepNode, resolve_dependencies
+from src.utils.cancellation import CancelToken, cancel_scope
+from src.utils.progress import STEP_FINISHED, progress_scope
 from src.database.credential_db import credential_db
 
 logger = logging.getLogger(__name__)
 
+# 命令步骤占用的资源类型与共享会话（会话相同的步骤串行执行）
+COMMAND_RESOURCES = {
+    "bilibili_open_up": ("browser", "browser_context"),
+    "bilibili_play_video": ("browser", "browser_context"),
+    "open_website": ("browser", None),
+    "play_video": ("browser", None),
+    "click_element": ("browser", None),
+    "automate_page": ("browser", None),
+    "web_search": ("network", None),
+    "desktop_scan": ("desktop", "desktop"),
+    "run_command": ("desktop", "desktop"),
+}
+
 class ChatGPTUI:
     """ChatGPT风格的LAM-Agent界面"""
     
@@ -38,6 +56,8 @@ class ChatGPTUI:
         self.conversation_history = []
         self.command_recognizer = CommandRecognizer()
         self.current_view = "main"  # "main" 或 "credentials"
+        # 当前命令执行的取消令牌，停止按钮通过它中止执行
+        self.cancel_token: Optional[CancelToken] = None
         
         # ChatGPT风格配色方案
         self.colors = {
@@ -299,9 +319,16 @@ class ChatGPTUI:
         self.progress_frame = tk.Frame(chat_container, bg=self.colors['bg_main'])
         self.progress_frame.pack(fill=tk.X, pady=(0, 10))
         
+        # 停止按钮：取消当前执行，关闭其浏览器并结束其子进程
+        self.stop_btn = tk.Button(self.progress_frame, text="⏹ 停止", command=self.stop_execution,
+                                  bg=self.colors['error'], fg=self.colors['text_primary'],
+                                  font=('Arial', 10), relief=tk.FLAT, bd=0,
+                                  cursor='hand2', padx=10)
+        self.stop_btn.pack(side=tk.RIGHT, padx=(10, 0))
+        
         self.progress_bar = ttk.Progressbar(self.progress_frame, mode='determinate', 
                                           style="Custom.Horizontal.TProgressbar")
-        self.progress_bar.pack(fill=tk.X)
+        self.progress_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
         self.progress_frame.pack_forget()  # 初始隐藏
         
         # 聊天文本区域
@@ -787,17 +814,8 @@ class ChatGPTUI:
     def classify_message(self, message):
         """分类消息：判断是问答类还是操作类"""
         try:
-            from langchain_openai import ChatOpenAI
             from langchain_core.messages import HumanMessage
             
-            # 初始化DeepSeek
-            llm = ChatOpenAI(
-                model="deepseek-chat",
-                api_key=os.environ.get('DEEPSEEK_API_KEY'),
-                base_url=os.environ.get('DEEPSEEK_BASE_URL', 'https://api.deepseek.com'),
-                temperature=0.1
-            )
-            
             # 构建分类提示词
             prompt = f"""
 请判断以下用户输入是问答类问题还是操作类指令。
@@ -813,8 +831,10 @@ class ChatGPTUI:
 - "action" (操作类)
 """
             
-            # 调用DeepSeek
-            response = llm.invoke([HumanMessage(content=prompt)])
+            # 调用DeepSeek（经共享LLM网关）
+            response = get_llm_gateway().invoke(
+                [HumanMessage(content=prompt)], temperature=0.1, purpose="ui_classify"
+            )
             result = response.content.strip().lower()
             
             # 解析结果
@@ -884,17 +904,8 @@ class ChatGPTUI:
     def generate_search_keywords(self, message):
         """使用DeepSeek生成搜索关键词"""
         try:
-            from langchain_openai import ChatOpenAI
             from langchain_core.messages import HumanMessage
             
-            # 初始化DeepSeek
-            llm = ChatOpenAI(
-                model="deepseek-chat",
-                api_key=os.environ.get('DEEPSEEK_API_KEY'),
-                base_url=os.environ.get('DEEPSEEK_BASE_URL', 'https://api.deepseek.com'),
-                temperature=0.1
-            )
-            
             # 构建提示词
             prompt = f"""
 请根据以下用户问题生成3-5个最相关的搜索关键词，用于网络搜索获取答案。
@@ -917,8 +928,10 @@ class ChatGPTUI:
 请只返回JSON数组，不要包含其他文字。
 """
             
-            # 调用DeepSeek
-            response = llm.invoke([HumanMessage(content=prompt)])
+            # 调用DeepSeek（经共享LLM网关）
+            response = get_llm_gateway().invoke(
+                [HumanMessage(content=prompt)], temperature=0.1, purpose="ui_keywords"
+            )
             result_text = response.content.strip()
             
             # 解析JSON
@@ -979,19 +992,22 @@ class ChatGPTUI:
     def generate_answer_from_search(self, question, search_results):
         """基于搜索结果生成回答"""
         try:
-            from langchain_openai import ChatOpenAI
             from langchain_core.messages import HumanMessage
             
-            # 初始化DeepSeek
-            llm = ChatOpenAI(
-                model="deepseek-chat",
-                api_key=os.environ.get('DEEPSEEK_API_KEY'),
-                base_url=os.environ.get('DEEPSEEK_BASE_URL', 'https://api.deepseek.com'),
-                temperature=0.3
-            )
+            # 压缩搜索结果：按URL去重、抽取相关段落并控制在token预算内
+            from src.utils.evidence import compact_evidence
+            compacted = compact_evidence(
+                question, search_results[:5], token_budget=settings.lam_evidence_token_budget
+            )  # 限制前5条结果
             
             # 构建搜索结果文本
-            search_text = "\n".join([f"- {result}" for result in search_results[:5]])  # 限制前5条结果
+            lines = []
+            for item in compacted:
+                line = f"- {item['title']}: {item['body']}" if item['title'] else f"- {item['body']}"
+                if item['href']:
+                    line += f" ({item['href']})"
+                lines.append(line)
+            search_text = "\n".join(lines)
             
             # 构建提示词
             prompt = f"""
@@ -1012,8 +1028,10 @@ class ChatGPTUI:
 请直接提供回答，不要包含其他格式。
 """
             
-            # 调用DeepSeek
-            response = llm.invoke([HumanMessage(content=prompt)])
+            # 调用DeepSeek（经共享LLM网关）
+            response = get_llm_gateway().invoke(
+                [HumanMessage(content=prompt)], temperature=0.3, purpose="ui_answer"
+            )
             answer = response.content.strip()
             
             return answer
@@ -1027,18 +1045,31 @@ class ChatGPTUI:
         self.progress_frame.pack(fill=tk.X, pady=(0, 10))
         self.progress_bar['maximum'] = total_steps
         self.progress_bar['value'] = 0
+        self.stop_btn.config(state=tk.NORMAL, text="⏹ 停止")
         self.execution_status.config(text="执行中...")
     
-    def update_progress(self, current_step, total_steps):
-        """更新进度条"""
+    def update_progress(self, current_step, total_steps, detail=None):
+        """更新进度条（current_step 可以是小数，表示当前步骤内部的执行进度）"""
         self.progress_bar['value'] = current_step
-        self.execution_status.config(text=f"执行中... ({current_step}/{total_steps})")
+        text = f"执行中... ({int(current_step)}/{total_steps})"
+        if detail:
+            text += f" {detail}"
+        self.execution_status.config(text=text)
     
     def hide_progress_bar(self):
         """隐藏进度条"""
         self.progress_frame.pack_forget()
         self.execution_status.config(text="")
     
+    def stop_execution(self):
+        """停止当前执行：不再派发新步骤，执行中的步骤在下一个检查点退出"""
+        token = self.cancel_token
+        if token is None or not token.cancel("用户停止"):
+            return
+        self.stop_btn.config(state=tk.DISABLED, text="正在停止...")
+        self.update_status("正在停止...")
+        self.append_to_chat("系统", "已请求停止，正在中止执行中的步骤", "warning")
+    
     def execute_deepseek_commands(self, message):
         """使用DeepSeek拆分和执行命令"""
         try:
@@ -1055,7 +1086,7 @@ class ChatGPTUI:
                     self.root.after(0, lambda: self.update_status("就绪"))
                     return
             
-            # 2. 逐条执行命令
+            # 2. 按依赖关系执行命令：相互独立的分支并行执行，结果按声明顺序汇总
             self.root.after(0, lambda: self.append_to_chat("系统", f"识别出 {len(command_steps)} 个命令步骤", "info"))
             
             # 显示进度条
@@ -1067,29 +1098,36 @@ class ChatGPTUI:
                 "current_url": None,
                 "execution_history": []
             }
-            
-            for i, step in enumerate(command_steps, 1):
-                # 更新进度条
-                self.root.after(0, lambda idx=i, total=len(command_steps): self.update_progress(idx, total))
-                
-                # 显示当前步骤
-                step_desc = step.get('description', f'步骤 {i}')
-                self.root.after(0, lambda s=step_desc, idx=i: self.append_to_chat("系统", f"执行步骤 {idx}: {s}", "info"))
-                self.root.after(0, lambda: self.update_status(f"执行步骤 {i}/{len(command_steps)}"))
-                
-                # 更新上下文
+            for step in command_steps:
                 self.update_context(context, step)
+            
+            total = len(command_steps)
+            finished = []
+            # 各步骤内部已完成的比例（来自工具上报的进度事件），用于在步骤之间平滑推进进度条
+            partial = {}
+            
+            def refresh_progress(detail=None):
+                value = len(finished) + sum(v for i, v in list(partial.items()) if i not in finished)
+                self.root.after(0, lambda v=value: self.update_progress(v, total, detail))
+            
+            def run_step(idx):
+                def on_progress(event):
+                    if event.get("kind") == STEP_FINISHED and event.get("total"):
+                        partial[idx] = max(partial.get(idx, 0.0), (event.get("index", 0) + 1) / event["total"] * 0.99)
+                    refresh_progress(event.get("message"))
                 
-                # 执行单个命令步骤
-                result = self.execute_single_command(step)
-                
-                # 记录执行历史
-                context["execution_history"].append({
-                    "step": i,
-                    "action": step.get('action'),
-                    "description": step_desc,
-                    "result": result
-                })
+                with progress_scope(on_progress):
+                    return self.execute_single_command(command_steps[idx])
+            
+            def on_start(idx):
+                step_desc = command_steps[idx].get('description', f'步骤 {idx + 1}')
+                self.root.after(0, lambda s=step_desc, n=idx + 1: self.append_to_chat("系统", f"执行步骤 {n}: {s}", "info"))
+                self.root.after(0, lambda n=idx + 1: self.update_status(f"执行步骤 {n}/{total}"))
+            
+            def on_finish(idx, result):
+                finished.append(idx)
+                # 更新进度条
+                refresh_progress()
                 
                 if result.get('success'):
                     self.root.after(0, lambda r=result: self.append_to_chat("系统", f"✓ 步骤执行成功: {r.get('message', '')}", "success"))
@@ -1099,15 +1137,45 @@ class ChatGPTUI:
                         self.root.after(0, lambda: self.append_to_chat("系统", "⚠️ 使用降级方案，请在浏览器中手动操作", "warning"))
                     elif result.get('partial'):
                         self.root.after(0, lambda: self.append_to_chat("系统", "⚠️ 部分自动化成功，请在浏览器中完成剩余操作", "warning"))
+                elif result.get('cancelled'):
+                    self.root.after(0, lambda r=result: self.append_to_chat("系统", f"⏹ 步骤已停止: {r.get('error', '')}", "warning"))
                 else:
                     self.root.after(0, lambda r=result: self.append_to_chat("系统", f"✗ 步骤执行失败: {r.get('error', '')}", "error"))
-                
-                # 短暂延迟，让用户看到执行过程
-                time.sleep(1)
+            
+            # 依赖步骤前短暂延迟，让用户看到执行过程
+            scheduler = DAGScheduler(
+                max_workers=settings.lam_step_max_parallel,
+                resource_limits=settings.lam_step_resource_limits,
+                dependent_delay=1.0,
+            )
+            # 取消令牌随上下文传入各步骤线程
+            token = self.cancel_token = CancelToken()
+            try:
+                with cancel_scope(token):
+                    results = scheduler.run(
+                        self.command_step_nodes(command_steps),
+                        run_step,
+                        on_start=on_start,
+                        on_finish=on_finish,
+                    )
+            finally:
+                self.cancel_token = None
+            
+            # 记录执行历史（按声明顺序）
+            for i, (step, result) in enumerate(zip(command_steps, results), 1):
+                context["execution_history"].append({
+                    "step": i,
+                    "action": step.get('action'),
+                    "description": step.get('description', f'步骤 {i}'),
+                    "result": result
+                })
             
             # 隐藏进度条
             self.root.after(0, lambda: self.hide_progress_bar())
-            self.root.after(0, lambda: self.update_status("所有命令执行完成"))
+            if token.cancelled:
+                self.root.after(0, lambda: self.update_status("已停止"))
+            else:
+                self.root.after(0, lambda: self.update_status("所有命令执行完成"))
             
             # 总结执行结果
             success_count = sum(1 for h in context["execution_history"] if h["result"].get('success'))
@@ -1141,6 +1209,38 @@ class ChatGPTUI:
         except Exception as e:
             logger.error(f"更新上下文失败: {e}")
     
+    def command_step_nodes(self, command_steps):
+        """为命令步骤构建调度节点
+        
+        显式的 depends_on 引用步骤的 id（缺省为从1开始的步骤编号）；此外共享同一
+        浏览器会话/站点的步骤按顺序串行，点击与页面自动化跟随前一个浏览器步骤。
+        """
+        sessions = []
+        resources = []
+        last_browser_session = None
+        for step in command_steps:
+            action = step.get('action', '')
+            params = step.get('params', {}) or {}
+            resource, session = COMMAND_RESOURCES.get(action, ("default", None))
+            if action in ('open_website', 'play_video'):
+                host = urlparse(params.get('url', '')).netloc or params.get('url', '')
+                session = f"site:{host}" if host else None
+            elif action in ('click_element', 'automate_page'):
+                session = last_browser_session or "page"
+            if resource == "browser" and session is not None:
+                last_browser_session = session
+            sessions.append(session)
+            resources.append(resource)
+        
+        ids = [step.get('id', i + 1) for i, step in enumerate(command_steps)]
+        dependencies = resolve_dependencies(
+            ids, [step.get('depends_on') for step in command_steps], sessions
+        )
+        return [
+            StepNode(index=i, depends_on=dependencies[i], resource=resources[i], session=sessions[i])
+            for i in range(len(command_steps))
+        ]
+    
     def simple_command_recognition(self, message):
         """智能命令识别（当DeepSeek不可用时）"""
         try:
@@ -1218,23 +1318,14 @@ class ChatGPTUI:
     def split_commands_with_deepseek(self, message):
         """使用DeepSeek拆分命令"""
         try:
-            from langchain_openai import ChatOpenAI
             from langchain_core.messages import HumanMessage
             
             # 检查API密钥
-            api_key = os.environ.get('DEEPSEEK_API_KEY')
-            if not api_key:
+            gateway = get_llm_gateway()
+            if not gateway.is_configured():
                 logger.warning("DEEPSEEK_API_KEY is required but not set")
                 return []
             
-            # 初始化DeepSeek
-            llm = ChatOpenAI(
-                model="deepseek-chat",
-                api_key=api_key,
-                base_url=os.environ.get('DEEPSEEK_BASE_URL', 'https://api.deepseek.com'),
-                temperature=0.1
-            )
-            
             # 构建提示词
             prompt = f"""
 请将以下用户指令拆分为具体的可执行步骤。每个步骤应该是独立的、可执行的命令。
@@ -1245,6 +1336,7 @@ class ChatGPTUI:
 - "action": 操作类型 (如: "open_website", "desktop_scan", "web_search", "bilibili_open_up" 等)
 - "params": 参数字典
 - "description": 步骤描述
+- "depends_on": 可选，该步骤依赖的步骤编号列表（从1开始）；互不依赖的步骤会并行执行
 
 支持的操作类型：
 - "open_website": 打开网站
@@ -1275,8 +1367,10 @@ class ChatGPTUI:
 请只返回JSON数组，不要包含其他文字。
 """
             
-            # 调用DeepSeek
-            response = llm.invoke([HumanMessage(content=prompt)])
+            # 调用DeepSeek（经共享LLM网关）
+            response = gateway.invoke(
+                [HumanMessage(content=prompt)], temperature=0.1, purpose="ui_split"
+            )
             result_text = response.content.strip()
             
             # 解析JSON
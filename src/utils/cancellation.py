@@ -0,0 +1,152 @@
+"""
+协作式取消
+调用方为一次执行创建 CancelToken，在 cancel_scope 中运行工具；工具在步骤之间与等待过程中调用
+check_cancelled / cancellable_sleep 检查取消状态，并可用 on_cancel 登记取消时立即执行的清理动作
+（关闭浏览器、结束子进程）。未进入 cancel_scope 时所有检查都是空操作。
+令牌保存在 contextvars 中，asyncio.to_thread 与携带上下文提交的线程任务都能继承。
+"""
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Iterator, List, Optional, TypeVar
+
+from .exceptions import OperationCancelled
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class CancelToken:
+    """线程安全的取消令牌"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self.reason: Optional[str] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: Optional[str] = None) -> bool:
+        """请求取消并执行已登记的清理动作；重复取消返回 False"""
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            _run_callback(callback)
+        return True
+
+    def add_callback(self, callback: Callable[[], None]) -> None:
+        """登记取消时执行的动作；已取消时立即执行"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        _run_callback(callback)
+
+    def remove_callback(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待取消，返回是否已取消"""
+        return self._event.wait(timeout)
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise OperationCancelled(reason=self.reason)
+
+
+def _run_callback(callback: Callable[[], None]) -> None:
+    try:
+        callback()
+    except Exception as e:
+        logger.debug(f"取消回调失败: {e}")
+
+
+_current: contextvars.ContextVar[Optional[CancelToken]] = contextvars.ContextVar("lam_cancel", default=None)
+
+
+def current_token() -> Optional[CancelToken]:
+    """当前上下文的取消令牌"""
+    return _current.get()
+
+
+@contextmanager
+def cancel_scope(token: Optional[CancelToken]) -> Iterator[Optional[CancelToken]]:
+    """在当前上下文中设置取消令牌"""
+    reset = _current.set(token)
+    try:
+        yield token
+    finally:
+        _current.reset(reset)
+
+
+def is_cancelled() -> bool:
+    token = _current.get()
+    return token is not None and token.cancelled
+
+
+def check_cancelled() -> None:
+    """取消检查点：当前执行已被取消时抛出 OperationCancelled"""
+    token = _current.get()
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+def cancellable_sleep(seconds: float) -> None:
+    """可被取消打断的 time.sleep"""
+    token = _current.get()
+    if token is None:
+        time.sleep(max(0.0, seconds))
+        return
+    if token.wait(max(0.0, seconds)):
+        token.raise_if_cancelled()
+
+
+@contextmanager
+def on_cancel(callback: Callable[[], None]) -> Iterator[None]:
+    """在代码块执行期间登记取消动作（如结束子进程、关闭浏览器）"""
+    token = _current.get()
+    if token is None:
+        yield
+        return
+    token.add_callback(callback)
+    try:
+        yield
+    finally:
+        token.remove_callback(callback)
+
+
+async def await_cancellable(awaitable: Awaitable[T]) -> T:
+    """在事件循环中等待协程；当前令牌被取消时（可来自其他线程）取消该任务并抛出 OperationCancelled"""
+    token = _current.get()
+    if token is None:
+        return await awaitable
+    token.raise_if_cancelled()
+    loop = asyncio.get_running_loop()
+    task = asyncio.ensure_future(awaitable)
+
+    def cancel() -> None:
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(task.cancel)
+
+    token.add_callback(cancel)
+    try:
+        return await task
+    except asyncio.CancelledError:
+        if token.cancelled and task.cancelled():
+            raise OperationCancelled(reason=token.reason) from None
+        raise
+    finally:
+        token.remove_callback(cancel)
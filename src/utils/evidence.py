@@ -0,0 +1,226 @@
+"""
+证据压缩
+在生成最终回答前对证据去重、抽取与查询最相关的段落，并裁剪到token预算内
+"""
+import hashlib
+import html
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_SCRIPT_STYLE_RE = re.compile(r"<(script|style|noscript)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+_HTML_HINT_RE = re.compile(r"<(html|body|div|p|span|a|script|br)\b", re.IGNORECASE)
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_CJK_RE = re.compile(r"[\u4e00-\u9fff]+")
+_SENTENCE_RE = re.compile(r"(?<=[。！？!?；;\n])|(?<=\.)\s+")
+
+# 证据条目中可能承载正文的字段，按优先级排列
+_TEXT_FIELDS = ("body", "text", "content", "message", "html")
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算token数：中日韩字符约1个token，其余约4个字符1个token"""
+    if not text:
+        return 0
+    cjk = sum(len(m) for m in _CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def tokenize(text: str) -> List[str]:
+    """混合中英文分词：英文按单词，中文按字符二元组"""
+    text = text.lower()
+    terms = _WORD_RE.findall(text)
+    for run in _CJK_RE.findall(text):
+        if len(run) == 1:
+            terms.append(run)
+        else:
+            terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return terms
+
+
+def strip_html(text: str) -> str:
+    """去除HTML标签、脚本与样式，保留可读文本"""
+    if not _HTML_HINT_RE.search(text):
+        return text
+    text = _SCRIPT_STYLE_RE.sub(" ", text)
+    text = _TAG_RE.sub("\n", text)
+    text = html.unescape(text)
+    lines = (line.strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+class EvidenceCompactor:
+    """证据压缩器
+
+    1. 按URL去重（无URL时按内容去重），保留正文最长的一条
+    2. 将长正文切分为段落块，使用BM25（NumPy向量化）按查询打分
+    3. 按分数从高到低挑选段落直到达到token预算，再按原文顺序拼回各条证据
+    """
+
+    def __init__(self, token_budget: int = 2000, chunk_chars: int = 400,
+                 k1: float = 1.5, b: float = 0.75, min_passage_tokens: int = 32):
+        self.token_budget = token_budget
+        self.chunk_chars = chunk_chars
+        self.min_passage_tokens = min_passage_tokens
+        self.k1 = k1
+        self.b = b
+
+    def compact(self, query: str, evidence: List[Any],
+                token_budget: Optional[int] = None) -> List[Dict[str, Any]]:
+        """压缩证据列表，返回仅包含 title/href/body 的精简条目"""
+        budget = token_budget if token_budget is not None else self.token_budget
+        items = self._dedupe([self._normalize(e) for e in evidence or []])
+        if not items:
+            return []
+
+        # 每条证据固定占用标题与链接的开销
+        overhead = [estimate_tokens(item["title"]) + estimate_tokens(item["href"]) for item in items]
+        remaining = budget - sum(overhead)
+
+        chunks: List[Tuple[int, int, str]] = []
+        for idx, item in enumerate(items):
+            for pos, chunk in enumerate(self._chunk(item["body"])):
+                chunks.append((idx, pos, chunk))
+
+        selected: Dict[int, List[Tuple[int, str]]] = {idx: [] for idx in range(len(items))}
+        if chunks and remaining > 0:
+            scores = self.score(query, [c[2] for c in chunks])
+            # 分数相同时保持原有顺序，优先靠前的证据与段落
+            for order in np.argsort(-scores, kind="stable"):
+                idx, pos, chunk = chunks[order]
+                cost = estimate_tokens(chunk)
+                if cost > remaining:
+                    # 预算不足以容纳整段时，截取段落开头填满剩余预算
+                    if remaining < self.min_passage_tokens or scores[order] <= 0:
+                        continue
+                    chunk = self._truncate(chunk, remaining)
+                    cost = estimate_tokens(chunk)
+                selected[idx].append((pos, chunk))
+                remaining -= cost
+                if remaining <= 0:
+                    break
+
+        compacted: List[Dict[str, Any]] = []
+        for idx, item in enumerate(items):
+            parts = [chunk for _, chunk in sorted(selected[idx])]
+            body = "\n".join(parts)
+            if not body and not item["title"] and not item["href"]:
+                continue
+            entry = {"title": item["title"], "href": item["href"], "body": body}
+            if len(body) < len(item["body"]):
+                entry["truncated"] = True
+            compacted.append(entry)
+
+        logger.debug(
+            f"证据压缩: {len(evidence or [])}条 -> {len(compacted)}条, "
+            f"约{budget - max(remaining, 0)}/{budget} tokens"
+        )
+        return compacted
+
+    def score(self, query: str, passages: List[str]) -> np.ndarray:
+        """计算各段落相对查询的BM25分数"""
+        terms = sorted(set(tokenize(query)))
+        if not terms or not passages:
+            return np.zeros(len(passages), dtype=np.float64)
+
+        vocab = {term: col for col, term in enumerate(terms)}
+        tf = np.zeros((len(passages), len(terms)), dtype=np.float64)
+        lengths = np.zeros(len(passages), dtype=np.float64)
+        for row, passage in enumerate(passages):
+            tokens = tokenize(passage)
+            lengths[row] = len(tokens)
+            cols = [vocab[t] for t in tokens if t in vocab]
+            if cols:
+                np.add.at(tf[row], cols, 1.0)
+
+        n_docs = len(passages)
+        df = np.count_nonzero(tf, axis=0)
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+        avgdl = lengths.mean() or 1.0
+        norm = self.k1 * (1.0 - self.b + self.b * lengths / avgdl)
+        weights = tf * (self.k1 + 1.0) / (tf + norm[:, None])
+        return weights @ idf
+
+    def _normalize(self, item: Any) -> Dict[str, str]:
+        if isinstance(item, dict):
+            body = ""
+            for field in _TEXT_FIELDS:
+                value = item.get(field)
+                if isinstance(value, str) and value.strip():
+                    body = value
+                    break
+            if not body:
+                # 结构化结果（如自动化日志）退化为紧凑的文本表示
+                rest = {k: v for k, v in item.items() if k not in ("title", "href", "url", "html")}
+                body = str(rest) if rest else ""
+            return {
+                "title": str(item.get("title") or ""),
+                "href": str(item.get("href") or item.get("url") or ""),
+                "body": strip_html(body).strip(),
+            }
+        return {"title": "", "href": "", "body": strip_html(str(item)).strip()}
+
+    def _dedupe(self, items: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        seen: Dict[str, int] = {}
+        unique: List[Dict[str, str]] = []
+        for item in items:
+            key = item["href"].rstrip("/") or hashlib.md5(
+                (item["title"] + "\0" + item["body"]).encode("utf-8")
+            ).hexdigest()
+            if key in seen:
+                kept = unique[seen[key]]
+                if len(item["body"]) > len(kept["body"]):
+                    kept["body"] = item["body"]
+                if not kept["title"]:
+                    kept["title"] = item["title"]
+                continue
+            seen[key] = len(unique)
+            unique.append(item)
+        return unique
+
+    @staticmethod
+    def _truncate(text: str, max_tokens: int) -> str:
+        lo, hi = 0, len(text)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if estimate_tokens(text[:mid]) <= max_tokens:
+                lo = mid
+            else:
+                hi = mid - 1
+        return text[:lo]
+
+    def _chunk(self, text: str) -> List[str]:
+        if not text:
+            return []
+        if len(text) <= self.chunk_chars:
+            return [text]
+        chunks: List[str] = []
+        current = ""
+        for sentence in _SENTENCE_RE.split(text):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            while len(sentence) > self.chunk_chars:
+                if current:
+                    chunks.append(current)
+                    current = ""
+                chunks.append(sentence[:self.chunk_chars])
+                sentence = sentence[self.chunk_chars:]
+            if current and len(current) + len(sentence) + 1 > self.chunk_chars:
+                chunks.append(current)
+                current = sentence
+            else:
+                current = f"{current} {sentence}" if current else sentence
+        if current:
+            chunks.append(current)
+        return chunks
+
+
+def compact_evidence(query: str, evidence: List[Any], token_budget: int = 2000) -> List[Dict[str, Any]]:
+    """压缩证据的便捷函数"""
+    return EvidenceCompactor(token_budget=token_budget).compact(query, evidence)
@@ -87,21 +87,9 @@ class TimeoutError(LAMAgentError):
         self.operation = operation
 
 
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+class OperationCancelled(LAMAgentError):
+    """操作已被调用方取消"""
+    
+    def __init__(self, message: str = "操作已取消", reason: Optional[str] = None):
+        super().__init__(message, "CANCELLED", {"reason": reason} if reason else None)
+        self.reason = reason
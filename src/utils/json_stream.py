@@ -0,0 +1,143 @@
+"""
+增量JSON解析
+逐块接收LLM流式输出，在整体完成前提取已闭合的顶层字段与数组元素
+"""
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class IncrementalPlanParser:
+    """增量计划解析器
+
+    只扫描新到达的字符，维护字符串/转义状态与括号栈：
+      - 顶层对象的某个字段值闭合时产生 ("field", key, value) 事件
+      - 指定数组字段（默认 steps）中的对象元素闭合时产生 ("step", index, step) 事件
+    首个 '{' 之前的内容（如 ```json 代码块标记）会被忽略。
+    """
+
+    def __init__(self, array_key: str = "steps"):
+        self.array_key = array_key
+        self.fields: Dict[str, Any] = {}
+        self.steps: List[Dict[str, Any]] = []
+        self._text = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._start: Optional[int] = None
+        self._end: Optional[int] = None
+        self._expect_key = True
+        self._key: Optional[str] = None
+        self._key_start: Optional[int] = None
+        self._value_start: Optional[int] = None
+        self._elem_start: Optional[int] = None
+
+    @property
+    def complete(self) -> bool:
+        """顶层对象是否已闭合"""
+        return self._end is not None
+
+    @property
+    def text(self) -> str:
+        """目前收到的全部文本"""
+        return self._text
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any, Any]]:
+        """输入一段文本，返回本次新产生的事件列表"""
+        events: List[Tuple[str, Any, Any]] = []
+        if not chunk or self.complete:
+            self._text += chunk or ""
+            return events
+
+        self._text += chunk
+        text = self._text
+        i = self._pos
+        while i < len(text) and not self.complete:
+            ch = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._key_start is not None:
+                        self._key = self._loads(text[self._key_start:i + 1])
+                        self._key_start = None
+                i += 1
+                continue
+
+            if self._start is None:
+                if ch == "{":
+                    self._start = i
+                    self._stack.append(ch)
+                i += 1
+                continue
+
+            depth = len(self._stack)
+            if ch == '"':
+                self._in_string = True
+                if depth == 1:
+                    if self._expect_key:
+                        self._key_start = i
+                    elif self._value_start is None:
+                        self._value_start = i
+            elif ch == ":" and depth == 1:
+                self._expect_key = False
+                self._value_start = None
+            elif ch in "{[":
+                if depth == 1 and self._value_start is None:
+                    self._value_start = i
+                if depth == 2 and ch == "{" and self._in_step_array():
+                    self._elem_start = i
+                self._stack.append(ch)
+            elif ch in "}]":
+                self._stack.pop()
+                depth = len(self._stack)
+                if depth == 2 and ch == "}" and self._elem_start is not None:
+                    step = self._loads(text[self._elem_start:i + 1])
+                    self._elem_start = None
+                    if isinstance(step, dict):
+                        self.steps.append(step)
+                        events.append(("step", len(self.steps) - 1, step))
+                elif depth == 0:
+                    self._finish_field(text, i, events)
+                    self._end = i
+            elif ch == "," and depth == 1:
+                self._finish_field(text, i, events)
+                self._expect_key = True
+            elif depth == 1 and not self._expect_key and self._value_start is None and not ch.isspace():
+                self._value_start = i
+            i += 1
+
+        self._pos = i
+        return events
+
+    def result(self) -> Dict[str, Any]:
+        """返回完整解析结果；对象尚未闭合或内容非法时抛出 ValueError"""
+        if not self.complete:
+            raise ValueError("JSON对象尚未完整")
+        plan = json.loads(self._text[self._start:self._end + 1])
+        if not isinstance(plan, dict):
+            raise ValueError("计划必须是JSON对象")
+        return plan
+
+    def _in_step_array(self) -> bool:
+        return self._stack[-1] == "[" and self._key == self.array_key
+
+    def _finish_field(self, text: str, end: int, events: List[Tuple[str, Any, Any]]) -> None:
+        if self._key is not None and self._value_start is not None:
+            raw = text[self._value_start:end].strip()
+            value = self._loads(raw)
+            self.fields[self._key] = value
+            events.append(("field", self._key, value))
+        self._key = None
+        self._value_start = None
+
+    @staticmethod
+    def _loads(raw: str) -> Any:
+        try:
+            return json.loads(raw)
+        except (TypeError, ValueError):
+            return None
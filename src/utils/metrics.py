@@ -0,0 +1,300 @@
+"""
+进程内指标注册表
+智能体、浏览器、MCP与API模块在运行中直接写入计数器/仪表/直方图（每个指标一把锁，写入为O(1)），
+已有自带统计的组件（工具运行统计、准入控制、各类缓存）注册采集函数，在抓取时把当前快照转换为指标。
+GET /metrics 以Prometheus文本格式（0.0.4）输出全部指标，不依赖 prometheus_client。
+MCP服务器子进程的指标经 metrics/collect 请求取回（dump_families/load_families），与本进程的指标合并输出。
+"""
+import bisect
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 默认直方图分桶（秒）：覆盖从毫秒级接口到分钟级浏览器自动化
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+Labels = Tuple[str, ...]
+
+
+class Sample(NamedTuple):
+    labels: Dict[str, str]
+    value: float
+    suffix: str = ""
+
+
+class MetricFamily(NamedTuple):
+    """采集函数返回的一组同名指标"""
+    name: str
+    type: str
+    help: str
+    samples: List[Sample]
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> Labels:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"指标 {self.name} 需要标签 {self.labelnames}，实际为 {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Labels) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def collect(self) -> MetricFamily:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """只增计数器"""
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: object) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def collect(self) -> MetricFamily:
+        with self._lock:
+            items = list(self._values.items())
+        return MetricFamily(self.name, self.type, self.help, [Sample(self._labels(k), v) for k, v in items])
+
+
+class Gauge(_Metric):
+    """可增可减的仪表"""
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def set(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: object) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: object) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    @contextmanager
+    def track_inprogress(self, **labels: object) -> Iterator[None]:
+        """代码块执行期间加一"""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def collect(self) -> MetricFamily:
+        with self._lock:
+            items = list(self._values.items())
+        return MetricFamily(self.name, self.type, self.help, [Sample(self._labels(k), v) for k, v in items])
+
+
+class Histogram(_Metric):
+    """固定分桶的直方图"""
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        if "le" in self.labelnames:
+            raise ValueError("直方图不能使用 le 标签")
+        self.buckets = tuple(sorted(float(b) for b in buckets if not math.isinf(b)))
+        # 标签 -> [各桶计数（最后一个为+Inf）, 总和]
+        self._values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    @contextmanager
+    def time(self, **labels: object) -> Iterator[None]:
+        """记录代码块的执行时长（秒），异常退出同样计入"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: object) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return sum(entry[0]) if entry else 0
+
+    def collect(self) -> MetricFamily:
+        with self._lock:
+            items = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        samples: List[Sample] = []
+        for key, counts, total in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                samples.append(Sample({**labels, "le": _format_value(bound)}, cumulative, "_bucket"))
+            samples.append(Sample(labels, total, "_sum"))
+            samples.append(Sample(labels, cumulative, "_count"))
+        return MetricFamily(self.name, self.type, self.help, samples)
+
+
+Collector = Callable[[], Iterable[MetricFamily]]
+
+
+class MetricsRegistry:
+    """指标注册表：同名指标只创建一次，重复获取返回同一实例"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[str, Collector] = {}
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labelnames, buckets=buckets)
+
+    def register_collector(self, name: str, collector: Collector) -> None:
+        """注册抓取时调用的采集函数；同名采集函数会被替换（组件重建时指向新实例）"""
+        with self._lock:
+            self._collectors[name] = collector
+
+    def unregister_collector(self, name: str) -> None:
+        with self._lock:
+            self._collectors.pop(name, None)
+
+    def collect(self) -> List[MetricFamily]:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors.items())
+        families = [metric.collect() for metric in metrics]
+        for name, collector in collectors:
+            try:
+                families.extend(collector())
+            except Exception as e:
+                logger.warning(f"指标采集失败（{name}）: {e}")
+        return families
+
+    def render(self, extra: Iterable[MetricFamily] = ()) -> str:
+        """Prometheus文本格式；extra 为额外的指标族（如MCP服务器进程的指标），同名指标族合并为一组输出"""
+        merged: Dict[str, MetricFamily] = {}
+        for family in [*self.collect(), *extra]:
+            existing = merged.get(family.name)
+            if existing is None:
+                merged[family.name] = family._replace(samples=list(family.samples))
+            else:
+                existing.samples.extend(family.samples)
+        lines: List[str] = []
+        for family in merged.values():
+            lines.append(f"# HELP {family.name} {_escape_help(family.help)}")
+            lines.append(f"# TYPE {family.name} {family.type}")
+            for sample in family.samples:
+                lines.append(f"{family.name}{sample.suffix}{_format_labels(sample.labels)} {_format_value(sample.value)}")
+        return "\n".join(lines) + "\n"
+
+    def _get_or_create(self, cls, name: str, help: str, labelnames: Sequence[str], **kwargs) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"指标 {name} 已以不同的类型或标签注册")
+            return metric
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def dump_families(families: Iterable[MetricFamily]) -> List[Dict[str, Any]]:
+    """把指标族转换为可JSON编码的结构（跨进程传递）"""
+    return [{"name": f.name, "type": f.type, "help": f.help,
+             "samples": [[s.labels, s.value, s.suffix] for s in f.samples]} for f in families]
+
+
+def load_families(data: Iterable[Dict[str, Any]], **labels: object) -> List[MetricFamily]:
+    """dump_families 的逆操作，每个样本附加 labels（如来源进程的 pid）"""
+    extra = {name: str(value) for name, value in labels.items()}
+    return [MetricFamily(f["name"], f["type"], f["help"],
+                         [Sample({**extra, **sample_labels}, value, suffix)
+                          for sample_labels, value, suffix in f["samples"]])
+            for f in data]
+
+
+def ratio(numerator: float, denominator: float) -> float:
+    """命中率等比值；分母为0时为0"""
+    return numerator / denominator if denominator else 0.0
+
+
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """获取全局指标注册表"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = MetricsRegistry()
+    return _registry
@@ -0,0 +1,66 @@
+"""
+进度事件
+长时间运行的工具通过 report_progress 上报步骤开始/完成与日志，调用方用 progress_scope 注册回调接收：
+MCP服务器把事件转发为 notifications/progress，UI直接据此刷新进度条。未注册回调时上报为空操作。
+回调保存在 contextvars 中，asyncio.to_thread 与携带上下文提交的线程任务都能继承。
+"""
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence, TypeVar
+
+from .cancellation import check_cancelled
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+T = TypeVar("T")
+
+# 事件类型
+STEP_STARTED = "step_started"
+STEP_FINISHED = "step_finished"
+LOG = "log"
+
+_current: contextvars.ContextVar[Optional[ProgressCallback]] = contextvars.ContextVar("lam_progress", default=None)
+
+
+def report_progress(kind: str, message: str = "", **data: Any) -> None:
+    """上报一个进度事件；回调异常只记录日志，不影响工具执行"""
+    callback = _current.get()
+    if callback is None:
+        return
+    event = {"kind": kind, "message": message, "time": time.time(), **data}
+    try:
+        callback(event)
+    except Exception as e:
+        logger.debug(f"进度回调失败: {e}")
+
+
+def progress_enabled() -> bool:
+    """当前上下文是否有人接收进度事件"""
+    return _current.get() is not None
+
+
+@contextmanager
+def progress_scope(callback: Optional[ProgressCallback]) -> Iterator[None]:
+    """在当前上下文中注册进度回调"""
+    token = _current.set(callback)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def iter_steps(steps: Sequence[T], describe: Callable[[T], str] = str) -> Iterable[T]:
+    """遍历步骤并在每步前后上报 step_started/step_finished（循环体中的 continue 同样会触发完成事件）
+
+    每步开始前是一个取消检查点：当前执行已被取消时抛出 OperationCancelled。
+    """
+    total = len(steps)
+    for index, step in enumerate(steps):
+        check_cancelled()
+        label = describe(step)
+        report_progress(STEP_STARTED, f"步骤 {index + 1}/{total}: {label}", index=index, total=total)
+        yield step
+        report_progress(STEP_FINISHED, f"步骤 {index + 1}/{total} 完成: {label}", index=index, total=total)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试MCP工具的并发类别与准入控制
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import time
+
+import pytest
+
+from src.mcp.core.admission import AdmissionController, AdmissionRejected
+from src.mcp.core.base import MCPTool
+from src.mcp.core.execution import ExecutionClass
+
+
+def test_queue_full_and_timeout_are_rejected_with_retry_hint():
+    """超过上限的调用排队，队列满时立即拒绝，排队超时同样拒绝，并给出重试间隔"""
+    controller = AdmissionController({"browser": {"limit": 1, "queue": 1, "timeout": 0.15}})
+    order = []
+
+    async def call(name, hold):
+        async with controller.slot("browser"):
+            order.append(name)
+            await asyncio.sleep(hold)
+        return name
+
+    async def scenario():
+        first = asyncio.ensure_future(call("a", 0.1))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(call("b", 0.3))
+        await asyncio.sleep(0)
+        start = time.perf_counter()
+        with pytest.raises(AdmissionRejected) as full:
+            await call("c", 0)
+        rejected_in = time.perf_counter() - start
+        await asyncio.gather(first, second)
+        with pytest.raises(AdmissionRejected) as timeout:
+            await asyncio.gather(call("d", 0.3), call("e", 0))
+        return full.value, rejected_in, timeout.value
+
+    full, rejected_in, timeout = asyncio.run(scenario())
+
+    assert order == ["a", "b", "d"]
+    assert full.reason == "queue_full" and full.retry_after >= 1 and rejected_in < 0.05
+    assert timeout.reason == "timeout"
+    stats = controller.stats()["browser"]
+    assert (stats["running"], stats["queue_depth"], stats["rejected"], stats["timeouts"]) == (0, 0, 1, 1)
+    assert stats["admitted"] == 3 and stats["max_wait_ms"] > 50
+
+
+def test_server_limits_class_without_blocking_other_tools():
+    """浏览器类工具达到上限时排队，不受限的工具照常执行，排队情况出现在 server_stats 中"""
+    from src.mcp.server import LAMMCPServer
+
+    server = LAMMCPServer()
+    server.admission = AdmissionController({"browser": {"limit": 1, "queue": 4, "timeout": 5}})
+    active = {"now": 0, "peak": 0}
+
+    def browse(args):
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        time.sleep(0.1)
+        active["now"] -= 1
+        return {"i": args["i"]}
+
+    def quick(args):
+        return {"ok": True}
+
+    server.tools["browse"] = MCPTool("browse", "演示", {"type": "object"}, browse,
+                                     ExecutionClass.BROWSER, concurrency="browser")
+    server.tools["quick"] = MCPTool("quick", "演示", {"type": "object"}, quick, ExecutionClass.BLOCKING_IO)
+
+    async def scenario():
+        calls = [asyncio.ensure_future(server.call_tool("browse", {"i": i})) for i in range(3)]
+        await asyncio.sleep(0.05)
+        start = time.perf_counter()
+        quick_result = await server.call_tool("quick", {})
+        quick_latency = time.perf_counter() - start
+        stats = await server.call_tool("server_stats", {})
+        return await asyncio.gather(*calls), quick_result, quick_latency, stats
+
+    results, quick_result, quick_latency, stats = asyncio.run(scenario())
+
+    assert [r["result"]["i"] for r in results] == [0, 1, 2]
+    assert active["peak"] == 1
+    assert quick_result["success"] and quick_latency < 0.05
+    browser = stats["result"]["concurrency"]["browser"]
+    assert browser["running"] == 1 and browser["queue_depth"] == 2
+    assert server.tools["web_automate"].concurrency == "browser"
+    assert server.tools["calculate"].concurrency is None
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试回答缓存
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+import pytest
+
+from src.database.answer_cache import AnswerCache, evidence_fingerprint, has_side_effects, normalize_query
+
+SEARCH_PLAN = {"operation_type": "search", "target_platform": "browser", "steps": []}
+EVIDENCE = [
+    {"title": "Python", "href": "https://example.com/py", "body": "Python 是一种编程语言"},
+    {"title": "教程", "href": "https://example.com/tutorial", "body": "入门教程"},
+]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AnswerCache(str(tmp_path / "cache.db"), ttl_by_operation={"search": 60, "answer": 3600})
+
+
+def test_normalization_and_fingerprint():
+    """查询规范化忽略大小写、全角与结尾标点；证据指纹与顺序无关"""
+    assert normalize_query("  什么是 Python？ ") == normalize_query("什么是  python?")
+    assert evidence_fingerprint(EVIDENCE) == evidence_fingerprint(list(reversed(EVIDENCE)))
+    assert evidence_fingerprint(EVIDENCE) != evidence_fingerprint(EVIDENCE[:1])
+
+
+def test_hit_by_query_and_by_evidence(cache):
+    """写入后可按查询或按（查询, 证据）命中，证据变化时不命中"""
+    assert cache.put("什么是Python？", SEARCH_PLAN, EVIDENCE, "Python是一种语言")
+
+    hit = cache.get("什么是 python")
+    assert hit["answer"] == "Python是一种语言"
+    assert hit["plan"] == SEARCH_PLAN and hit["evidence"] == EVIDENCE
+    assert cache.get("什么是Python", list(reversed(EVIDENCE)))["answer"] == "Python是一种语言"
+    assert cache.get("什么是Python", EVIDENCE[:1]) is None
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+
+def test_side_effect_plans_are_not_cached_and_invalidate(cache):
+    """含副作用的计划不缓存，并使同一查询的旧缓存失效"""
+    automate = {"operation_type": "automate", "steps": [{"action": "navigate", "url": "https://jd.com"}]}
+    clicking = {"operation_type": "search", "steps": [{"action": "click", "selector": "a"}]}
+    assert has_side_effects(automate) and has_side_effects(clicking)
+    assert not has_side_effects(SEARCH_PLAN)
+
+    cache.put("打开京东", SEARCH_PLAN, EVIDENCE, "旧回答")
+    assert not cache.put("打开京东", automate, EVIDENCE, "新回答")
+    assert cache.get("打开京东") is None
+
+
+def test_ttl_per_operation_type(tmp_path):
+    """不同操作类型使用各自的TTL，未配置的类型不缓存"""
+    cache = AnswerCache(str(tmp_path / "ttl.db"), ttl_by_operation={"search": 1, "answer": 3600})
+    cache.put("搜索新闻", SEARCH_PLAN, EVIDENCE, "新闻摘要")
+    cache.put("你好", {"operation_type": "answer", "steps": []}, [], "你好！")
+    assert not cache.put("浏览页面", {"operation_type": "browse", "steps": []}, [], "页面内容")
+
+    time.sleep(1.1)
+    assert cache.get("搜索新闻") is None
+    assert cache.get("你好")["answer"] == "你好！"
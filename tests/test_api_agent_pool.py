@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试 /ask 接口的代理工作池：并发执行不阻塞事件循环、有界排队与拒绝、超时取消、批量查询的去重与流式返回
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from src.api.agent_pool import AgentPool, AgentPoolBusy
+from src.utils.cancellation import cancellable_sleep
+from src.utils.exceptions import TimeoutError as AgentTimeoutError
+
+
+class FakeAgent:
+    """与 LamAgent.run 相同的同步接口，不可重入"""
+
+    def __init__(self, delay: float = 0.2):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def run(self, question, use_cache=True):
+        assert self.lock.acquire(blocking=False), "同一实例被并发调用"
+        try:
+            cancellable_sleep(self.delay)
+            return {"plan": "answer", "answer": question, "evidence_count": 0, "evidence": []}
+        finally:
+            self.stopped.set()
+            self.lock.release()
+
+
+def test_pool_runs_concurrently_without_blocking_loop():
+    """多个请求在独立实例上并发执行，期间事件循环照常调度其他协程"""
+    pool = AgentPool(FakeAgent, size=4, queue_size=4)
+    ticks = []
+
+    async def ticker(stop):
+        while not stop.is_set():
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    async def scenario():
+        stop = asyncio.Event()
+        tick_task = asyncio.ensure_future(ticker(stop))
+        start = time.perf_counter()
+        results = await asyncio.gather(*[pool.run(f"q{i}") for i in range(8)])
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await tick_task
+        return results, elapsed
+
+    try:
+        results, elapsed = asyncio.run(scenario())
+    finally:
+        pool.shutdown(wait=True)
+
+    assert [r["answer"] for r in results] == [f"q{i}" for i in range(8)]
+    # 8个0.2秒的请求由4个实例分两批完成
+    assert elapsed < 0.6
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.1
+    stats = pool.stats()
+    assert (stats["completed"], stats["running"], stats["queued"]) == (8, 0, 0)
+
+
+def test_pool_rejects_when_queue_full():
+    """运行与排队的请求达到上限后立即拒绝并给出重试间隔"""
+    pool = AgentPool(FakeAgent, size=1, queue_size=1)
+
+    async def scenario():
+        first = asyncio.ensure_future(pool.run("a"))
+        second = asyncio.ensure_future(pool.run("b"))
+        await asyncio.sleep(0.05)
+        with pytest.raises(AgentPoolBusy) as excinfo:
+            await pool.run("c")
+        await asyncio.gather(first, second)
+        return excinfo.value
+
+    try:
+        busy = asyncio.run(scenario())
+    finally:
+        pool.shutdown(wait=True)
+
+    assert busy.retry_after >= 1.0
+    assert pool.stats()["rejected"] == 1
+
+
+def test_pool_timeout_cancels_running_agent():
+    """超时立即返回，仍在运行的代理在检查点停止，实例归还后可继续使用"""
+    agents = []
+
+    def factory():
+        agents.append(FakeAgent(delay=5))
+        return agents[-1]
+
+    pool = AgentPool(factory, size=1, queue_size=0, timeout=0.1)
+
+    async def scenario():
+        start = time.perf_counter()
+        with pytest.raises(AgentTimeoutError):
+            await pool.run("slow")
+        return time.perf_counter() - start
+
+    try:
+        elapsed = asyncio.run(scenario())
+        assert elapsed < 0.5
+        assert agents[0].stopped.wait(1.0)
+        agents[0].delay = 0
+        assert asyncio.run(pool.run("next"))["answer"] == "next"
+    finally:
+        pool.shutdown(wait=True)
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_health_answers_while_ask_runs(monkeypatch):
+    """/ask 执行期间 /health 仍能立即响应"""
+    httpx = pytest.importorskip("httpx")
+    # 接口模块依赖浏览器与桌面集成的全部可选依赖
+    main = pytest.importorskip("src.api.main")
+
+    pool = AgentPool(lambda: FakeAgent(delay=0.5), size=1)
+    monkeypatch.setattr(main, "agent_pool", pool)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            ask = asyncio.ensure_future(client.post("/ask", json={"question": "你好"}))
+            await asyncio.sleep(0.1)
+            start = time.perf_counter()
+            health = await client.get("/health")
+            health_elapsed = time.perf_counter() - start
+            return await ask, health, health_elapsed
+
+    try:
+        ask, health, health_elapsed = asyncio.run(scenario())
+    finally:
+        pool.shutdown(wait=True)
+
+    assert ask.status_code == 200 and ask.json()["answer"] == "你好"
+    assert health.json()["agent_pool"]["running"] == 1
+    assert health_elapsed < 0.3
+
+
+def test_run_many_bounds_parallelism_and_yields_as_completed():
+    """批量执行不超过指定并行度，结果按完成顺序产出，单项失败不影响其他项"""
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    class CountingAgent(FakeAgent):
+        def run(self, question, use_cache=True):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            try:
+                if question == "bad":
+                    raise ValueError("无效问题")
+                self.delay = 0.3 if question == "slow" else 0.05
+                return super().run(question, use_cache)
+            finally:
+                with lock:
+                    active[0] -= 1
+
+    pool = AgentPool(CountingAgent, size=4, queue_size=0)
+
+    async def scenario():
+        return [item async for item in pool.run_many(["slow", "a", "bad", "b", "c", "d"], parallelism=2)]
+
+    try:
+        items = asyncio.run(scenario())
+    finally:
+        pool.shutdown(wait=True)
+
+    assert peak[0] == 2
+    assert sorted(index for index, _, _ in items) == list(range(6))
+    assert items[-1][0] == 0
+    errors = {index: error for index, _, error in items if error is not None}
+    assert list(errors) == [2] and isinstance(errors[2], ValueError)
+
+
+def test_ask_batch_dedupes_and_streams_ndjson(monkeypatch):
+    """/ask/batch 对相同问题只执行一次，逐行返回每个输入的结果与汇总"""
+    httpx = pytest.importorskip("httpx")
+    main = pytest.importorskip("src.api.main")
+    calls = []
+
+    class RecordingAgent(FakeAgent):
+        def run(self, question, use_cache=True):
+            calls.append(question)
+            return super().run(question, use_cache)
+
+    pool = AgentPool(lambda: RecordingAgent(delay=0.05), size=2)
+    monkeypatch.setattr(main, "agent_pool", pool)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/ask/batch", json={
+                "questions": ["什么是Python？", "什么是 python", "天气", "汇率"]})
+            too_many = await client.post("/ask/batch", json={"questions": ["q"] * 201})
+            return response, too_many
+
+    try:
+        response, too_many = asyncio.run(scenario())
+    finally:
+        pool.shutdown(wait=True)
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert sorted(calls) == sorted(["什么是Python？", "天气", "汇率"])
+    results = {line["index"]: line for line in lines[:-1]}
+    assert sorted(results) == [0, 1, 2, 3]
+    assert results[1]["duplicate_of"] == 0 and results[1]["result"] == results[0]["result"]
+    assert results[2]["result"]["answer"] == "天气"
+    assert lines[-1]["done"] is True and (lines[-1]["total"], lines[-1]["unique"], lines[-1]["failed"]) == (4, 3, 0)
+    assert too_many.status_code == 422
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试API响应的orjson编码、重型字段去除与按 Accept-Encoding 协商的压缩
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import gzip
+import json
+
+import pytest
+
+pytest.importorskip("starlette")
+httpx = pytest.importorskip("httpx")
+
+from src.api.responses import CompressionMiddleware, ORJSONResponse, exclude_fields, negotiate_encoding
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+PAGE = {"title": "示例", "html": "<div>商品</div>" * 500, "text": "商品 " * 500}
+
+
+def _app(**options):
+    async def large(request):
+        return ORJSONResponse({"evidence": [PAGE] * 3})
+
+    async def small(request):
+        return PlainTextResponse("ok")
+
+    async def lines(request):
+        async def body():
+            for i in range(3):
+                yield json.dumps({"index": i, "page": PAGE}).encode() + b"\n"
+        return StreamingResponse(body(), media_type="application/x-ndjson")
+
+    async def events(request):
+        return StreamingResponse(iter([b"data: " + b"x" * 4096 + b"\n\n"]), media_type="text/event-stream")
+
+    app = Starlette(routes=[Route("/large", large), Route("/small", small), Route("/lines", lines),
+                            Route("/events", events)])
+    return CompressionMiddleware(app, **options)
+
+
+def _get(app, path, accept_encoding):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(path, headers={"Accept-Encoding": accept_encoding})
+
+    return asyncio.run(scenario())
+
+
+def test_negotiate_encoding_honours_q_values_and_server_order():
+    assert negotiate_encoding("gzip, zstd", ["zstd", "gzip"]) == "zstd"
+    assert negotiate_encoding("gzip, zstd;q=0.5", ["zstd", "gzip"]) == "gzip"
+    assert negotiate_encoding("*;q=0.1, gzip;q=0", ["gzip"]) is None
+    assert negotiate_encoding("*", ["gzip"]) == "gzip"
+    assert negotiate_encoding("br, identity", ["zstd", "gzip"]) is None
+
+
+def test_exclude_fields_strips_nested_keys_without_mutating_input():
+    result = {"evidence": [PAGE, {"href": "https://example.com"}], "execution_result": {"page": PAGE}}
+    stripped = exclude_fields(result, ["html"])
+    assert "html" not in stripped["evidence"][0] and "html" not in stripped["execution_result"]["page"]
+    assert stripped["evidence"][1] == {"href": "https://example.com"}
+    assert "html" in PAGE
+    assert exclude_fields(result, []) is result
+
+
+def test_gzip_compresses_large_and_streaming_responses_only():
+    """大于阈值的响应与NDJSON流被压缩；小响应、SSE与不接受压缩的客户端原样返回"""
+    app = _app(encodings=["gzip"], minimum_size=1024)
+
+    large = _get(app, "/large", "gzip")
+    assert large.headers["content-encoding"] == "gzip" and "Accept-Encoding" in large.headers["vary"]
+    assert int(large.headers["content-length"]) < len(json.dumps({"evidence": [PAGE] * 3}, ensure_ascii=False))
+    assert large.json()["evidence"][0]["text"] == PAGE["text"]
+
+    streamed = _get(app, "/lines", "gzip")
+    assert streamed.headers["content-encoding"] == "gzip" and "content-length" not in streamed.headers
+    assert [json.loads(line)["index"] for line in streamed.text.splitlines()] == [0, 1, 2]
+
+    assert "content-encoding" not in _get(app, "/small", "gzip").headers
+    assert "content-encoding" not in _get(app, "/events", "gzip").headers
+    assert "content-encoding" not in _get(app, "/large", "identity").headers
+    assert gzip.decompress(_compressed_body(app, "/large", "gzip"))
+
+
+def test_zstd_preferred_when_available():
+    pytest.importorskip("zstandard")
+    app = _app(encodings=["zstd", "gzip"], minimum_size=1024)
+    response = _get(app, "/large", "gzip, zstd")
+    assert response.headers["content-encoding"] == "zstd"
+    assert response.json()["evidence"][2]["title"] == "示例"
+    assert _get(app, "/large", "gzip").headers["content-encoding"] == "gzip"
+
+
+def _compressed_body(app, path, accept_encoding):
+    """不经客户端自动解压，取得原始响应体"""
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            async with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+                return b"".join([chunk async for chunk in response.aiter_raw()])
+
+    return asyncio.run(scenario())
+
+
+def test_ask_details_exclude_html_by_default(monkeypatch):
+    """/ask 可附带证据与执行结果，默认去掉原始HTML"""
+    main = pytest.importorskip("src.api.main")
+
+    class Pool:
+        async def run(self, question, use_cache=True, timeout=None):
+            return {"plan": "browse", "answer": "回答", "evidence_count": 1,
+                    "evidence": [{"href": "https://example.com", **PAGE}],
+                    "execution_result": {"success": True, "page": PAGE}}
+
+    monkeypatch.setattr(main, "agent_pool", Pool())
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            plain = await client.post("/ask", json={"question": "你好"})
+            details = await client.post("/ask", json={"question": "你好", "include_details": True})
+            full = await client.post("/ask", json={"question": "你好", "include_details": True, "exclude_fields": []})
+            return plain, details, full
+
+    plain, details, full = asyncio.run(scenario())
+    assert "evidence" not in plain.json() and plain.json()["sources"] == ["https://example.com"]
+    assert details.json()["evidence"][0]["text"] == PAGE["text"] and "html" not in details.json()["evidence"][0]
+    assert "html" not in details.json()["execution_result"]["page"]
+    assert full.json()["evidence"][0]["html"] == PAGE["html"]
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试协作式取消：步骤检查点、调度器、MCP服务器的 notifications/cancelled 与客户端超时取消
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from src.mcp.core.base import MCPTool
+from src.mcp.core.execution import ExecutionClass
+from src.mcp.transport import InProcessTransport, StdioTransport
+from src.tools.step_scheduler import DAGScheduler, StepNode
+from src.utils.cancellation import CancelToken, cancel_scope, cancellable_sleep, on_cancel
+from src.utils.exceptions import OperationCancelled
+from src.utils.progress import LOG, iter_steps, progress_scope, report_progress
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_checkpoints_stop_steps_and_waits():
+    """取消后下一步不再开始，等待立即被打断，登记的清理动作在取消时执行"""
+    token = CancelToken()
+    seen = []
+    with cancel_scope(token):
+        with pytest.raises(OperationCancelled):
+            for step in iter_steps(["a", "b", "c"]):
+                seen.append(step)
+                if step == "b":
+                    token.cancel("用户停止")
+    assert seen == ["a", "b"]
+    assert token.reason == "用户停止"
+
+    token, cleanups = CancelToken(), []
+    threading.Timer(0.05, token.cancel).start()
+    start = time.perf_counter()
+    with cancel_scope(token), on_cancel(lambda: cleanups.append("closed")):
+        with pytest.raises(OperationCancelled):
+            cancellable_sleep(5)
+    assert time.perf_counter() - start < 1.0
+    assert cleanups == ["closed"]
+
+    # 已取消的令牌上登记的动作立即执行；块结束后登记自动撤销
+    with cancel_scope(token), on_cancel(lambda: cleanups.append("late")):
+        pass
+    assert cleanups == ["closed", "late"]
+
+
+def test_scheduler_stops_dispatching_after_cancel():
+    """调度器在取消后不再派发新步骤，剩余步骤标记为已取消"""
+    token = CancelToken()
+    started = []
+
+    def execute(idx):
+        started.append(idx)
+        if idx == 0:
+            token.cancel()
+        return {"success": True}
+
+    nodes = [StepNode(0), StepNode(1, depends_on=[0]), StepNode(2, depends_on=[1])]
+    with cancel_scope(token):
+        results = DAGScheduler(max_workers=2).run(nodes, execute)
+
+    assert started == [0]
+    assert results[0]["success"]
+    assert all(r["cancelled"] and not r["success"] for r in results[1:])
+
+
+def test_speculative_run_sees_caller_cancel_and_progress(monkeypatch):
+    """投机导航在租约线程上执行的自动化能看到调用方的取消令牌与进度回调"""
+    speculation = pytest.importorskip("src.agent.speculation")
+
+    class FakeLease:
+        def close(self):
+            pass
+
+    monkeypatch.setattr(speculation, "PageLease", lambda url, **kwargs: FakeLease())
+    nav = speculation.SpeculativeNavigator()
+    nav.dispatch("https://example.com")
+    events = []
+
+    def automate(lease):
+        report_progress(LOG, "页面已就绪")
+        for _ in iter_steps(["a"]):
+            pass
+        return lease
+
+    token = CancelToken()
+    try:
+        with cancel_scope(token), progress_scope(events.append):
+            assert isinstance(nav.run(automate), FakeLease)
+            token.cancel("超时")
+            with pytest.raises(OperationCancelled):
+                nav.run(automate)
+    finally:
+        nav.close()
+
+    assert [event["message"] for event in events][:2] == ["页面已就绪", "步骤 1/1: a"]
+
+
+def _register_blocking_tool(server, exited):
+    def slow(args):
+        try:
+            for _ in range(100):
+                cancellable_sleep(0.05)
+            return {"done": True}
+        finally:
+            exited.set()
+
+    server.tools["slow"] = MCPTool("slow", "可取消的慢工具", {"type": "object"}, slow, ExecutionClass.BLOCKING_IO)
+
+
+def test_server_cancels_request_on_notification():
+    """notifications/cancelled 让执行中的调用立即返回，线程中的处理器在检查点退出"""
+    from src.mcp.server import LAMMCPServer
+
+    server = LAMMCPServer()
+    exited = threading.Event()
+    _register_blocking_tool(server, exited)
+
+    async def scenario():
+        call = asyncio.ensure_future(server.handle_message(
+            {"jsonrpc": "2.0", "id": 7, "method": "tools/call", "params": {"name": "slow", "arguments": {}}}))
+        await asyncio.sleep(0.2)
+        start = time.perf_counter()
+        await server.handle_message({"jsonrpc": "2.0", "method": "notifications/cancelled",
+                                     "params": {"requestId": 7, "reason": "用户停止"}})
+        response = await call
+        return response, time.perf_counter() - start
+
+    response, elapsed = asyncio.run(scenario())
+
+    assert response["result"]["cancelled"] is True
+    assert response["result"]["success"] is False
+    assert elapsed < 0.5
+    assert exited.wait(1.0)
+    assert server._cancel_tokens == {}
+
+
+def test_cancel_only_stops_the_cancelled_request_of_a_shared_cache_fill(monkeypatch):
+    """合并到同一缓存填充的请求中，取消其中一个不影响另一个；唯一的等待者取消时处理器退出"""
+    from src.mcp.core import cache as cache_module
+    from src.mcp.core.cache import CachePolicy, ToolResultCache
+    from src.mcp.server import LAMMCPServer
+
+    monkeypatch.setattr(cache_module, "_tool_cache", ToolResultCache(None))
+    server = LAMMCPServer()
+    calls, exited = [], threading.Event()
+
+    def fetch(args):
+        calls.append(args["url"])
+        try:
+            for _ in range(6 if args["url"] == "u" else 100):
+                cancellable_sleep(0.05)
+            return {"url": args["url"]}
+        finally:
+            if args["url"] == "v":
+                exited.set()
+
+    server.tools["fetch"] = MCPTool("fetch", "可缓存的慢工具",
+                                    {"type": "object", "properties": {"url": {"type": "string"}}},
+                                    fetch, ExecutionClass.BLOCKING_IO, cache=CachePolicy(ttl=60))
+
+    def call(request_id, url):
+        return asyncio.ensure_future(server.handle_message(
+            {"jsonrpc": "2.0", "id": request_id, "method": "tools/call",
+             "params": {"name": "fetch", "arguments": {"url": url}}}))
+
+    async def scenario():
+        first, second = call(101, "u"), call(102, "u")
+        await asyncio.sleep(0.1)
+        server.cancel_request(101)
+        shared = await asyncio.gather(first, second)
+        alone = call(103, "v")
+        await asyncio.sleep(0.1)
+        server.cancel_request(103)
+        return shared, await alone
+
+    (first, second), alone = asyncio.run(scenario())
+
+    assert first["result"]["cancelled"] is True
+    assert second["result"] == {"success": True, "result": {"url": "u"}}
+    assert alone["result"]["cancelled"] is True
+    assert exited.wait(1.0)
+    assert calls == ["u", "v"]
+
+
+def test_in_process_timeout_cancels_tool():
+    """进程内传输请求超时后，服务器端的工具执行同样被取消"""
+    from src.mcp.server import LAMMCPServer
+
+    server = LAMMCPServer()
+    exited = threading.Event()
+    _register_blocking_tool(server, exited)
+    transport = InProcessTransport(server=server)
+
+    async def scenario():
+        await transport.start()
+        with pytest.raises(asyncio.TimeoutError):
+            await transport.request("tools/call", {"name": "slow", "arguments": {}}, timeout=0.2)
+
+    asyncio.run(scenario())
+    assert exited.wait(1.0)
+
+
+@pytest.mark.skipif(os.name == "nt", reason="依赖POSIX进程组")
+def test_run_command_process_is_killed_on_cancel(tmp_path):
+    """取消 run_command 时立即结束命令子进程"""
+    from src.mcp.server import LAMMCPServer
+
+    server = LAMMCPServer()
+    pid_file = tmp_path / "pid"
+    command = f"echo $$ > {pid_file}; sleep 30"
+
+    async def scenario():
+        call = asyncio.ensure_future(server.handle_message(
+            {"jsonrpc": "2.0", "id": "cmd", "method": "tools/call",
+             "params": {"name": "run_command", "arguments": {"command": command}}}))
+        for _ in range(100):
+            if pid_file.exists() and pid_file.read_text().strip():
+                break
+            await asyncio.sleep(0.02)
+        server.cancel_request("cmd")
+        return await asyncio.wait_for(call, 2.0)
+
+    response = asyncio.run(scenario())
+    assert response["result"]["cancelled"] is True
+
+    pid = int(pid_file.read_text().strip())
+    deadline = time.monotonic() + 2.0
+    while time.monotonic() < deadline:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            break
+        time.sleep(0.02)
+    else:
+        pytest.fail("命令进程未被结束")
+
+
+CANCEL_RECORDER = '''
+import asyncio, json, sys
+sys.path.insert(0, {root!r})
+from src.mcp.transport import serve_stdio
+
+async def handle(message, notify):
+    if message.get("method") == "notifications/cancelled":
+        with open({path!r}, "w") as f:
+            json.dump(message["params"], f)
+        return None
+    await asyncio.sleep(5)
+    return {{"jsonrpc": "2.0", "id": message["id"], "result": {{}}}}
+
+asyncio.run(serve_stdio(handle))
+'''
+
+
+def test_stdio_timeout_sends_cancel_notification(tmp_path):
+    """stdio客户端放弃等待时向服务器发送 notifications/cancelled"""
+    record = tmp_path / "cancelled.json"
+    script = tmp_path / "server.py"
+    script.write_text(CANCEL_RECORDER.format(root=ROOT, path=str(record)), encoding="utf-8")
+    transport = StdioTransport([sys.executable, str(script)])
+
+    async def scenario():
+        await transport.start()
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await transport.request("tools/call", {"name": "slow"}, timeout=0.2)
+            for _ in range(100):
+                if record.exists():
+                    break
+                await asyncio.sleep(0.02)
+        finally:
+            await transport.close(timeout=0.5)
+
+    asyncio.run(scenario())
+
+    params = json.loads(record.read_text())
+    assert params["requestId"] == 1
+    assert params["reason"] == "请求超时"
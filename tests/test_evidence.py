@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试证据压缩器
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from src.utils.evidence import EvidenceCompactor, compact_evidence, estimate_tokens
+
+
+def _page_html(needle: str) -> str:
+    filler = "<p>这是一段与问题无关的填充文字，用于模拟整页内容。</p>" * 300
+    return f"<html><head><script>var tracking = 1;</script></head><body>{filler}<p>{needle}</p>{filler}</body></html>"
+
+
+def test_dedupes_by_url_and_keeps_longest_body():
+    """同一URL的证据只保留一条，正文取最长的版本"""
+    evidence = [
+        {"title": "Python", "href": "https://example.com/py/", "body": "短摘要"},
+        {"title": "Python", "href": "https://example.com/py", "body": "更完整的 Python 介绍内容"},
+        {"title": "其他", "href": "https://example.com/other", "body": "其他内容"},
+    ]
+    result = compact_evidence("Python 介绍", evidence)
+
+    assert [item["href"] for item in result] == ["https://example.com/py/", "https://example.com/other"]
+    assert result[0]["body"] == "更完整的 Python 介绍内容"
+
+
+def test_extracts_relevant_passage_from_page_html():
+    """整页HTML被去标签，并只保留与查询相关的段落"""
+    needle = "Python 3.13 引入了实验性的 JIT 编译器。"
+    evidence = [{"title": "新闻", "href": "https://example.com/news", "html": _page_html(needle)}]
+
+    result = compact_evidence("Python 3.13 JIT 编译器", evidence, token_budget=300)
+
+    assert len(result) == 1
+    assert needle in result[0]["body"]
+    assert "<p>" not in result[0]["body"] and "tracking" not in result[0]["body"]
+    assert result[0]["truncated"] is True
+
+
+def test_respects_token_budget():
+    """压缩结果的总token数不超过预算"""
+    evidence = [
+        {"title": f"结果{i}", "href": f"https://example.com/{i}", "body": "搜索 结果 内容。" * 200}
+        for i in range(5)
+    ]
+    budget = 400
+    result = EvidenceCompactor(token_budget=budget).compact("搜索结果", evidence)
+
+    total = sum(estimate_tokens(item["title"]) + estimate_tokens(item["href"]) + estimate_tokens(item["body"])
+                for item in result)
+    assert total <= budget
+    assert len(result) == 5
+
+
+def test_bm25_prefers_matching_passages():
+    """BM25对包含查询词的段落打出更高的分数"""
+    scores = EvidenceCompactor().score("机器学习 model", [
+        "今天天气很好，适合出门散步。",
+        "机器学习模型需要大量数据进行训练，model 的质量取决于数据。",
+        "",
+    ])
+    assert scores[1] > scores[0] >= 0
+    assert scores[2] == 0
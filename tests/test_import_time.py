@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试MCP冷启动导入开销
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import subprocess
+
+from src.mcp.registry.tool_registry import LAMToolRegistry
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 导入预算（毫秒），可通过环境变量放宽以适应较慢的机器
+IMPORT_BUDGET_MS = float(os.environ.get("LAM_IMPORT_BUDGET_MS", "600"))
+
+# 这些模块只应在对应工具第一次被调用时加载
+HEAVY_MODULES = (
+    "playwright",
+    "win32com",
+    "winreg",
+    "src.tools.executor",
+    "src.tools.browser",
+    "src.tools.steam_integration",
+    "src.tools.bilibili_integration",
+    "src.tools.desktop_launcher_safe",
+    "src.mcp.handlers",
+)
+
+COLD_START = (
+    "import src.mcp\n"
+    "from src.mcp import LAMAgentMCPAdapter, get_mcp_server\n"
+    "get_mcp_server()\n"
+)
+
+
+def import_profile(code: str):
+    """运行 python -X importtime，返回 {模块名: 累计微秒} 与顶层模块的累计耗时"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, timeout=60,
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    modules = {}
+    top_level_us = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative)
+        if not name[1:].startswith(" ") and name.strip().startswith("src"):
+            top_level_us += int(cumulative)
+    return modules, top_level_us
+
+
+def test_mcp_cold_start_is_lazy_and_within_budget():
+    """导入 src.mcp 并创建服务器不加载工具模块，且耗时在预算内"""
+    modules, src_us = import_profile(COLD_START)
+
+    loaded = [name for name in modules if name.startswith(HEAVY_MODULES)]
+    assert loaded == []
+    assert src_us / 1000 < IMPORT_BUDGET_MS
+
+
+def test_registry_handlers_load_on_first_call():
+    """注册表只保存处理器描述符，调用时才解析"""
+    registry = LAMToolRegistry()
+    tool = registry.get_tool("calculate")
+
+    assert not tool.handler.loaded
+    result = tool.handler.resolve()
+    assert tool.handler.loaded
+    assert result.__qualname__ == "CalculatorHandler.handle"
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试后台任务：SQLite任务存储、重启恢复与保留期清除、工作池执行查询与工具调用并记录进度事件
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from src.api.jobs import ASK, TOOL, JobManager
+from src.database.job_store import FAILED, QUEUED, RUNNING, STATUS, SUCCEEDED, JobStore
+from src.mcp.core.base import MCPTool
+from src.mcp.core.execution import ExecutionClass
+from src.utils.progress import LOG, iter_steps, report_progress
+
+
+class FakeAgent:
+    def run(self, question, use_cache=True):
+        for step in iter_steps(["plan", "search"]):
+            report_progress(LOG, f"执行 {step}")
+        if question == "boom":
+            return {"plan": "error", "answer": "抱歉", "execution_result": {"success": False, "error": "爆炸"}}
+        return {"plan": "answer", "answer": f"回答: {question}", "evidence_count": 0, "evidence": []}
+
+
+def _wait_finished(store, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = store.get(job_id)
+        if job["status"] in (SUCCEEDED, FAILED):
+            return job
+        time.sleep(0.02)
+    pytest.fail(f"任务 {job_id} 未在 {timeout} 秒内结束")
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / "jobs.db"))
+
+
+def test_store_lifecycle_recovery_and_retention(store):
+    """状态变化写入事件表；重启时运行中的任务标记失败、排队任务重新入队；过期任务被清除"""
+    first = store.create(ASK, {"question": "a"})
+    second = store.create(TOOL, {"tool": "calculate", "arguments": {"expression": "1+1"}})
+    assert first["status"] == QUEUED and first["request"] == {"question": "a"}
+
+    assert store.mark_running(first["id"])
+    assert not store.mark_running(first["id"])
+    store.add_event(first["id"], LOG, message="进行中")
+
+    assert store.recover() == [second["id"]]
+    interrupted = store.get(first["id"])
+    assert interrupted["status"] == FAILED and "中断" in interrupted["error"]
+    events = store.events(first["id"])
+    assert [e["seq"] for e in events] == [1, 2, 3, 4]
+    assert [e.get("status") for e in events if e["kind"] == STATUS] == [QUEUED, RUNNING, FAILED]
+    assert store.events(first["id"], after=3)[0]["status"] == FAILED
+
+    store.finish(second["id"], {"value": 2})
+    assert store.purge(retention=3600) == 0
+    assert store.purge(retention=-1) == 2
+    assert store.get(first["id"]) is None and store.events(first["id"]) == []
+
+
+def test_manager_runs_queries_and_tools_with_progress(store, monkeypatch):
+    """查询与工具调用任务在工作线程中执行，结果、错误与进度事件（经MCP进度通知转发）持久化"""
+    from src.mcp import server as server_module
+    from src.mcp.client import MCPClient
+
+    server = server_module.LAMMCPServer()
+    monkeypatch.setattr(server_module, "get_mcp_server", lambda: server)
+
+    def count(args):
+        for i in range(args["n"]):
+            report_progress(LOG, f"第 {i + 1} 项")
+        return {"counted": args["n"]}
+
+    server.tools["count"] = MCPTool("count", "计数", {
+        "type": "object", "properties": {"n": {"type": "integer"}}, "required": ["n"]}, count,
+        ExecutionClass.BLOCKING_IO)
+    manager = JobManager(store, FakeAgent, workers=2, tool_client=lambda: MCPClient(transport="inprocess")).start()
+    try:
+        ask = manager.submit(ASK, {"question": "你好"})
+        failed = manager.submit(ASK, {"question": "boom"})
+        tool = manager.submit(TOOL, {"tool": "count", "arguments": {"n": 3}})
+        missing = manager.submit(TOOL, {"tool": "no_such_tool"})
+        jobs = {j["id"]: _wait_finished(store, j["id"]) for j in (ask, failed, tool, missing)}
+    finally:
+        manager.stop()
+
+    assert jobs[ask["id"]]["status"] == SUCCEEDED
+    assert jobs[ask["id"]]["result"]["answer"] == "回答: 你好"
+    assert jobs[failed["id"]]["status"] == FAILED and jobs[failed["id"]]["error"] == "爆炸"
+    assert jobs[tool["id"]]["result"] == {"success": True, "result": {"counted": 3}}
+    assert jobs[missing["id"]]["status"] == FAILED and "no_such_tool" in jobs[missing["id"]]["error"]
+
+    kinds = [e["kind"] for e in store.events(ask["id"])]
+    assert kinds[:2] == [STATUS, STATUS] and kinds[-1] == STATUS
+    assert kinds.count("step_started") == 2 and kinds.count(LOG) == 2
+    assert [e["message"] for e in store.events(tool["id"]) if e["kind"] == LOG] == ["第 1 项", "第 2 项", "第 3 项"]
+    assert manager.mcp_client is None
+
+
+def test_tool_jobs_run_in_mcp_server_process(store):
+    """默认配置下工具任务经工作池持有的stdio客户端在独立的服务器进程中执行"""
+    from src.mcp.client import MCPClient
+
+    def stdio_client():
+        return MCPClient(server_command=[sys.executable, "-m", "src.mcp.server"], transport="stdio", workers=1)
+
+    manager = JobManager(store, FakeAgent, workers=1, tool_client=stdio_client).start()
+    try:
+        job = manager.submit(TOOL, {"tool": "calculate", "arguments": {"expression": "6*7"}})
+        finished = _wait_finished(store, job["id"], timeout=30.0)
+        process = manager.mcp_client.process
+    finally:
+        manager.stop()
+
+    assert finished["status"] == SUCCEEDED
+    assert finished["result"]["result"]["result"] == 42
+    assert process.pid != os.getpid() and process.returncode is not None
+    kinds = [e["kind"] for e in store.events(job["id"])]
+    assert "step_started" in kinds and "step_finished" in kinds
+
+
+def test_queued_jobs_survive_restart(store):
+    """上次运行未开始的任务在新的工作池启动后继续执行"""
+    job = store.create(ASK, {"question": "重启前提交"})
+    manager = JobManager(JobStore(store.db_path), FakeAgent, workers=1).start()
+    try:
+        finished = _wait_finished(store, job["id"])
+    finally:
+        manager.stop()
+    assert finished["status"] == SUCCEEDED
+    assert finished["result"]["answer"] == "回答: 重启前提交"
+
+
+def test_job_endpoints_stream_events(tmp_path, monkeypatch):
+    """POST /jobs 立即返回任务id，GET /jobs/{id} 返回结果，事件流在任务结束后关闭"""
+    httpx = pytest.importorskip("httpx")
+    main = pytest.importorskip("src.api.main")
+
+    manager = JobManager(JobStore(str(tmp_path / "jobs.db")), FakeAgent, workers=1).start()
+    monkeypatch.setattr(main, "job_manager", manager)
+    monkeypatch.setattr(main, "JOB_EVENTS_POLL_INTERVAL", 0.02)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            created = await client.post("/jobs", json={"question": "你好"})
+            invalid = await client.post("/jobs", json={"question": "你好", "tool": "calculate"})
+            events = await client.get(f"/jobs/{created.json()['id']}/events")
+            status = await client.get(f"/jobs/{created.json()['id']}")
+            resumed = await client.get(f"/jobs/{created.json()['id']}/events", headers={"Last-Event-ID": "2"})
+            missing = await client.get("/jobs/nope")
+            trimmed = await client.get(f"/jobs/{created.json()['id']}", params={"exclude": "answer,sources"})
+            return created, invalid, events, status, resumed, missing, trimmed
+
+    try:
+        created, invalid, events, status, resumed, missing, trimmed = asyncio.run(scenario())
+    finally:
+        manager.stop()
+
+    assert created.status_code == 202 and created.json()["status"] == QUEUED
+    assert invalid.status_code == 400
+    assert events.headers["content-type"].startswith("text/event-stream")
+    data = [json.loads(line[6:]) for line in events.text.splitlines() if line.startswith("data: ")]
+    assert data[0]["status"] == QUEUED and data[-1]["status"] == SUCCEEDED
+    assert status.json()["result"]["answer"] == "回答: 你好"
+    assert resumed.text.count("data: ") == len(data) - 2
+    assert missing.status_code == 404
+    assert "answer" not in trimmed.json()["result"] and trimmed.json()["result"]["plan"] == "answer"
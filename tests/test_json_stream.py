@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试增量计划解析器
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.utils.json_stream import IncrementalPlanParser
+
+PLAN_TEXT = """```json
+{
+    "operation_type": "automate",
+    "target_platform": "jd.com",
+    "steps": [
+        {"action": "navigate", "url": "https://search.m.jd.com/Search?keyword={笔记本}"},
+        {"action": "wait", "selector": "a[href*='/item'], .gl-item", "state": "visible"}
+    ],
+    "context": "在京东搜索\\"笔记本\\", 然后查看}"
+}
+```"""
+
+
+def _feed_in_chunks(parser, text, size):
+    events = []
+    for i in range(0, len(text), size):
+        events.extend(parser.feed(text[i:i + size]))
+    return events
+
+
+@pytest.mark.parametrize("size", [1, 3, 17, len(PLAN_TEXT)])
+def test_steps_emitted_before_plan_completes(size):
+    """步骤在对象闭合前逐个产生，且与整体解析结果一致"""
+    parser = IncrementalPlanParser()
+    events = _feed_in_chunks(parser, PLAN_TEXT, size)
+
+    kinds = [(kind, key) for kind, key, _ in events]
+    assert kinds.index(("step", 0)) < kinds.index(("field", "steps"))
+    assert kinds.index(("field", "operation_type")) < kinds.index(("step", 0))
+
+    plan = parser.result()
+    assert parser.complete
+    assert parser.steps == plan["steps"]
+    assert plan["steps"][0]["url"].endswith("{笔记本}")
+    assert plan["context"] == '在京东搜索"笔记本", 然后查看}'
+
+
+def test_first_step_available_from_partial_input():
+    """只收到部分文本时即可取得第一个步骤"""
+    cut = PLAN_TEXT.index('{"action": "wait"')
+    parser = IncrementalPlanParser()
+    events = parser.feed(PLAN_TEXT[:cut])
+
+    assert ("step", 0) in [(kind, key) for kind, key, _ in events]
+    assert parser.fields["operation_type"] == "automate"
+    assert not parser.complete
+    with pytest.raises(ValueError):
+        parser.result()
+
+
+def test_invalid_json_raises():
+    """闭合后内容非法时 result() 抛出 ValueError"""
+    parser = IncrementalPlanParser()
+    parser.feed('{"operation_type": automate, "steps": []}')
+    assert parser.complete
+    with pytest.raises(ValueError):
+        parser.result()
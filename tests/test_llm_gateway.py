@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试共享LLM网关
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("langchain_openai")
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.agent.llm_gateway import LLM_REQUEST_SECONDS, LLMGateway, LLMMetrics, TokenBucket
+
+
+class _FakeLLM:
+    model_name = "fake"
+    temperature = 0.2
+
+    def __init__(self, delay=0.0, failures=0, error=None):
+        self.delay = delay
+        self.failures = failures
+        self.error = error or ConnectionError("boom")
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, messages):
+        with self._lock:
+            self.calls += 1
+            fail = self.calls <= self.failures
+        time.sleep(self.delay)
+        if fail:
+            raise self.error
+        return AIMessage(content="ok")
+
+
+def _gateway(llm, **kwargs):
+    kwargs.setdefault("rate_per_sec", 0)
+    kwargs.setdefault("backoff_base", 0.001)
+    gateway = LLMGateway(**kwargs)
+    gateway.get_llm = lambda model=None, temperature=0.2: llm
+    return gateway
+
+
+def test_token_bucket_limits_burst():
+    """突发容量用尽后需等待补充令牌"""
+    bucket = TokenBucket(rate=1000, capacity=2)
+    assert bucket.acquire(timeout=0) and bucket.acquire(timeout=0)
+    assert not bucket.acquire(timeout=0)
+    assert bucket.acquire(timeout=0.1)
+
+
+def test_identical_requests_are_coalesced():
+    """进行中的相同请求只触发一次实际调用"""
+    llm = _FakeLLM(delay=0.2)
+    gateway = _gateway(llm)
+    messages = [HumanMessage(content="hi")]
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(gateway.invoke(messages, purpose="t")))
+               for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert llm.calls == 1
+    assert [r.content for r in results] == ["ok"] * 4
+    assert gateway.snapshot()["t"]["coalesced"] == 3
+    gateway.close()
+
+
+def test_retries_transient_errors_only():
+    """可恢复错误被重试，其他错误直接抛出"""
+    llm = _FakeLLM(failures=2)
+    gateway = _gateway(llm, max_retries=3)
+    assert gateway.invoke([HumanMessage(content="a")], purpose="t").content == "ok"
+    assert gateway.snapshot()["t"]["retries"] == 2
+
+    llm = _FakeLLM(failures=1, error=ValueError("bad request"))
+    gateway = _gateway(llm, max_retries=3)
+    with pytest.raises(ValueError):
+        gateway.invoke([HumanMessage(content="b")], purpose="t")
+    assert llm.calls == 1
+
+
+def test_latency_metrics_are_in_seconds():
+    """累计耗时以秒导出，单次耗时计入按用途的直方图"""
+    metrics = LLMMetrics()
+    before = LLM_REQUEST_SECONDS.count(purpose="latency-test")
+    metrics.record("latency-test", 1500.0)
+    metrics.record("latency-test", 500.0)
+    families = {f.name: f for f in metrics.collect_metrics()}
+    [sample] = families["lam_llm_latency_seconds_total"].samples
+    assert sample.value == pytest.approx(2.0)
+    assert LLM_REQUEST_SECONDS.count(purpose="latency-test") == before + 2
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试MCP消息编解码：长度前缀帧与大字符串引用
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+
+from src.mcp.codec import BLOB_KEY, encode_frame, externalize_strings, frame_length, loads, resolve_blobs
+
+
+def test_frames_switch_to_length_prefix_above_threshold():
+    """小消息按行发送，大消息加长度前缀；消息体中的换行不影响分帧"""
+    small = encode_frame({"id": 1, "result": "中文"}, frame_threshold=64)
+    large_message = {"id": 2, "result": "行\n" * 100}
+    large = encode_frame(large_message, frame_threshold=64)
+
+    assert small.endswith(b"\n") and frame_length(small) is None
+    assert loads(small) == {"id": 1, "result": "中文"}
+    header, body = large.split(b"\n", 1)
+    assert frame_length(header + b"\n") == len(body)
+    assert loads(body) == large_message
+    assert frame_length(encode_frame(large_message)) is None
+
+
+def test_large_strings_round_trip_by_reference(tmp_path):
+    """大字符串写入临时文件，解析后恢复原值并删除文件"""
+    html = "<html>" + "页" * 5000 + "</html>"
+    result = {"success": True, "result": {"title": "t", "html": html, "links": ["a", html]}}
+
+    sent = externalize_strings(result, 1000, str(tmp_path))
+
+    assert sent["result"]["title"] == "t"
+    assert set(sent["result"]["html"]) == {BLOB_KEY}
+    assert len(os.listdir(tmp_path)) == 2
+    assert resolve_blobs(loads(encode_frame(sent)), str(tmp_path)) == result
+    assert os.listdir(tmp_path) == []
+
+
+def test_threshold_counts_encoded_bytes(tmp_path):
+    """阈值按UTF-8编码后的字节数比较，而不是字符数"""
+    sent = externalize_strings({"cjk": "页" * 400, "ascii": "a" * 999}, 1000, str(tmp_path))
+
+    assert set(sent["cjk"]) == {BLOB_KEY} and sent["cjk"][BLOB_KEY]["bytes"] == 1200
+    assert sent["ascii"] == "a" * 999
+
+
+def test_refs_outside_blob_dir_are_not_read_or_deleted(tmp_path):
+    """只解析引用目录中以 lam-blob- 开头的文件；其他路径（含 .. 与符号链接）原样保留且文件不被删除"""
+    blobs = tmp_path / "blobs"
+    blobs.mkdir()
+    secret = tmp_path / "secret.txt"
+    secret.write_text("secret", encoding="utf-8")
+    unprefixed = blobs / "notes.txt"
+    unprefixed.write_text("notes", encoding="utf-8")
+    link = blobs / "lam-blob-link.txt"
+    link.symlink_to(secret)
+
+    crafted = [
+        {BLOB_KEY: {"path": str(secret)}},
+        {BLOB_KEY: {"path": str(blobs / ".." / "secret.txt")}},
+        {BLOB_KEY: {"path": str(unprefixed)}},
+        {BLOB_KEY: {"path": str(link)}},
+        {BLOB_KEY: {"path": ["not", "a", "path"]}},
+    ]
+    assert resolve_blobs({"result": crafted}, str(blobs)) == {"result": crafted}
+    assert secret.exists() and unprefixed.exists() and link.is_symlink()
+
+
+def test_server_externalizes_results_after_client_opt_in():
+    """客户端在initialize中声明 lamBlobRefs 后，服务器的工具结果按引用返回大字符串"""
+    from src.mcp.core.base import MCPTool
+    from src.mcp.server import LAMMCPServer
+
+    server = LAMMCPServer()
+    server.tools["page"] = MCPTool("page", "演示", {"type": "object"}, lambda args: {"html": "x" * 4096})
+
+    async def call():
+        return await server.handle_message({"jsonrpc": "2.0", "id": 2, "method": "tools/call",
+                                            "params": {"name": "page", "arguments": {}}})
+
+    async def scenario():
+        before = await call()
+        init = await server.handle_message({"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {
+            "capabilities": {"experimental": {"lamBlobRefs": {"minBytes": 1024}}}}})
+        return before, init, await call()
+
+    try:
+        before, init, after = asyncio.run(scenario())
+        blob_dir = init["result"]["capabilities"]["experimental"]["lamBlobRefs"]["dir"]
+
+        assert before["result"]["result"]["html"] == "x" * 4096
+        assert BLOB_KEY in after["result"]["result"]["html"]
+        assert os.path.dirname(after["result"]["result"]["html"][BLOB_KEY]["path"]) == blob_dir
+        assert resolve_blobs(after["result"], blob_dir) == before["result"]
+    finally:
+        server.cleanup_blob_dir()
+    assert not os.path.exists(blob_dir)
+
+
+def test_server_writes_refs_into_client_directory(tmp_path):
+    """客户端在 lamBlobRefs 中指定目录时，服务器在其中写入引用，退出清理不删除该目录"""
+    from src.mcp.core.base import MCPTool
+    from src.mcp.server import LAMMCPServer
+
+    server = LAMMCPServer()
+    server.tools["page"] = MCPTool("page", "演示", {"type": "object"}, lambda args: {"html": "x" * 4096})
+
+    async def scenario():
+        init = await server.handle_message({"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {
+            "capabilities": {"experimental": {"lamBlobRefs": {"minBytes": 1024, "dir": str(tmp_path)}}}}})
+        called = await server.handle_message({"jsonrpc": "2.0", "id": 2, "method": "tools/call",
+                                              "params": {"name": "page", "arguments": {}}})
+        return init, called
+
+    init, called = asyncio.run(scenario())
+    server.cleanup_blob_dir()
+
+    assert init["result"]["capabilities"]["experimental"]["lamBlobRefs"] == {"dir": str(tmp_path)}
+    assert len(os.listdir(tmp_path)) == 1
+    assert resolve_blobs(called["result"], str(tmp_path))["result"]["html"] == "x" * 4096
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试MCP服务器工作池
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+
+import pytest
+
+from src.mcp.client import MCPClient
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FAKE_SERVER = '''
+import asyncio, os, sys
+sys.path.insert(0, {root!r})
+from src.mcp.transport import serve_stdio
+
+async def handle(message, notify):
+    if "id" not in message:
+        return None
+    result = {{}}
+    if message["method"] == "tools/list":
+        result = {{"tools": [{{"name": "work"}}]}}
+    elif message["method"] == "tools/call":
+        params = message["params"]
+        if params["name"] == "crash":
+            os._exit(3)
+        await asyncio.sleep(params["arguments"].get("delay", 0))
+        result = {{"success": True, "result": {{"pid": os.getpid(), "tool": params["name"]}}}}
+    elif message["method"] == "tools/call_batch":
+        result = {{"results": [{{"success": True, "result": {{"pid": os.getpid(), "tool": c["name"]}}}}
+                              for c in message["params"]["calls"]]}}
+    return {{"jsonrpc": "2.0", "id": message["id"], "result": result}}
+
+asyncio.run(serve_stdio(handle))
+'''
+
+
+@pytest.fixture
+def client(tmp_path):
+    script = tmp_path / "fake_server.py"
+    script.write_text(FAKE_SERVER.format(root=ROOT), encoding="utf-8")
+    return MCPClient(server_command=[sys.executable, str(script)], transport="stdio", workers=3)
+
+
+def test_affinity_pins_and_least_loaded_spreads(client):
+    """亲和组的调用固定在同一进程，其余并发调用分散到不同进程；批量调用按同样规则拆分"""
+    async def scenario():
+        await client.start_server()
+        try:
+            pinned = await asyncio.gather(*[client.call_tool(f"bilibili_{i}", {"delay": 0.05}) for i in range(6)])
+            spread = await asyncio.gather(*[client.call_tool("work", {"delay": 0.2}) for _ in range(3)])
+            batch = await client.call_tools([{"name": "bilibili_x"}, {"name": "work"}, {"name": "steam_y"}])
+            return pinned, spread, batch
+        finally:
+            await client.stop_server()
+
+    pinned, spread, batch = asyncio.run(scenario())
+
+    assert len({r["result"]["pid"] for r in pinned}) == 1
+    assert len({r["result"]["pid"] for r in spread}) == 3
+    assert [r["result"]["tool"] for r in batch] == ["bilibili_x", "work", "steam_y"]
+    assert batch[0]["result"]["pid"] == pinned[0]["result"]["pid"]
+
+
+def test_crashed_worker_is_restarted(client):
+    """进程崩溃时在途调用失败，之后自动重启并重新完成初始化"""
+    async def scenario():
+        await client.start_server()
+        try:
+            before = {w.process.pid for w in client.transport.workers}
+            with pytest.raises(ConnectionError):
+                await client.call_tool("crash", {})
+            results = await asyncio.gather(*[client.call_tool("work", {"delay": 0.1}) for _ in range(3)])
+            return before, results, client.transport.stats()
+        finally:
+            await client.stop_server()
+
+    before, results, stats = asyncio.run(scenario())
+
+    assert stats["restarts"] == 1
+    pids = {r["result"]["pid"] for r in results}
+    assert len(pids) == 3 and len(pids - before) == 1
+
+
+def test_stop_drains_in_flight_calls(client):
+    """停止时等待在途调用完成，之后的新请求被拒绝"""
+    async def scenario():
+        await client.start_server()
+        transport = client.transport
+        call = asyncio.ensure_future(client.call_tool("work", {"delay": 0.3}))
+        await asyncio.sleep(0.05)
+        await client.stop_server()
+        with pytest.raises(RuntimeError):
+            await transport.request("ping")
+        return await call
+
+    result = asyncio.run(scenario())
+
+    assert result["success"] is True
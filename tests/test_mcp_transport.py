@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试MCP stdio多路复用传输
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import time
+
+import pytest
+
+from src.mcp.client import MCPClient
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FAKE_SERVER = '''
+import asyncio, sys
+sys.path.insert(0, {root!r})
+from src.mcp.transport import serve_stdio
+
+async def handle(message, notify):
+    if "id" not in message:
+        return None
+    if message["method"] == "tools/list":
+        return {{"jsonrpc": "2.0", "id": message["id"], "result": {{"tools": [{{"name": "echo"}}]}}}}
+    if message["method"] == "tools/call":
+        arguments = message["params"]["arguments"]
+        token = message["params"].get("_meta", {{}}).get("progressToken")
+        for index in range(arguments.get("steps", 0)):
+            await notify("notifications/progress", {{"progressToken": token, "progress": index + 1,
+                                                     "total": arguments["steps"], "message": f"step {{index}}",
+                                                     "event": {{"kind": "step_finished", "index": index}}}})
+        await asyncio.sleep(arguments.get("delay", 0))
+        return {{"jsonrpc": "2.0", "id": message["id"], "result": {{"success": True, "result": arguments}}}}
+    return {{"jsonrpc": "2.0", "id": message["id"], "result": {{}}}}
+
+asyncio.run(serve_stdio(handle))
+'''
+
+
+@pytest.fixture
+def server_command(tmp_path):
+    script = tmp_path / "fake_server.py"
+    script.write_text(FAKE_SERVER.format(root=ROOT), encoding="utf-8")
+    return [sys.executable, str(script)]
+
+
+def test_concurrent_calls_are_routed_by_id(server_command):
+    """并发调用同时在途，响应按id回到各自的调用方"""
+    client = MCPClient(server_command=server_command)
+
+    async def scenario():
+        await client.start_server()
+        try:
+            start = time.perf_counter()
+            results = await asyncio.gather(*[
+                client.call_tool("echo", {"i": i, "delay": 0.2 if i % 2 else 0.05}) for i in range(20)
+            ])
+            return results, time.perf_counter() - start
+        finally:
+            await client.stop_server()
+
+    results, elapsed = asyncio.run(scenario())
+
+    assert [r["result"]["i"] for r in results] == list(range(20))
+    assert elapsed < 1.0
+    assert client.tools_cache == [{"name": "echo"}]
+
+
+def test_client_survives_new_event_loops(server_command):
+    """同一客户端可在多次 asyncio.run 之间复用"""
+    client = MCPClient(server_command=server_command)
+    asyncio.run(client.start_server())
+    try:
+        first = asyncio.run(client.call_tool("echo", {"n": 1}))
+        second = asyncio.run(client.call_tool("echo", {"n": 2}))
+    finally:
+        asyncio.run(client.stop_server())
+
+    assert first["result"] == {"n": 1}
+    assert second["result"] == {"n": 2}
+    assert client.process is None
+
+
+def test_large_payloads_use_length_prefixed_frames(server_command):
+    """超过帧阈值的请求与响应按长度前缀帧传输，与按行消息混用"""
+    client = MCPClient(server_command=server_command)
+    page = "<p>页面\n内容</p>" * 200_000
+
+    async def scenario():
+        await client.start_server()
+        try:
+            return await asyncio.gather(client.call_tool("echo", {"html": page}), client.call_tool("echo", {"n": 1}))
+        finally:
+            await client.stop_server()
+
+    large, small = asyncio.run(scenario())
+
+    assert large["result"]["html"] == page
+    assert small["result"] == {"n": 1}
+
+
+def test_call_tool_stream_yields_progress_before_result(server_command):
+    """进度通知按顺序以异步迭代器产出，最后是调用结果"""
+    client = MCPClient(server_command=server_command)
+
+    async def scenario():
+        await client.start_server()
+        try:
+            events = [event async for event in client.call_tool_stream("echo", {"steps": 3, "delay": 0.05})]
+            seen = []
+            result = await client.call_tool("echo", {"steps": 2}, on_progress=seen.append)
+            return events, seen, result
+        finally:
+            await client.stop_server()
+
+    events, seen, result = asyncio.run(scenario())
+
+    assert [e["type"] for e in events] == ["progress"] * 3 + ["result"]
+    assert [e["index"] for e in events[:3]] == [0, 1, 2]
+    assert events[0]["kind"] == "step_finished" and events[0]["total"] == 3
+    assert events[-1]["result"]["result"] == {"steps": 3, "delay": 0.05}
+    assert [e["progress"] for e in seen] == [1, 2]
+    assert result["success"] is True
+    assert client._progress_queues == {}
+
+
+def test_inprocess_transport_matches_stdio_schema():
+    """进程内传输走同一套消息处理与参数校验"""
+    client = MCPClient(transport="inprocess")
+
+    async def scenario():
+        await client.start_server()
+        try:
+            missing = await client.call_tool("web_automate", {})
+            unknown = await client.call_tool("no_such_tool", {})
+            bad_method = await client.transport.request("tools/unknown")
+            return missing, unknown, bad_method
+        finally:
+            await client.stop_server()
+
+    missing, unknown, bad_method = asyncio.run(scenario())
+
+    assert any(tool["name"] == "web_automate" for tool in client.tools_cache)
+    assert missing["success"] is False and missing["error"] == "输入参数验证失败: url: 缺少必需参数"
+    assert unknown["success"] is False and "no_such_tool" in unknown["error"]
+    assert bad_method["error"]["code"] == -32601
+    assert client.process is None
+
+
+def test_call_batch_runs_concurrently_in_order_with_item_errors():
+    """tools/call_batch 并发执行各项，按请求顺序返回，单项错误不影响其他项"""
+    from src.mcp.core.base import MCPTool
+    from src.mcp.core.execution import ExecutionClass
+    from src.mcp.server import LAMMCPServer
+    from src.mcp.transport import InProcessTransport
+
+    def slow(args):
+        time.sleep(args["delay"])
+        return {"delay": args["delay"]}
+
+    server = LAMMCPServer()
+    server.tools["slow"] = MCPTool(
+        "slow", "演示", {"type": "object", "properties": {"delay": {"type": "number"}}, "required": ["delay"]},
+        slow, ExecutionClass.BLOCKING_IO,
+    )
+    client = MCPClient(transport="inprocess")
+
+    async def scenario():
+        client.transport = InProcessTransport(server=server)
+        await client.transport.start()
+        start = time.perf_counter()
+        results = await client.call_tools([
+            {"name": "slow", "arguments": {"delay": 0.3}},
+            {"name": "no_such_tool"},
+            {"name": "slow", "arguments": {}},
+            {"name": "slow", "arguments": {"delay": 0.1}},
+        ])
+        elapsed = time.perf_counter() - start
+        bad = await client.transport.request("tools/call_batch", {"calls": "x"})
+        return results, elapsed, bad
+
+    results, elapsed, bad = asyncio.run(scenario())
+
+    assert results[0] == {"success": True, "result": {"delay": 0.3}}
+    assert results[1]["success"] is False and "no_such_tool" in results[1]["error"]
+    assert results[2]["error"] == "输入参数验证失败: delay: 缺少必需参数"
+    assert results[3] == {"success": True, "result": {"delay": 0.1}}
+    assert elapsed < 0.38
+    assert bad["error"]["code"] == -32602
+
+
+def test_adapter_execute_actions_merges_mapped_actions():
+    """适配器把有MCP映射的操作合并为一次批量调用，其余操作走原有实现，结果保持输入顺序"""
+    from src.mcp.client import LAMAgentMCPAdapter
+    from src.mcp.core.base import MCPTool
+    from src.mcp.server import LAMMCPServer
+    from src.mcp.transport import InProcessTransport
+
+    server = LAMMCPServer()
+    server.tools["echo"] = MCPTool("echo", "演示", {"type": "object"}, lambda args: args)
+    requests = []
+
+    class Adapter(LAMAgentMCPAdapter):
+        ACTION_MAPPING = {"say": "echo"}
+
+        async def _fallback_execute(self, action, params):
+            return {"success": True, "action": action, "source": "fallback"}
+
+    adapter = Adapter()
+
+    async def scenario():
+        adapter.mcp_client.transport = InProcessTransport(server=server)
+        await adapter.mcp_client.transport.start()
+        adapter.server_started = True
+        original = adapter.mcp_client._send_request
+
+        async def send(method, params=None):
+            requests.append(method)
+            return await original(method, params)
+
+        adapter.mcp_client._send_request = send
+        return await adapter.execute_actions([
+            {"action": "say", "params": {"n": 1}},
+            {"action": "legacy"},
+            {"action": "say", "params": {"n": 2}},
+        ])
+
+    results = asyncio.run(scenario())
+
+    assert requests == ["tools/call_batch"]
+    assert [r["source"] for r in results] == ["mcp", "fallback", "mcp"]
+    assert results[0]["result"] == {"success": True, "result": {"n": 1}}
+    assert results[2]["result"]["result"] == {"n": 2}
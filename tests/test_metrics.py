@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试进程内指标注册表、各组件的采集函数与 GET /metrics 接口
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+
+import pytest
+
+from src.mcp.core.admission import AdmissionController
+from src.mcp.core.stats import ToolStats
+from src.utils.metrics import MetricsRegistry
+
+
+def _lines(registry):
+    return [line for line in registry.render().splitlines() if not line.startswith("#")]
+
+
+def test_render_counters_gauges_and_cumulative_histogram():
+    """直方图分桶累计输出并带 _sum/_count，标签值转义，同名指标重复获取返回同一实例"""
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "请求数", ("path",))
+    requests.inc(path='/a"b')
+    requests.inc(2, path='/a"b')
+    assert registry.counter("requests_total", "请求数", ("path",)) is requests
+    with pytest.raises(ValueError):
+        registry.gauge("requests_total", "请求数", ("path",))
+
+    active = registry.gauge("active", "活动数")
+    with active.track_inprogress():
+        assert active.value() == 1
+    assert active.value() == 0
+
+    latency = registry.histogram("latency_seconds", "延迟", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        latency.observe(value)
+
+    text = registry.render()
+    assert "# TYPE latency_seconds histogram" in text
+    lines = _lines(registry)
+    assert 'requests_total{path="/a\\"b"} 3' in lines
+    assert "active 0" in lines
+    assert [line for line in lines if line.startswith("latency_seconds")] == [
+        'latency_seconds_bucket{le="0.1"} 1',
+        'latency_seconds_bucket{le="1"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        "latency_seconds_sum 4.05",
+        "latency_seconds_count 4",
+    ]
+
+
+def test_collectors_export_component_stats():
+    """工具运行统计与准入控制通过采集函数导出；采集失败不影响其他指标"""
+    registry = MetricsRegistry()
+    stats = ToolStats()
+    with stats.track("calculate"):
+        pass
+    with pytest.raises(KeyError):
+        with stats.track("calculate"):
+            raise KeyError("x")
+
+    controller = AdmissionController({"browser": {"limit": 2, "queue": 1}})
+
+    async def hold():
+        async with controller.slot("browser"):
+            return registry.render()
+
+    def broken():
+        raise RuntimeError("采集失败")
+
+    registry.register_collector("tools", stats.collect_metrics)
+    registry.register_collector("admission", controller.collect_metrics)
+    registry.register_collector("broken", broken)
+    text = asyncio.run(hold())
+    lines = text.splitlines()
+
+    assert 'lam_mcp_tool_calls_total{tool="calculate"} 2' in lines
+    assert 'lam_mcp_tool_errors_total{tool="calculate",type="KeyError"} 1' in lines
+    assert 'lam_mcp_tool_in_flight{tool="calculate"} 0' in lines
+    assert 'lam_mcp_tool_latency_seconds_count{tool="calculate"} 2' in lines
+    assert 'lam_mcp_concurrency_running{class="browser"} 1' in lines
+    assert 'lam_mcp_concurrency_limit{class="browser"} 2' in lines
+
+    registry.unregister_collector("admission")
+    assert "lam_mcp_concurrency_running" not in registry.render()
+
+
+def test_metrics_endpoint_records_requests_by_route(monkeypatch):
+    """/metrics 以Prometheus文本格式输出，请求按路由模板计数"""
+    httpx = pytest.importorskip("httpx")
+    main = pytest.importorskip("src.api.main")
+    monkeypatch.setattr(main, "agent_pool", None)
+    monkeypatch.setattr(main, "job_manager", None)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.get("/health")
+            await client.get("/no-such-path")
+            return await client.get("/metrics")
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = response.text.splitlines()
+    assert any(line.startswith('lam_http_requests_total{method="GET",path="/health",status="200"}')
+               for line in lines)
+    assert any(line.startswith('lam_http_requests_total{method="GET",path="unmatched",status="404"}')
+               for line in lines)
+    assert any(line.startswith('lam_http_request_duration_seconds_bucket{method="GET",path="/health",le="+Inf"}')
+               for line in lines)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_metrics_endpoint_includes_stdio_server_metrics(monkeypatch, workers):
+    """stdio传输下工具在子进程中执行，/metrics 合并子进程的指标并带 pid 标签"""
+    httpx = pytest.importorskip("httpx")
+    main = pytest.importorskip("src.api.main")
+    pytest.importorskip("src.mcp.server")
+    from src.mcp.client import MCPClient
+    monkeypatch.setattr(main, "agent_pool", None)
+    monkeypatch.setattr(main, "job_manager", None)
+    mcp = MCPClient(server_command=[sys.executable, "-m", "src.mcp.server"], transport="stdio", workers=workers)
+
+    async def scenario():
+        await mcp.start_server()
+        try:
+            result = await mcp.call_tool("calculate", {"expression": "1+2"})
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.get("/metrics")
+            processes = mcp.transport.processes if workers > 1 else [mcp.process]
+            return result, response, [process.pid for process in processes]
+        finally:
+            await mcp.stop_server()
+
+    result, response, pids = asyncio.run(scenario())
+    assert result["success"]
+    text = response.text
+    assert text.count("# TYPE lam_mcp_tool_calls_total counter") == 1
+    calls = [line for line in text.splitlines() if line.startswith("lam_mcp_tool_calls_total{")]
+    assert any(f'pid="{pid}"' in line for pid in pids for line in calls)
+    assert any('tool="calculate"' in line for line in calls)
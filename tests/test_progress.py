@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试工具执行进度事件
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+
+from src.mcp.core.base import MCPTool
+from src.mcp.core.execution import ExecutionClass
+from src.mcp.server import LAMMCPServer
+from src.utils.progress import LOG, iter_steps, progress_scope, report_progress
+
+
+def test_iter_steps_reports_each_step_even_on_continue():
+    """每个步骤都有开始与完成事件，未注册回调时上报为空操作"""
+    events = []
+    with progress_scope(events.append):
+        for step in iter_steps(["a", "skip", "b"]):
+            if step == "skip":
+                continue
+            report_progress(LOG, f"处理 {step}")
+    report_progress(LOG, "无人接收")
+
+    assert [(e["kind"], e.get("index")) for e in events] == [
+        ("step_started", 0), ("log", None), ("step_finished", 0),
+        ("step_started", 1), ("step_finished", 1),
+        ("step_started", 2), ("log", None), ("step_finished", 2),
+    ]
+    assert events[0]["total"] == 3
+
+
+def test_server_forwards_progress_from_worker_threads():
+    """线程池中执行的工具上报的事件作为 notifications/progress 在响应之前发出"""
+    def handler(args):
+        for step in iter_steps(["打开", "点击"]):
+            report_progress(LOG, f"{step}中")
+        return {"done": True}
+
+    server = LAMMCPServer()
+    server.tools["demo"] = MCPTool("demo", "演示", {"type": "object"}, handler, ExecutionClass.BLOCKING_IO)
+    sent = []
+
+    async def notify(method, params):
+        sent.append((method, params))
+
+    async def scenario():
+        return await server.handle_message({
+            "jsonrpc": "2.0", "id": 7, "method": "tools/call",
+            "params": {"name": "demo", "arguments": {}, "_meta": {"progressToken": "t1"}},
+        }, notify)
+
+    response = asyncio.run(scenario())
+
+    assert response["result"] == {"success": True, "result": {"done": True}}
+    assert {method for method, _ in sent} == {"notifications/progress"}
+    assert all(params["progressToken"] == "t1" for _, params in sent)
+    assert [params["progress"] for _, params in sent] == list(range(1, len(sent) + 1))
+    assert [params["event"]["kind"] for _, params in sent] == [
+        "step_started", "step_started", "log", "step_finished", "step_started", "log", "step_finished", "step_finished",
+    ]
+    assert sent[0][1]["event"]["tool"] == sent[-1][1]["event"]["tool"] == "demo"
+    assert sent[-1][1]["event"]["success"] is True
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试步骤DAG调度器
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+import time
+
+from src.tools.step_scheduler import DAGScheduler, StepNode, resolve_dependencies
+
+
+def test_resolve_dependencies_merges_declared_and_session():
+    """显式依赖与同会话的顺序依赖合并，无效引用被忽略"""
+    deps = resolve_dependencies(
+        ids=[1, 2, 3, 4],
+        declared=[None, None, [1, 9], [4]],
+        sessions=["jd.com", None, "jd.com", None],
+    )
+    assert deps == [[], [], [0], []]
+
+
+def test_independent_branches_run_concurrently_and_merge_in_order():
+    """独立分支并行执行，同一会话在同一线程串行，结果按声明顺序返回"""
+    threads = {}
+    lock = threading.Lock()
+
+    def execute(idx):
+        time.sleep(0.1)
+        with lock:
+            threads[idx] = threading.current_thread().name
+        return {"success": True, "message": f"step{idx}"}
+
+    nodes = [
+        StepNode(0, resource="network"),
+        StepNode(1, resource="browser", session="jd.com"),
+        StepNode(2, depends_on=[1], resource="browser", session="jd.com"),
+        StepNode(3, resource="browser", session="bilibili.com"),
+    ]
+    scheduler = DAGScheduler(max_workers=4)
+    start = time.perf_counter()
+    results = scheduler.run(nodes, execute)
+    elapsed = time.perf_counter() - start
+
+    assert [r["message"] for r in results] == ["step0", "step1", "step2", "step3"]
+    assert scheduler.peak_parallel == 3
+    assert elapsed < 0.35
+    assert threads[1] == threads[2]
+
+
+def test_resource_limit_and_critical_failure():
+    """资源并发受限；关键步骤失败后其依赖链被跳过，其他分支照常执行"""
+    running = {"browser": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def execute(idx):
+        with lock:
+            running["browser"] += 1
+            running["peak"] = max(running["peak"], running["browser"])
+        time.sleep(0.05)
+        with lock:
+            running["browser"] -= 1
+        return {"success": idx != 0}
+
+    nodes = [
+        StepNode(0, resource="browser", critical=True),
+        StepNode(1, depends_on=[0], resource="browser"),
+        StepNode(2, depends_on=[1], resource="browser"),
+        StepNode(3, resource="browser"),
+        StepNode(4, resource="browser"),
+    ]
+    results = DAGScheduler(max_workers=4, resource_limits={"browser": 2}).run(nodes, execute)
+
+    assert running["peak"] == 2
+    assert results[1]["skipped"] and results[2]["skipped"]
+    assert results[3]["success"] and results[4]["success"]
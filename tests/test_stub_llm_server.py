@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试离线桩LLM服务器
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+
+import pytest
+
+pytest.importorskip("uvicorn")
+pytest.importorskip("langchain_openai")
+
+from langchain_core.messages import HumanMessage
+from langchain_openai import ChatOpenAI
+
+from benchmarks.stub_llm_server import StubLLMServer, StubScript
+
+
+@pytest.fixture(scope="module")
+def stub():
+    with StubLLMServer(StubScript.load(latency_ms=0, tokens_per_sec=0)) as server:
+        yield server
+
+
+def _llm(stub):
+    return ChatOpenAI(model="stub", api_key="stub", base_url=stub.base_url, max_retries=0, stream_usage=True)
+
+
+def test_streams_templated_plan(stub):
+    """计划请求以多个数据块流式返回，模板中的查询被替换"""
+    prompt = "用户查询: 学习Python\n\n请仔细分析用户意图并生成详细的执行计划。"
+    chunks = list(_llm(stub).stream([HumanMessage(content=prompt)]))
+
+    assert len(chunks) > 3
+    plan = json.loads("".join(c.content for c in chunks))
+    assert plan["operation_type"] == "answer"
+    assert plan["context"] == "学习Python"
+    assert any(c.usage_metadata for c in chunks)
+
+
+def test_quoted_query_keeps_object_responses_valid_json():
+    """查询中的引号与反斜杠按JSON字符串转义，对象响应仍可解析"""
+    script = StubScript.load(latency_ms=0, tokens_per_sec=0)
+    query = 'say "hi" C:\\temp\\new'
+    reply = script.respond([{"role": "user", "content": f"用户查询: {query}\n\n请仔细分析用户意图并生成详细的执行计划。"}])
+
+    assert reply["name"] == "plan"
+    assert json.loads(reply["content"])["context"] == query
+
+
+def test_invoke_matches_rules_and_falls_back(stub):
+    """非流式请求按规则匹配，未命中时返回兜底响应"""
+    llm = _llm(stub)
+    reply = llm.invoke([HumanMessage(content="请判断以下用户输入是问答类问题还是操作类指令。\n用户输入: 你好")])
+    assert reply.content == "question"
+    assert reply.usage_metadata["output_tokens"] > 0
+
+    assert llm.invoke([HumanMessage(content="随便说点什么")]).content == "OK"
+    assert stub.script.hits["ui_classify"] >= 1
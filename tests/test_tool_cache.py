@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试工具结果缓存
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+
+from src.mcp.core import cache as cache_module
+from src.mcp.core.base import MCPTool
+from src.mcp.core.cache import CachePolicy, ToolResultCache
+from src.mcp.core.execution import ExecutionClass
+
+
+def test_single_flight_and_key_fields(tmp_path):
+    """相同键的并发调用只执行一次，不参与缓存键的参数不影响命中"""
+    cache = ToolResultCache(str(tmp_path / "tool_cache.db"))
+    policy = CachePolicy(ttl=60, key_fields=("url",))
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"content": "page"}
+
+    async def scenario():
+        first = await asyncio.gather(*[
+            cache.get_or_compute("fetch_page", policy, {"url": "u", "timeout_ms": t}, compute) for t in range(5)
+        ])
+        again = await cache.get_or_compute("fetch_page", policy, {"url": "u", "timeout_ms": 1}, compute)
+        return first, again
+
+    first, again = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert first == [{"content": "page"}] * 5 and again == {"content": "page"}
+    stats = cache.stats()["tools"]["fetch_page"]
+    assert (stats["misses"], stats["shared"], stats["hits"], stats["stores"]) == (1, 4, 1, 1)
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    """首个调用方被取消后，等待同一结果的其他调用方仍拿到结果；所有调用方都取消时才中止执行"""
+    cache = ToolResultCache(None)
+    policy = CachePolicy(ttl=60)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return {"content": "page"}
+
+    async def scenario():
+        leader = asyncio.ensure_future(asyncio.wait_for(
+            cache.get_or_compute("fetch_page", policy, {"url": "u"}, compute), 0.1))
+        await asyncio.sleep(0.01)
+        follower = await cache.get_or_compute("fetch_page", policy, {"url": "u"}, compute)
+        leader_timed_out = isinstance((await asyncio.gather(leader, return_exceptions=True))[0],
+                                      asyncio.TimeoutError)
+
+        started = asyncio.Event()
+
+        async def abandoned():
+            started.set()
+            await asyncio.sleep(10)
+
+        only = asyncio.ensure_future(cache.get_or_compute("fetch_page", policy, {"url": "v"}, abandoned))
+        await started.wait()
+        only.cancel()
+        await asyncio.gather(only, return_exceptions=True)
+        return follower, leader_timed_out, cache._in_flight
+
+    follower, leader_timed_out, in_flight = asyncio.run(scenario())
+
+    assert leader_timed_out and follower == {"content": "page"}
+    assert len(calls) == 1
+    assert in_flight == {}
+
+
+def test_sqlite_back_lru_and_errors(tmp_path):
+    """内存淘汰后仍可从磁盘命中，新实例可读到已持久化的结果；失败结果不缓存"""
+    path = str(tmp_path / "tool_cache.db")
+    policy = CachePolicy(ttl=60, max_size=2)
+    calls = []
+
+    async def run(cache, query, result=None):
+        async def compute():
+            calls.append(query)
+            return result if result is not None else {"query": query}
+        return await cache.get_or_compute("web_search", policy, {"query": query}, compute)
+
+    cache = ToolResultCache(path)
+    asyncio.run(run(cache, "a"))
+    asyncio.run(run(cache, "b"))
+    asyncio.run(run(cache, "c"))
+    asyncio.run(run(cache, "x", {"success": False, "error": "超时"}))
+    asyncio.run(run(cache, "x", {"success": False, "error": "超时"}))
+    assert cache.stats()["memory_entries"] == {"web_search": 2}
+    assert cache.stats()["tools"]["web_search"]["evictions"] == 1
+
+    reopened = ToolResultCache(path)
+    assert asyncio.run(run(reopened, "c")) == {"query": "c"}
+    assert asyncio.run(run(reopened, "a")) == {"query": "a"} and calls.count("a") == 2
+    assert reopened.stats()["tools"]["web_search"]["disk_hits"] == 1
+    assert calls.count("x") == 2
+
+
+def test_server_call_tool_uses_policy_and_reports_stats(tmp_path, monkeypatch):
+    """服务器对声明了缓存策略的工具使用缓存，并通过 server_stats 暴露命中计数"""
+    from src.mcp.server import LAMMCPServer
+
+    monkeypatch.setattr(cache_module, "_tool_cache", ToolResultCache(None))
+    calls = []
+
+    def handler(args):
+        calls.append(args)
+        return {"bvid": args["bvid"]}
+
+    server = LAMMCPServer()
+    server.tools["demo"] = MCPTool(
+        "demo", "演示", {"type": "object", "properties": {"bvid": {"type": "string"}}},
+        handler, ExecutionClass.BLOCKING_IO, cache=CachePolicy(ttl=60),
+    )
+
+    async def scenario():
+        results = [await server.call_tool("demo", {"bvid": "BV1"}) for _ in range(3)]
+        return results, await server.call_tool("server_stats", {})
+
+    results, stats = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert all(r == {"success": True, "result": {"bvid": "BV1"}} for r in results)
+    assert stats["result"]["cache"]["tools"]["demo"]["hits"] == 2
+    assert server.tools["web_search"].cache.key_fields == ("query", "max_results")
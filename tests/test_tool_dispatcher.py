@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试MCP工具执行分派
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import threading
+import time
+
+from src.mcp.core.execution import ExecutionClass, ToolDispatcher
+
+
+async def blocking_handler(args):
+    time.sleep(args["seconds"])
+    return {"thread": threading.current_thread().name}
+
+
+def process_handler(args):
+    return {"pid": os.getpid(), "value": args["n"] * 2}
+
+
+_held_lock = threading.Lock()
+
+
+def lock_probe_handler(args):
+    acquired = _held_lock.acquire(timeout=args["timeout"])
+    if acquired:
+        _held_lock.release()
+    return {"acquired": acquired}
+
+
+def test_blocking_handlers_do_not_stall_event_loop():
+    """阻塞型处理器在线程池中并发执行，事件循环保持响应"""
+    dispatcher = ToolDispatcher(blocking_workers=4, browser_workers=1)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    async def scenario():
+        tick_task = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        results = await asyncio.gather(*[
+            dispatcher.run(blocking_handler, {"seconds": 0.2}, ExecutionClass.BLOCKING_IO) for _ in range(4)
+        ])
+        elapsed = time.perf_counter() - start
+        tick_task.cancel()
+        return results, elapsed
+
+    try:
+        results, elapsed = asyncio.run(scenario())
+    finally:
+        dispatcher.shutdown()
+
+    assert elapsed < 0.5
+    assert ticks >= 10
+    assert all(r["thread"].startswith("mcp-blocking") for r in results)
+
+
+def test_cpu_handlers_use_process_pool_with_thread_fallback():
+    """可序列化的CPU处理器在子进程执行，无法序列化的退回线程池"""
+    dispatcher = ToolDispatcher(cpu_workers=1)
+    unpicklable = lambda args: {"pid": os.getpid()}
+
+    async def scenario():
+        in_process = await dispatcher.run(process_handler, {"n": 21}, ExecutionClass.CPU)
+        fallback = await dispatcher.run(unpicklable, {}, ExecutionClass.CPU)
+        return in_process, fallback
+
+    try:
+        in_process, fallback = asyncio.run(scenario())
+    finally:
+        dispatcher.shutdown()
+
+    assert in_process["value"] == 42
+    assert in_process["pid"] != os.getpid()
+    assert fallback["pid"] == os.getpid()
+    assert dispatcher.active() == {name: 0 for name in ExecutionClass.ALL}
+
+
+def test_cpu_pool_children_do_not_inherit_held_locks():
+    """CPU进程池不以 fork 启动：父进程中已持有的锁不会以加锁状态复制到子进程"""
+    dispatcher = ToolDispatcher(cpu_workers=1)
+    _held_lock.acquire()
+    try:
+        result = asyncio.run(dispatcher.run(lock_probe_handler, {"timeout": 2.0}, ExecutionClass.CPU))
+    finally:
+        _held_lock.release()
+        dispatcher.shutdown()
+
+    assert result["acquired"]
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试声明式工具清单：服务器、注册表与适配器映射由同一份清单生成，tools/list 结果的磁盘缓存与客户端按哈希跳过获取
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+import types
+
+from src.mcp.codec import RawJSON, encode_frame
+from src.mcp.core.base import MCPTool, ToolExecutor
+from src.mcp.core.execution import ToolDispatcher
+from src.mcp.core.stats import ToolStats
+from src.mcp.manifest import action_mapping, registry_specs, server_specs
+
+
+def _server(monkeypatch, cache_path):
+    from src.config import settings
+    from src.mcp.server import LAMMCPServer
+
+    monkeypatch.setattr(settings, "lam_mcp_tools_list_cache", str(cache_path))
+    return LAMMCPServer()
+
+
+def test_server_and_registry_follow_manifest():
+    """服务器与注册表的工具、schema与执行类别都来自清单"""
+    from src.mcp.registry.tool_registry import LAMToolRegistry
+    from src.mcp.server import LAMMCPServer
+
+    server = LAMMCPServer()
+    specs = server_specs()
+    assert list(server.tools) == [spec.name for spec in specs]
+    for spec in specs:
+        tool = server.tools[spec.name]
+        assert (tool.input_schema, tool.execution, tool.concurrency) == (spec.input_schema, spec.execution,
+                                                                          spec.concurrency)
+
+    registry = LAMToolRegistry()
+    for spec in registry_specs():
+        tool = registry.get_tool(spec.name)
+        assert tool.input_schema == spec.input_schema
+        if spec.name in server.tools:
+            assert tool.input_schema == server.tools[spec.name].input_schema
+    assert "page_fetch" in registry.tools and "page_fetch" not in server.tools
+    assert "calculate" in registry.get_tools_by_category()["通用工具"]
+
+
+class _FakeBackend(dict):
+    """替代处理器调用的后端对象：任意属性与调用都返回自身同类对象，并记录调用路径与参数"""
+
+    def __init__(self, calls, path):
+        super().__init__(success=True)
+        self._calls = calls
+        self._path = path
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _FakeBackend(self._calls, f"{self._path}.{name}")
+
+    def __call__(self, *args, **kwargs):
+        self._calls.append((self._path, args, kwargs))
+        return _FakeBackend(self._calls, f"{self._path}()")
+
+
+_BACKEND_MODULES = (
+    "src.tools.executor", "src.tools.search", "src.tools.browser", "src.tools.bilibili",
+    "src.tools.bilibili_integration", "src.tools.steam_integration", "src.tools.website_integration",
+    "src.tools.desktop_launcher", "src.tools.desktop_software_integration", "src.tools.auto_fill_integration",
+    "src.database.credential_db",
+)
+
+_SAMPLES = {"string": "x", "integer": 1, "number": 1, "boolean": False, "array": [], "object": {}}
+
+
+def test_registry_tools_run_with_manifest_schemas(monkeypatch):
+    """注册表的每个工具按清单schema传入必需参数后，处理器读取的参数名与schema一致"""
+    from src.mcp.registry.tool_registry import LAMToolRegistry
+
+    calls = []
+    for name in _BACKEND_MODULES:
+        module = types.ModuleType(name)
+        module.__getattr__ = lambda attr: _FakeBackend(calls, attr)
+        monkeypatch.setitem(sys.modules, name, module)
+
+    dispatcher = ToolDispatcher(cpu_workers=1)
+    executor = ToolExecutor(LAMToolRegistry(), dispatcher=dispatcher, stats=ToolStats())
+
+    async def run_all():
+        results = {}
+        for spec in registry_specs():
+            schema = spec.input_schema
+            args = {key: _SAMPLES[schema["properties"][key]["type"]] for key in schema.get("required", [])}
+            if spec.name == "calculate":
+                args["expression"] = "1+1"
+            results[spec.name] = await executor.execute_tool(spec.name, args)
+        return results
+
+    try:
+        results = asyncio.run(run_all())
+    finally:
+        dispatcher.shutdown()
+    failed = {name: response.to_dict() for name, response in results.items()
+              if not response.success or (isinstance(response.data, dict) and "error" in response.data)}
+    assert failed == {}
+
+    assert results["send_email"].data["subject"] == "x"
+    assert "'x'" in results["schedule_task"].data["message"]
+    assert ("executor.nl_step_execute", ({"query": "x"},), {}) in calls
+    assert ("executor.browse_product", ({"url": "x", "keyword": "x", "match_text": ""},), {}) in calls
+    assert ("bilibili_integration.get_watch_later_list", (1, 20), {}) in calls
+
+
+def test_action_mapping_keeps_aliases():
+    """适配器映射保留原有别名，未开放给智能体的工具不在映射中"""
+    from src.mcp.client import LAMAgentMCPAdapter
+
+    mapping = action_mapping()
+    assert LAMAgentMCPAdapter.ACTION_MAPPING == mapping
+    assert mapping["automate_page"] == "web_automate"
+    assert mapping["search_web"] == "web_search"
+    assert (mapping["create_file"], mapping["read_file"]) == ("file_write", "file_read")
+    assert mapping["steam_get_library"] == "steam_get_library"
+    for name in ("website_auto_login", "check_login_status", "desktop_scan", "desktop_launch", "server_stats"):
+        assert name not in mapping
+    assert set(mapping.values()) <= {spec.name for spec in server_specs()}
+
+
+def test_tools_list_uses_disk_cache_and_raw_bytes(tmp_path, monkeypatch):
+    """tools/list 结果写入磁盘缓存，新的服务器实例直接复用缓存字节；initialize 返回同一哈希"""
+    cache = tmp_path / "tools_list.cache"
+    server = _server(monkeypatch, cache)
+    data, digest = server.tools_list_result()
+    assert cache.exists()
+    assert json.loads(data)["_meta"]["lamToolsHash"] == digest
+
+    # 缓存命中时不再构建工具描述
+    other = _server(monkeypatch, cache)
+    monkeypatch.setattr(other, "_tool_descriptions", lambda: (_ for _ in ()).throw(AssertionError("重新编码")))
+    assert other.tools_list_result() == (data, digest)
+
+    async def scenario():
+        init = await other.handle_message({"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}})
+        listed = await other.handle_message({"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+        return init, listed
+
+    init, listed = asyncio.run(scenario())
+    assert init["result"]["capabilities"]["experimental"]["lamToolsHash"] == digest
+    assert isinstance(listed["result"], RawJSON)
+    frame = encode_frame(listed)
+    assert data in frame
+    assert json.loads(frame)["result"]["tools"][0]["name"] == server_specs()[0].name
+
+
+def test_modified_tool_table_invalidates_list(tmp_path, monkeypatch):
+    """运行时新增工具后按当前工具表重新编码，哈希随之变化"""
+    server = _server(monkeypatch, tmp_path / "tools_list.cache")
+    _, before = server.tools_list_result()
+    server.tools["extra"] = MCPTool("extra", "临时工具", {"type": "object"}, lambda args: {})
+    data, after = server.tools_list_result()
+    assert after != before
+    assert json.loads(data)["tools"][-1]["name"] == "extra"
+
+
+def test_client_skips_tools_list_when_hash_matches(tmp_path, monkeypatch):
+    """客户端磁盘缓存或内存中的工具列表与服务器哈希一致时不再请求 tools/list"""
+    from src.mcp.client import MCPClient
+
+    cache = tmp_path / "tools_list.cache"
+    server = _server(monkeypatch, cache)
+    server.tools_list_result()
+    methods = []
+
+    async def session(client):
+        from src.mcp.transport import InProcessTransport
+
+        transport = InProcessTransport(server=server)
+        request = transport.request
+
+        async def recording(method, params=None, timeout=None):
+            methods.append(method)
+            return await request(method, params, timeout)
+
+        transport.request = recording
+        client.transport = transport
+        await transport.start()
+        await client._initialize()
+        await client.stop_server()
+
+    client = MCPClient(transport="inprocess")
+    client.tools_list_cache = ""
+    asyncio.run(session(client))
+    assert methods == ["initialize", "tools/list"]
+    assert client.tools_hash and len(client.tools_cache) == len(server.tools)
+
+    # 同一客户端重新连接：内存中的列表仍然有效
+    methods.clear()
+    asyncio.run(session(client))
+    assert methods == ["initialize"]
+
+    # 新客户端：从服务器写下的磁盘缓存读取
+    methods.clear()
+    fresh = MCPClient(transport="inprocess")
+    fresh.tools_list_cache = str(cache)
+    asyncio.run(session(fresh))
+    assert methods == ["initialize"]
+    assert fresh.tools_cache == client.tools_cache
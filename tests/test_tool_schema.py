@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试工具参数的预编译校验
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+
+import pytest
+
+from src.mcp.core.base import MCPTool
+from src.mcp.core.schema import SchemaValidationError, compile_schema
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "url": {"type": "string"},
+        "page": {"type": "integer", "default": 1, "minimum": 1},
+        "headless": {"type": "boolean", "default": False},
+        "task_data": {"type": "object", "default": {}},
+        "category": {"type": "string", "default": None},
+        "steps": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "action": {"type": "string", "enum": ["click", "type", "sleep"]},
+                    "ms": {"type": "integer"},
+                },
+                "required": ["action"],
+            },
+        },
+    },
+    "required": ["url"],
+}
+
+
+def test_defaults_coercion_and_nested_items():
+    """填充默认值、宽松转换标量，并逐项校验嵌套的 steps"""
+    validate = compile_schema(SCHEMA)
+    args = {"url": "https://example.com", "page": "2", "category": None,
+            "steps": [{"action": "click"}, {"action": "sleep", "ms": "500"}]}
+
+    result = validate(args)
+
+    assert result == {
+        "url": "https://example.com", "page": 2, "headless": False, "task_data": {}, "category": None,
+        "steps": [{"action": "click"}, {"action": "sleep", "ms": 500}],
+    }
+    assert "headless" not in args
+    assert validate({"url": "u"})["task_data"] is not validate({"url": "u"})["task_data"]
+
+
+@pytest.mark.parametrize("args, message", [
+    ({}, "url: 缺少必需参数"),
+    ({"url": ["x"]}, "url: 类型应为 string，实际为 list"),
+    ({"url": "u", "page": 0}, "page: 不能小于 1"),
+    ({"url": "u", "steps": [{"action": "click"}, {"action": "fly"}]}, "steps[1].action: 取值必须是"),
+    ({"url": "u", "steps": [{"ms": 10}]}, "steps[0].action: 缺少必需参数"),
+])
+def test_invalid_arguments_report_path(args, message):
+    """错误信息包含出错字段的路径"""
+    with pytest.raises(SchemaValidationError) as excinfo:
+        compile_schema(SCHEMA)(args)
+    assert str(excinfo.value).startswith(message)
+
+
+def test_tool_rejects_before_dispatch():
+    """校验函数在注册时编译，无效调用不会进入处理器"""
+    from src.mcp.core.base import BaseToolRegistry, ToolExecutor
+
+    calls = []
+
+    async def handler(args):
+        calls.append(args)
+        return args
+
+    class Registry(BaseToolRegistry):
+        def register_tools(self):
+            self.register_tool(MCPTool("demo", "演示", SCHEMA, handler))
+
+    registry = Registry()
+    registry.register_tools()
+    executor = ToolExecutor(registry)
+
+    bad = asyncio.run(executor.execute_tool("demo", {"url": "u", "page": "abc"}))
+    good = asyncio.run(executor.execute_tool("demo", {"url": "u"}))
+
+    assert not bad.success and "page" in bad.error
+    assert good.success and good.data["page"] == 1
+    assert len(calls) == 1
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试MCP工具运行统计：延迟直方图精度、按工具计数与错误分类、server_stats 工具与JSONL快照
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+import random
+import time
+
+from src.mcp.core.base import MCPTool
+from src.mcp.core.execution import ExecutionClass
+from src.mcp.core.stats import LatencyHistogram, StatsDumper, ToolStats
+
+
+def test_histogram_percentiles_within_relative_error():
+    """对数-线性分桶的分位数与精确值的相对误差在 1/2**sub_bits 以内"""
+    rng = random.Random(7)
+    samples = [rng.lognormvariate(-3, 1.2) for _ in range(20000)]
+    histogram = LatencyHistogram()
+    for value in samples:
+        histogram.record(value)
+
+    ordered = sorted(samples)
+    for q in (0.5, 0.9, 0.95, 0.99):
+        exact = ordered[int(q * len(ordered) + 0.999999) - 1] * 1000
+        assert abs(histogram.percentile(q) - exact) / exact <= 1 / 32
+
+    summary = histogram.summary()
+    assert summary["count"] == 20000
+    assert summary["min_ms"] <= summary["p50_ms"] <= summary["p95_ms"] <= summary["p99_ms"] <= summary["max_ms"]
+    # 桶数与调用次数无关
+    assert len(histogram._counts) < 400
+
+
+def test_server_records_calls_errors_and_in_flight():
+    """call_tool 按工具计入调用、按类型计入错误，在途数在调用期间可见，结果经 server_stats 返回"""
+    from src.mcp.server import LAMMCPServer
+
+    server = LAMMCPServer()
+    server.tool_stats = ToolStats()
+    seen_in_flight = []
+
+    async def ok(args):
+        seen_in_flight.append(server.tool_stats.snapshot(["stats_ok"])["stats_ok"]["in_flight"])
+        await asyncio.sleep(0.01)
+        return {"value": args.get("n")}
+
+    def boom(args):
+        raise KeyError("missing")
+
+    server.tools["stats_ok"] = MCPTool("stats_ok", "正常工具", {
+        "type": "object", "properties": {"n": {"type": "integer"}}}, ok)
+    server.tools["stats_boom"] = MCPTool("stats_boom", "总是失败", {"type": "object"}, boom, ExecutionClass.BLOCKING_IO)
+    server.tools["stats_soft"] = MCPTool("stats_soft", "返回失败结果", {"type": "object"},
+                                         lambda args: {"success": False, "error": "未找到"})
+
+    async def scenario():
+        await asyncio.gather(*[server.call_tool("stats_ok", {"n": i}) for i in range(3)])
+        invalid = await server.call_tool("stats_ok", {"n": "x"})
+        await server.call_tool("stats_boom", {})
+        await server.call_tool("stats_soft", {})
+        await server.call_tool("no_such_tool", {})
+        stats = await server.call_tool("server_stats", {"tools": ["stats_ok", "stats_boom", "stats_soft"]})
+        return invalid, stats
+
+    invalid, stats = asyncio.run(scenario())
+
+    assert invalid["success"] is False
+    assert max(seen_in_flight) == 3
+    tools = stats["result"]["tools"]
+    assert set(tools) == {"stats_ok", "stats_boom", "stats_soft"}
+    assert (tools["stats_ok"]["calls"], tools["stats_ok"]["errors"]) == (4, 1)
+    assert tools["stats_ok"]["errors_by_type"] == {"validation": 1}
+    assert tools["stats_ok"]["in_flight"] == 0 and tools["stats_ok"]["max_in_flight"] == 3
+    assert tools["stats_ok"]["latency"]["p95_ms"] >= 10
+    assert tools["stats_boom"]["errors_by_type"] == {"KeyError": 1}
+    assert tools["stats_soft"]["errors_by_type"] == {"tool_error": 1}
+
+
+def test_tool_executor_records_stats():
+    """ToolExecutor 与服务器使用相同的统计口径"""
+    from src.mcp.core.base import BaseToolRegistry, ToolExecutor
+
+    class Registry(BaseToolRegistry):
+        def register_tools(self):
+            self.register_tool(MCPTool("double", "翻倍", {
+                "type": "object", "properties": {"n": {"type": "integer"}}, "required": ["n"]},
+                lambda args: {"n": args["n"] * 2}, ExecutionClass.BLOCKING_IO))
+
+    registry = Registry()
+    registry.register_tools()
+    stats = ToolStats()
+    executor = ToolExecutor(registry, stats=stats)
+
+    async def scenario():
+        await executor.execute_tool("double", {"n": 2})
+        await executor.execute_tool("double", {})
+
+    asyncio.run(scenario())
+    entry = stats.snapshot()["double"]
+    assert (entry["calls"], entry["errors"], entry["errors_by_type"]) == (2, 1, {"validation": 1})
+
+
+def test_periodic_jsonl_dump(tmp_path):
+    """后台定期追加快照，停止时再写一次，每行带版本标签"""
+    stats = ToolStats()
+    with stats.track("web_search"):
+        pass
+    path = tmp_path / "stats.jsonl"
+    dumper = StatsDumper(stats, str(path), interval=0.1, labels={"version": "1.2.3"}).start()
+    time.sleep(0.35)
+    dumper.stop()
+
+    rows = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert len(rows) >= 2
+    assert all(row["version"] == "1.2.3" for row in rows)
+    assert rows[-1]["tools"]["web_search"]["calls"] == 1
+    assert "p95_ms" in rows[-1]["tools"]["web_search"]["latency"]